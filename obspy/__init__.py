@@ -40,14 +40,14 @@ from obspy.core.utcdatetime import UTCDateTime  # NOQA
 from obspy.core.util import _get_version_string
 __version__ = _get_version_string(abbrev=10)
 from obspy.core.trace import Trace  # NOQA
-from obspy.core.stream import Stream, read
+from obspy.core.stream import Stream, read, iread  # NOQA
 from obspy.core.event import read_events, Catalog
 from obspy.core.inventory import read_inventory, Inventory  # NOQA
 from obspy.core.util.obspy_types import (  # NOQA
     ObsPyException, ObsPyReadingError)
 
 
-__all__ = ["UTCDateTime", "Trace", "__version__", "Stream", "read",
+__all__ = ["UTCDateTime", "Trace", "__version__", "Stream", "read", "iread",
            "read_events", "Catalog", "read_inventory", "ObsPyException",
            "ObsPyReadingError"]
 __all__ = [native_str(i) for i in __all__]
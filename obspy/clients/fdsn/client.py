@@ -16,17 +16,20 @@ from future.utils import PY2, native_str
 
 import collections
 import copy
-import gzip
 import io
 import os
 import re
+import shutil
 from socket import timeout as socket_timeout
 import textwrap
 import threading
 import warnings
+import zlib
 from collections import OrderedDict
 
 from lxml import etree
+import requests
+from requests.packages.urllib3 import exceptions as urllib3_exceptions
 
 import obspy
 from obspy import UTCDateTime, read_inventory
@@ -48,6 +51,13 @@ else:
 
 
 DEFAULT_SERVICE_VERSIONS = {'dataselect': 1, 'station': 1, 'event': 1}
+# chunk size for streaming responses to files and decompressing them
+DOWNLOAD_CHUNK_SIZE = 2 ** 16
+REDIRECT_WITH_CREDENTIALS_MSG = (
+    "Requests with credentials (username, password) are not being "
+    "redirected by default to improve security. To force redirects "
+    "and if you trust the data center, set `force_redirect` to True "
+    "when initializing the Client.")
 
 
 class CustomRedirectHandler(urllib_request.HTTPRedirectHandler):
@@ -89,11 +99,211 @@ class NoRedirectionHandler(urllib_request.HTTPRedirectHandler):
         """
         Copied and modified from the standard library.
         """
-        raise FDSNRedirectException(
-            "Requests with credentials (username, password) are not being "
-            "redirected by default to improve security. To force redirects "
-            "and if you trust the data center, set `force_redirect` to True "
-            "when initializing the Client.")
+        raise FDSNRedirectException(REDIRECT_WITH_CREDENTIALS_MSG)
+
+
+class PooledHTTPTransport(object):
+    """
+    HTTP transport for the FDSN client that keeps connections alive.
+
+    By default every request of a
+    :class:`~obspy.clients.fdsn.client.Client` opens a new connection to the
+    server. This transport uses a :class:`requests.Session` with a pool of
+    persistent connections instead, which saves the connection setup (and
+    the TLS handshake for https) for all but the first request to a server.
+    This makes many small requests, e.g. a bulk download split into many
+    requests, considerably faster. Responses are streamed, large responses
+    written to files are never held in memory as a whole.
+
+    One transport can be shared by multiple clients and threads. As
+    :class:`requests.Session` is not guaranteed to be thread-safe, every
+    thread uses its own session. All sessions share the (thread-safe)
+    connection pools of one :class:`requests.adapters.HTTPAdapter`, so
+    connections are reused across threads.
+
+    :type pool_connections: int
+    :param pool_connections: Number of servers to keep connection pools
+        for.
+    :type pool_maxsize: int
+    :param pool_maxsize: Maximum number of connections kept alive per
+        server, should be at least the number of threads using the
+        transport in parallel.
+    :type max_retries: int
+    :param max_retries: Number of retries of failed connection attempts.
+        Requests that reached the server are never retried.
+
+    >>> from obspy.clients.fdsn import Client
+    >>> from obspy.clients.fdsn.client import PooledHTTPTransport
+    >>> client = Client("IRIS", transport=PooledHTTPTransport())
+    """
+    # redirects forced to keep method and data, see CustomRedirectHandler
+    REDIRECT_CODES = (301, 302, 303, 307)
+    MAX_REDIRECTS = 10
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, max_retries=0):
+        self.adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+            max_retries=max_retries)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """
+        The :class:`requests.Session` of the current thread.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            # gzip is requested per request, requests would ask for it by
+            # default
+            session.headers["Accept-Encoding"] = "identity"
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            self._local.session = session
+        return session
+
+    def build_opener(self, user=None, password=None, follow_redirects=True):
+        """
+        Returns an opener using the connections of this transport to be used
+        by :func:`download_url`.
+
+        :type user: str
+        :param user: User name of HTTP Digest Authentication.
+        :type password: str
+        :param password: Password of HTTP Digest Authentication.
+        :type follow_redirects: bool
+        :param follow_redirects: Whether to follow redirects, otherwise a
+            :class:`~obspy.clients.fdsn.header.FDSNRedirectException` is
+            raised.
+        """
+        auth = None
+        if user is not None and password is not None:
+            auth = requests.auth.HTTPDigestAuth(user, password)
+        return _PooledOpener(self, auth, follow_redirects)
+
+    def close(self):
+        """
+        Closes all connections of the transport.
+        """
+        self.adapter.close()
+
+
+class _PooledOpener(object):
+    """
+    Opener of a :class:`PooledHTTPTransport`, compatible with the opener
+    directors of urllib.
+    """
+    def __init__(self, transport, auth, follow_redirects):
+        self.transport = transport
+        self.auth = auth
+        self.follow_redirects = follow_redirects
+
+    def open(self, request, data=None, timeout=None):
+        url = request.get_full_url()
+        headers = dict(request.header_items())
+        if data is None:
+            method = "GET"
+        else:
+            method = "POST"
+            # same as urllib
+            if not any(key.lower() == "content-type" for key in headers):
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+        for _ in range(self.transport.MAX_REDIRECTS + 1):
+            response = self.transport.session.request(
+                method, url, headers=headers, data=data, timeout=timeout,
+                auth=self.auth, allow_redirects=False, stream=True)
+            if response.status_code not in self.transport.REDIRECT_CODES \
+                    or "location" not in response.headers:
+                break
+            response.close()
+            if not self.follow_redirects:
+                raise FDSNRedirectException(REDIRECT_WITH_CREDENTIALS_MSG)
+            url = requests.compat.urljoin(
+                url, response.headers["location"].replace(" ", "%20"))
+        else:
+            raise FDSNException("Too many redirects: %s" % url)
+        if not 200 <= response.status_code < 300:
+            # same as urllib, the body of errors is small
+            try:
+                body = io.BytesIO(response.content)
+            finally:
+                response.close()
+            raise urllib_request.HTTPError(url, response.status_code,
+                                           response.reason, response.headers,
+                                           body)
+        return _PooledResponse(response)
+
+
+class _PooledResponse(object):
+    """
+    Streamed response of a :class:`PooledHTTPTransport`, compatible with the
+    responses of urllib. The connection goes back to the pool once the
+    response is read completely.
+    """
+    def __init__(self, response):
+        self.response = response
+
+    def getcode(self):
+        return self.response.status_code
+
+    def info(self):
+        return self.response.headers
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = None
+        try:
+            # content encodings are handled by download_url()
+            return self.response.raw.read(size, decode_content=False)
+        # raise the same exceptions as urllib, e.g. for timeouts or
+        # truncated responses
+        except urllib3_exceptions.ReadTimeoutError as e:
+            raise socket_timeout(str(e))
+        except urllib3_exceptions.HTTPError as e:
+            raise urllib_request.URLError(e)
+
+    def close(self):
+        self.response.close()
+
+
+class _GzipStreamReader(object):
+    """
+    File-like object decompressing a gzip compressed stream while reading.
+    """
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._buffer = b""
+        self._eof = False
+
+    def read(self, size=-1):
+        if size is None:
+            size = -1
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while not self._eof and (size < 0 or length < size):
+            data = self._fileobj.read(DOWNLOAD_CHUNK_SIZE)
+            if not data:
+                chunks.append(self._decompressor.flush())
+                self._eof = True
+                break
+            chunk = self._decompressor.decompress(data)
+            # concatenated gzip members
+            while self._decompressor.unused_data:
+                data = self._decompressor.unused_data
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                chunk += self._decompressor.decompress(data)
+            chunks.append(chunk)
+            length += len(chunk)
+        data = b"".join(chunks)
+        if size < 0:
+            self._buffer = b""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+    def close(self):
+        self._fileobj.close()
 
 
 class Client(object):
@@ -140,7 +350,7 @@ class Client(object):
     def __init__(self, base_url="IRIS", major_versions=None, user=None,
                  password=None, user_agent=DEFAULT_USER_AGENT, debug=False,
                  timeout=120, service_mappings=None, force_redirect=False,
-                 eida_token=None):
+                 eida_token=None, transport=None):
         """
         Initializes an FDSN Web Service client.
 
@@ -202,11 +412,18 @@ class Client(object):
             used. This mechanism is only available on select EIDA nodes. The
             token can be provided in form of the PGP message as a string, or
             the filename of a local file with the PGP message in it.
+        :type transport:
+            :class:`~obspy.clients.fdsn.client.PooledHTTPTransport`
+        :param transport: HTTP transport used for all requests. By default
+            every request opens a new connection using urllib. Pass a
+            :class:`~obspy.clients.fdsn.client.PooledHTTPTransport` to reuse
+            connections, which is much faster for many requests.
         """
         self.debug = debug
         self.user = user
         self.timeout = timeout
         self._force_redirect = force_redirect
+        self._transport = transport
 
         # Cache for the webservice versions. This makes interactive use of
         # the client more convenient.
@@ -312,6 +529,17 @@ class Client(object):
         self.set_credentials(user, password)
 
     def _set_opener(self, user, password):
+        # Redirect if no credentials are given or the force_redirect
+        # flag is True.
+        follow_redirects = (user is None and password is None) or \
+            self._force_redirect is True
+        if self._transport is not None:
+            self._url_opener = self._transport.build_opener(
+                user, password, follow_redirects)
+            if self.debug:
+                print('Installed new opener of transport {!r}'.format(
+                    self._transport))
+            return
         # Only add the authentication handler if required.
         handlers = []
         if user is not None and password is not None:
@@ -320,9 +548,7 @@ class Client(object):
             password_mgr.add_password(None, self.base_url, user, password)
             handlers.append(urllib_request.HTTPDigestAuthHandler(password_mgr))
 
-        if (user is None and password is None) or self._force_redirect is True:
-            # Redirect if no credentials are given or the force_redirect
-            # flag is True.
+        if follow_redirects:
             handlers.append(CustomRedirectHandler())
         else:
             handlers.append(NoRedirectionHandler())
@@ -510,12 +736,11 @@ class Client(object):
         url = self._create_url_from_parameters(
             "event", DEFAULT_PARAMETERS['event'], kwargs)
 
-        data_stream = self._download(url)
-        data_stream.seek(0, 0)
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
+            self._download(url, filename=filename)
         else:
+            data_stream = self._download(url)
+            data_stream.seek(0, 0)
             cat = obspy.read_events(data_stream, format="quakeml")
             data_stream.close()
             return cat
@@ -708,12 +933,11 @@ class Client(object):
         url = self._create_url_from_parameters(
             "station", DEFAULT_PARAMETERS['station'], kwargs)
 
-        data_stream = self._download(url)
-        data_stream.seek(0, 0)
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
+            self._download(url, filename=filename)
         else:
+            data_stream = self._download(url)
+            data_stream.seek(0, 0)
             # This works with XML and StationXML data.
             inventory = read_inventory(data_stream)
             data_stream.close()
@@ -827,12 +1051,11 @@ class Client(object):
 
         # Gzip not worth it for MiniSEED and most likely disabled for this
         # route in any case.
-        data_stream = self._download(url, use_gzip=False)
-        data_stream.seek(0, 0)
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
+            self._download(url, use_gzip=False, filename=filename)
         else:
+            data_stream = self._download(url, use_gzip=False)
+            data_stream.seek(0, 0)
             st = obspy.read(data_stream, format="MSEED")
             data_stream.close()
             if attach_response:
@@ -1005,13 +1228,11 @@ class Client(object):
 
         url = self._build_url("dataselect", "query")
 
-        data_stream = self._download(url,
-                                     data=bulk)
-        data_stream.seek(0, 0)
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
+            self._download(url, data=bulk, filename=filename)
         else:
+            data_stream = self._download(url, data=bulk)
+            data_stream.seek(0, 0)
             st = obspy.read(data_stream, format="MSEED")
             data_stream.close()
             if attach_response:
@@ -1151,14 +1372,12 @@ class Client(object):
 
         url = self._build_url("station", "query")
 
-        data_stream = self._download(url,
-                                     data=bulk)
-        data_stream.seek(0, 0)
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
+            self._download(url, data=bulk, filename=filename)
             return
         else:
+            data_stream = self._download(url, data=bulk)
+            data_stream.seek(0, 0)
             # Works with text and StationXML data.
             inv = obspy.read_inventory(data_stream)
             data_stream.close()
@@ -1166,10 +1385,11 @@ class Client(object):
 
     def _write_to_file_object(self, filename_or_object, data_stream):
         if hasattr(filename_or_object, "write"):
-            filename_or_object.write(data_stream.read())
+            shutil.copyfileobj(data_stream, filename_or_object,
+                               DOWNLOAD_CHUNK_SIZE)
             return
         with open(filename_or_object, "wb") as fh:
-            fh.write(data_stream.read())
+            shutil.copyfileobj(data_stream, fh, DOWNLOAD_CHUNK_SIZE)
 
     def _create_url_from_parameters(self, service, default_params, parameters):
         """
@@ -1374,13 +1594,27 @@ class Client(object):
 
         print("\n".join(msg))
 
-    def _download(self, url, return_string=False, data=None, use_gzip=True):
+    def _download(self, url, return_string=False, data=None, use_gzip=True,
+                  filename=None):
+        """
+        Downloads the URL and returns the response data or, if ``filename``
+        (a file name or file-like object) is given, streams the response to
+        the file and returns nothing.
+        """
         code, data = download_url(
             url, opener=self._url_opener, headers=self.request_headers,
             debug=self.debug, return_string=return_string, data=data,
-            timeout=self.timeout, use_gzip=use_gzip)
-        raise_on_error(code, data)
-        return data
+            timeout=self.timeout, use_gzip=use_gzip,
+            stream=filename is not None)
+        if filename is None:
+            raise_on_error(code, data)
+            return data
+        try:
+            raise_on_error(code, data)
+            self._write_to_file_object(filename, data)
+        finally:
+            if hasattr(data, "close"):
+                data.close()
 
     def _build_url(self, service, resource_type, parameters={}):
         """
@@ -1739,12 +1973,14 @@ def raise_on_error(code, data):
 
 
 def download_url(url, opener, timeout=10, headers={}, debug=False,
-                 return_string=True, data=None, use_gzip=True):
+                 return_string=True, data=None, use_gzip=True, stream=False):
     """
     Returns a pair of tuples.
 
     The first one is the returned HTTP code and the second the data as
-    string.
+    string. With ``stream=True`` the second one is the file-like response
+    instead, which has to be read and closed by the caller. Gzip compressed
+    responses are decompressed while reading.
 
     Will return a tuple of Nones if the service could not be found.
     All encountered exceptions will get raised unless `debug=True` is
@@ -1786,18 +2022,20 @@ def download_url(url, opener, timeout=10, headers={}, debug=False,
     if url_obj.info().get("Content-Encoding") == "gzip":
         if debug is True:
             print("Uncompressing gzipped response for %s" % url)
-        # Cannot directly stream to gzip from urllib!
-        # http://www.enricozini.org/2011/cazzeggio/python-gzip/
-        buf = io.BytesIO(url_obj.read())
-        buf.seek(0, 0)
-        f = gzip.GzipFile(fileobj=buf)
+        f = _GzipStreamReader(url_obj)
     else:
         f = url_obj
 
-    if return_string is False:
-        data = io.BytesIO(f.read())
-    else:
-        data = f.read()
+    if stream is True:
+        return code, f
+
+    try:
+        if return_string is False:
+            data = io.BytesIO(f.read())
+        else:
+            data = f.read()
+    finally:
+        f.close()
 
     if debug is True:
         print("Downloaded %s with HTTP code: %i" % (url, code))
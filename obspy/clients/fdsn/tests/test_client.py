@@ -14,17 +14,24 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 from future.utils import PY2
 
+import gzip
 import io
 import os
 import re
+import socket
 import sys
+import threading
 import unittest
 import warnings
 from difflib import Differ
 
 if PY2:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
     import urllib2 as urllib_request
 else:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
     import urllib.request as urllib_request
 
 import lxml
@@ -35,7 +42,9 @@ from obspy import UTCDateTime, read, read_inventory, Stream, Trace
 from obspy.core.compatibility import mock
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.clients.fdsn import Client, RoutingClient
-from obspy.clients.fdsn.client import build_url, parse_simple_xml
+from obspy.clients.fdsn.client import (CustomRedirectHandler,
+                                       PooledHTTPTransport, build_url,
+                                       download_url, parse_simple_xml)
 from obspy.clients.fdsn.header import (DEFAULT_USER_AGENT, URL_MAPPINGS,
                                        FDSNException, FDSNRedirectException,
                                        FDSNNoDataException)
@@ -1350,8 +1359,240 @@ class ClientTestCase(unittest.TestCase):
                                                'event_helpstring.txt'))
 
 
+class _LocalFDSNServer(ThreadingMixIn, HTTPServer):
+    """
+    Minimal local FDSN web service counting the connections of clients.
+    """
+    daemon_threads = True
+
+    def __init__(self, datapath):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), _LocalFDSNHandler)
+        self.datapath = datapath
+        self.connections = 0
+        self.requests = []
+        # stalled responses wait for this
+        self.release = threading.Event()
+
+
+class _LocalFDSNHandler(BaseHTTPRequestHandler):
+    # keep-alive, without delays of the separately written body
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    files = {
+        "/fdsnws/dataselect/1/application.wadl": "dataselect.wadl",
+        "/fdsnws/station/1/application.wadl": "station.wadl",
+        "/fdsnws/dataselect/1/query": "dataselect_example.mseed",
+        "/fdsnws/station/1/query": "AU.MEEK.xml"}
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+
+    def log_message(self, *args, **kwargs):
+        pass
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._respond()
+
+    def _respond(self):
+        self.server.requests.append((self.command, self.path))
+        path, _, query = self.path.partition("?")
+        headers = {}
+        if path in ("/stall", "/truncated"):
+            # announce more data than is sent
+            self.send_response(200)
+            self.send_header("Content-Length", "1000")
+            self.end_headers()
+            self.wfile.write(b"0" * 10)
+            self.wfile.flush()
+            if path == "/stall":
+                self.server.release.wait(10)
+            self.close_connection = True
+            return
+        if path == "/redirect":
+            code, body = 301, b""
+            headers["Location"] = query
+        elif "NODATA" in query:
+            code, body = 204, b""
+        elif path in self.files:
+            code = 200
+            with open(os.path.join(self.server.datapath, self.files[path]),
+                      "rb") as fh:
+                body = fh.read()
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                # two gzip members
+                buf = io.BytesIO()
+                for part in (body[:1000], body[1000:]):
+                    with gzip.GzipFile(fileobj=buf, mode="wb") as fh:
+                        fh.write(part)
+                body = buf.getvalue()
+                headers["Content-Encoding"] = "gzip"
+        else:
+            code, body = 404, b"Not found"
+        self.send_response(code)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if code != 204:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PooledHTTPTransportTestCase(unittest.TestCase):
+    """
+    Test cases for obspy.clients.fdsn.client.PooledHTTPTransport using a
+    local server.
+    """
+    def setUp(self):
+        self.datapath = os.path.join(os.path.dirname(__file__), "data")
+        self.server = _LocalFDSNServer(self.datapath)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.base_url = "http://127.0.0.1:%i" % self.server.server_address[1]
+        self.transport = PooledHTTPTransport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _get_client(self, **kwargs):
+        return Client(base_url=self.base_url, user_agent=USER_AGENT,
+                      service_mappings={"event": None}, **kwargs)
+
+    def test_same_results_as_urllib(self):
+        """
+        The pooled transport gives the same results as urllib and reuses the
+        connection for all requests.
+        """
+        client = self._get_client()
+        client_pooled = self._get_client(transport=self.transport)
+        t = UTCDateTime(2010, 1, 1)
+        st = client.get_waveforms("IU", "ANMO", "00", "BHZ", t, t + 10)
+        inv = client.get_stations(network="AU", station="MEEK")
+        self.server.connections = 0
+        for _ in range(3):
+            self.assertEqual(client_pooled.get_waveforms(
+                "IU", "ANMO", "00", "BHZ", t, t + 10), st)
+            # gzip compressed
+            self.assertEqual(client_pooled.get_stations(
+                network="AU", station="MEEK"), inv)
+            self.assertEqual(client_pooled.get_waveforms_bulk(
+                [("IU", "ANMO", "00", "BHZ", t, t + 10)]), st)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.requests[-1],
+                         ("POST", "/fdsnws/dataselect/1/query"))
+        # no data
+        for c in (client, client_pooled):
+            with self.assertRaises(FDSNNoDataException):
+                c.get_waveforms("IU", "NODATA", "00", "BHZ", t, t + 10)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_streaming_to_file(self):
+        """
+        Responses are streamed to files, gzip compressed responses are
+        decompressed while streaming.
+        """
+        client = self._get_client(transport=self.transport)
+        self.server.connections = 0
+        t = UTCDateTime(2010, 1, 1)
+        for filename, service in (("dataselect_example.mseed", "waveforms"),
+                                  ("AU.MEEK.xml", "stations")):
+            with open(os.path.join(self.datapath, filename), "rb") as fh:
+                expected = fh.read()
+            method = getattr(client, "get_" + service)
+            if service == "waveforms":
+                args = ("IU", "ANMO", "00", "BHZ", t, t + 10)
+            else:
+                args = ()
+            buf = io.BytesIO()
+            with mock.patch("obspy.clients.fdsn.client.DOWNLOAD_CHUNK_SIZE",
+                            100):
+                self.assertIsNone(method(*args, filename=buf))
+            self.assertEqual(buf.getvalue(), expected)
+            with NamedTemporaryFile() as tf:
+                method(*args, filename=tf.name)
+                with open(tf.name, "rb") as fh:
+                    self.assertEqual(fh.read(), expected)
+        # the connections of the service discovery are reused
+        self.assertEqual(self.server.connections, 0)
+
+    def test_redirects(self):
+        """
+        Redirects keep method and data and are only followed if allowed.
+        """
+        url = self.base_url + "/redirect?" + self.base_url + \
+            "/fdsnws/station/1/query"
+        with open(os.path.join(self.datapath, "AU.MEEK.xml"), "rb") as fh:
+            expected = fh.read()
+        for data in (None, b"AU MEEK * * * *"):
+            for opener in (self.transport.build_opener(),
+                           urllib_request.build_opener(
+                               CustomRedirectHandler())):
+                code, got = download_url(url, opener, data=data)
+                self.assertEqual(code, 200)
+                self.assertEqual(got, expected)
+                self.assertEqual(
+                    self.server.requests[-1][0],
+                    "GET" if data is None else "POST")
+            opener = self.transport.build_opener(follow_redirects=False)
+            code, got = download_url(url, opener, data=data)
+            self.assertIsNone(code)
+            self.assertIsInstance(got, FDSNRedirectException)
+        code, got = download_url(self.base_url + "/unknown",
+                                 self.transport.build_opener())
+        self.assertEqual(code, 404)
+        self.assertEqual(got.read(), b"Not found")
+
+    def test_read_errors(self):
+        """
+        Stalled and truncated responses raise the same exceptions as with
+        urllib, which are handled e.g. by the mass downloader.
+        """
+        from obspy.clients.fdsn.mass_downloader.utils import ERRORS
+        opener = self.transport.build_opener()
+        for op in (opener, urllib_request.build_opener()):
+            with self.assertRaises(socket.timeout):
+                download_url(self.base_url + "/stall", op, timeout=0.3)
+        with self.assertRaises(urllib_request.URLError) as cm:
+            download_url(self.base_url + "/truncated", opener)
+        self.assertIsInstance(cm.exception, ERRORS)
+
+    def test_threads(self):
+        """
+        Every thread uses its own session, connections are shared.
+        """
+        opener = self.transport.build_opener()
+        url = self.base_url + "/fdsnws/station/1/query"
+        sessions = []
+        codes = []
+
+        def _download():
+            sessions.append(self.transport.session)
+            codes.append(download_url(url, opener)[0])
+
+        _download()
+        self.server.connections = 0
+        threads = [threading.Thread(target=_download) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        self.assertEqual(codes, [200] * 3)
+        self.assertEqual(len(set(map(id, sessions))), 3)
+        self.assertEqual(self.server.connections, 0)
+
+
 def suite():
-    return unittest.makeSuite(ClientTestCase, 'test')
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(ClientTestCase, 'test'))
+    testsuite.addTest(unittest.makeSuite(PooledHTTPTransportTestCase, 'test'))
+    return testsuite
 
 
 if __name__ == '__main__':
@@ -42,13 +42,15 @@ from future.builtins import *  # NOQA
 import glob
 import os
 import re
+import threading
 import warnings
 from datetime import timedelta
 
 import numpy as np
 
-from obspy import Stream, read, UTCDateTime
+from obspy import Stream, Trace, read, UTCDateTime
 from obspy.core.stream import _headonly_warning_msg
+from obspy.core.util.base import _parallel_map
 from obspy.core.util.misc import BAND_CODE
 from obspy.io.mseed import ObsPyMSEEDFilesizeTooSmallError
 
@@ -69,7 +71,7 @@ class Client(object):
     FMTSTR = SDS_FMTSTR
 
     def __init__(self, sds_root, sds_type="D", format="MSEED",
-                 fileborder_seconds=30, fileborder_samples=5000):
+                 fileborder_seconds=30, fileborder_samples=5000, index=None):
         """
         Initialize a SDS local filesystem client.
 
@@ -106,6 +108,19 @@ class Client(object):
             code of the requested channel to sampling frequency. The maximum of
             both ``fileborder_seconds`` and ``fileborder_samples`` is used when
             determining if previous/next day should be checked for data.
+        :type index: str
+        :param index: Filename of a SQLite database used as persistent index
+            of all files in the archive with the SEED ids and time spans of
+            the data they contain (created if it does not exist yet). If
+            given, the index is brought up to date on initialization (only
+            new or changed files are read, judged by size and modification
+            time) and is then used to look up files in
+            :meth:`get_waveforms`, :meth:`get_waveforms_bulk`,
+            :meth:`get_availability_percentage`, :meth:`get_all_nslc`,
+            :meth:`get_all_stations`, :meth:`has_data` and
+            :meth:`get_latency` instead of searching the directory tree.
+            Use :meth:`update_index` to pick up data written to the archive
+            afterwards.
         """
         if not os.path.isdir(sds_root):
             msg = ("SDS root is not a local directory: " + sds_root)
@@ -115,6 +130,27 @@ class Client(object):
         self.format = format and format.upper()
         self.fileborder_seconds = fileborder_seconds
         self.fileborder_samples = fileborder_samples
+        self.index = None
+        if index is not None:
+            self.index = _SDSIndex(index, self.sds_root, self.FMTSTR,
+                                   self.format)
+            self.update_index()
+
+    def update_index(self):
+        """
+        Update the persistent index of the archive.
+
+        Only files that were added or changed in size or modification time
+        since the last update are read (headers only), entries of removed
+        files are deleted.
+
+        :rtype: int
+        :returns: Number of files that were (re)indexed.
+        """
+        if self.index is None:
+            msg = "Client was initialized without an index."
+            raise ValueError(msg)
+        return self.index.update()
 
     def get_waveforms(self, network, station, location, channel, starttime,
                       endtime, merge=-1, sds_type=None, **kwargs):
@@ -198,6 +234,45 @@ class Client(object):
             st.merge(merge)
         return st
 
+    def get_waveforms_bulk(self, bulk, merge=-1, sds_type=None, workers=None,
+                           **kwargs):
+        """
+        Read data for multiple SEED ids and time windows at once.
+
+        >>> from obspy import UTCDateTime
+        >>> t = UTCDateTime("2015-10-12T12")
+        >>> bulk = [("IU", "ANMO", "*", "HH?", t, t + 30),
+        ...         ("IU", "COLA", "*", "BH?", t - 60, t + 60)]
+        >>> st = client.get_waveforms_bulk(bulk, workers=4)
+        ... # doctest: +SKIP
+
+        :type bulk: list
+        :param bulk: List of (network, station, location, channel,
+            starttime, endtime) tuples, see :meth:`get_waveforms` for the
+            meaning of the individual items.
+        :type merge: int or None
+        :param merge: Merge operation performed on the data of each request,
+            see :meth:`get_waveforms`.
+        :type sds_type: str
+        :param sds_type: Override SDS data type identifier that was specified
+            during client initialization.
+        :type workers: int
+        :param workers: Number of threads used to read the requests
+            concurrently. By default requests are read one after another.
+        :param kwargs: Additional kwargs that get passed on to
+            :func:`~obspy.core.stream.read` internally.
+        :rtype: :class:`~obspy.core.stream.Stream`
+        """
+        def _get_waveforms(item):
+            return self.get_waveforms(*item, merge=merge, sds_type=sds_type,
+                                      **kwargs)
+
+        st = Stream()
+        for st_ in _parallel_map(_get_waveforms, bulk, workers=workers,
+                                 executor="thread"):
+            st += st_
+        return st
+
     def _get_filenames(self, network, station, location, channel, starttime,
                        endtime, sds_type=None):
         """
@@ -221,6 +296,10 @@ class Client(object):
         :rtype: list of str
         """
         sds_type = sds_type or self.sds_type
+        if self.index is not None:
+            return set(self.index.get_filenames(
+                network, station, location, channel, sds_type,
+                starttime=starttime, endtime=endtime))
         # SDS has data sometimes in adjacent days, so also try to read the
         # requested data from those files. Usually this is only a few seconds
         # of data after midnight, but for now we play safe here to catch all
@@ -305,29 +384,14 @@ class Client(object):
             msg = ("'endtime' must be after 'starttime'.")
             raise ValueError(msg)
         sds_type = sds_type or self.sds_type
-        with warnings.catch_warnings():
-            warnings.filterwarnings(
-                "ignore", _headonly_warning_msg, UserWarning,
-                "obspy.core.stream")
-            st = self.get_waveforms(network, station, location, channel,
-                                    starttime, endtime, sds_type=sds_type,
-                                    headonly=True, _no_trim_or_merge=True)
-        # even if the warning was silently caught and not shown it gets
-        # registered in the __warningregistry__ and will not be shown
-        # subsequently in a place were it's not caught
-        # see https://bugs.python.org/issue4180
-        # see e.g. http://blog.ionelmc.ro/2013/06/26/testing-python-warnings/
-        try:
-            from obspy.core.stream import __warningregistry__ as \
-                stream_warningregistry
-        except ImportError:
-            # import error means no warning has been issued from
-            # obspy.core.stream before, so nothing to do.
-            pass
+        if self.index is not None:
+            # The time spans of the data are known from the index.
+            st = self.index.get_headers(
+                network, station, location, channel, sds_type,
+                starttime=starttime, endtime=endtime)
         else:
-            for key in list(stream_warningregistry.keys()):
-                if key[0] == _headonly_warning_msg:
-                    stream_warningregistry.pop(key)
+            st = self._get_headers(network, station, location, channel,
+                                   starttime, endtime, sds_type=sds_type)
         st.sort(keys=['starttime', 'endtime'])
         st.traces = [tr for tr in st
                      if not (tr.stats.endtime < starttime or
@@ -353,6 +417,40 @@ class Client(object):
 
         return (1 - (gap_sum / total_duration), gap_count)
 
+    def _get_headers(self, network, station, location, channel, starttime,
+                     endtime, sds_type=None):
+        """
+        Read only the headers of all data for given SEED id and time span.
+
+        See :meth:`get_waveforms` for the parameters.
+
+        :rtype: :class:`~obspy.core.stream.Stream`
+        """
+        with warnings.catch_warnings():
+            warnings.filterwarnings(
+                "ignore", _headonly_warning_msg, UserWarning,
+                "obspy.core.stream")
+            st = self.get_waveforms(network, station, location, channel,
+                                    starttime, endtime, sds_type=sds_type,
+                                    headonly=True, _no_trim_or_merge=True)
+        # even if the warning was silently caught and not shown it gets
+        # registered in the __warningregistry__ and will not be shown
+        # subsequently in a place were it's not caught
+        # see https://bugs.python.org/issue4180
+        # see e.g. http://blog.ionelmc.ro/2013/06/26/testing-python-warnings/
+        try:
+            from obspy.core.stream import __warningregistry__ as \
+                stream_warningregistry
+        except ImportError:
+            # import error means no warning has been issued from
+            # obspy.core.stream before, so nothing to do.
+            pass
+        else:
+            for key in list(stream_warningregistry.keys()):
+                if key[0] == _headonly_warning_msg:
+                    stream_warningregistry.pop(key)
+        return st
+
     def _get_current_endtime(self, network, station, location, channel,
                              sds_type=None, stop_time=None):
         """
@@ -379,6 +477,11 @@ class Client(object):
         """
         sds_type = sds_type or self.sds_type
 
+        if self.index is not None:
+            return self.index.get_endtime(
+                network, station, location, channel, sds_type,
+                stop_time=stop_time or UTCDateTime(1950, 1, 1))
+
         seed_pattern = ".".join((network, station, location, channel))
 
         if not self.has_data(
@@ -472,6 +575,10 @@ class Client(object):
         """
         sds_type = sds_type or self.sds_type
 
+        if self.index is not None:
+            return bool(self.index.get_filenames(
+                network, station, location, channel, sds_type))
+
         pattern = re.sub(
             FORMAT_STR_PLACEHOLDER_REGEX,
             _wildcarded_except(["network", "station", "location", "channel",
@@ -507,6 +614,11 @@ class Client(object):
             available streams in archive.
         """
         sds_type = sds_type or self.sds_type
+        if self.index is not None:
+            if datetime is None:
+                return self.index.get_nslc(sds_type)
+            return self.index.get_nslc(sds_type, year=datetime.year,
+                                       doy=datetime.julday)
         result = set()
         # wildcarded pattern to match all files of interest
         if datetime is None:
@@ -554,6 +666,9 @@ class Client(object):
             in archive.
         """
         sds_type = sds_type or self.sds_type
+        if self.index is not None:
+            return sorted(set(
+                nslc[:2] for nslc in self.index.get_nslc(sds_type)))
         result = set()
         # wildcarded pattern to match all files of interest
         fmtstr = os.path.dirname(self.FMTSTR)
@@ -583,6 +698,182 @@ class Client(object):
         return sorted(result)
 
 
+class _SDSIndex(object):
+    """
+    Persistent index of the files in a SDS archive and the time spans of the
+    data they contain, stored in a SQLite database.
+
+    Wildcards in SEED ids are matched with SQLite's ``GLOB`` operator which
+    uses the same ``*`` and ``?`` semantics as :mod:`fnmatch`. Paths are
+    stored relative to the SDS root directory and times as integer
+    nanoseconds (compare :attr:`~obspy.core.utcdatetime.UTCDateTime.ns`).
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY, size INTEGER, mtime REAL);
+        CREATE TABLE IF NOT EXISTS segments (
+            path TEXT, network TEXT, station TEXT, location TEXT,
+            channel TEXT, sds_type TEXT, year INTEGER, doy INTEGER,
+            starttime INTEGER, endtime INTEGER, sampling_rate REAL,
+            npts INTEGER);
+        CREATE INDEX IF NOT EXISTS segments_nslc ON segments (
+            network, station, location, channel, starttime);
+        CREATE INDEX IF NOT EXISTS segments_path ON segments (path);
+        """
+
+    def __init__(self, filename, sds_root, fmtstr, format=None):
+        import sqlite3
+        self.sds_root = sds_root
+        self.format = format
+        self.pattern = os.path.join(sds_root, fmtstr)
+        self.group_map = {
+            i: groups[0] for i, groups in enumerate(re.findall(
+                FORMAT_STR_PLACEHOLDER_REGEX, self.pattern))}
+        # The connection is shared by the threads of
+        # Client.get_waveforms_bulk(), access is serialized with the lock.
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(self.SCHEMA)
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def update(self):
+        """
+        Index new and changed files and remove deleted files from the index.
+
+        :rtype: int
+        :returns: Number of (re)indexed files.
+        """
+        known = {path: (size, mtime) for path, size, mtime in
+                 self._query("SELECT path, size, mtime FROM files")}
+        changed = []
+        for dirpath, _, filenames in os.walk(self.sds_root):
+            for name in filenames:
+                full_path = os.path.join(dirpath, name)
+                info = _parse_path_to_dict(full_path, self.pattern,
+                                           self.group_map)
+                if not info or not all(
+                        key in info for key in ("network", "station",
+                                                "location", "channel")):
+                    continue
+                path = os.path.relpath(full_path, self.sds_root)
+                stat = os.stat(full_path)
+                if known.pop(path, None) == (stat.st_size, stat.st_mtime):
+                    continue
+                changed.append((path, stat, info))
+        rows = []
+        for path, stat, info in changed:
+            for tr in self._read_headers(os.path.join(self.sds_root, path)):
+                rows.append((
+                    path, tr.stats.network, tr.stats.station,
+                    tr.stats.location, tr.stats.channel,
+                    info.get("sds_type"), int(info.get("year") or 0),
+                    int(info.get("doy") or 0), tr.stats.starttime.ns,
+                    tr.stats.endtime.ns, tr.stats.sampling_rate,
+                    tr.stats.npts))
+        with self._lock, self._connection:
+            paths = [(path, ) for path in known] + \
+                [(path, ) for path, _, _ in changed]
+            self._connection.executemany(
+                "DELETE FROM files WHERE path = ?", paths)
+            self._connection.executemany(
+                "DELETE FROM segments WHERE path = ?", paths)
+            self._connection.executemany(
+                "INSERT INTO files VALUES (?, ?, ?)",
+                [(path, stat.st_size, stat.st_mtime)
+                 for path, stat, _ in changed])
+            self._connection.executemany(
+                "INSERT INTO segments VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(changed)
+
+    def _read_headers(self, filename):
+        with warnings.catch_warnings():
+            warnings.filterwarnings(
+                "ignore", _headonly_warning_msg, UserWarning,
+                "obspy.core.stream")
+            try:
+                return read(filename, format=self.format, headonly=True)
+            # Files that can not be read (e.g. files just being created in
+            # near-realtime archives) are indexed without data and get read
+            # again once they change.
+            except Exception:
+                return Stream()
+
+    def _where(self, network, station, location, channel, sds_type,
+               starttime=None, endtime=None):
+        sql = ("network GLOB ? AND station GLOB ? AND location GLOB ? AND "
+               "channel GLOB ? AND sds_type GLOB ?")
+        parameters = [network, station, location, channel, sds_type]
+        if starttime is not None:
+            sql += " AND endtime >= ?"
+            parameters.append(starttime.ns)
+        if endtime is not None:
+            sql += " AND starttime <= ?"
+            parameters.append(endtime.ns)
+        return sql, parameters
+
+    def get_filenames(self, network, station, location, channel, sds_type,
+                      starttime=None, endtime=None):
+        """
+        Returns all files with data matching given SEED id and time span.
+        """
+        sql, parameters = self._where(network, station, location, channel,
+                                      sds_type, starttime, endtime)
+        rows = self._query(
+            "SELECT DISTINCT path FROM segments WHERE " + sql, parameters)
+        return sorted(os.path.join(self.sds_root, path) for path, in rows)
+
+    def get_headers(self, network, station, location, channel, sds_type,
+                    starttime=None, endtime=None):
+        """
+        Returns header only traces of all indexed data matching given SEED id
+        and time span.
+        """
+        sql, parameters = self._where(network, station, location, channel,
+                                      sds_type, starttime, endtime)
+        rows = self._query(
+            "SELECT network, station, location, channel, starttime, "
+            "sampling_rate, npts FROM segments WHERE " + sql, parameters)
+        st = Stream()
+        for net, sta, loc, cha, t, sampling_rate, npts in rows:
+            st.append(Trace(header=dict(
+                network=net, station=sta, location=loc, channel=cha,
+                starttime=UTCDateTime(ns=t), sampling_rate=sampling_rate,
+                npts=npts)))
+        return st
+
+    def get_nslc(self, sds_type, year=None, doy=None):
+        """
+        Returns all SEED ids in the index, optionally only those in day files
+        of given year and day of year.
+        """
+        sql = "SELECT DISTINCT network, station, location, channel " \
+            "FROM segments WHERE sds_type GLOB ?"
+        parameters = [sds_type]
+        if year is not None:
+            sql += " AND year = ? AND doy = ?"
+            parameters += [year, doy]
+        return sorted(tuple(row) for row in self._query(sql, parameters))
+
+    def get_endtime(self, network, station, location, channel, sds_type,
+                    stop_time):
+        """
+        Returns the time of the last sample of given SEED id or ``None`` if
+        there is no data after ``stop_time``.
+        """
+        sql, parameters = self._where(network, station, location, channel,
+                                      sds_type, starttime=stop_time)
+        (endtime, ), = self._query(
+            "SELECT MAX(endtime) FROM segments WHERE " + sql, parameters)
+        if endtime is None:
+            return None
+        return UTCDateTime(ns=endtime)
+
+
 def _wildcarded_except(exclude=[]):
     """
     Function factory for :mod:`re` ``repl`` functions used in :func:`re.sub``,
@@ -605,7 +896,10 @@ def _parse_path_to_dict(path, pattern, group_map):
     # replace each format string placeholder with a regex group, matching
     # alphanumerics. append end-of-line otherwise the last non-greedy match
     # doesn't catch anything if it's at the end of the regex
-    regex = re.sub(FORMAT_STR_PLACEHOLDER_REGEX, r'(\w*?)', regex) + "$"
+    # (replacement given as function, escapes like "\w" in replacement
+    # strings are an error on Python >= 3.7)
+    regex = re.sub(FORMAT_STR_PLACEHOLDER_REGEX, lambda match: r'(\w*?)',
+                   regex) + "$"
     match = re.match(regex, path)
     if match is None:
         return None
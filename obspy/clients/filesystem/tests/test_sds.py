@@ -256,6 +256,80 @@ class SDSTestCase(unittest.TestCase):
             got_nslc = client.get_all_nslc(datetime=t - 2 * 24 * 3600)
             self.assertEqual([], got_nslc)
 
+    def test_indexed_client(self):
+        """
+        Test that a client backed by a persistent index gives the same
+        results as the plain client and that the index is updated
+        incrementally.
+        """
+        t = UTCDateTime() - 2.5 * 3600
+        with TemporarySDSDirectory(year=None, doy=None, time=t) as temp_sds, \
+                TemporaryWorkingDirectory():
+            client = Client(temp_sds.tempdir)
+            indexed = Client(temp_sds.tempdir, index="index.sqlite")
+            for seed_id in ("AB.ZZZ3..HH?", "*.*..HHZ", "*.*.*.*",
+                            "AB.XYZ..HHE", "XX.*.*.*"):
+                net, sta, loc, cha = seed_id.split(".")
+                for t1, t2 in ((t - 200, t + 200), (t - 80, t - 30),
+                               (t + 20, t + 40), (t + 900, t + 1000)):
+                    st = client.get_waveforms(net, sta, loc, cha, t1, t2)
+                    st_indexed = indexed.get_waveforms(net, sta, loc, cha,
+                                                       t1, t2)
+                    self.assertEqual(st.sort(), st_indexed.sort())
+                    self.assertEqual(
+                        client.get_availability_percentage(
+                            net, sta, loc, cha, t1, t2),
+                        indexed.get_availability_percentage(
+                            net, sta, loc, cha, t1, t2))
+                self.assertEqual(client.has_data(net, sta, loc, cha),
+                                 indexed.has_data(net, sta, loc, cha))
+            self.assertEqual(
+                client._get_current_endtime("AB", "XYZ", "", "HHZ"),
+                indexed._get_current_endtime("AB", "XYZ", "", "HHZ"))
+            self.assertEqual(client.get_all_stations(),
+                             indexed.get_all_stations())
+            self.assertEqual(client.get_all_nslc(), indexed.get_all_nslc())
+            for time in (t, t + 2 * 24 * 3600):
+                self.assertEqual(client.get_all_nslc(datetime=time),
+                                 indexed.get_all_nslc(datetime=time))
+            # bulk requests, read concurrently
+            bulk = [("AB", "XYZ", "", "HHZ", t - 200, t + 200),
+                    ("CD", "*", "00", "BH?", t - 80, t - 30)]
+            expected = Stream()
+            for item in bulk:
+                expected += client.get_waveforms(*item)
+            for workers in (None, 4):
+                self.assertEqual(
+                    expected, indexed.get_waveforms_bulk(bulk,
+                                                         workers=workers))
+                self.assertEqual(
+                    expected, client.get_waveforms_bulk(bulk,
+                                                        workers=workers))
+            # nothing changed, nothing to index
+            self.assertEqual(indexed.update_index(), 0)
+            indexed = Client(temp_sds.tempdir, index="index.sqlite")
+            self.assertEqual(indexed.update_index(), 0)
+            # changed and removed files
+            for filename in indexed._get_filenames("AB", "XYZ", "", "HHN",
+                                                   t - 200, t + 200):
+                os.remove(filename)
+            filename = sorted(indexed._get_filenames(
+                "AB", "XYZ", "", "HHZ", t - 200, t + 200))[0]
+            tr = Trace(data=np.arange(10, dtype=np.int32), header=dict(
+                network="AB", station="XYZ", channel="HHZ",
+                starttime=t + 100))
+            tr.write(filename, format="MSEED")
+            self.assertEqual(indexed.update_index(), 1)
+            for cha in ("HHZ", "HHN"):
+                self.assertEqual(
+                    indexed.get_waveforms("AB", "XYZ", "", cha, t - 200,
+                                          t + 200),
+                    client.get_waveforms("AB", "XYZ", "", cha, t - 200,
+                                         t + 200))
+            self.assertFalse(indexed.has_data("AB", "XYZ", "", "HHN"))
+            with self.assertRaises(ValueError):
+                client.update_index()
+
 
 def suite():
     return unittest.makeSuite(SDSTestCase, 'test')
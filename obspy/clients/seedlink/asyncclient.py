@@ -0,0 +1,516 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio based SeedLink client for many concurrent server connections.
+
+The :class:`~.AsyncSeedLinkClient` opens one connection per SeedLink server
+on an :mod:`asyncio` event loop and collects the data of all of them in one
+bounded queue. The MiniSEED records received in one read from a server are
+decoded together and handed out as one
+:class:`~obspy.core.stream.Stream`. If the consumer falls behind, reading
+from the servers is paused (TCP flow control then slows the servers down)
+until the queue has drained to half its size again.
+
+.. note::
+
+    Requires Python 3.4.4 or newer, ``async for`` requires Python 3.5.2 or
+    newer.
+
+.. rubric:: Example
+
+.. code-block:: python
+
+    import asyncio
+    from obspy.clients.seedlink.asyncclient import AsyncSeedLinkClient
+
+    client = AsyncSeedLinkClient()
+    client.select_stream('geofon.gfz-potsdam.de:18000', 'GE', 'APE', 'BH?')
+    client.select_stream('rtserve.iris.washington.edu:18000', 'IU', 'ANMO',
+                         'BHZ')
+
+    async def main():
+        await client.connect()
+        async for st in client:
+            print(st)
+
+    asyncio.get_event_loop().run_until_complete(main())
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from collections import OrderedDict, deque
+import io
+import logging
+
+try:
+    import asyncio
+except ImportError:  # Python 2
+    asyncio = None
+
+from obspy.core.stream import Stream
+from obspy.io.mseed.core import _read_mseed
+from .seedlinkexception import SeedLinkException
+from .slpacket import SLPacket
+
+
+logger = logging.getLogger('obspy.clients.seedlink')
+
+_PACKET_SIZE = SLPacket.SLHEADSIZE + SLPacket.SLRECSIZE
+
+
+class AsyncSeedLinkClient(object):
+    """
+    SeedLink client handling many server connections concurrently.
+
+    Streams are selected per server with :meth:`select_stream`, all
+    connections are opened with :meth:`connect`. Data is retrieved with
+    :meth:`get` (or by asynchronous iteration over the client), each item
+    being a :class:`~obspy.core.stream.Stream` with the records received in
+    one read from one server.
+
+    Lost connections are re-established after ``reconnect_delay`` seconds,
+    resuming each station from the last received sequence number.
+
+    :type max_queue: int
+    :param max_queue: Maximum number of undelivered batches of records. When
+        reached, reading from all servers is paused.
+    :type begin_time: :class:`~obspy.core.utcdatetime.UTCDateTime`
+    :param begin_time: Request data from this time on (``TIME`` command)
+        instead of the next available data. Connections end once the servers
+        have sent all data of the time window.
+    :type end_time: :class:`~obspy.core.utcdatetime.UTCDateTime`
+    :param end_time: End of the requested time window, only used with
+        ``begin_time``.
+    :type keepalive: float
+    :param keepalive: Interval in seconds of keepalive requests sent to idle
+        servers, ``0`` to disable.
+    :type reconnect_delay: float
+    :param reconnect_delay: Seconds to wait before reconnecting after a lost
+        connection, ``None`` to not reconnect.
+    :type timeout: float
+    :param timeout: Timeout in seconds for opening a connection and the
+        SeedLink handshake.
+    """
+    def __init__(self, max_queue=1000, begin_time=None, end_time=None,
+                 keepalive=0, reconnect_delay=30.0, timeout=30.0):
+        if asyncio is None:
+            msg = "AsyncSeedLinkClient requires Python 3.4.4 or newer."
+            raise NotImplementedError(msg)
+        if max_queue < 1:
+            raise ValueError("max_queue out of bounds: %s" % max_queue)
+        self.max_queue = max_queue
+        self.begin_time = begin_time
+        self.end_time = end_time
+        self.keepalive = keepalive
+        self.reconnect_delay = reconnect_delay
+        self.timeout = timeout
+        # server address -> (network, station) -> list of selectors
+        self.streams = OrderedDict()
+        # (network, station) -> last received sequence number
+        self.sequence_numbers = {}
+        self._loop = None
+        self._protocols = {}
+        self._queue = deque()
+        self._waiters = deque()
+        self._paused = False
+        self._closed = False
+
+    def select_stream(self, server, net, station, selector=None):
+        """
+        Select a stream of a server for data transfer.
+
+        :type server: str
+        :param server: Address of the SeedLink server, ``host:port`` (port
+            defaults to 18000).
+        :type net: str
+        :param net: The network id
+        :type station: str
+        :param station: The station id
+        :type selector: str
+        :param selector: A valid SeedLink selector, e.g. ``EHZ`` or ``EH?``,
+            several selectors separated by spaces.
+        """
+        if self._loop is not None:
+            msg = 'Streams have to be selected before connecting.'
+            raise SeedLinkException(msg)
+        selectors = self.streams.setdefault(server, OrderedDict()).setdefault(
+            (net, station), [])
+        if selector:
+            selectors.extend(selector.split())
+
+    def connect(self, loop=None):
+        """
+        Connect to all servers and negotiate the selected streams.
+
+        Returns an awaitable which is done when all connections are
+        streaming data and raises if any of the connections failed.
+
+        :param loop: Event loop to use, defaults to the current event loop.
+        """
+        if not self.streams:
+            msg = 'No streams specified. Use select_stream() to select ' + \
+                  'a stream.'
+            raise SeedLinkException(msg)
+        self._loop = loop or asyncio.get_event_loop()
+        return asyncio.gather(*[self._connect(server)
+                                for server in self.streams])
+
+    def _connect(self, server):
+        """
+        Opens the connection to one server, returns a future which is done
+        once data is streaming.
+        """
+        host, _, port = server.rpartition(':')
+        if not host or not port.isdigit():
+            host, port = server, 18000
+        protocol = _SeedLinkProtocol(self, server)
+        self._protocols[server] = protocol
+
+        def _connection_made(task):
+            if protocol.ready.done():
+                return
+            if task.cancelled():
+                protocol.ready.cancel()
+            elif task.exception() is not None:
+                protocol.ready.set_exception(task.exception())
+
+        task = asyncio.ensure_future(self._loop.create_connection(
+            lambda: protocol, host, int(port)), loop=self._loop)
+        task.add_done_callback(_connection_made)
+        self._loop.call_later(self.timeout, protocol.handshake_timeout, task)
+        return protocol.ready
+
+    def _connection_lost(self, server, protocol, finished):
+        """
+        Called by a protocol when its connection ended.
+        """
+        if self._closed or self._protocols.get(server) is not protocol:
+            return
+        if finished or self.reconnect_delay is None:
+            del self._protocols[server]
+            if not self._protocols:
+                self._close_queue()
+            return
+        msg = "Connection to %s lost, reconnecting in %g s"
+        logger.warning(msg % (server, self.reconnect_delay))
+
+        def _reconnect():
+            if self._closed:
+                return
+            future = self._connect(server)
+
+            def _check(future):
+                protocol = self._protocols.get(server)
+                # closed in the meantime
+                if protocol is None:
+                    return
+                if future.cancelled() or future.exception() is not None:
+                    self._connection_lost(server, protocol, False)
+            future.add_done_callback(_check)
+
+        self._loop.call_later(self.reconnect_delay, _reconnect)
+
+    def close(self):
+        """
+        Close all connections. Pending :meth:`get` calls raise
+        :class:`EOFError`.
+        """
+        self._closed = True
+        for protocol in self._protocols.values():
+            protocol.close()
+        self._protocols = {}
+        self._close_queue()
+
+    def _close_queue(self):
+        self._closed = True
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(EOFError("SeedLink connections closed"))
+
+    def _put(self, records):
+        """
+        Queue a batch of MiniSEED records received from a server.
+        """
+        for record in records:
+            self.sequence_numbers[_get_station(record[1])] = record[0]
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(self._decode(records))
+                return
+        self._queue.append(records)
+        if len(self._queue) >= self.max_queue and not self._paused:
+            self._paused = True
+            for protocol in self._protocols.values():
+                protocol.pause_reading()
+
+    def get(self):
+        """
+        Get the next batch of data.
+
+        Returns an awaitable resulting in a
+        :class:`~obspy.core.stream.Stream` with the records received in one
+        read from one of the servers. Raises :class:`EOFError` once all
+        connections are closed and all data was retrieved.
+        """
+        future = asyncio.Future(loop=self._loop)
+        if self._queue:
+            future.set_result(self._decode(self._queue.popleft()))
+            if self._paused and len(self._queue) <= self.max_queue // 2:
+                self._paused = False
+                for protocol in self._protocols.values():
+                    protocol.resume_reading()
+        elif self._closed:
+            future.set_exception(EOFError("SeedLink connections closed"))
+        else:
+            self._waiters.append(future)
+        return future
+
+    def get_nowait(self):
+        """
+        Get the next batch of data if available, else ``None``.
+
+        :rtype: :class:`~obspy.core.stream.Stream`
+        """
+        if not self._queue:
+            return None
+        return self.get().result()
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = asyncio.Future(loop=self._loop)
+
+        def _done(result):
+            if result.cancelled():
+                future.cancel()
+            elif isinstance(result.exception(), EOFError):
+                future.set_exception(StopAsyncIteration())
+            elif result.exception() is not None:
+                future.set_exception(result.exception())
+            else:
+                future.set_result(result.result())
+
+        self.get().add_done_callback(_done)
+        return future
+
+    @staticmethod
+    def _decode(records):
+        """
+        Decodes a batch of MiniSEED records with a single call to libmseed.
+        """
+        data = b"".join(record for _, record in records)
+        if not data:
+            return Stream()
+        return _read_mseed(io.BytesIO(data))
+
+
+class _ProtocolBase(asyncio.Protocol if asyncio is not None else object):
+    pass
+
+
+class _SeedLinkProtocol(_ProtocolBase):
+    """
+    SeedLink protocol of one server connection.
+
+    Negotiates the streams of the server (``HELLO``, then ``STATION``,
+    ``SELECT`` and ``DATA``/``TIME`` for every station and ``END``) and
+    passes all complete data packets of every read to the client.
+    """
+    def __init__(self, client, server):
+        self.client = client
+        self.server = server
+        self.ready = asyncio.Future(loop=client._loop)
+        self.transport = None
+        self._buffer = bytearray()
+        self._commands = deque()
+        self._streaming = False
+        self._finished = False
+        self._keepalive = None
+        self._accepted = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        # one group of commands per station, later commands of a group are
+        # dropped when the station is not accepted
+        self._commands.append((None, [b"HELLO"]))
+        client = self.client
+        for (net, station), selectors in client.streams[self.server].items():
+            commands = [("STATION %s %s" % (station, net)).encode()]
+            commands.extend(("SELECT %s" % selector).encode()
+                            for selector in selectors)
+            seqnum = client.sequence_numbers.get((net, station))
+            if seqnum is not None:
+                commands.append(("DATA %06X" % ((seqnum + 1) % 0x1000000))
+                                .encode())
+            elif client.begin_time is not None:
+                command = "TIME " + client.begin_time.format_seedlink()
+                if client.end_time is not None:
+                    command += " " + client.end_time.format_seedlink()
+                commands.append(command.encode())
+            else:
+                commands.append(b"DATA")
+            self._commands.append(((net, station), commands))
+        self._send_next()
+
+    def _send_next(self):
+        """
+        Sends the next handshake command, or END if all were sent.
+        """
+        while self._commands and not self._commands[0][1]:
+            self._commands.popleft()
+        if not self._commands:
+            if not self._accepted:
+                self._fail(SeedLinkException("no stations accepted"))
+                return
+            self.transport.write(b"END\r")
+            self._streaming = True
+            if self.client._paused:
+                self.pause_reading()
+            self._schedule_keepalive()
+            if not self.ready.done():
+                self.ready.set_result(self.server)
+            return
+        self.transport.write(self._commands[0][1][0] + b"\r")
+
+    def _handle_response(self, lines):
+        station, commands = self._commands[0]
+        command = commands.pop(0)
+        if station is None:
+            # HELLO, two lines of server id and organization
+            if not lines[0].lower().startswith(b"seedlink"):
+                msg = "Incorrect response to HELLO: %s" % lines[0]
+                self._fail(SeedLinkException(msg))
+                return
+            logger.info("%s: connected to '%s'" % (
+                self.server, lines[0].decode(errors='replace')))
+        elif lines[0] == b"OK":
+            if command.startswith((b"DATA", b"TIME")):
+                self._accepted += 1
+        elif lines[0] == b"ERROR":
+            logger.error("%s: command '%s' not accepted" % (
+                self.server, command.decode()))
+            if not command.startswith(b"SELECT"):
+                # skip the station
+                del commands[:]
+        else:
+            msg = "Invalid response to %s: %s" % (command, lines[0])
+            self._fail(SeedLinkException(msg))
+            return
+        self._send_next()
+
+    def data_received(self, data):
+        self._buffer.extend(data)
+        if not self._streaming:
+            while not self._streaming and not self._finished:
+                expected = 2 if self._commands[0][0] is None and \
+                    self._commands[0][1][0] == b"HELLO" else 1
+                lines = bytes(self._buffer).split(b"\r\n")
+                if len(lines) <= expected:
+                    return
+                del self._buffer[:sum(len(line) + 2
+                                      for line in lines[:expected])]
+                self._handle_response(lines[:expected])
+            if not self._streaming:
+                return
+        records = []
+        buf = self._buffer
+        offset = 0
+        while len(buf) - offset >= 3:
+            head = bytes(buf[offset:offset + 8])
+            if head.startswith(SLPacket.INFOSIGNATURE):
+                # answers to keepalive requests
+                if len(buf) - offset < _PACKET_SIZE:
+                    break
+                offset += _PACKET_SIZE
+            elif head.startswith(SLPacket.SIGNATURE):
+                if len(buf) - offset < _PACKET_SIZE:
+                    break
+                try:
+                    seqnum = int(head[2:8], 16)
+                except ValueError:
+                    seqnum = -1
+                records.append((seqnum, bytes(
+                    buf[offset + SLPacket.SLHEADSIZE:offset + _PACKET_SIZE])))
+                offset += _PACKET_SIZE
+            elif head.startswith(SLPacket.ENDSIGNATURE):
+                # end of requested time window
+                self._finished = True
+                offset = len(buf)
+                self.transport.close()
+            elif head.startswith(SLPacket.ERRORSIGNATURE[:3]):
+                logger.error("%s: server reported an error" % self.server)
+                offset = len(buf)
+                self.transport.close()
+            else:
+                logger.error("%s: invalid data, reconnecting" % self.server)
+                offset = len(buf)
+                self.transport.close()
+        del buf[:offset]
+        if records:
+            self._schedule_keepalive()
+            self.client._put(records)
+
+    def connection_lost(self, exc):
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+        if not self.ready.done():
+            self.ready.set_exception(exc or SeedLinkException(
+                "Connection to %s closed during handshake" % self.server))
+            return
+        self.client._connection_lost(self.server, self, self._finished)
+
+    def _fail(self, exc):
+        self._finished = True
+        if not self.ready.done():
+            self.ready.set_exception(exc)
+        if self.transport is not None:
+            self.transport.close()
+
+    def handshake_timeout(self, task):
+        if not self.ready.done():
+            task.cancel()
+            self._fail(SeedLinkException(
+                "Timeout connecting to %s" % self.server))
+
+    def _schedule_keepalive(self):
+        if not self.client.keepalive:
+            return
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+        self._keepalive = self.client._loop.call_later(
+            self.client.keepalive, self._send_keepalive)
+
+    def _send_keepalive(self):
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.write(b"INFO ID\r")
+            self._schedule_keepalive()
+
+    def pause_reading(self):
+        if self._streaming and not self.transport.is_closing():
+            self.transport.pause_reading()
+
+    def resume_reading(self):
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.resume_reading()
+
+    def close(self):
+        self._finished = True
+        if self.transport is not None:
+            self.transport.close()
+
+
+def _get_station(record):
+    """
+    Returns network and station code from the fixed header of a MiniSEED
+    record.
+    """
+    return (record[18:20].strip().decode(), record[8:13].strip().decode())
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.clients.seedlink.asyncclient test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import io
+import unittest
+
+import numpy as np
+
+from obspy import read, UTCDateTime
+from obspy.core.compatibility import PY2
+from obspy.clients.seedlink.asyncclient import AsyncSeedLinkClient, asyncio
+from obspy.clients.seedlink.seedlinkexception import SeedLinkException
+
+
+class _FakeSeedLinkServer(asyncio.Protocol if asyncio else object):
+    """
+    Minimal SeedLink server sending a fixed list of MiniSEED records.
+    """
+    def __init__(self, records, rejected=(), packets_per_write=None,
+                 close_after=None):
+        self.records = records
+        self.rejected = rejected
+        self.packets_per_write = packets_per_write
+        self.close_after = close_after
+        self.sessions = []
+        self.transport = None
+
+    def __call__(self):
+        self.sessions.append([])
+        self._buffer = b""
+        self._time_mode = False
+        self._start = 0
+        return self
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self._buffer += data
+        while b"\r" in self._buffer:
+            line, self._buffer = self._buffer.split(b"\r", 1)
+            line = line.strip().decode()
+            self.sessions[-1].append(line)
+            if line == "HELLO":
+                self.transport.write(b"SeedLink v3.1 (fake)\r\nObsPy\r\n")
+            elif line.startswith("STATION"):
+                ok = line.split()[1] not in self.rejected
+                self.transport.write(b"OK\r\n" if ok else b"ERROR\r\n")
+            elif line.startswith("SELECT"):
+                self.transport.write(b"OK\r\n")
+            elif line.startswith("DATA"):
+                if len(line.split()) > 1:
+                    self._start = int(line.split()[1], 16)
+                self.transport.write(b"OK\r\n")
+            elif line.startswith("TIME"):
+                self._time_mode = True
+                self.transport.write(b"OK\r\n")
+            elif line == "END":
+                self._send(self._start)
+
+    def _send(self, start):
+        loop = asyncio.get_event_loop()
+        if self.transport.is_closing():
+            return
+        stop = len(self.records)
+        if self.packets_per_write:
+            stop = min(stop, start + self.packets_per_write)
+        if self.close_after is not None and start >= self.close_after:
+            self.close_after = None
+            self.transport.close()
+            return
+        for seqnum in range(start, stop):
+            self.transport.write(
+                ("SL%06X" % seqnum).encode() + self.records[seqnum])
+        if stop < len(self.records):
+            loop.call_later(0.005, self._send, stop)
+        elif self._time_mode:
+            self.transport.write(b"END")
+
+
+@unittest.skipIf(PY2, 'asyncio requires Python 3')
+class AsyncSeedLinkClientTestCase(unittest.TestCase):
+    """
+    Test cases for AsyncSeedLinkClient against local fake servers.
+    """
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+            self.loop.run_until_complete(server.wait_closed())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _get_records(self, station):
+        st = read()
+        for tr in st:
+            tr.stats.station = station
+            tr.data = tr.data.astype(np.int32)
+        buf = io.BytesIO()
+        st.write(buf, format='MSEED', reclen=512, encoding='STEIM2')
+        data = buf.getvalue()
+        return st, [data[i:i + 512] for i in range(0, len(data), 512)]
+
+    def _start_server(self, protocol):
+        server = self.loop.run_until_complete(self.loop.create_server(
+            protocol, '127.0.0.1', 0))
+        self.servers.append(server)
+        return '127.0.0.1:%d' % server.sockets[0].getsockname()[1]
+
+    def _run(self, future, timeout=10):
+        return self.loop.run_until_complete(asyncio.wait_for(future, timeout))
+
+    def _get_all(self, client):
+        st = read()
+        st.clear()
+        while True:
+            try:
+                st += self._run(client.get())
+            except EOFError:
+                break
+        return st
+
+    def _get_records_of(self, client, key, count):
+        st = read()
+        st.clear()
+        while client._queue or \
+                client.sequence_numbers.get(key) != count - 1:
+            st += self._run(client.get())
+        return st
+
+    def _assert_complete(self, st, expected):
+        st.merge()
+        self.assertEqual(len(st), len(expected))
+        for tr in expected:
+            tr2 = st.select(id=tr.id)[0]
+            np.testing.assert_array_equal(tr2.data, tr.data)
+
+    def test_multiple_servers(self):
+        """
+        Data of all servers ends up in the queue, connections end after the
+        requested time window.
+        """
+        expected = read()
+        expected.clear()
+        servers = []
+        client = AsyncSeedLinkClient(begin_time=UTCDateTime(2009, 8, 24),
+                                     end_time=UTCDateTime(2009, 8, 25))
+        for station in ('RJOB', 'ABCD', 'EFGH'):
+            st, records = self._get_records(station)
+            expected += st
+            servers.append(_FakeSeedLinkServer(records, packets_per_write=3))
+            address = self._start_server(servers[-1])
+            client.select_stream(address, 'BW', station, 'EH?')
+        self._run(client.connect())
+        self._assert_complete(self._get_all(client), expected)
+        for server in servers:
+            commands = server.sessions[0]
+            self.assertEqual(commands[1:3], ['STATION %s BW' %
+                                             commands[1].split()[1],
+                                             'SELECT EH?'])
+            self.assertEqual(commands[3],
+                             'TIME 2009,8,24,0,0,0 2009,8,25,0,0,0')
+            self.assertEqual(commands[-1], 'END')
+        client.close()
+
+    def test_backpressure(self):
+        """
+        Reading from the servers is paused while the queue is full.
+        """
+        st, records = self._get_records('RJOB')
+        server = _FakeSeedLinkServer(records, packets_per_write=1)
+        client = AsyncSeedLinkClient(max_queue=3)
+        client.select_stream(self._start_server(server), 'BW', 'RJOB')
+        self._run(client.connect())
+        self._run(asyncio.sleep(0.3))
+        self.assertTrue(client._paused)
+        self.assertEqual(len(client._queue), 3)
+        # consuming resumes reading
+        result = self._get_records_of(client, ('BW', 'RJOB'), len(records))
+        self.assertFalse(client._paused)
+        self._assert_complete(result, st)
+        client.close()
+        self.assertRaises(EOFError, self._run, client.get())
+
+    def test_reconnect_resumes(self):
+        """
+        After a lost connection the client reconnects and requests data from
+        the last received sequence number on.
+        """
+        st, records = self._get_records('RJOB')
+        server = _FakeSeedLinkServer(records, packets_per_write=2,
+                                     close_after=4)
+        client = AsyncSeedLinkClient(reconnect_delay=0.01)
+        client.select_stream(self._start_server(server), 'BW', 'RJOB')
+        self._run(client.connect())
+        result = self._get_records_of(client, ('BW', 'RJOB'), len(records))
+        self._assert_complete(result, st)
+        self.assertEqual(len(server.sessions), 2)
+        self.assertEqual(server.sessions[0][2], 'DATA')
+        self.assertEqual(server.sessions[1][2], 'DATA 000004')
+        self.assertEqual(client.sequence_numbers[('BW', 'RJOB')],
+                         len(records) - 1)
+        client.close()
+
+    def test_close_while_reconnecting(self):
+        """
+        Closing the client while a reconnect is in progress.
+        """
+        st, records = self._get_records('RJOB')
+        server = _FakeSeedLinkServer(records, packets_per_write=2,
+                                     close_after=4)
+        errors = []
+        self.loop.set_exception_handler(
+            lambda loop, context: errors.append(context))
+        client = AsyncSeedLinkClient(reconnect_delay=0.01)
+        client.select_stream(self._start_server(server), 'BW', 'RJOB')
+        self._run(client.connect())
+        # the server does not answer the handshake of the reconnect
+        data_received = server.data_received
+        server.data_received = lambda data: len(server.sessions) > 1 or \
+            data_received(data)
+        while len(server.sessions) < 2:
+            self._run(asyncio.sleep(0.01))
+        client.close()
+        self._run(asyncio.sleep(0.1))
+        self.assertEqual(errors, [])
+        self._get_all(client)
+
+    def test_rejected_stations(self):
+        """
+        Rejected stations are skipped, without any accepted station the
+        connection fails.
+        """
+        st, records = self._get_records('RJOB')
+        server = _FakeSeedLinkServer(records, rejected=('XXXX',))
+        address = self._start_server(server)
+        client = AsyncSeedLinkClient()
+        client.select_stream(address, 'BW', 'XXXX', 'EHZ EHN')
+        client.select_stream(address, 'BW', 'RJOB')
+        self._run(client.connect())
+        self.assertEqual(server.sessions[0][1:], [
+            'STATION XXXX BW', 'STATION RJOB BW', 'DATA', 'END'])
+        client.close()
+        client = AsyncSeedLinkClient(reconnect_delay=None)
+        client.select_stream(address, 'BW', 'XXXX')
+        self.assertRaises(SeedLinkException, self._run, client.connect())
+        self.assertRaises(SeedLinkException, client.select_stream,
+                          address, 'BW', 'RJOB')
+
+
+def suite():
+    return unittest.makeSuite(AsyncSeedLinkClientTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
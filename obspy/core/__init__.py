@@ -124,7 +124,7 @@ from future.builtins import *  # NOQA
 from obspy.core.utcdatetime import UTCDateTime  # NOQA
 from obspy.core.util.attribdict import AttribDict  # NOQA
 from obspy.core.trace import Stats, Trace  # NOQA
-from obspy.core.stream import Stream, read  # NOQA
+from obspy.core.stream import Stream, read, iread  # NOQA
 from obspy.scripts.runtests import run_tests  # NOQA
 
 
@@ -25,8 +25,10 @@ from future.builtins import *  # NOQA
 
 from .base import (
     Comment, CompositeTime, ConfidenceEllipsoid, CreationInfo, DataUsed,
-    QuantityError, ResourceIdentifier, TimeWindow, WaveformStreamID)
+    QuantityError, ResourceIdentifier, ResourceIdentifierScope, TimeWindow,
+    WaveformStreamID)
 from .catalog import Catalog, read_events
+from .columns import CatalogColumns
 from .event import Event, EventDescription
 from .magnitude import (
     Amplitude, Magnitude, StationMagnitude, StationMagnitudeContribution)
@@ -28,6 +28,7 @@ import collections
 import copy
 import inspect
 import re
+import threading
 import warnings
 import weakref
 from copy import deepcopy
@@ -391,9 +392,13 @@ def _event_type_class_factory(class_name, class_attributes=[],
                     raise ValueError(msg)
 
             AttribDict.__setattr__(self, name, value)
-            # if value is a resource id bind or unbind the resource_id
+            # if value is a resource id bind or unbind the resource_id,
+            # scoped resource ids only bind objects to their own id
             if isinstance(value, ResourceIdentifier):
-                if name == "resource_id":  # bind the resource_id to self
+                if value._scope is not None:
+                    if name == "resource_id":
+                        value._scope._set_referred_object(value.id, self)
+                elif name == "resource_id":  # bind the resource_id to self
                     self.resource_id.set_referred_object(self, warn=False)
                 else:  # else unbind to allow event scoping later
                     value._object_id = None
@@ -617,8 +622,15 @@ class ResourceIdentifier(object):
     # keys are the id and values are a weak ref to the resource identifier
     __unbound_resource_id = weakref.WeakValueDictionary()
 
+    # Scope the instance was created in, None for the global bookkeeping.
+    _scope = None
+
     def __init__(self, id=None, prefix="smi:local",
                  referred_object=None):
+        scope = getattr(_scope_state, "scope", None)
+        if scope is not None and not isinstance(id, ResourceIdentifier):
+            self._init_scoped(scope, id, prefix, referred_object)
+            return
         # Create a resource id if None is given and possibly use a prefix.
         if id is None:
             self.fixed = False
@@ -639,7 +651,25 @@ class ResourceIdentifier(object):
         # Increment the counter for the current resource id.
         ResourceIdentifier.__resource_id_tracker[self.id] += 1
 
+    def _init_scoped(self, scope, id, prefix, referred_object):
+        """
+        Initialization inside of a :class:`ResourceIdentifierScope`, without
+        any global bookkeeping.
+        """
+        if id is None:
+            self.fixed = False
+            self._prefix = prefix
+            self._uuid = str(uuid4())
+        else:
+            self.id = scope._intern(id)
+        self.__dict__['_object_id'] = None
+        self._scope = scope
+        if referred_object is not None:
+            scope._set_referred_object(self.id, referred_object)
+
     def __del__(self):
+        if self._scope is not None:
+            return
         if self.id not in ResourceIdentifier.__resource_id_tracker:
             return
         # Decrement the resource id counter.
@@ -677,6 +707,8 @@ class ResourceIdentifier(object):
 
         Will return None if no object could be found.
         """
+        if self._scope is not None:
+            return self._scope._get_referred_object(self.id)
         try:
             rdic = ResourceIdentifier.__resource_id_weak_dict[self.id]
         except KeyError:
@@ -687,6 +719,19 @@ class ResourceIdentifier(object):
             else:  # find last added obj that is not None
                 return self._get_similar_referred_object()
 
+    @classmethod
+    def _get_global_referred_object(cls, id):
+        """
+        Returns the most recently bound object of the given ID that still
+        exists, ignoring scopes.
+        """
+        rdic = cls.__resource_id_weak_dict.get(id, {})
+        for ref in reversed(list(rdic.values())):
+            obj = ref()
+            if obj is not None:
+                return obj
+        return None
+
     def _get_similar_referred_object(self):
         """
         Find an object with the same resource_id that is not None and
@@ -729,6 +774,9 @@ class ResourceIdentifier(object):
         so everything stays consistent. Warning can be ignored by setting
         the warn parameter to False.
         """
+        if self._scope is not None:
+            self._scope._set_referred_object(self.id, referred_object)
+            return
         self._object_id = id(referred_object)  # identity of object
         rdic = ResourceIdentifier.__resource_id_weak_dict
         # if the resource_id is in the rid_dict
@@ -819,7 +867,9 @@ class ResourceIdentifier(object):
 
     @_object_id.setter
     def _object_id(self, value):
-        if value is None:  # add instance to unbound dict
+        if self._scope is not None:
+            pass
+        elif value is None:  # add instance to unbound dict
             self.__class__.__unbound_resource_id[id(self)] = self
         else:  # binding to object, remove instance from unbound dict
             self.__class__.__unbound_resource_id.pop(id(self), None)
@@ -942,6 +992,192 @@ class ResourceIdentifier(object):
         self._uuid = str(uuid4())
 
 
+# Currently active ResourceIdentifierScope of each thread.
+_scope_state = threading.local()
+# Attributes possibly holding objects with resource ids, per class.
+_child_keys = {}
+
+
+def _get_child_keys(cls, attributes):
+    """
+    Returns the names of all attributes of instances of an event type class
+    that can hold objects with a resource id.
+    """
+    try:
+        return _child_keys[cls]
+    except KeyError:
+        pass
+    if hasattr(cls, "_containers"):
+        keys = [key for key, type_ in cls._properties
+                if "resource_id" in getattr(type_, "_property_dict", ())]
+        keys.extend(reversed(cls._containers))
+    elif "events" in attributes:
+        # catalog
+        keys = ["comments", "events"]
+    else:
+        keys = []
+    _child_keys[cls] = keys
+    return keys
+
+
+class ResourceIdentifierScope(object):
+    """
+    Catalog scoped resolution of resource identifiers.
+
+    All :class:`ResourceIdentifier` instances created while a scope is active
+    (i.e. inside a ``with`` block) belong to that scope instead of the global
+    bookkeeping of the class: Their IDs are interned per scope, a single weak
+    reference per object is stored when it is assigned a scoped
+    ``resource_id`` and nothing is done when resource identifiers are
+    created, assigned as references or garbage collected.
+
+    >>> from obspy.core.event import Arrival, Catalog, Event, Origin, Pick
+    >>> with ResourceIdentifierScope():
+    ...     origin = Origin(resource_id="smi:local/origin/1")
+    ...     event = Event(origins=[origin],
+    ...                   preferred_origin_id="smi:local/origin/1")
+    ...     cat = Catalog(events=[event])
+    >>> event.preferred_origin() is origin
+    True
+
+    Deep copies of the catalog (or of single events) get a scope of their own
+    that resolves to the copied objects.
+
+    >>> cat2 = cat.copy()
+    >>> cat2[0].preferred_origin() is cat2[0].origins[0]
+    True
+    >>> cat2[0].preferred_origin() is origin
+    False
+
+    >>> with ResourceIdentifierScope():
+    ...     pick = Pick(resource_id="smi:local/pick/1")
+    ...     arrival = Arrival(pick_id="smi:local/pick/1")
+    >>> arrival.pick_id.get_referred_object() is pick
+    True
+
+    Resource identifiers of a scope resolve objects that were assigned a
+    resource identifier of the scope, objects explicitly bound with
+    :meth:`~ResourceIdentifier.set_referred_object` and, as a fallback,
+    objects of catalogs and events created in the scope (see
+    :meth:`add_root` to add others) and objects with resource identifiers
+    created outside of any scope. In contrast to the global bookkeeping,
+    a resource identifier always resolves to the object most recently bound
+    to its ID in the scope (not to the object it was bound to itself), no
+    warnings are shown when binding different objects to the same ID and
+    objects of other scopes are not found.
+    :func:`~obspy.core.event.read_events` reads into a scope of its own with
+    ``scope_resource_ids=True``.
+    """
+    def __init__(self):
+        self._roots = []
+        self._ids = {}
+        self._bound = weakref.WeakValueDictionary()
+        self._index = None
+        self._missing = set()
+        self._previous = []
+
+    def __enter__(self):
+        self._previous.append(getattr(_scope_state, "scope", None))
+        _scope_state.scope = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _scope_state.scope = self._previous.pop()
+
+    @staticmethod
+    def _current():
+        """
+        Returns the scope active in the current thread or None.
+        """
+        return getattr(_scope_state, "scope", None)
+
+    def add_root(self, obj):
+        """
+        Add a catalog or event whose objects can be referred to.
+
+        :type obj: :class:`~obspy.core.event.Catalog` or
+            :class:`~obspy.core.event.Event`
+        """
+        self._roots.append(weakref.ref(obj))
+        self._index = None
+        self._missing.clear()
+
+    def _intern(self, id):
+        self._missing.discard(id)
+        return self._ids.setdefault(id, id)
+
+    def _set_referred_object(self, id, referred_object):
+        self._bound[id] = referred_object
+
+    def _get_referred_object(self, id):
+        obj = self._bound.get(id)
+        if obj is not None:
+            return obj
+        if self._index is None:
+            self._build_index()
+        obj = self._index.get(id)
+        if obj is None and id not in self._missing:
+            # objects might have been added since the last look up, IDs not
+            # found are not looked up again until new objects are registered
+            self._build_index()
+            obj = self._index.get(id)
+            if obj is None:
+                self._missing.add(id)
+        if obj is None:
+            # objects created outside of the scope
+            obj = ResourceIdentifier._get_global_referred_object(id)
+        return obj
+
+    def _build_index(self):
+        """
+        Indexes all objects with a resource id reachable from the roots.
+        """
+        index = weakref.WeakValueDictionary()
+        roots = collections.OrderedDict()
+        for root in self._roots:
+            root = root()
+            if root is not None:
+                roots[id(root)] = root
+        self._roots = [weakref.ref(root) for root in roots.values()]
+        todo = list(reversed(roots.values()))
+        while todo:
+            obj = todo.pop()
+            attributes = obj.__dict__
+            resource_id = attributes.get("resource_id")
+            if isinstance(resource_id, ResourceIdentifier):
+                index.setdefault(resource_id.id, obj)
+            for key in _get_child_keys(type(obj), attributes):
+                value = attributes.get(key)
+                if isinstance(value, list):
+                    todo.extend(reversed(value))
+                elif value is not None:
+                    todo.append(value)
+        self._index = index
+
+    def __deepcopy__(self, memodict):
+        # Copies of roots get a scope of their own, single copied objects
+        # keep resolving to the original objects.
+        roots = [memodict[id(root())] for root in self._roots
+                 if root() is not None and id(root()) in memodict]
+        if not roots:
+            return self
+        new = ResourceIdentifierScope()
+        memodict[id(self)] = new
+        for root in roots:
+            new.add_root(root)
+        new._ids = self._ids.copy()
+        return new
+
+    def __getstate__(self):
+        return {"roots": [root() for root in self._roots
+                          if root() is not None]}
+
+    def __setstate__(self, state):
+        self.__init__()
+        for root in state["roots"]:
+            self.add_root(root)
+
+
 __CreationInfo = _event_type_class_factory(
     "__CreationInfo",
     class_attributes=[("agency_id", str),
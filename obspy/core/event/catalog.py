@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 from future.utils import native_str
 
+import functools
 import glob
 import io
 import copy
@@ -30,16 +31,16 @@ import warnings
 
 import numpy as np
 
-from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile, _read_from_plugin
-from obspy.core.util.base import (ENTRY_POINTS, download_to_file,
-                                  sanitize_filename)
+from obspy.core.util.base import (ENTRY_POINTS, _parallel_map,
+                                  download_to_file, sanitize_filename)
 from obspy.core.util.decorator import (map_example_filename, rlock,
                                        uncompress_file)
 from obspy.core.util.misc import buffered_load_entry_point
 from obspy.imaging.cm import obspy_sequential
 
-from .base import CreationInfo, ResourceIdentifier
+from .base import CreationInfo, ResourceIdentifier, ResourceIdentifierScope
+from .columns import CatalogColumns
 
 from .event import Event
 
@@ -79,6 +80,9 @@ class Catalog(object):
         self._set_resource_id(kwargs.get("resource_id", None))
         self.description = kwargs.get("description", "")
         self._set_creation_info(kwargs.get("creation_info", None))
+        scope = ResourceIdentifierScope._current()
+        if scope is not None:
+            scope.add_root(self)
 
     def _get_resource_id(self):
         return self.__dict__['resource_id']
@@ -321,83 +325,94 @@ class Catalog(object):
         2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb | manual
         2012-04-04T14:08:46.000000Z | +38.017,  +37.736 | 3.0 ML | manual
         """
-        # Helper functions. Only first argument might be None. Avoid
-        # unorderable types by checking first shortcut on positive is None
-        # also for the greater stuff (is confusing but correct)
-        def _is_smaller(value_1, value_2):
-            if value_1 is None or value_1 < value_2:
-                return True
-            return False
-
-        def _is_smaller_or_equal(value_1, value_2):
-            if value_1 is None or value_1 <= value_2:
-                return True
-            return False
+        inverse = kwargs.get("inverse", False)
+        # always rebuild the columns, events might have been changed in place
+        columns = self.get_columns(preferred=False, cache=False)
+        mask = columns._mask(args, legacy=True)
+        if inverse:
+            mask = ~mask
+        return Catalog(events=[ev for ev, selected in zip(columns.events, mask)
+                               if selected])
+
+    def get_columns(self, preferred=True, cache=True):
+        """
+        Returns a columnar view of the origin and magnitude parameters of all
+        events for vectorized filtering, sorting and export.
+
+        The columns are cached on the catalog and rebuilt if events are
+        added, removed or replaced. In-place changes to the events themselves
+        are not detected, use ``cache=False`` after modifying events.
+        :meth:`~obspy.core.event.catalog.Catalog.filter` and
+        :meth:`~obspy.core.event.catalog.Catalog.sort` always rebuild the
+        columns.
+
+        :type preferred: bool
+        :param preferred: If ``True``, use the preferred origin and magnitude
+            of each event (or the first ones if no preferred ones are set).
+            If ``False``, always use the first origin and magnitude.
+        :type cache: bool
+        :param cache: Reuse columns cached by previous calls.
+        :rtype: :class:`~obspy.core.event.columns.CatalogColumns`
 
-        def _is_greater(value_1, value_2):
-            if value_1 is None or value_1 <= value_2:
-                return False
-            return True
+        .. rubric:: Example
 
-        def _is_greater_or_equal(value_1, value_2):
-            if value_1 is None or value_1 < value_2:
-                return False
-            return True
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> columns = cat.get_columns()
+        >>> print(columns['latitude'])
+        [ 41.818  39.342  38.017]
+        >>> columns is cat.get_columns()
+        True
+        """
+        cached = self.__dict__.setdefault('_columns', {})
+        columns = cached.get(preferred)
+        if not cache or columns is None or \
+                len(columns.events) != len(self.events) or \
+                not all(a is b for a, b in zip(columns.events, self.events)):
+            columns = CatalogColumns.from_catalog(self.events,
+                                                  preferred=preferred)
+            cached[preferred] = columns
+        return columns
+
+    def sort(self, keys=['time'], reverse=False, preferred=True):
+        """
+        Sort the events in the Catalog object.
+
+        The events will be sorted according to the keys list. It will be
+        sorted by the first item first, then by the second and so on. Events
+        with missing values are put last.
+
+        :type keys: list, optional
+        :param keys: List of the columns of
+            :meth:`~obspy.core.event.catalog.Catalog.get_columns` according to
+            which the events will be sorted, e.g. ``'time'``,
+            ``'magnitude'``, ``'latitude'``, ``'longitude'`` or ``'depth'``.
+            Defaults to ``['time']``.
+        :type reverse: bool
+        :param reverse: Reverts sorting order to descending.
+        :type preferred: bool
+        :param preferred: Sort by the preferred origin and magnitude of the
+            events (or the first ones if no preferred ones are set). If
+            ``False``, always use the first origin and magnitude.
 
-        # Map the function to the operators.
-        operator_map = {"<": _is_smaller,
-                        "<=": _is_smaller_or_equal,
-                        ">": _is_greater,
-                        ">=": _is_greater_or_equal}
+        .. rubric:: Example
 
-        try:
-            inverse = kwargs["inverse"]
-        except KeyError:
-            inverse = False
-
-        events = list(self.events)
-        for arg in args:
-            try:
-                key, operator, value = arg.split(" ", 2)
-            except ValueError:
-                msg = "%s is not a valid filter rule." % arg
-                raise ValueError(msg)
-            if key == "magnitude":
-                temp_events = []
-                for event in events:
-                    if (event.magnitudes and event.magnitudes[0].mag and
-                        operator_map[operator](
-                            event.magnitudes[0].mag,
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
-            elif key in ("longitude", "latitude", "depth", "time"):
-                temp_events = []
-                for event in events:
-                    if (event.origins and key in event.origins[0] and
-                        operator_map[operator](
-                            event.origins[0].get(key),
-                            UTCDateTime(value) if key == 'time' else
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
-            elif key in ('standard_error', 'azimuthal_gap',
-                         'used_station_count', 'used_phase_count'):
-                temp_events = []
-                for event in events:
-                    if (event.origins and event.origins[0].quality and
-                        key in event.origins[0].quality and
-                        operator_map[operator](
-                            event.origins[0].quality.get(key),
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
-            else:
-                msg = "%s is not a valid filter key" % key
-                raise ValueError(msg)
-        if inverse:
-            events = [ev for ev in self.events if ev not in events]
-        return Catalog(events=events)
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> cat.sort(['magnitude'])  # doctest: +ELLIPSIS
+        <...Catalog object at 0x...>
+        >>> print(cat)
+        3 Event(s) in Catalog:
+        2012-04-04T14:08:46.000000Z | +38.017,  +37.736 | 3.0 ML | manual
+        2012-04-04T14:18:37.000000Z | +39.342,  +41.044 | 4.3 ML | manual
+        2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb | manual
+        """
+        columns = self.get_columns(preferred=preferred, cache=False)
+        indices = columns.argsort(keys=keys, reverse=reverse)
+        columns = columns.select(indices)
+        self.events = list(columns.events)
+        self.__dict__['_columns'] = {preferred: columns}
+        return self
 
     def copy(self):
         """
@@ -767,7 +782,8 @@ class Catalog(object):
 
 @rlock
 @map_example_filename("pathname_or_url")
-def read_events(pathname_or_url=None, format=None, **kwargs):
+def read_events(pathname_or_url=None, format=None, workers=None,
+                executor=None, scope_resource_ids=False, **kwargs):
     """
     Read event files into an ObsPy Catalog object.
 
@@ -783,6 +799,20 @@ def read_events(pathname_or_url=None, format=None, **kwargs):
     :type format: str
     :param format: Format of the file to read (e.g. ``"QUAKEML"``). See the
         `Supported Formats`_ section below for a list of supported formats.
+    :type workers: int, optional
+    :param workers: Number of files that are parsed in parallel if
+        ``pathname_or_url`` matches multiple files. Defaults to reading one
+        file after another. Events are ordered exactly as for serial reading.
+    :type executor: str or object, optional
+    :param executor: Only used together with multiple files. Either
+        ``"thread"`` (default) or ``"process"``, or an existing pool/executor
+        with a ``map()`` method. See :func:`~obspy.core.stream.read`.
+    :type scope_resource_ids: bool, optional
+    :param scope_resource_ids: If ``True``, all resource identifiers are
+        created in a :class:`~obspy.core.event.base.ResourceIdentifierScope`
+        of the read catalog. They are interned per catalog and referred
+        objects are only looked up on demand, which makes reading (and
+        copying and garbage collecting) of large catalogs faster.
     :rtype: :class:`~obspy.core.event.Catalog`
     :return: An ObsPy :class:`~obspy.core.event.Catalog` object.
 
@@ -805,7 +835,8 @@ def read_events(pathname_or_url=None, format=None, **kwargs):
     if pathname_or_url is None:
         # if no pathname or URL specified, return example catalog
         return _create_example_catalog()
-    elif not isinstance(pathname_or_url, (str, native_str)):
+    kwargs["scope_resource_ids"] = scope_resource_ids
+    if not isinstance(pathname_or_url, (str, native_str)):
         # not a string - we assume a file-like object
         try:
             # first try reading directly
@@ -841,21 +872,28 @@ def read_events(pathname_or_url=None, format=None, **kwargs):
             elif not glob.has_magic(pathname) and not os.path.isfile(pathname):
                 raise IOError(2, "No such file or directory", pathname)
 
-        catalog = _read(pathnames[0], format, **kwargs)
-        if len(pathnames) > 1:
-            for filename in pathnames[1:]:
-                catalog.extend(_read(filename, format, **kwargs).events)
+        read_file = functools.partial(_read, format=format, **kwargs)
+        catalogs = _parallel_map(read_file, pathnames, workers=workers,
+                                 executor=executor)
+        catalog = catalogs[0]
+        for other in catalogs[1:]:
+            catalog.extend(other.events)
         ResourceIdentifier.bind_resource_ids()
         return catalog
 
 
 @uncompress_file
-def _read(filename, format=None, **kwargs):
+def _read(filename, format=None, scope_resource_ids=False, **kwargs):
     """
     Reads a single event file into a ObsPy Catalog object.
     """
-    catalog, format = _read_from_plugin('event', filename, format=format,
-                                        **kwargs)
+    if scope_resource_ids:
+        with ResourceIdentifierScope():
+            catalog, format = _read_from_plugin('event', filename,
+                                                format=format, **kwargs)
+    else:
+        catalog, format = _read_from_plugin('event', filename, format=format,
+                                            **kwargs)
     for event in catalog:
         event._format = format
     return catalog
@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+"""
+obspy.core.event.columns - Columnar view of a Catalog
+=====================================================
+This module provides a columnar, NumPy based representation of the most
+frequently used event parameters of a
+:class:`~obspy.core.event.catalog.Catalog` to allow vectorized filtering,
+sorting and spatial selection of large catalogs.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import operator
+
+import numpy as np
+
+from obspy.core.utcdatetime import UTCDateTime
+
+
+COLUMNS_DTYPE = [
+    (native_str('time'), native_str('M8[us]')),
+    (native_str('latitude'), np.float64),
+    (native_str('longitude'), np.float64),
+    (native_str('depth'), np.float64),
+    (native_str('magnitude'), np.float64),
+    (native_str('magnitude_type'), native_str('U16')),
+    (native_str('event_type'), native_str('U32')),
+    (native_str('standard_error'), np.float64),
+    (native_str('azimuthal_gap'), np.float64),
+    (native_str('used_station_count'), np.float64),
+    (native_str('used_phase_count'), np.float64)]
+
+_ORIGIN_KEYS = ('time', 'latitude', 'longitude', 'depth')
+_QUALITY_KEYS = ('standard_error', 'azimuthal_gap', 'used_station_count',
+                 'used_phase_count')
+_STRING_KEYS = ('magnitude_type', 'event_type', 'resource_id')
+_NAT = np.datetime64('NaT', 'us').astype(np.int64)
+
+_OPERATORS = {"<": operator.lt,
+              "<=": operator.le,
+              ">": operator.gt,
+              ">=": operator.ge,
+              "==": operator.eq,
+              "!=": operator.ne}
+
+
+def _get_value(obj, key):
+    """
+    Returns an attribute of an event type object as float or ``nan``.
+    """
+    if obj is None:
+        return np.nan
+    value = obj.__dict__.get(key)
+    if value is None:
+        return np.nan
+    return value
+
+
+def _to_us(ns):
+    """
+    Rounds nanoseconds to microseconds (half to even), just like
+    :class:`~obspy.core.utcdatetime.UTCDateTime` comparisons with the default
+    precision do.
+
+    Uses Python integers, nanoseconds of times before 1678 or after 2262 do
+    not fit into 64 bit integers.
+    """
+    quotient, remainder = divmod(ns, 1000)
+    return quotient + int(remainder > 500 or
+                          (remainder == 500 and quotient % 2 == 1))
+
+
+class CatalogColumns(object):
+    """
+    Columnar view of the origin and magnitude parameters of all events of a
+    catalog.
+
+    Each column is a :class:`numpy.ndarray` with one entry per event.
+    Available columns are ``'time'`` (as ``datetime64[us]``, i.e. rounded
+    to microseconds), ``'latitude'``, ``'longitude'``, ``'depth'``,
+    ``'magnitude'``, ``'magnitude_type'``, ``'event_type'``,
+    ``'standard_error'``, ``'azimuthal_gap'``, ``'used_station_count'``,
+    ``'used_phase_count'`` and ``'resource_id'`` (UTF-8 encoded bytes).
+    Missing values are ``NaN``, ``NaT`` or empty strings.
+
+    Usually the columns are not created directly but with
+    :meth:`~obspy.core.event.catalog.Catalog.get_columns` which caches them
+    on the catalog.
+
+    :type data: :class:`numpy.ndarray`
+    :param data: Structured array holding the columns.
+    :type events: list of :class:`~obspy.core.event.event.Event`, optional
+    :param events: The events the rows were created from.
+
+    .. rubric:: Example
+
+    >>> from obspy.core.event import read_events
+    >>> cat = read_events()
+    >>> columns = cat.get_columns()
+    >>> print(columns['magnitude'])
+    [ 4.4  4.3  3. ]
+    >>> mask = columns.mask("magnitude >= 4", "latitude < 40")
+    >>> print(mask)
+    [False  True False]
+    >>> print(columns.select(columns.mask("magnitude >= 4")).to_catalog())
+    2 Event(s) in Catalog:
+    2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb | manual
+    2012-04-04T14:18:37.000000Z | +39.342,  +41.044 | 4.3 ML | manual
+    """
+    def __init__(self, data, events=None):
+        self.data = data
+        self.events = events
+        self._origin_mask = None
+        self._quality_mask = None
+
+    @classmethod
+    def from_catalog(cls, catalog, preferred=True):
+        """
+        Creates the columns from all events of a catalog.
+
+        :type catalog: :class:`~obspy.core.event.catalog.Catalog` or list of
+            :class:`~obspy.core.event.event.Event`
+        :param catalog: Events to create the columns from.
+        :type preferred: bool
+        :param preferred: If ``True``, use the preferred origin and magnitude
+            of each event and fall back to the first ones if no preferred
+            ones are set. If ``False``, always use the first origin and
+            magnitude.
+        """
+        events = list(catalog)
+        count = len(events)
+        times = np.empty(count, dtype=np.int64)
+        values = np.empty((count, 8), dtype=np.float64)
+        magnitude_types = []
+        event_types = []
+        resource_ids = []
+        origin_mask = np.zeros(count, dtype=np.bool_)
+        quality_mask = np.zeros(count, dtype=np.bool_)
+        for i, event in enumerate(events):
+            origin = magnitude = quality = None
+            if preferred:
+                origin = event.preferred_origin()
+                magnitude = event.preferred_magnitude()
+            if origin is None and event.origins:
+                origin = event.origins[0]
+            if magnitude is None and event.magnitudes:
+                magnitude = event.magnitudes[0]
+            if origin is not None:
+                origin_mask[i] = True
+                quality = origin.__dict__.get('quality')
+                time = origin.__dict__.get('time')
+                times[i] = _NAT if time is None else _to_us(time.ns)
+            else:
+                times[i] = _NAT
+            row = (_get_value(origin, 'latitude'),
+                   _get_value(origin, 'longitude'),
+                   _get_value(origin, 'depth'),
+                   _get_value(magnitude, 'mag'),
+                   _get_value(quality, 'standard_error'),
+                   _get_value(quality, 'azimuthal_gap'),
+                   _get_value(quality, 'used_station_count'),
+                   _get_value(quality, 'used_phase_count'))
+            values[i] = row
+            if quality is not None:
+                # checking all attributes of the quality is expensive, only
+                # do it if none of the columns is set
+                quality_mask[i] = \
+                    any(value == value for value in row[4:]) or bool(quality)
+            magnitude_types.append(
+                magnitude is not None and
+                magnitude.__dict__.get('magnitude_type') or '')
+            event_types.append(event.__dict__.get('event_type') or '')
+            resource_ids.append(str(event.resource_id).encode('utf-8'))
+        data = np.empty(count, dtype=cls._get_dtype(resource_ids))
+        data['time'] = times.view('M8[us]')
+        for j, key in enumerate(('latitude', 'longitude', 'depth',
+                                 'magnitude') + _QUALITY_KEYS):
+            data[key] = values[:, j]
+        data['magnitude_type'] = magnitude_types
+        data['event_type'] = event_types
+        data['resource_id'] = resource_ids
+        columns = cls(data, events=events)
+        columns._origin_mask = origin_mask
+        columns._quality_mask = quality_mask
+        return columns
+
+    @staticmethod
+    def _get_dtype(resource_ids):
+        width = max([len(rid) for rid in resource_ids] or [1])
+        return COLUMNS_DTYPE + [(native_str('resource_id'),
+                                 native_str('S%d' % width))]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        """
+        Returns the column of the given name.
+        """
+        return self.data[native_str(key)]
+
+    def __eq__(self, other):
+        if not isinstance(other, CatalogColumns):
+            return False
+        if len(self) != len(other):
+            return False
+        for name in self.data.dtype.names:
+            a, b = self.data[name], other.data[name]
+            if a.dtype.kind == 'M':
+                a, b = a.view(np.int64), b.view(np.int64)
+            if a.dtype.kind == 'f':
+                equal = np.array_equal(np.isnan(a), np.isnan(b)) and \
+                    np.array_equal(a[~np.isnan(a)], b[~np.isnan(b)])
+            else:
+                equal = np.array_equal(a, b)
+            if not equal:
+                return False
+        return True
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __str__(self):
+        return "%s(%d events)" % (self.__class__.__name__, len(self))
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    @property
+    def keys(self):
+        """
+        Names of all columns.
+        """
+        return [str(name) for name in self.data.dtype.names]
+
+    def _get_origin_mask(self):
+        if self._origin_mask is None:
+            self._origin_mask = \
+                self.data['time'].view(np.int64) != _NAT
+            for key in _ORIGIN_KEYS[1:]:
+                self._origin_mask |= ~np.isnan(self.data[key])
+            self._origin_mask |= self._get_quality_mask()
+        return self._origin_mask
+
+    def _get_quality_mask(self):
+        if self._quality_mask is None:
+            self._quality_mask = np.zeros(len(self), dtype=np.bool_)
+            for key in _QUALITY_KEYS:
+                self._quality_mask |= ~np.isnan(self.data[key])
+        return self._quality_mask
+
+    def _compare(self, key, op, value, missing):
+        """
+        Compares a column with a value, rows with missing values evaluate to
+        ``missing``.
+        """
+        column = self.data[native_str(key)]
+        if key == 'time':
+            us = column.view(np.int64)
+            valid = us != _NAT
+            result = op(us, _to_us(UTCDateTime(value).ns))
+        elif key in _STRING_KEYS:
+            if op not in (operator.eq, operator.ne):
+                msg = "Only '==' and '!=' are supported for key %s" % key
+                raise ValueError(msg)
+            if key == 'resource_id':
+                value = value.encode('utf-8')
+            valid = column != column.dtype.type()
+            result = op(column, value)
+        else:
+            valid = ~np.isnan(column)
+            with np.errstate(invalid='ignore'):
+                result = op(column, float(value))
+        return np.where(valid, result, missing)
+
+    def mask(self, *conditions):
+        """
+        Returns a boolean array that is ``True`` for all rows matching all of
+        the given conditions.
+
+        Conditions are strings of the form ``"key operator value"`` with any
+        of the column names as key and ``<``, ``<=``, ``>``, ``>=``, ``==``
+        or ``!=`` as operator. String columns only support ``==`` and
+        ``!=``. Rows with a missing value never match a condition on that
+        column.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self._mask(conditions)
+
+    def _mask(self, conditions, legacy=False):
+        """
+        Evaluates filter conditions.
+
+        With ``legacy=True`` the semantics of
+        :meth:`~obspy.core.event.catalog.Catalog.filter` are used: events
+        without a (quality of the) origin never match, missing origin and
+        quality values match ``<`` and ``<=``, zero magnitudes count as
+        missing.
+        """
+        mask = np.ones(len(self), dtype=np.bool_)
+        for condition in conditions:
+            try:
+                key, op, value = condition.split(" ", 2)
+            except ValueError:
+                msg = "%s is not a valid filter rule." % condition
+                raise ValueError(msg)
+            if legacy:
+                if key not in ('magnitude', ) + _ORIGIN_KEYS + _QUALITY_KEYS:
+                    msg = "%s is not a valid filter key" % key
+                    raise ValueError(msg)
+                # invalid operators raise a KeyError just like before
+                op = {"<": operator.lt, "<=": operator.le,
+                      ">": operator.gt, ">=": operator.ge}[op]
+            else:
+                if key not in self.data.dtype.names:
+                    msg = "%s is not a valid filter key" % key
+                    raise ValueError(msg)
+                try:
+                    op = _OPERATORS[op]
+                except KeyError:
+                    msg = "%s is not a valid filter rule." % condition
+                    raise ValueError(msg)
+            if not legacy:
+                mask &= self._compare(key, op, value, False)
+            elif key == 'magnitude':
+                mask &= self._compare(key, op, value, False)
+                mask &= self.data['magnitude'] != 0
+            else:
+                missing = op in (operator.lt, operator.le)
+                mask &= self._compare(key, op, value, missing)
+                if key in _QUALITY_KEYS:
+                    mask &= self._get_quality_mask()
+                else:
+                    mask &= self._get_origin_mask()
+        return mask
+
+    def argsort(self, keys=['time'], reverse=False):
+        """
+        Returns the indices that sort the rows by the given columns.
+
+        Rows are sorted by the first key first, then by the second key and
+        so on. Rows with missing values are put last.
+
+        :type keys: list of str
+        :param keys: Names of the columns to sort by.
+        :type reverse: bool
+        :param reverse: Sort in descending order.
+        :rtype: :class:`numpy.ndarray`
+        """
+        if isinstance(keys, (str, native_str)):
+            keys = [keys]
+        sort_keys = []
+        for key in keys:
+            column = self.data[native_str(key)]
+            if column.dtype.kind == 'M':
+                column = column.view(np.int64)
+                missing = column == _NAT
+            elif column.dtype.kind == 'f':
+                missing = np.isnan(column)
+            else:
+                missing = column == column.dtype.type()
+            if reverse:
+                if column.dtype.kind in 'US':
+                    # invert the order of strings by their rank
+                    column = -np.unique(column, return_inverse=True)[1]
+                else:
+                    column = -column
+            sort_keys.extend([missing, column])
+        # np.lexsort sorts by the last key first
+        return np.lexsort(sort_keys[::-1])
+
+    def select_region(self, minlatitude=None, maxlatitude=None,
+                      minlongitude=None, maxlongitude=None, latitude=None,
+                      longitude=None, minradius=None, maxradius=None):
+        """
+        Returns a boolean array that is ``True`` for all rows located in the
+        given geographic region.
+
+        Rectangular regions crossing the date line can be selected by setting
+        ``minlongitude`` larger than ``maxlongitude``. Circular regions are
+        given by ``latitude``, ``longitude`` and a minimum and/or maximum
+        radius in degrees. Rows without location never match.
+
+        :rtype: :class:`numpy.ndarray`
+        """
+        from obspy.geodetics import locations2degrees
+        lat = self.data['latitude']
+        lon = self.data['longitude']
+        mask = ~np.isnan(lat) & ~np.isnan(lon)
+        with np.errstate(invalid='ignore'):
+            if minlatitude is not None:
+                mask &= lat >= minlatitude
+            if maxlatitude is not None:
+                mask &= lat <= maxlatitude
+            if minlongitude is not None and maxlongitude is not None and \
+                    minlongitude > maxlongitude:
+                mask &= (lon >= minlongitude) | (lon <= maxlongitude)
+            else:
+                if minlongitude is not None:
+                    mask &= lon >= minlongitude
+                if maxlongitude is not None:
+                    mask &= lon <= maxlongitude
+            if minradius is not None or maxradius is not None:
+                if latitude is None or longitude is None:
+                    msg = ("latitude and longitude are needed for a radius "
+                           "selection")
+                    raise ValueError(msg)
+                distance = locations2degrees(latitude, longitude, lat, lon)
+                if minradius is not None:
+                    mask &= distance >= minradius
+                if maxradius is not None:
+                    mask &= distance <= maxradius
+        return mask
+
+    def select(self, indices):
+        """
+        Returns new columns only containing the given rows.
+
+        :type indices: :class:`numpy.ndarray`
+        :param indices: Boolean mask or integer indices of the rows.
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == np.bool_:
+            indices = np.flatnonzero(indices)
+        columns = self.__class__(self.data[indices])
+        if self.events is not None:
+            columns.events = [self.events[i] for i in indices]
+        if self._origin_mask is not None:
+            columns._origin_mask = self._origin_mask[indices]
+        if self._quality_mask is not None:
+            columns._quality_mask = self._quality_mask[indices]
+        return columns
+
+    def to_catalog(self):
+        """
+        Returns a catalog of the events of all rows.
+
+        If the columns were created from events, a catalog with references
+        to these events is returned. Otherwise (e.g. after
+        :meth:`~CatalogColumns.load`) new events containing one origin and
+        one magnitude with the parameters of the columns are created.
+
+        :rtype: :class:`~obspy.core.event.catalog.Catalog`
+        """
+        from .catalog import Catalog
+        if self.events is not None:
+            return Catalog(events=list(self.events))
+        from .event import Event
+        from .magnitude import Magnitude
+        from .origin import Origin, OriginQuality
+
+        def _get(value):
+            value = value.item()
+            return None if value != value else value
+
+        origin_mask = self._get_origin_mask()
+        quality_mask = self._get_quality_mask()
+        events = []
+        for row, has_origin, has_quality in zip(self.data, origin_mask,
+                                                quality_mask):
+            event = Event(resource_id=row['resource_id'].decode('utf-8'),
+                          event_type=str(row['event_type']) or None)
+            us = row['time'].view(np.int64).item()
+            if has_origin:
+                quality = None
+                if has_quality:
+                    quality = OriginQuality(**dict(
+                        (key, _get(row[key])) for key in _QUALITY_KEYS))
+                    for key in ('used_station_count', 'used_phase_count'):
+                        if quality[key] is not None:
+                            quality[key] = int(quality[key])
+                origin = Origin(
+                    time=None if us == _NAT else UTCDateTime(ns=us * 1000),
+                    latitude=_get(row['latitude']),
+                    longitude=_get(row['longitude']),
+                    depth=_get(row['depth']), quality=quality)
+                event.origins.append(origin)
+                event.preferred_origin_id = origin.resource_id
+            if not np.isnan(row['magnitude']) or row['magnitude_type']:
+                magnitude = Magnitude(
+                    mag=_get(row['magnitude']),
+                    magnitude_type=str(row['magnitude_type']) or None)
+                event.magnitudes.append(magnitude)
+                event.preferred_magnitude_id = magnitude.resource_id
+            events.append(event)
+        return Catalog(events=events)
+
+    def save(self, filename):
+        """
+        Saves the columns to a binary NumPy ``.npy`` file.
+
+        :type filename: str or file-like object
+        :param filename: Name of the file or open file-like object.
+        """
+        np.save(filename, self.data, allow_pickle=False)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Loads columns saved with :meth:`~CatalogColumns.save`.
+
+        :type filename: str or file-like object
+        :param filename: Name of the file or open file-like object.
+        """
+        data = np.load(filename, allow_pickle=False)
+        if data.dtype.names is None or \
+                list(data.dtype.descr[:-1]) != \
+                list(np.dtype(COLUMNS_DTYPE).descr):
+            msg = "File does not contain catalog columns."
+            raise ValueError(msg)
+        return cls(data)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -29,7 +29,7 @@ from obspy.imaging.source import plot_radiation_pattern, _setup_figure_and_axes
 
 
 from .base import (_event_type_class_factory,
-                   CreationInfo, ResourceIdentifier)
+                   CreationInfo, ResourceIdentifier, ResourceIdentifierScope)
 
 
 __Event = _event_type_class_factory(
@@ -102,6 +102,12 @@ class Event(__Event):
     """
     do_not_warn_on = ["_format", "extra"]
 
+    def __init__(self, *args, **kwargs):
+        super(Event, self).__init__(*args, **kwargs)
+        scope = ResourceIdentifierScope._current()
+        if scope is not None:
+            scope.add_root(self)
+
     def short_str(self):
         """
         Returns a short string representation of the current Event.
@@ -16,14 +16,17 @@ from future.utils import python_2_unicode_compatible, native_str
 
 import copy
 import fnmatch
+import functools
+import glob
 import os
 import textwrap
 import warnings
 
 import obspy
 from obspy.core.util.base import (ENTRY_POINTS, ComparingObject,
-                                  _read_from_plugin, NamedTemporaryFile,
-                                  download_to_file, sanitize_filename)
+                                  _parallel_map, _read_from_plugin,
+                                  NamedTemporaryFile, download_to_file,
+                                  sanitize_filename)
 from obspy.core.util.decorator import map_example_filename
 from obspy.core.util.misc import buffered_load_entry_point
 from obspy.core.util.obspy_types import ObsPyException, ZeroSamplingRate
@@ -51,12 +54,22 @@ def read_inventory(path_or_file_object=None, format=None, *args, **kwargs):
     """
     Function to read inventory files.
 
-    :param path_or_file_object: File name or file like object. If this
-        attribute is omitted, an example :class:`Inventory`
+    :param path_or_file_object: File name or file like object. Wildcards are
+        allowed for a file name, all matching files are merged into a single
+        inventory. If this attribute is omitted, an example :class:`Inventory`
         object will be returned.
     :type format: str
     :param format: Format of the file to read (e.g. ``"STATIONXML"``). See the
         `Supported Formats`_ section below for a list of supported formats.
+    :type workers: int, optional
+    :param workers: Keyword only. Number of files that are parsed in
+        parallel if ``path_or_file_object`` matches multiple files. Defaults
+        to reading one file after another. Networks are ordered exactly as
+        for serial reading.
+    :type executor: str or object, optional
+    :param executor: Keyword only, used together with multiple files. Either
+        ``"thread"`` (default) or ``"process"``, or an existing pool/executor
+        with a ``map()`` method. See :func:`~obspy.core.stream.read`.
     :rtype: :class:`~obspy.core.inventory.inventory.Inventory`
     :return: An ObsPy :class:`~obspy.core.inventory.inventory.Inventory`
         object.
@@ -82,6 +95,9 @@ def read_inventory(path_or_file_object=None, format=None, *args, **kwargs):
         StationXML standard and how to output it to StationXML
         see the :ref:`ObsPy Tutorial <stationxml-extra>`.
     """
+    # keyword only arguments, positional arguments go to the plugins
+    workers = kwargs.pop("workers", None)
+    executor = kwargs.pop("executor", None)
     if path_or_file_object is None:
         # if no pathname or URL specified, return example catalog
         return _create_example_inventory()
@@ -94,10 +110,33 @@ def read_inventory(path_or_file_object=None, format=None, *args, **kwargs):
         with NamedTemporaryFile(suffix=sanitize_filename(suffix)) as fh:
             download_to_file(url=path_or_file_object, filename_or_buffer=fh)
             return read_inventory(fh.name, format=format)
+    elif isinstance(path_or_file_object, (str, native_str)) and \
+            glob.has_magic(path_or_file_object):
+        # some file name pattern
+        pathnames = sorted(glob.glob(path_or_file_object))
+        if not pathnames:
+            raise Exception("No file matching file pattern: %s" %
+                            path_or_file_object)
+        read_file = functools.partial(_read, format=format, args=args,
+                                      **kwargs)
+        inventories = _parallel_map(read_file, pathnames, workers=workers,
+                                    executor=executor)
+        inventory = inventories[0]
+        for other in inventories[1:]:
+            inventory += other
+        return inventory
     return _read_from_plugin("inventory", path_or_file_object,
                              format=format, *args, **kwargs)[0]
 
 
+def _read(filename, format=None, args=(), **kwargs):
+    """
+    Reads a single inventory file into an ObsPy Inventory object.
+    """
+    return _read_from_plugin("inventory", filename, format=format, *args,
+                             **kwargs)[0]
+
+
 @python_2_unicode_compatible
 class Inventory(ComparingObject):
     """
@@ -15,8 +15,11 @@ from future.builtins import *  # NOQA
 
 import copy
 import ctypes as C
+import hashlib
+import pickle
+import threading
 import warnings
-from collections import defaultdict, Iterable
+from collections import OrderedDict, defaultdict, Iterable
 from copy import deepcopy
 from math import pi
 
@@ -33,6 +36,55 @@ from obspy.core.util.obspy_types import (ComplexWithUncertainties,
 from .util import Angle, Frequency
 
 
+# maximum number of evaluated responses kept in the response cache, set to 0
+# to disable caching
+RESPONSE_CACHE_SIZE = 64
+# maximum total size of all cached response arrays in bytes
+RESPONSE_CACHE_MAX_BYTES = 2 ** 28
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+_RESPONSE_CACHE_STATS = {"hits": 0, "misses": 0, "nbytes": 0}
+
+
+def get_response_cache_info():
+    """
+    Returns statistics of the cache of evaluated instrument responses.
+
+    Responses evaluated with
+    :meth:`Response.get_evalresp_response_for_frequencies` (and thus
+    :meth:`Response.get_evalresp_response` and
+    :meth:`~obspy.core.trace.Trace.remove_response`) are kept in a least
+    recently used cache keyed by the response stages, the instrument
+    sensitivity, the requested output units, the start and end stage and the
+    frequency grid. The size of the cache is controlled with the module level
+    variables ``RESPONSE_CACHE_SIZE`` (number of entries) and
+    ``RESPONSE_CACHE_MAX_BYTES`` (total size of cached arrays).
+
+    :rtype: dict
+    :returns: Dictionary with the number of cache ``"hits"`` and
+        ``"misses"``, the current number of entries (``"size"``), the total
+        size of all cached arrays in bytes (``"nbytes"``) and the maximum
+        number of entries (``"maxsize"``).
+    """
+    with _RESPONSE_CACHE_LOCK:
+        info = dict(_RESPONSE_CACHE_STATS)
+        info["size"] = len(_RESPONSE_CACHE)
+    info["maxsize"] = RESPONSE_CACHE_SIZE
+    return info
+
+
+def clear_response_cache():
+    """
+    Empties the cache of evaluated instrument responses and resets its
+    statistics.
+
+    See :func:`get_response_cache_info`.
+    """
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE.clear()
+        _RESPONSE_CACHE_STATS.update(hits=0, misses=0, nbytes=0)
+
+
 class ResponseStage(ComparingObject):
     """
     From the StationXML Definition:
@@ -1388,10 +1440,54 @@ class Response(ComparingObject):
         :rtype: :class:`numpy.ndarray`
         :returns: frequency response at requested frequencies
         """
-        output, chan = self._call_eval_resp_for_frequencies(
+        key = None
+        if RESPONSE_CACHE_SIZE > 0:
+            key = self._get_response_cache_key(
+                frequencies, output, start_stage, end_stage)
+        if key is not None:
+            with _RESPONSE_CACHE_LOCK:
+                cached = _RESPONSE_CACHE.pop(key, None)
+                if cached is not None:
+                    _RESPONSE_CACHE[key] = cached
+                    _RESPONSE_CACHE_STATS["hits"] += 1
+                    return cached.copy()
+                _RESPONSE_CACHE_STATS["misses"] += 1
+        response, chan = self._call_eval_resp_for_frequencies(
             frequencies, output=output, start_stage=start_stage,
             end_stage=end_stage)
-        return output
+        if key is not None and response.nbytes <= RESPONSE_CACHE_MAX_BYTES:
+            with _RESPONSE_CACHE_LOCK:
+                previous = _RESPONSE_CACHE.pop(key, None)
+                if previous is not None:
+                    _RESPONSE_CACHE_STATS["nbytes"] -= previous.nbytes
+                _RESPONSE_CACHE[key] = response.copy()
+                _RESPONSE_CACHE_STATS["nbytes"] += response.nbytes
+                while (len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE or
+                       _RESPONSE_CACHE_STATS["nbytes"] >
+                       RESPONSE_CACHE_MAX_BYTES):
+                    _, evicted = _RESPONSE_CACHE.popitem(last=False)
+                    _RESPONSE_CACHE_STATS["nbytes"] -= evicted.nbytes
+        return response
+
+    def _get_response_cache_key(self, frequencies, output, start_stage,
+                                end_stage):
+        """
+        Returns the key of the given evaluation in the response cache.
+
+        The response content is fingerprinted on every call so modifying the
+        stages of a response in place never returns stale results. Returns
+        ``None`` if the response can not be fingerprinted.
+        """
+        try:
+            content = pickle.dumps(
+                (self.response_stages, self.instrument_sensitivity,
+                 self.instrument_polynomial), protocol=2)
+        except Exception:
+            return None
+        frequencies = np.ascontiguousarray(frequencies, dtype=np.float64)
+        return (hashlib.sha1(content).hexdigest(),
+                hashlib.sha1(frequencies.tobytes()).hexdigest(),
+                len(frequencies), output.upper(), start_stage, end_stage)
 
     def get_evalresp_response(self, t_samp, nfft, output="VEL",
                               start_stage=None, end_stage=None):
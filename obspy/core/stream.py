@@ -15,22 +15,25 @@ from future.utils import PY3, native_str
 
 import copy
 import fnmatch
+import functools
 import math
 import os
 import pickle
 import re
 import warnings
+from collections import OrderedDict
 from glob import glob, has_magic
 
 import numpy as np
 
 from obspy.core import compatibility
-from obspy.core.trace import Trace
+from obspy.core.trace import (Trace, _detrend_data, _get_processing_info,
+                              _get_taper, _resample_data)
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import NamedTemporaryFile
 from obspy.core.util.base import (ENTRY_POINTS, _get_function_from_entry_point,
-                                  _read_from_plugin, download_to_file,
-                                  sanitize_filename)
+                                  _parallel_map, _read_from_plugin,
+                                  download_to_file, sanitize_filename)
 from obspy.core.util.decorator import (map_example_filename,
                                        raise_if_masked, uncompress_file)
 from obspy.core.util.misc import get_window_times, buffered_load_entry_point
@@ -39,11 +42,19 @@ from obspy.core.util.misc import get_window_times, buffered_load_entry_point
 _headonly_warning_msg = (
     "Keyword headonly cannot be combined with starttime, endtime or dtype.")
 
+# Filters and detrend methods that work along the last axis of 2-D arrays and
+# are applied at once to all traces of equal length and sampling rate. Only
+# methods giving results identical to trace by trace processing are listed
+# (e.g. not 'linear', least squares fits of 2-D arrays differ slightly).
+_BATCH_FILTERS = ("bandpass", "bandstop", "lowpass", "highpass",
+                  "lowpass_cheby_2")
+_BATCH_DETRENDS = ("simple", "constant", "demean")
+
 
 @map_example_filename("pathname_or_url")
 def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
          endtime=None, nearest_sample=True, dtype=None, apply_calib=False,
-         check_compression=True, **kwargs):
+         check_compression=True, workers=None, executor=None, **kwargs):
     """
     Read waveform files into an ObsPy Stream object.
 
@@ -88,6 +99,18 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     :param check_compression: Check for compression on file and decompress
         if needed. This may be disabled for a moderate speed up.
     :type check_compression: bool, optional
+    :type workers: int, optional
+    :param workers: Number of files that are decoded in parallel if
+        ``pathname_or_url`` matches multiple files. Defaults to reading one
+        file after another. The traces in the resulting stream are ordered
+        exactly as for serial reading.
+    :type executor: str or object, optional
+    :param executor: Only used together with multiple files. Either
+        ``"thread"`` (default) or ``"process"`` to select the kind of pool
+        created for ``workers``, or an existing pool/executor with a ``map()``
+        method (e.g. :class:`concurrent.futures.ProcessPoolExecutor`) which
+        is used instead. Threads work well for formats decoded in C (e.g.
+        MiniSEED), processes for formats parsed in pure Python.
     :param kwargs: Additional keyword arguments passed to the underlying
         waveform reader method.
     :return: An ObsPy :class:`~obspy.core.stream.Stream` object.
@@ -231,8 +254,11 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     else:
         # some file name
         pathname = pathname_or_url
-        for file in sorted(glob(pathname)):
-            st.extend(_read(file, format, headonly, **kwargs).traces)
+        read_file = functools.partial(_read, format=format,
+                                      headonly=headonly, **kwargs)
+        for stream in _parallel_map(read_file, sorted(glob(pathname)),
+                                    workers=workers, executor=executor):
+            st.extend(stream.traces)
         if len(st) == 0:
             # try to give more specific information why the stream is empty
             if has_magic(pathname) and not glob(pathname):
@@ -268,6 +294,132 @@ def read(pathname_or_url=None, format=None, headonly=False, starttime=None,
     return st
 
 
+@map_example_filename("pathname")
+def iread(pathname, format=None, headonly=False, window_length=None,
+          overlap=0, starttime=None, endtime=None, nearest_sample=True,
+          **kwargs):
+    """
+    Generator lazily reading waveform files trace by trace or window by
+    window.
+
+    In contrast to :func:`~obspy.core.stream.read`, the data of all files
+    matched by ``pathname`` is never held in memory at once, so arbitrarily
+    large data sets can be processed in a loop.
+
+    Without ``window_length`` the files are read one after another and
+    their :class:`~obspy.core.trace.Trace` objects are yielded one by one.
+    Otherwise :class:`~obspy.core.stream.Stream` objects with all data in
+    consecutive time windows of ``window_length`` seconds are yielded. To
+    do so, the time spans of all files are determined in a first pass
+    reading only the headers. Afterwards a file is read when the first
+    window it has data for is reached and released again when the windows
+    have moved past its end, so only the files overlapping the current
+    window are held in memory. Traces continuing across files (e.g. day
+    files) are merged.
+
+    :type pathname: str
+    :param pathname: File name, wildcards are allowed. Files are processed
+        in alphabetical order.
+    :type format: str, optional
+    :param format: Format of the files, see :func:`~obspy.core.stream.read`.
+    :type headonly: bool, optional
+    :param headonly: Only read the headers. Can not be combined with
+        ``window_length``.
+    :type window_length: float, optional
+    :param window_length: Length of the yielded time windows in seconds.
+    :type overlap: float, optional
+    :param overlap: Overlap of successive windows in seconds, e.g. to leave
+        room for filter transients in window based processing.
+    :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`, optional
+    :param starttime: Only read data after this time. For windows it also
+        is the start time of the first window, otherwise windows start at
+        the earliest data.
+    :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime`, optional
+    :param endtime: Only read data before this time.
+    :type nearest_sample: bool, optional
+    :param nearest_sample: See :func:`~obspy.core.stream.read`.
+    :param kwargs: Additional keyword arguments passed to
+        :func:`~obspy.core.stream.read`.
+
+    .. rubric:: Example
+
+    >>> from obspy import iread
+    >>> for tr in iread("/path/to/test.mseed"):
+    ...     print(tr)  # doctest: +ELLIPSIS
+    NL.HGN.00.BHZ | 2003-05-29T02:13:22.043400Z - ... | 40.0 Hz, 11947 samples
+
+    >>> for st in iread("/path/to/BW.BGLD.__.EHE.D.2008.001.first_10_records",
+    ...                 window_length=8, overlap=2):
+    ...     print(st)  # doctest: +ELLIPSIS
+    1 Trace(s) in Stream:
+    BW.BGLD..EHE | 2007-12-31T23:59:59.915000Z - ... | 200.0 Hz, 1601 samples
+    1 Trace(s) in Stream:
+    BW.BGLD..EHE | 2008-01-01T00:00:05.915000Z - ... | 200.0 Hz, 1601 samples
+    1 Trace(s) in Stream:
+    BW.BGLD..EHE | 2008-01-01T00:00:11.915000Z - ... | 200.0 Hz, 1601 samples
+    1 Trace(s) in Stream:
+    BW.BGLD..EHE | 2008-01-01T00:00:17.915000Z - ... | 200.0 Hz, 520 samples
+    """
+    filenames = sorted(glob(pathname))
+    if not filenames:
+        if has_magic(pathname):
+            raise Exception("No file matching file pattern: %s" % pathname)
+        raise IOError(2, "No such file or directory", pathname)
+    kwargs.update(format=format, starttime=starttime, endtime=endtime,
+                  nearest_sample=nearest_sample)
+    if window_length is None:
+        for filename in filenames:
+            for tr in read(filename, headonly=headonly, **kwargs):
+                yield tr
+        return
+    if headonly:
+        msg = "Keyword headonly cannot be combined with window_length."
+        raise ValueError(msg)
+    if not 0 <= overlap < window_length:
+        msg = "Overlap has to be positive and shorter than window_length."
+        raise ValueError(msg)
+    # First pass: time spans of all files.
+    spans = []
+    for filename in filenames:
+        st = read(filename, format=format, headonly=True)
+        if not len(st):
+            continue
+        spans.append((min(tr.stats.starttime for tr in st),
+                      max(tr.stats.endtime for tr in st), filename))
+    spans = [span for span in sorted(spans)
+             if not (starttime is not None and span[1] < starttime or
+                     endtime is not None and span[0] > endtime)]
+    if not spans:
+        return
+    windows = get_window_times(
+        starttime=starttime or spans[0][0],
+        endtime=endtime or max(span[1] for span in spans),
+        window_length=window_length, step=window_length - overlap,
+        offset=0, include_partial_windows=True)
+    buffer = Stream()
+    i = 0
+    for start, stop in windows:
+        # Release data before the current window, keeping one sample for
+        # nearest sample slicing, and load all files starting before its
+        # end. Merging copies the remaining data, so only about one window
+        # and one file are held in memory.
+        buffer.traces = [tr for tr in buffer
+                         if tr.stats.endtime >= start]
+        for tr in buffer:
+            tr._ltrim(start - tr.stats.delta, nearest_sample=False)
+        loaded = False
+        while i < len(spans) and spans[i][0] <= stop:
+            if spans[i][1] >= start:
+                buffer += read(spans[i][2], **kwargs)
+                loaded = True
+            i += 1
+        if loaded:
+            buffer.merge(-1)
+        window = buffer.slice(start, stop, nearest_sample=nearest_sample)
+        if window:
+            yield window
+
+
 @uncompress_file
 def _read(filename, format=None, headonly=False, **kwargs):
     """
@@ -1722,6 +1874,44 @@ class Stream(object):
                 continue
             yield temp
 
+    def iter_chunks(self, window_length, overlap=0, nearest_sample=True):
+        """
+        Generator yielding consecutive, optionally overlapping time windows
+        of the Stream.
+
+        Shortcut for :meth:`~obspy.core.stream.Stream.slide` with a step of
+        ``window_length - overlap`` that also yields the last, partial
+        window. The same chunking for data that does not fit into memory is
+        provided by :func:`~obspy.core.stream.iread`. As for
+        :meth:`~obspy.core.stream.Stream.slide` the windows are views of the
+        original data.
+
+        .. rubric:: Example
+
+        >>> import obspy
+        >>> st = obspy.read()
+        >>> for chunk in st.iter_chunks(window_length=12.0, overlap=2.0):
+        ...     print(chunk[0].stats.starttime, chunk[0].stats.npts)
+        2009-08-24T00:20:03.000000Z 1201
+        2009-08-24T00:20:13.000000Z 1201
+        2009-08-24T00:20:23.000000Z 1000
+
+        :param window_length: The length of each window in seconds.
+        :type window_length: float
+        :param overlap: Overlap of successive windows in seconds.
+        :type overlap: float
+        :param nearest_sample: See
+            :meth:`~obspy.core.stream.Stream.slide`.
+        :type nearest_sample: bool, optional
+        """
+        if not 0 <= overlap < window_length:
+            msg = "Overlap has to be positive and shorter than window_length."
+            raise ValueError(msg)
+        for window in self.slide(window_length, window_length - overlap,
+                                 include_partial_windows=True,
+                                 nearest_sample=nearest_sample):
+            yield window
+
     def select(self, network=None, station=None, location=None, channel=None,
                sampling_rate=None, npts=None, component=None, id=None):
         """
@@ -2114,9 +2304,19 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             st = read()
             st.filter("highpass", freq=1.0)
             st.plot()
+
+        .. note::
+
+            Butterworth and Cheby2 filters are designed only once for all
+            traces with equal sampling rate, number of samples and data type
+            and applied to the stacked data of these traces at once.
         """
-        for tr in self:
-            tr.filter(type, **options)
+        if type.lower() not in _BATCH_FILTERS:
+            for tr in self:
+                tr.filter(type, **options)
+            return self
+        for traces in self._get_batches():
+            self._filter_batch(traces, type, **options)
         return self
 
     def trigger(self, type, **options):
@@ -2246,9 +2446,40 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         BW.RJOB..EHN | 2009-08-24T00:20:03.000000Z ... | 10.0 Hz, 300 samples
         BW.RJOB..EHE | 2009-08-24T00:20:03.000000Z ... | 10.0 Hz, 300 samples
         """
-        for tr in self:
-            tr.resample(sampling_rate, window=native_str(window),
-                        no_filter=no_filter, strict_length=strict_length)
+        window = native_str(window)
+        for traces in self._get_batches():
+            if len(traces) == 1:
+                traces[0].resample(sampling_rate, window=window,
+                                   no_filter=no_filter,
+                                   strict_length=strict_length)
+                continue
+            # same checks and pre-filter as in Trace.resample() but for all
+            # traces at once
+            tr = traces[0]
+            info = _get_processing_info(
+                Trace.resample, tr, sampling_rate, window=window,
+                no_filter=no_filter, strict_length=strict_length)
+            factor = tr.stats.sampling_rate / float(sampling_rate)
+            if strict_length and tr.stats.npts % factor != 0.0:
+                msg = "End time of trace would change and strict_length=True."
+                raise ValueError(msg)
+            if not no_filter:
+                if factor > 16:
+                    msg = "Automatic filter design is unstable for " + \
+                          "resampling factors (current sampling rate/new " + \
+                          "sampling rate) above 16. Manual resampling is " + \
+                          "necessary."
+                    raise ArithmeticError(msg)
+                freq = tr.stats.sampling_rate * 0.5 / float(factor)
+                self._filter_batch(traces, 'lowpass_cheby_2', freq=freq,
+                                   maxorder=12)
+            data = _resample_data(self._stack(traces),
+                                  tr.stats.sampling_rate, sampling_rate,
+                                  window)
+            for tr, row in zip(traces, data):
+                tr.data = row
+                tr.stats.sampling_rate = sampling_rate
+                tr._internal_add_processing_info(info)
         return self
 
     def decimate(self, factor, no_filter=False, strict_length=False):
@@ -2314,9 +2545,36 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         >>> tr.data
         array([0, 4, 8])
         """
-        for tr in self:
-            tr.decimate(factor, no_filter=no_filter,
-                        strict_length=strict_length)
+        from obspy.signal.filter import integer_decimation
+        for traces in self._get_batches():
+            if len(traces) == 1:
+                traces[0].decimate(factor, no_filter=no_filter,
+                                   strict_length=strict_length)
+                continue
+            # same checks and pre-filter as in Trace.decimate() but for all
+            # traces at once
+            tr = traces[0]
+            info = _get_processing_info(
+                Trace.decimate, tr, factor, no_filter=no_filter,
+                strict_length=strict_length)
+            if strict_length and tr.stats.npts % factor:
+                msg = "End time of trace would change and strict_length=True."
+                raise ValueError(msg)
+            if not no_filter:
+                if factor > 16:
+                    msg = "Automatic filter design is unstable for " + \
+                          "decimation factors above 16. Manual decimation " + \
+                          "is necessary."
+                    raise ArithmeticError(msg)
+                freq = tr.stats.sampling_rate * 0.5 / float(factor)
+                self._filter_batch(traces, 'lowpass_cheby_2', freq=freq,
+                                   maxorder=12)
+            data = integer_decimation(self._stack(traces), factor)
+            sampling_rate = tr.stats.sampling_rate / float(factor)
+            for tr, row in zip(traces, data):
+                tr.data = row
+                tr.stats.sampling_rate = sampling_rate
+                tr._internal_add_processing_info(info)
         return self
 
     def max(self):
@@ -2403,8 +2661,24 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         :meth:`~obspy.core.trace.Trace.detrend` method of
         :class:`~obspy.core.trace.Trace`.
         """
-        for tr in self:
-            tr.detrend(type=type, **options)
+        if type.lower() not in _BATCH_DETRENDS:
+            for tr in self:
+                tr.detrend(type=type, **options)
+            return self
+        for traces in self._get_batches():
+            if len(traces) == 1:
+                traces[0].detrend(type=type, **options)
+                continue
+            info = _get_processing_info(Trace.detrend, traces[0], type=type,
+                                        **options)
+            data = _detrend_data(self._stack(traces), type, **options)
+            for tr, row in zip(traces, data):
+                # 'simple' works in place on floating point data
+                if type.lower() == 'simple' and tr.data.dtype == row.dtype:
+                    tr.data[:] = row
+                else:
+                    tr.data = row
+                tr._internal_add_processing_info(info)
         return self
 
     def taper(self, *args, **kwargs):
@@ -2421,8 +2695,20 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             original data, use :meth:`~obspy.core.stream.Stream.copy` to create
             a copy of your stream object.
         """
-        for tr in self:
-            tr.taper(*args, **kwargs)
+        for traces in self._get_batches():
+            if len(traces) == 1:
+                traces[0].taper(*args, **kwargs)
+                continue
+            # the taper window is computed once for all traces
+            info = _get_processing_info(Trace.taper, traces[0], *args,
+                                        **kwargs)
+            taper = _get_taper(traces[0].stats.npts,
+                               traces[0].stats.sampling_rate, *args, **kwargs)
+            for tr in traces:
+                if not np.issubdtype(tr.data.dtype, np.floating):
+                    tr.data = np.require(tr.data, dtype=np.float64)
+                tr.data *= taper
+                tr._internal_add_processing_info(info)
         return self
 
     def interpolate(self, *args, **kwargs):
@@ -2773,6 +3059,50 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         self.traces = []
         return self
 
+    def _get_batches(self):
+        """
+        Groups the traces for batched processing.
+
+        Traces with unmasked data of equal sampling rate, number of samples
+        and dtype are put into the same group so they can be processed as one
+        2-D array. All other traces end up in groups of their own.
+
+        :rtype: list of lists of :class:`~obspy.core.trace.Trace`
+        """
+        batches = OrderedDict()
+        for tr in self:
+            data = tr.data
+            if isinstance(data, np.ma.MaskedArray) or data.ndim != 1 or \
+                    not len(data):
+                key = id(tr)
+            else:
+                key = (tr.stats.sampling_rate, len(data), data.dtype)
+            batches.setdefault(key, []).append(tr)
+        return list(batches.values())
+
+    @staticmethod
+    def _stack(traces):
+        """
+        Returns the data of given traces stacked as rows of a 2-D array.
+        """
+        return np.vstack([tr.data for tr in traces])
+
+    def _filter_batch(self, traces, type, **options):
+        """
+        Applies a filter from ``_BATCH_FILTERS`` to the stacked data of a
+        group of traces from :meth:`_get_batches`.
+        """
+        if len(traces) == 1:
+            traces[0].filter(type, **options)
+            return
+        info = _get_processing_info(Trace.filter, traces[0], type, **options)
+        func = _get_function_from_entry_point('filter', type.lower())
+        data = func(self._stack(traces), df=traces[0].stats.sampling_rate,
+                    **options)
+        for tr, row in zip(traces, data):
+            tr.data = row
+            tr._internal_add_processing_info(info)
+
     def _cleanup(self, misalignment_threshold=1e-2):
         """
         Merge consistent trace objects but leave everything else alone.
@@ -3342,6 +3672,10 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         return self
 
 
+_PICKLE_SIGNATURE = {"magic": br'\x80[\x02-\x05]',
+                     "extensions": ['.pickle', '.pkl']}
+
+
 def _is_pickle(filename):  # @UnusedVariable
     """
     Check whether a file is a pickled ObsPy Stream file.
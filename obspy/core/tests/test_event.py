@@ -6,7 +6,10 @@ from future.utils import PY2, native_str
 
 import builtins
 import copy
+import gc
+import io
 import os
+import pickle
 import sys
 import unittest
 import warnings
@@ -15,15 +18,19 @@ import tempfile
 from matplotlib import rcParams
 import numpy as np
 
-from obspy.core.event import (Catalog, Comment, CreationInfo, Event, Origin,
-                              Pick, ResourceIdentifier, WaveformStreamID,
+from obspy.core.event import (Catalog, CatalogColumns, Comment, CreationInfo,
+                              Event, Origin, OriginQuality, Pick,
+                              ResourceIdentifier, WaveformStreamID,
                               read_events, Magnitude, FocalMechanism, Arrival)
 from obspy.core.event.source import farfield
 from obspy.core.utcdatetime import UTCDateTime
-from obspy.core.util import BASEMAP_VERSION, CARTOPY_VERSION
+from obspy.core.util import (BASEMAP_VERSION, CARTOPY_VERSION,
+                             NamedTemporaryFile)
 from obspy.core.util.base import _get_entry_points
 from obspy.core.util.testing import ImageComparison
-from obspy.core.event.base import QuantityError
+from obspy.core.compatibility import mock
+from obspy.core.event.base import QuantityError, ResourceIdentifierScope
+from obspy.geodetics import locations2degrees
 
 
 if CARTOPY_VERSION and CARTOPY_VERSION >= [0, 12, 0]:
@@ -336,6 +343,15 @@ class CatalogTestCase(unittest.TestCase):
         got = read_events(os.path.join(self.path, "*_events.xml"))
         self.assertEqual(expected, got)
 
+    def test_read_events_with_wildcard_in_parallel(self):
+        """
+        Tests the read_events() function with a filename wild card and
+        multiple workers.
+        """
+        expected = read_events(os.path.join(self.path, "*_events.xml"))
+        got = read_events(os.path.join(self.path, "*_events.xml"), workers=2)
+        self.assertEqual(expected, got)
+
     def test_append(self):
         """
         Tests the append method of the Catalog object.
@@ -1112,6 +1128,386 @@ class ResourceIDEventScopeTestCase(unittest.TestCase):
         os.remove(self.catalog_path)
 
 
+class CatalogColumnsTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.core.event.columns.CatalogColumns.
+    """
+    def setUp(self):
+        rng = np.random.RandomState(815)
+        self.catalog = Catalog()
+        for i in range(200):
+            event = Event(event_type=['earthquake', 'explosion', None][i % 3])
+            if i % 7:
+                quality = None
+                if i % 5:
+                    quality = OriginQuality(
+                        standard_error=rng.uniform(0, 2),
+                        used_station_count=int(rng.randint(0, 100)))
+                    if i % 4:
+                        quality.azimuthal_gap = rng.uniform(0, 360)
+                origin = Origin(
+                    time=UTCDateTime(2012, 1, 1) + rng.uniform(0, 1e6),
+                    latitude=rng.uniform(-90, 90),
+                    longitude=rng.uniform(-180, 180),
+                    depth=None if i % 11 == 0 else rng.uniform(0, 7e5),
+                    quality=quality)
+                event.origins.append(origin)
+            if i % 9:
+                mag = 0.0 if i % 13 == 0 else round(rng.uniform(0, 8), 1)
+                event.magnitudes.append(Magnitude(mag=mag,
+                                                  magnitude_type='Mw'))
+            self.catalog.append(event)
+
+    def _filter_reference(self, catalog, key, operator, value):
+        """
+        Event by event evaluation of a single filter rule.
+        """
+        ops = {'<': lambda a, b: a is None or a < b,
+               '<=': lambda a, b: a is None or a <= b,
+               '>': lambda a, b: a is not None and a > b,
+               '>=': lambda a, b: a is not None and a >= b}
+        value = UTCDateTime(value) if key == 'time' else float(value)
+        events = []
+        for event in catalog:
+            if key == 'magnitude':
+                if not event.magnitudes or not event.magnitudes[0].mag:
+                    continue
+                if ops[operator](event.magnitudes[0].mag, value):
+                    events.append(event)
+            elif not event.origins:
+                continue
+            elif key in ('time', 'latitude', 'longitude', 'depth'):
+                if ops[operator](event.origins[0].get(key), value):
+                    events.append(event)
+            elif event.origins[0].quality and \
+                    ops[operator](event.origins[0].quality.get(key), value):
+                events.append(event)
+        return events
+
+    def test_filter_same_as_event_by_event(self):
+        """
+        The vectorized Catalog.filter() selects the same events as the
+        event by event evaluation.
+        """
+        rules = [('magnitude', '3.5'), ('time', '2012-01-05T12:00:00'),
+                 ('latitude', '10'), ('longitude', '-20'),
+                 ('depth', '2e5'), ('standard_error', '1'),
+                 ('azimuthal_gap', '180'), ('used_station_count', '50'),
+                 ('used_phase_count', '10')]
+        for key, value in rules:
+            for operator in ('<', '<=', '>', '>='):
+                rule = '%s %s %s' % (key, operator, value)
+                expected = self._filter_reference(
+                    self.catalog, key, operator, value)
+                got = self.catalog.filter(rule)
+                self.assertEqual([id(ev) for ev in got],
+                                 [id(ev) for ev in expected], rule)
+                expected = set(id(ev) for ev in expected)
+                got = self.catalog.filter(rule, inverse=True)
+                self.assertEqual(
+                    [id(ev) for ev in got],
+                    [id(ev) for ev in self.catalog if id(ev) not in expected])
+        # several rules
+        got = self.catalog.filter('magnitude >= 2', 'depth < 1e5')
+        expected = self._filter_reference(
+            self._filter_reference(self.catalog, 'magnitude', '>=', '2'),
+            'depth', '<', '1e5')
+        self.assertEqual([id(ev) for ev in got], [id(ev) for ev in expected])
+        self.assertRaises(ValueError, self.catalog.filter, 'muh < 1')
+        self.assertRaises(ValueError, self.catalog.filter, 'magnitude')
+
+    def test_columns_and_cache(self):
+        """
+        Columns are cached on the catalog and rebuilt if the events change.
+        """
+        event = self.catalog[1]
+        origin = Origin(time=UTCDateTime(2000, 1, 1), latitude=1.0,
+                        longitude=2.0)
+        event.origins.append(origin)
+        event.preferred_origin_id = origin.resource_id
+        columns = self.catalog.get_columns()
+        self.assertEqual(len(columns), 200)
+        self.assertIs(self.catalog.get_columns(), columns)
+        self.assertEqual(columns['time'][1],
+                         np.datetime64('2000-01-01T00:00:00', 'us'))
+        self.assertEqual(columns['latitude'][1], 1.0)
+        self.assertTrue(np.isnan(columns['depth'][1]))
+        self.assertEqual(columns['event_type'][0], 'earthquake')
+        self.assertEqual(columns['event_type'][2], '')
+        self.assertTrue(np.isnat(columns['time'][0]))
+        first = self.catalog.get_columns(preferred=False)
+        self.assertNotEqual(first['latitude'][1], 1.0)
+        self.catalog.append(Event())
+        self.assertIsNot(self.catalog.get_columns(), columns)
+        self.assertEqual(len(self.catalog.get_columns()), 201)
+        self.catalog[3] = Event()
+        self.assertEqual(self.catalog.get_columns()['event_type'][3], '')
+        columns = self.catalog.get_columns()
+        self.assertIsNot(self.catalog.get_columns(cache=False), columns)
+
+    def test_filter_and_sort_after_modifying_events(self):
+        """
+        Catalog.filter() and Catalog.sort() see events changed in place.
+        """
+        cat = read_events()
+        self.assertEqual(len(cat.filter("magnitude >= 4")), 2)
+        cat.get_columns()
+        cat[2].magnitudes[0].mag = 5.0
+        self.assertEqual(len(cat.filter("magnitude >= 4")), 3)
+        cat.sort(['magnitude'], reverse=True)
+        self.assertEqual(cat[0].magnitudes[0].mag, 5.0)
+        cat[0].magnitudes[0].mag = 1.0
+        cat.sort(['magnitude'])
+        self.assertEqual(cat[0].magnitudes[0].mag, 1.0)
+
+    def test_times_outside_of_nanosecond_range(self):
+        """
+        Events before 1678 and after 2262 can be filtered and sorted.
+        """
+        cat = Catalog()
+        for time in ('2012-01-01', '1600-01-01T00:00:00.5000005',
+                     '2500-01-01'):
+            cat.append(Event(origins=[Origin(time=UTCDateTime(time))]))
+        self.assertEqual(len(cat.filter('time < 1700-01-01')), 1)
+        self.assertIs(cat.filter('time < 1700-01-01')[0], cat[1])
+        self.assertIs(cat.filter('time > 2300-01-01')[0], cat[2])
+        self.assertEqual(
+            cat.get_columns().mask(
+                'time == 1600-01-01T00:00:00.500000').tolist(),
+            [False, True, False])
+        cat.sort()
+        self.assertEqual([ev.origins[0].time.year for ev in cat],
+                         [1600, 2012, 2500])
+        # times are restored from the columns alone
+        converted = CatalogColumns(cat.get_columns().data).to_catalog()
+        self.assertEqual(converted[0].origins[0].time,
+                         UTCDateTime('1600-01-01T00:00:00.5'))
+        self.assertEqual(converted[2].origins[0].time,
+                         UTCDateTime(2500, 1, 1))
+
+    def test_mask_select_and_sort(self):
+        """
+        Tests vectorized masks, spatial selection and sorting.
+        """
+        columns = self.catalog.get_columns()
+        mask = columns.mask('magnitude >= 4', 'event_type == explosion')
+        expected = [bool(ev.magnitudes and ev.magnitudes[0].mag >= 4 and
+                         ev.event_type == 'explosion')
+                    for ev in self.catalog]
+        self.assertEqual(mask.tolist(), expected)
+        # missing values never match
+        self.assertFalse(columns.mask('depth != 1')[0])
+        self.assertRaises(ValueError, columns.mask, 'event_type < a')
+        self.assertRaises(ValueError, columns.mask, 'depth ~ 1')
+        # boxes, also across the date line, and circles
+        lat, lon = columns['latitude'], columns['longitude']
+        mask = columns.select_region(minlatitude=0, maxlatitude=45,
+                                     minlongitude=170, maxlongitude=-170)
+        with np.errstate(invalid='ignore'):
+            expected = (lat >= 0) & (lat <= 45) & \
+                ((lon >= 170) | (lon <= -170))
+        np.testing.assert_array_equal(mask, expected)
+        mask = columns.select_region(latitude=10, longitude=20,
+                                     minradius=30, maxradius=60)
+        for ev, selected in zip(self.catalog, mask):
+            if not ev.origins:
+                self.assertFalse(selected)
+                continue
+            dist = locations2degrees(10, 20, ev.origins[0].latitude,
+                                     ev.origins[0].longitude)
+            self.assertEqual(selected, 30 <= dist <= 60)
+        self.assertRaises(ValueError, columns.select_region, maxradius=10)
+        subset = columns.select(mask)
+        self.assertEqual(len(subset), mask.sum())
+        self.assertEqual(len(subset.to_catalog()), mask.sum())
+        # sorting puts missing values last
+        self.catalog.sort(['magnitude', 'time'], reverse=True)
+        mags = [ev.magnitudes[0].mag if ev.magnitudes else None
+                for ev in self.catalog]
+        count = len([m for m in mags if m is not None])
+        self.assertEqual(mags[:count], sorted(mags[:count], reverse=True))
+        self.assertTrue(all(m is None for m in mags[count:]))
+        self.assertEqual(self.catalog.get_columns()['magnitude'][0],
+                         mags[0])
+        for i in range(count - 1):
+            if mags[i] == mags[i + 1] and self.catalog[i].origins and \
+                    self.catalog[i + 1].origins:
+                self.assertGreaterEqual(self.catalog[i].origins[0].time,
+                                        self.catalog[i + 1].origins[0].time)
+
+    def test_save_and_load(self):
+        """
+        Columns round trip through a binary file, loaded columns can be
+        converted back to a catalog.
+        """
+        columns = self.catalog.get_columns()
+        with NamedTemporaryFile(suffix='.npy') as tf:
+            columns.save(tf.name)
+            loaded = CatalogColumns.load(tf.name)
+        self.assertEqual(loaded, columns)
+        self.assertIsNone(loaded.events)
+        cat = loaded.to_catalog()
+        self.assertEqual(len(cat), len(self.catalog))
+        self.assertEqual(cat.get_columns(cache=False), columns)
+        self.assertEqual(
+            cat.filter('standard_error < 1').get_columns(),
+            self.catalog.filter('standard_error < 1').get_columns())
+        self.assertEqual(cat[5].resource_id, self.catalog[5].resource_id)
+        buf = io.BytesIO()
+        np.save(buf, np.arange(3))
+        buf.seek(0)
+        self.assertRaises(ValueError, CatalogColumns.load, buf)
+
+
+class ResourceIdentifierScopeTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.core.event.base.ResourceIdentifierScope.
+    """
+    def setUp(self):
+        catalog = Catalog()
+        for i in range(3):
+            pick = Pick(resource_id="smi:local/pick/%d" % i,
+                        time=UTCDateTime(2010, 1, 1, i))
+            arrival = Arrival(pick_id="smi:local/pick/%d" % i, phase="P")
+            origin = Origin(resource_id="smi:local/origin/%d" % i,
+                            time=UTCDateTime(2010, 1, 1), latitude=i,
+                            longitude=i, arrivals=[arrival])
+            catalog.append(Event(
+                resource_id="smi:local/event/%d" % i, picks=[pick],
+                origins=[origin],
+                preferred_origin_id="smi:local/origin/%d" % i))
+        with tempfile.NamedTemporaryFile(suffix=".xml") as tf:
+            catalog.write(tf.name, format="QUAKEML")
+            self.catalog = read_events(tf.name)
+            self.scoped = read_events(tf.name, scope_resource_ids=True)
+
+    def _assert_resolved_within(self, catalog):
+        for event in catalog:
+            self.assertIs(event.preferred_origin(), event.origins[0])
+            self.assertIs(
+                event.origins[0].arrivals[0].pick_id.get_referred_object(),
+                event.picks[0])
+
+    def test_read_events(self):
+        """
+        Scoped reading gives the same catalog and resolves references within
+        the catalog, without global bookkeeping.
+        """
+        self.assertEqual(self.catalog, self.scoped)
+        self._assert_resolved_within(self.scoped)
+        scope = self.scoped[0].resource_id._scope
+        self.assertIsInstance(scope, ResourceIdentifierScope)
+        for event in self.scoped:
+            pick_id = event.picks[0].resource_id
+            self.assertIs(pick_id._scope, scope)
+            self.assertIs(event.origins[0].arrivals[0].pick_id.id,
+                          pick_id.id)
+            # nothing is bound to the resource identifiers themselves
+            self.assertIsNone(pick_id._object_id)
+        # no scope outside of the read
+        self.assertIsNone(ResourceIdentifier()._scope)
+
+    def test_copy_and_pickle(self):
+        """
+        Copies of scoped catalogs and events resolve to their own objects.
+        """
+        for catalog in (self.scoped.copy(), copy.deepcopy(self.scoped),
+                        pickle.loads(pickle.dumps(self.scoped))):
+            self.assertEqual(catalog, self.scoped)
+            self._assert_resolved_within(catalog)
+        event = self.scoped[1].copy()
+        self.assertIs(event.preferred_origin(), event.origins[0])
+        self.assertIsNot(event.preferred_origin(),
+                         self.scoped[1].origins[0])
+        # a single resource id keeps referring to the original object
+        pick_id = self.scoped[1].picks[0].resource_id.copy()
+        self.assertIs(pick_id.get_referred_object(), self.scoped[1].picks[0])
+        # the originals still resolve to their own objects
+        self._assert_resolved_within(self.scoped)
+        for event in self.scoped:
+            self.assertIs(event.resource_id.get_referred_object(), event)
+
+    def test_objects_without_catalog(self):
+        """
+        Objects created in a scope resolve without a catalog or event and
+        after their catalog is gone, as in the global bookkeeping.
+        """
+        with ResourceIdentifierScope():
+            pick = Pick(resource_id="smi:local/pick/x")
+            arrival = Arrival(pick_id="smi:local/pick/x")
+        self.assertIs(pick.resource_id.get_referred_object(), pick)
+        self.assertIs(arrival.pick_id.get_referred_object(), pick)
+        origin = self.scoped[0].origins[0]
+        arrival = origin.arrivals[0]
+        self.scoped = None
+        gc.collect()
+        self.assertIs(origin.resource_id.get_referred_object(), origin)
+        # the pick was part of the event, the object of the same id created
+        # outside of any scope is found instead
+        self.assertIs(arrival.pick_id.get_referred_object(),
+                      self.catalog[0].picks[0])
+
+    def test_later_added_objects(self):
+        """
+        Objects created after the first look up are found.
+        """
+        event = self.scoped[0]
+        self.assertIsNone(event.preferred_magnitude())
+        event.preferred_magnitude_id = "smi:local/magnitude/1"
+        self.assertIsNone(event.preferred_magnitude())
+        magnitude = Magnitude(resource_id="smi:local/magnitude/1", mag=2.0)
+        event.magnitudes.append(magnitude)
+        self.assertIs(event.preferred_magnitude(), magnitude)
+        with event.resource_id._scope:
+            magnitude = Magnitude(resource_id="smi:local/magnitude/2")
+            event.preferred_magnitude_id = "smi:local/magnitude/2"
+        self.assertIsNone(magnitude.resource_id._object_id)
+        event.magnitudes.append(magnitude)
+        self.assertIs(event.preferred_magnitude(), magnitude)
+        # explicitly bound objects are preferred
+        origin = Origin()
+        event.preferred_origin_id.set_referred_object(origin)
+        self.assertIs(event.preferred_origin(), origin)
+
+    def test_missing_ids_indexed_once(self):
+        """
+        Looking up IDs without objects only indexes the catalog again after
+        new objects were registered.
+        """
+        scope = self.scoped.resource_id._scope
+        with scope:
+            missing = [ResourceIdentifier("smi:local/missing/%d" % i)
+                       for i in range(3)]
+        with mock.patch.object(ResourceIdentifierScope, "_build_index",
+                               autospec=True,
+                               side_effect=ResourceIdentifierScope.
+                               _build_index) as build_index:
+            for _ in range(3):
+                for resource_id in missing:
+                    self.assertIsNone(resource_id.get_referred_object())
+            self.assertLessEqual(build_index.call_count, 4)
+            build_index.reset_mock()
+            # a new root
+            event = Event(resource_id="smi:local/missing/0")
+            scope.add_root(event)
+            self.assertIs(missing[0].get_referred_object(), event)
+            self.assertIsNone(missing[1].get_referred_object())
+            self.assertEqual(build_index.call_count, 2)
+
+    def test_nested_scopes(self):
+        """
+        Scopes are restored when leaving nested scopes.
+        """
+        outer = ResourceIdentifierScope()
+        inner = ResourceIdentifierScope()
+        with outer:
+            self.assertIs(ResourceIdentifier()._scope, outer)
+            with inner:
+                self.assertIs(ResourceIdentifier("abc")._scope, inner)
+            self.assertIs(ResourceIdentifier()._scope, outer)
+        self.assertIsNone(ResourceIdentifierScope._current())
+
+
 class BaseTestCase(unittest.TestCase):
     """
     Test suite for obspy.core.event.base.
@@ -1191,10 +1587,13 @@ def suite():
     suite.addTest(unittest.makeSuite(CatalogTestCase, 'test'))
     suite.addTest(unittest.makeSuite(CatalogBasemapTestCase, 'test'))
     suite.addTest(unittest.makeSuite(CatalogCartopyTestCase, 'test'))
+    suite.addTest(unittest.makeSuite(CatalogColumnsTestCase, 'test'))
     suite.addTest(unittest.makeSuite(EventTestCase, 'test'))
     suite.addTest(unittest.makeSuite(OriginTestCase, 'test'))
     suite.addTest(unittest.makeSuite(WaveformStreamIDTestCase, 'test'))
     suite.addTest(unittest.makeSuite(ResourceIdentifierTestCase, 'test'))
+    suite.addTest(unittest.makeSuite(ResourceIdentifierScopeTestCase,
+                                     'test'))
     suite.addTest(unittest.makeSuite(BaseTestCase, 'test'))
     return suite
 
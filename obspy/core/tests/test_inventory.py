@@ -15,6 +15,7 @@ from future.builtins import *  # NOQA
 from future.utils import PY2, native_str
 
 import builtins
+import glob
 import os
 import unittest
 import warnings
@@ -434,6 +435,37 @@ class InventoryTestCase(unittest.TestCase):
         for contents_, expected_ in zip(contents, expected):
             self.assertEqual(expected_, _unified_content_strings(contents_))
 
+    def test_read_inventory_with_wildcard(self):
+        """
+        Tests reading and merging multiple inventory files matched by a
+        wildcard, serially and in parallel.
+        """
+        path = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                            "io", "stationxml", "tests", "data")
+        pattern = os.path.join(path, "minimal*.xml")
+        filenames = sorted(glob.glob(pattern))
+        self.assertGreater(len(filenames), 1)
+        expected = read_inventory(filenames[0])
+        for filename in filenames[1:]:
+            expected += read_inventory(filename)
+        for workers in (None, 2):
+            got = read_inventory(pattern, workers=workers)
+            self.assertEqual(expected.networks, got.networks)
+        self.assertRaises(Exception, read_inventory,
+                          os.path.join(path, "NOTEXISTING*.xml"))
+        # positional arguments are passed on to the plugins, also for
+        # multiple files
+        for workers in (None, 2):
+            with mock.patch("obspy.core.inventory.inventory."
+                            "_read_from_plugin") as p:
+                p.return_value = [mock.MagicMock()]
+                read_inventory(pattern, "STATIONXML", "arg", workers=workers,
+                               key="value")
+            self.assertEqual(
+                sorted(p.call_args_list),
+                [mock.call("inventory", filename, "arg", format="STATIONXML",
+                           key="value") for filename in filenames])
+
     def test_read_invalid_filename(self):
         """
         Tests that we get a sane error message when calling read_inventory()
@@ -17,6 +17,7 @@ import inspect
 import os
 import unittest
 import warnings
+from copy import deepcopy
 from math import pi
 
 import numpy as np
@@ -25,7 +26,8 @@ from matplotlib import rcParams
 
 from obspy import UTCDateTime, read_inventory
 from obspy.core.inventory.response import (
-    _pitick2latex, PolesZerosResponseStage, PolynomialResponseStage)
+    _pitick2latex, clear_response_cache, get_response_cache_info,
+    PolesZerosResponseStage, PolynomialResponseStage)
 from obspy.core.util import MATPLOTLIB_VERSION
 from obspy.core.util.misc import CatchOutput
 from obspy.core.util.obspy_types import ComplexWithUncertainties
@@ -243,6 +245,50 @@ class ResponseTestCase(unittest.TestCase):
         np.testing.assert_allclose(amp, exp_amp, rtol=1E-3)
         np.testing.assert_allclose(phase, exp_ph, rtol=1E-3)
 
+    def test_response_cache(self):
+        """
+        Repeated evaluations of the same response on the same frequency grid
+        are served from the response cache.
+        """
+        inv = read_inventory(os.path.join(self.data_dir, "IM_IL31__BHZ.xml"))
+        response = inv[0][0][0].response
+        clear_response_cache()
+        try:
+            expected, freqs = response.get_evalresp_response(
+                t_samp=0.025, nfft=100, output="VEL")
+            info = get_response_cache_info()
+            self.assertEqual((info["hits"], info["misses"], info["size"]),
+                             (0, 1, 1))
+            self.assertEqual(info["nbytes"], expected.nbytes)
+            # a copy of the same response hits the cache, modifying the
+            # returned array does not change the cached one
+            got, _ = deepcopy(response).get_evalresp_response(
+                t_samp=0.025, nfft=100, output="VEL")
+            np.testing.assert_array_equal(got, expected)
+            got[:] = 0
+            got = response.get_evalresp_response_for_frequencies(
+                freqs, output="VEL")
+            np.testing.assert_array_equal(got, expected)
+            info = get_response_cache_info()
+            self.assertEqual((info["hits"], info["misses"]), (2, 1))
+            # different output units, frequencies or modified stages miss
+            response.get_evalresp_response(
+                t_samp=0.025, nfft=100, output="DISP")
+            response.get_evalresp_response(
+                t_samp=0.025, nfft=200, output="VEL")
+            response.response_stages[0].stage_gain *= 2
+            got, _ = response.get_evalresp_response(
+                t_samp=0.025, nfft=100, output="VEL")
+            np.testing.assert_allclose(np.abs(got), np.abs(expected) * 2)
+            info = get_response_cache_info()
+            self.assertEqual((info["hits"], info["misses"], info["size"]),
+                             (2, 4, 4))
+        finally:
+            clear_response_cache()
+        info = get_response_cache_info()
+        self.assertEqual((info["hits"], info["misses"], info["size"],
+                          info["nbytes"]), (0, 0, 0, 0))
+
     def test_response_list_raises_error_if_out_of_range(self):
         """
         If extrpolating a lot it should raise an error.
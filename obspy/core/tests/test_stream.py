@@ -9,14 +9,16 @@ import pickle
 import unittest
 import warnings
 from copy import deepcopy
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 
-from obspy import Stream, Trace, UTCDateTime, read, read_inventory
+from obspy import Stream, Trace, UTCDateTime, iread, read, read_inventory
 from obspy.core.compatibility import mock
 from obspy.core.stream import _is_pickle, _read_pickle, _write_pickle
 from obspy.core.util.attribdict import AttribDict
 from obspy.core.util.base import NamedTemporaryFile
+from obspy.core.util.misc import TemporaryWorkingDirectory
 from obspy.io.xseed import Parser
 
 
@@ -1830,6 +1832,193 @@ class StreamTestCase(unittest.TestCase):
             self.assertRaises(UserWarning, read, '/path/to/slist_float.ascii',
                               headonly=True, starttime=0, endtime=1)
 
+    def test_read_parallel(self):
+        """
+        Reading multiple files with workers returns the same stream in the
+        same order as reading them one after another.
+        """
+        path = os.path.dirname(__file__)
+        ascii_path = os.path.join(path, "..", "..", "io", "ascii", "tests",
+                                  "data")
+        filename = os.path.join(ascii_path, '*[!n].ascii')
+        expected = read(filename)
+        for executor in ("thread", "process"):
+            st = read(filename, workers=3, executor=executor)
+            self.assertEqual(expected, st)
+        # existing pool objects are used as they are
+        pool = ThreadPool(2)
+        try:
+            st = read(filename, executor=pool)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(expected, st)
+        self.assertRaises(ValueError, read, filename, workers=2,
+                          executor="gpu")
+        self.assertRaises(ValueError, read, filename, workers=0)
+
+    def test_iread(self):
+        """
+        Reading files lazily trace by trace or in time windows gives the
+        same data as reading everything at once.
+        """
+        st = read()
+        t = st[0].stats.starttime
+        with TemporaryWorkingDirectory():
+            # split the data into files of 8 seconds each
+            for i in range(4):
+                st.slice(t + i * 8, t + (i + 1) * 8 - 0.01).write(
+                    "%02i.mseed" % i, format="MSEED")
+            expected = read("*.mseed")
+            got = list(iread("*.mseed"))
+            self.assertEqual(expected, Stream(got))
+            self.assertEqual(
+                read("*.mseed", starttime=t + 5, endtime=t + 20),
+                Stream(list(iread("*.mseed", starttime=t + 5,
+                                  endtime=t + 20))))
+            st = expected
+            st.merge(-1)
+            self.assertEqual(len(st), 3)
+            for window_length, overlap in ((5, 0), (10, 2.5), (30, 0)):
+                expected = list(st.iter_chunks(window_length, overlap))
+                got = list(iread("*.mseed", window_length=window_length,
+                                 overlap=overlap))
+                self.assertEqual(expected, got)
+            # starttime/endtime limit the windows
+            got = list(iread("*.mseed", window_length=4, overlap=1,
+                             starttime=t + 6, endtime=t + 16))
+            expected = list(
+                st.slice(t + 6, t + 16).iter_chunks(4, overlap=1))
+            self.assertEqual(len(got), 4)
+            # processing history and number of read records differ
+            for chunk in got + expected:
+                for tr in chunk:
+                    tr.stats.pop("processing")
+                    tr.stats.pop("mseed")
+            self.assertEqual(expected, got)
+            # only files overlapping the windows are read
+            with mock.patch("obspy.core.stream.read",
+                            side_effect=read) as p:
+                list(iread("*.mseed", window_length=4,
+                           starttime=t + 17, endtime=t + 20))
+            self.assertEqual(
+                [call[0][0] for call in p.call_args_list],
+                ["00.mseed", "01.mseed", "02.mseed", "03.mseed",
+                 "02.mseed"])
+            self.assertRaises(ValueError, list,
+                              iread("*.mseed", window_length=4, overlap=4))
+            self.assertRaises(ValueError, list,
+                              iread("*.mseed", window_length=4,
+                                    headonly=True))
+            self.assertRaises(Exception, list, iread("*.sac"))
+            self.assertRaises(IOError, list, iread("00.sac"))
+
+    def test_iread_memory_bounded(self):
+        """
+        Windows of contiguous files only hold about one window and one file
+        in memory.
+        """
+        tr = Trace(np.arange(6000, dtype=np.int32),
+                   {"sampling_rate": 10.0})
+        t = tr.stats.starttime
+        sizes = []
+        merge = Stream.merge
+
+        def _merge(self, *args, **kwargs):
+            result = merge(self, *args, **kwargs)
+            sizes.append(sum(len(tr_) for tr_ in self))
+            return result
+
+        with TemporaryWorkingDirectory():
+            # six contiguous files of 1000 samples
+            for i in range(6):
+                tr.slice(t + i * 100, t + (i + 1) * 100 - 0.01).write(
+                    "%02i.mseed" % i, format="MSEED")
+            with mock.patch.object(Stream, "merge", _merge):
+                got = list(iread("*.mseed", window_length=20))
+        self.assertEqual(len(got), 30)
+        for i, st in enumerate(got):
+            self.assertEqual(st[0].stats.starttime, t + i * 20)
+            np.testing.assert_array_equal(
+                st[0].data, np.arange(i * 200, min(i * 200 + 201, 6000)))
+        self.assertEqual(len(sizes), 6)
+        # one window, the sample before it and one file
+        self.assertLessEqual(max(sizes), 201 + 1 + 1000)
+
+    def test_iter_chunks(self):
+        """
+        Tests iterating over overlapping windows of a stream.
+        """
+        st = read()
+        t = st[0].stats.starttime
+        chunks = list(st.iter_chunks(12, overlap=2))
+        self.assertEqual(
+            [chunk[0].stats.starttime - t for chunk in chunks], [0, 10, 20])
+        self.assertEqual([len(chunk[0]) for chunk in chunks],
+                         [1201, 1201, 1000])
+        self.assertEqual(list(st.iter_chunks(10)),
+                         list(st.slide(10, 10, include_partial_windows=True)))
+        self.assertRaises(ValueError, list, st.iter_chunks(10, overlap=-1))
+        self.assertRaises(ValueError, list, st.iter_chunks(10, overlap=10))
+
+    def test_batched_processing(self):
+        """
+        Processing traces of equal length and sampling rate at once gives
+        exactly the same results as processing them one by one.
+        """
+        st = read()
+        st += read()
+        tr = st[0].copy()
+        tr.data = tr.data[:2000]
+        st.append(tr)
+        for dtype in (np.int32, np.float32):
+            tr = st[0].copy()
+            tr.data = tr.data.astype(dtype)
+            st.append(tr)
+            st.append(tr.copy())
+        tr = st[0].copy()
+        tr.data = tr.data[:0]
+        st.append(tr)
+        self.assertEqual([len(traces) for traces in st._get_batches()],
+                         [6, 1, 2, 2, 1])
+        operations = [
+            ("filter", ("bandpass", ),
+             dict(freqmin=1, freqmax=10, zerophase=True)),
+            ("filter", ("highpass", ), dict(freq=1.0)),
+            ("filter", ("lowpass_cheby_2", ), dict(freq=5.0)),
+            ("filter", ("bandstop", ), dict(freqmin=1, freqmax=10)),
+            ("detrend", ("simple", ), {}),
+            ("detrend", ("demean", ), {}),
+            ("detrend", ("linear", ), {}),
+            ("taper", (0.05, ), {}),
+            ("taper", (0.1, ), dict(type="cosine", side="left")),
+            ("resample", (20.0, ), {}),
+            ("resample", (33.3, ), dict(no_filter=False)),
+            ("decimate", (4, ), {}),
+            ("decimate", (2, ), dict(no_filter=True))]
+        for name, args, kwargs in operations:
+            expected = st.copy()
+            got = st.copy()
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter("ignore")
+                for tr in expected:
+                    if len(tr) or name not in ("filter", "decimate"):
+                        getattr(tr, name)(*args, **kwargs)
+                getattr(got.select(npts=3000) + got.select(npts=2000),
+                        name)(*args, **kwargs)
+                if name not in ("filter", "decimate"):
+                    getattr(got[-1:], name)(*args, **kwargs)
+            for tr_expected, tr_got in zip(expected, got):
+                self.assertEqual(tr_expected.stats, tr_got.stats)
+                self.assertEqual(tr_expected.data.dtype, tr_got.data.dtype)
+                np.testing.assert_array_equal(tr_expected.data, tr_got.data)
+        # 'simple' detrend stays in place for floating point data
+        st = read()
+        data = [tr.data for tr in st]
+        st.detrend("simple")
+        for tr, data_ in zip(st, data):
+            self.assertIs(tr.data, data_)
+
     def test_read_url_via_network(self):
         """
         Testing read function with an URL fetching data via network connection
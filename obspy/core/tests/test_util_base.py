@@ -10,7 +10,7 @@ import unittest
 from obspy.core.compatibility import mock
 from obspy.core.util.base import (NamedTemporaryFile, get_dependency_version,
                                   download_to_file, sanitize_filename,
-                                  create_empty_data_chunk)
+                                  create_empty_data_chunk, _parallel_map)
 from obspy.core.util.testing import ImageComparison, ImageComparisonException
 
 import numpy as np
@@ -140,6 +140,32 @@ class UtilBaseTestCase(unittest.TestCase):
         self.assertEqual(out.dtype, np.float32)
         np.testing.assert_allclose(out.mask, [True, True, True])
 
+    def test_parallel_map(self):
+        """
+        Tests the _parallel_map() helper for all kinds of executors.
+        """
+        items = list(range(20))
+        expected = [abs(-i) for i in items]
+        self.assertEqual(expected, _parallel_map(abs, items))
+        self.assertEqual(expected, _parallel_map(abs, items, workers=1))
+        self.assertEqual(expected, _parallel_map(abs, items, workers=4))
+        self.assertEqual(expected, _parallel_map(abs, iter(items), workers=4,
+                                                 executor="process"))
+        # objects with a map() method are used directly
+        with mock.patch("multiprocessing.pool.ThreadPool") as p:
+            executor = mock.MagicMock()
+            executor.map.return_value = iter(expected)
+            self.assertEqual(expected, _parallel_map(abs, items, workers=4,
+                                                     executor=executor))
+            self.assertEqual(p.call_count, 0)
+        executor.map.assert_called_once_with(abs, items)
+        self.assertEqual([], _parallel_map(abs, [], workers=4))
+        self.assertRaises(ValueError, _parallel_map, abs, items, workers=-1)
+        self.assertRaises(ValueError, _parallel_map, abs, items, workers=2,
+                          executor="unknown")
+        self.assertRaises(TypeError, _parallel_map, abs, items,
+                          executor=object())
+
 
 def suite():
     return unittest.makeSuite(UtilBaseTestCase, 'test')
@@ -19,9 +19,12 @@ from obspy import Trace, read
 from obspy.core.compatibility import mock
 from obspy.io.mseed.core import _write_mseed
 from obspy.core.utcdatetime import UTCDateTime
+from obspy.core.util import base
 from obspy.core.util.base import (NamedTemporaryFile, _get_entry_points,
                                   DEFAULT_MODULES, WAVEFORM_ACCEPT_BYTEORDER)
-from obspy.core.util.misc import buffered_load_entry_point, _ENTRY_POINT_CACHE
+from obspy.core.util.misc import (buffered_load_entry_point,
+                                  TemporaryWorkingDirectory,
+                                  _ENTRY_POINT_CACHE)
 
 
 def _get_default_eps(group, subgroup=None):
@@ -415,6 +418,67 @@ class WaveformPluginsTestCase(unittest.TestCase):
             # using format keyword
             self.assertRaises(TypeError, read, tmpfile)
 
+    def test_format_detection_with_signatures(self):
+        """
+        Files with a magic byte signature are detected without asking the
+        isFormat functions of formats earlier in the detection order.
+        """
+        path = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                            "io", "gse2", "tests", "data",
+                            "loc_RJOB20050831023349.z")
+        load_ep = base.buffered_load_entry_point
+        checked = []
+
+        def _load(dist, group, name):
+            if name == "isFormat":
+                checked.append(group.split(".")[-1])
+            return load_ep(dist, group, name)
+
+        with mock.patch("obspy.core.util.base.buffered_load_entry_point",
+                        side_effect=_load):
+            st = read(path)
+        self.assertEqual(st[0].stats._format, "GSE2")
+        self.assertEqual(checked, ["GSE2"])
+
+    def test_format_detection_cache(self):
+        """
+        The format detected for a file is tried first for further files in
+        the same directory.
+        """
+        path = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir,
+                            "io", "sac", "tests", "data", "test.sac")
+        load_ep = base.buffered_load_entry_point
+        checked = []
+
+        def _load(dist, group, name):
+            if name == "isFormat":
+                checked.append(group.split(".")[-1])
+            return load_ep(dist, group, name)
+
+        with TemporaryWorkingDirectory():
+            with open(path, "rb") as fh:
+                data = fh.read()
+            for filename in ("a.sac", "b.data", "c.data"):
+                with open(filename, "wb") as fh:
+                    fh.write(data)
+            base._FORMAT_DETECTION_CACHE.clear()
+            with mock.patch("obspy.core.util.base.buffered_load_entry_point",
+                            side_effect=_load):
+                # extension given by SAC signature
+                self.assertEqual(read("a.sac")[0].stats._format, "SAC")
+                self.assertEqual(checked, ["SAC"])
+                # same directory, so SAC is checked first
+                checked[:] = []
+                self.assertEqual(read("b.data")[0].stats._format, "SAC")
+                self.assertEqual(checked, ["SAC"])
+                # full chain is used if the cached format does not match
+                checked[:] = []
+                with open("c.data", "wb") as fh:
+                    fh.write(b"not a seismogram")
+                self.assertRaises(TypeError, read, "c.data")
+                self.assertEqual(
+                    sorted(checked), sorted(base.ENTRY_POINTS["waveform"]))
+
     def test_deepcopy(self):
         """
         Test for issue #689: deepcopy did not work for segy. In order to
@@ -225,6 +225,20 @@ def _add_processing_info(func, *args, **kwargs):
     This is a decorator that attaches information about a processing call as a
     string to the Trace.stats.processing list.
     """
+    info = _get_processing_info(func, *args, **kwargs)
+    self = args[0]
+    result = func(*args, **kwargs)
+    # Attach after executing the function to avoid having it attached
+    # while the operation failed.
+    self._internal_add_processing_info(info)
+    return result
+
+
+def _get_processing_info(func, *args, **kwargs):
+    """
+    Returns the string describing a processing call as stored in
+    Trace.stats.processing.
+    """
     callargs = inspect.getcallargs(func, *args, **kwargs)
     callargs.pop("self")
     kwargs_ = callargs.pop("kwargs", {})
@@ -240,13 +254,7 @@ def _add_processing_info(func, *args, **kwargs):
         ["%s=%s" % (k, repr(v)) if not isinstance(v, native_str) else
          "%s='%s'" % (k, v) for k, v in kwargs_.items()]
     arguments.sort()
-    info = info % "::".join(arguments)
-    self = args[0]
-    result = func(*args, **kwargs)
-    # Attach after executing the function to avoid having it attached
-    # while the operation failed.
-    self._internal_add_processing_info(info)
-    return result
+    return info % "::".join(arguments)
 
 
 class Trace(object):
@@ -1662,8 +1670,6 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         >>> tr.data  # doctest: +NORMALIZE_WHITESPACE +ELLIPSIS
         array([ 0.5       ,  0.40432914,  0.3232233 ,  0.26903012,  0.25 ...
         """
-        from scipy.signal import get_window
-        from scipy.fftpack import rfft, irfft
         factor = self.stats.sampling_rate / float(sampling_rate)
         # check if end time changes and this is not explicitly allowed
         if strict_length:
@@ -1681,46 +1687,9 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             freq = self.stats.sampling_rate * 0.5 / float(factor)
             self.filter('lowpass_cheby_2', freq=freq, maxorder=12)
 
-        # resample in the frequency domain. Make sure the byteorder is native.
-        x = rfft(self.data.newbyteorder("="))
-        # Cast the value to be inserted to the same dtype as the array to avoid
-        # issues with numpy rule 'safe'.
-        x = np.insert(x, 1, x.dtype.type(0))
-        if self.stats.npts % 2 == 0:
-            x = np.append(x, [0])
-        x_r = x[::2]
-        x_i = x[1::2]
-
-        if window is not None:
-            if callable(window):
-                large_w = window(np.fft.fftfreq(self.stats.npts))
-            elif isinstance(window, np.ndarray):
-                if window.shape != (self.stats.npts,):
-                    msg = "Window has the wrong shape. Window length must " + \
-                          "equal the number of points."
-                    raise ValueError(msg)
-                large_w = window
-            else:
-                large_w = np.fft.ifftshift(get_window(native_str(window),
-                                                      self.stats.npts))
-            x_r *= large_w[:self.stats.npts // 2 + 1]
-            x_i *= large_w[:self.stats.npts // 2 + 1]
-
-        # interpolate
-        num = int(self.stats.npts / factor)
-        df = 1.0 / (self.stats.npts * self.stats.delta)
-        d_large_f = 1.0 / num * sampling_rate
-        f = df * np.arange(0, self.stats.npts // 2 + 1, dtype=np.int32)
-        n_large_f = num // 2 + 1
-        large_f = d_large_f * np.arange(0, n_large_f, dtype=np.int32)
-        large_y = np.zeros((2 * n_large_f))
-        large_y[::2] = np.interp(large_f, f, x_r)
-        large_y[1::2] = np.interp(large_f, f, x_i)
-
-        large_y = np.delete(large_y, 1)
-        if num % 2 == 0:
-            large_y = np.delete(large_y, -1)
-        self.data = irfft(large_y) * (float(num) / float(self.stats.npts))
+        self.data = _resample_data(self.data[np.newaxis, :],
+                                   self.stats.sampling_rate, sampling_rate,
+                                   window)[0]
         self.stats.sampling_rate = sampling_rate
 
         return self
@@ -1963,27 +1932,7 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
             samples between spline nodes.
             (uses :func:`obspy.signal.detrend.spline`).
         """
-        type = type.lower()
-        # retrieve function call from entry points
-        func = _get_function_from_entry_point('detrend', type)
-
-        # handle function specific settings
-        if func.__module__.startswith('scipy'):
-            # SciPy need to set the type keyword
-            if type == 'demean':
-                type = 'constant'
-            options['type'] = type
-            original_dtype = self.data.dtype
-
-        # detrending
-        self.data = func(self.data, **options)
-
-        # Ugly workaround for old scipy versions that might unnecessarily
-        # change the dtype of the data.
-        if func.__module__.startswith('scipy'):
-            if original_dtype == np.float32 and self.data.dtype != np.float32:
-                self.data = np.require(self.data, dtype=np.float32)
-
+        self.data = _detrend_data(self.data, type, **options)
         return self
 
     @skip_if_no_data
@@ -2077,48 +2026,9 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         ``'triang'``
             Triangular window. (uses: :func:`scipy.signal.triang`)
         """
-        type = type.lower()
-        side = side.lower()
-        side_valid = ['both', 'left', 'right']
-        npts = self.stats.npts
-        if side not in side_valid:
-            raise ValueError("'side' has to be one of: %s" % side_valid)
-        # retrieve function call from entry points
-        func = _get_function_from_entry_point('taper', type)
-        # store all constraints for maximum taper length
-        max_half_lenghts = []
-        if max_percentage is not None:
-            max_half_lenghts.append(int(max_percentage * npts))
-        if max_length is not None:
-            max_half_lenghts.append(int(max_length * self.stats.sampling_rate))
-        if np.all([2 * mhl > npts for mhl in max_half_lenghts]):
-            msg = "The requested taper is longer than the trace. " \
-                  "The taper will be shortened to trace length."
-            warnings.warn(msg)
-        # add full trace length to constraints
-        max_half_lenghts.append(int(npts / 2))
-        # select shortest acceptable window half-length
-        wlen = min(max_half_lenghts)
-        # obspy.signal.cosine_taper has a default value for taper percentage,
-        # we need to override is as we control percentage completely via npts
-        # of taper function and insert ones in the middle afterwards
-        if type == "cosine":
-            kwargs['p'] = 1.0
-        # tapering. tapering functions are expected to accept the number of
-        # samples as first argument and return an array of values between 0 and
-        # 1 with the same length as the data
-        if 2 * wlen == npts:
-            taper_sides = func(2 * wlen, **kwargs)
-        else:
-            taper_sides = func(2 * wlen + 1, **kwargs)
-        if side == 'left':
-            taper = np.hstack((taper_sides[:wlen], np.ones(npts - wlen)))
-        elif side == 'right':
-            taper = np.hstack((np.ones(npts - wlen),
-                               taper_sides[len(taper_sides) - wlen:]))
-        else:
-            taper = np.hstack((taper_sides[:wlen], np.ones(npts - 2 * wlen),
-                               taper_sides[len(taper_sides) - wlen:]))
+        taper = _get_taper(self.stats.npts, self.stats.sampling_rate,
+                           max_percentage, type=type, max_length=max_length,
+                           side=side, **kwargs)
 
         # Convert data if it's not a floating point type.
         if not np.issubdtype(self.data.dtype, np.floating):
@@ -2914,6 +2824,141 @@ seismometer_correction_simulation.html#using-a-resp-file>`_.
         return self
 
 
+def _detrend_data(data, type='simple', **options):
+    """
+    Returns detrended data, see :meth:`Trace.detrend`.
+
+    The built-in methods ``'simple'``, ``'linear'``, ``'constant'`` and
+    ``'demean'`` also detrend each row of 2-D arrays.
+    """
+    type = type.lower()
+    # retrieve function call from entry points
+    func = _get_function_from_entry_point('detrend', type)
+
+    # handle function specific settings
+    if func.__module__.startswith('scipy'):
+        # SciPy need to set the type keyword
+        if type == 'demean':
+            type = 'constant'
+        options['type'] = type
+        original_dtype = data.dtype
+
+    # detrending
+    data = func(data, **options)
+
+    # Ugly workaround for old scipy versions that might unnecessarily
+    # change the dtype of the data.
+    if func.__module__.startswith('scipy'):
+        if original_dtype == np.float32 and data.dtype != np.float32:
+            data = np.require(data, dtype=np.float32)
+
+    return data
+
+
+def _get_taper(npts, sampling_rate, max_percentage, type='hann',
+               max_length=None, side='both', **kwargs):
+    """
+    Returns the taper window applied by :meth:`Trace.taper` to data of given
+    length and sampling rate.
+    """
+    type = type.lower()
+    side = side.lower()
+    side_valid = ['both', 'left', 'right']
+    if side not in side_valid:
+        raise ValueError("'side' has to be one of: %s" % side_valid)
+    # retrieve function call from entry points
+    func = _get_function_from_entry_point('taper', type)
+    # store all constraints for maximum taper length
+    max_half_lenghts = []
+    if max_percentage is not None:
+        max_half_lenghts.append(int(max_percentage * npts))
+    if max_length is not None:
+        max_half_lenghts.append(int(max_length * sampling_rate))
+    if np.all([2 * mhl > npts for mhl in max_half_lenghts]):
+        msg = "The requested taper is longer than the trace. " \
+              "The taper will be shortened to trace length."
+        warnings.warn(msg)
+    # add full trace length to constraints
+    max_half_lenghts.append(int(npts / 2))
+    # select shortest acceptable window half-length
+    wlen = min(max_half_lenghts)
+    # obspy.signal.cosine_taper has a default value for taper percentage,
+    # we need to override is as we control percentage completely via npts
+    # of taper function and insert ones in the middle afterwards
+    if type == "cosine":
+        kwargs['p'] = 1.0
+    # tapering. tapering functions are expected to accept the number of
+    # samples as first argument and return an array of values between 0 and
+    # 1 with the same length as the data
+    if 2 * wlen == npts:
+        taper_sides = func(2 * wlen, **kwargs)
+    else:
+        taper_sides = func(2 * wlen + 1, **kwargs)
+    if side == 'left':
+        taper = np.hstack((taper_sides[:wlen], np.ones(npts - wlen)))
+    elif side == 'right':
+        taper = np.hstack((np.ones(npts - wlen),
+                           taper_sides[len(taper_sides) - wlen:]))
+    else:
+        taper = np.hstack((taper_sides[:wlen], np.ones(npts - 2 * wlen),
+                           taper_sides[len(taper_sides) - wlen:]))
+    return taper
+
+
+def _resample_data(data, old_sampling_rate, sampling_rate, window='hanning'):
+    """
+    Resamples each row of a 2-D array in the frequency domain, see
+    :meth:`Trace.resample`.
+
+    Spectra of all rows are computed at once, the window and interpolation
+    frequencies are shared by all rows.
+    """
+    from scipy.signal import get_window
+    from scipy.fftpack import rfft, irfft
+    npts = data.shape[-1]
+    factor = old_sampling_rate / float(sampling_rate)
+    # resample in the frequency domain. Make sure the byteorder is native.
+    x = rfft(data.newbyteorder("="), axis=-1)
+    # Cast the value to be inserted to the same dtype as the array to avoid
+    # issues with numpy rule 'safe'.
+    x = np.insert(x, 1, x.dtype.type(0), axis=-1)
+    if npts % 2 == 0:
+        x = np.append(x, np.zeros((len(x), 1), dtype=x.dtype), axis=-1)
+    x_r = x[:, ::2]
+    x_i = x[:, 1::2]
+
+    if window is not None:
+        if callable(window):
+            large_w = window(np.fft.fftfreq(npts))
+        elif isinstance(window, np.ndarray):
+            if window.shape != (npts,):
+                msg = "Window has the wrong shape. Window length must " + \
+                      "equal the number of points."
+                raise ValueError(msg)
+            large_w = window
+        else:
+            large_w = np.fft.ifftshift(get_window(native_str(window), npts))
+        x_r *= large_w[:npts // 2 + 1]
+        x_i *= large_w[:npts // 2 + 1]
+
+    # interpolate
+    num = int(npts / factor)
+    df = 1.0 / (npts * (1.0 / float(old_sampling_rate)))
+    d_large_f = 1.0 / num * sampling_rate
+    f = df * np.arange(0, npts // 2 + 1, dtype=np.int32)
+    n_large_f = num // 2 + 1
+    large_f = d_large_f * np.arange(0, n_large_f, dtype=np.int32)
+    large_y = np.zeros((len(x), 2 * n_large_f))
+    for i in range(len(x)):
+        large_y[i, ::2] = np.interp(large_f, f, x_r[i])
+        large_y[i, 1::2] = np.interp(large_f, f, x_i[i])
+
+    large_y = np.delete(large_y, 1, axis=-1)
+    if num % 2 == 0:
+        large_y = np.delete(large_y, -1, axis=-1)
+    return irfft(large_y, axis=-1) * (float(num) / float(npts))
+
+
 def _data_sanity_checks(value):
     """
     Check if a given input is suitable to be used for Trace.data. Raises the
@@ -21,6 +21,7 @@ import os
 import re
 import sys
 import tempfile
+import threading
 import unicodedata
 from collections import OrderedDict
 
@@ -363,6 +364,153 @@ if PY2:
     FileNotFoundError = getattr(builtins, 'IOError')
 
 
+# number of bytes read from the start of a file to match format signatures
+FORMAT_SIGNATURE_HEADER_SIZE = 512
+# maximum number of directory/extension entries kept in the format cache
+FORMAT_DETECTION_CACHE_SIZE = 1024
+_FORMAT_DETECTION_CACHE = OrderedDict()
+_FORMAT_DETECTION_CACHE_LOCK = threading.Lock()
+_FORMAT_SIGNATURES = {}
+
+
+def _get_format_signature(plugin_type, format_ep):
+    """
+    Returns the (optional) format signature contributed by a plug-in.
+
+    Plug-ins may register a ``signature`` entry point next to ``isFormat``
+    pointing to a dictionary with the optional keys ``"magic"`` (a bytes
+    regular expression matched against the start of the file) and
+    ``"extensions"`` (a list of lower case file extensions including the
+    leading dot). The magic expression is precompiled and cached.
+
+    :rtype: tuple
+    :returns: Compiled magic pattern or ``None`` and tuple of extensions.
+    """
+    key = (plugin_type, format_ep.name)
+    if key not in _FORMAT_SIGNATURES:
+        try:
+            signature = buffered_load_entry_point(
+                format_ep.dist.key,
+                'obspy.plugin.%s.%s' % (plugin_type, format_ep.name),
+                'signature')
+        except ImportError:
+            signature = {}
+        magic = signature.get("magic")
+        if magic is not None:
+            magic = re.compile(magic, re.DOTALL)
+        extensions = tuple(ext.lower()
+                           for ext in signature.get("extensions", ()))
+        _FORMAT_SIGNATURES[key] = (magic, extensions)
+    return _FORMAT_SIGNATURES[key]
+
+
+def _read_header_block(filename, size=FORMAT_SIGNATURE_HEADER_SIZE):
+    """
+    Reads the first bytes of a file or file-like object.
+
+    The position of file-like objects is restored. Returns an empty bytes
+    string if nothing can be read.
+    """
+    try:
+        if hasattr(filename, "read"):
+            position = filename.tell()
+            try:
+                header = filename.read(size)
+            finally:
+                filename.seek(position, 0)
+        else:
+            with io.open(filename, "rb") as fh:
+                header = fh.read(size)
+    except Exception:
+        return b""
+    if not isinstance(header, bytes):
+        return b""
+    return header
+
+
+def _get_format_cache_keys(plugin_type, filename):
+    """
+    Returns the format detection cache keys for a file, the most specific
+    one first.
+    """
+    if not isinstance(filename, (str, native_str)):
+        return []
+    dirname, basename = os.path.split(os.path.abspath(filename))
+    extension = os.path.splitext(basename)[1].lower()
+    return [(plugin_type, dirname, extension), (plugin_type, dirname)]
+
+
+def _detect_format(plugin_type, filename):
+    """
+    Detects the format of a file and returns its entry point.
+
+    The header block of the file is read only once and matched against the
+    signatures contributed by the plug-ins. Candidate formats are then
+    verified with their ``isFormat`` function in the following order:
+
+    1. formats whose magic byte signature matches the header,
+    2. the format last detected for files with the same directory and
+       extension (or the same directory),
+    3. formats registering the file extension in their signature,
+    4. all remaining formats in the default order of automatic detection.
+
+    Every ``isFormat`` function is called at most once, so in the worst case
+    this falls back to the full chain of format checks.
+    """
+    eps = ENTRY_POINTS[plugin_type]
+    header = _read_header_block(filename)
+    cache_keys = _get_format_cache_keys(plugin_type, filename)
+    extension = cache_keys and cache_keys[0][2] or None
+
+    magic_matches = []
+    extension_matches = []
+    for name, format_ep in eps.items():
+        magic, extensions = _get_format_signature(plugin_type, format_ep)
+        if magic is not None and header and magic.match(header):
+            magic_matches.append(name)
+        elif extension and extension in extensions:
+            extension_matches.append(name)
+    with _FORMAT_DETECTION_CACHE_LOCK:
+        cached = [_FORMAT_DETECTION_CACHE.get(key) for key in cache_keys]
+    candidates = magic_matches + [name for name in cached if name in eps] + \
+        extension_matches + list(eps.keys())
+
+    checked = set()
+    for name in candidates:
+        if name in checked:
+            continue
+        checked.add(name)
+        format_ep = eps[name]
+        # search isFormat for given entry point
+        is_format = buffered_load_entry_point(
+            format_ep.dist.key,
+            'obspy.plugin.%s.%s' % (plugin_type, format_ep.name),
+            'isFormat')
+        # If it is a file-like object, store the position and restore it
+        # later to avoid that the isFormat() functions move the file
+        # pointer.
+        if hasattr(filename, "tell") and hasattr(filename, "seek"):
+            position = filename.tell()
+        else:
+            position = None
+        # check format
+        is_format = is_format(filename)
+        if position is not None:
+            filename.seek(0, 0)
+        if is_format:
+            break
+    else:
+        raise TypeError('Unknown format for file %s' % filename)
+    if cache_keys:
+        with _FORMAT_DETECTION_CACHE_LOCK:
+            for key in cache_keys:
+                _FORMAT_DETECTION_CACHE.pop(key, None)
+                _FORMAT_DETECTION_CACHE[key] = name
+            while len(_FORMAT_DETECTION_CACHE) > FORMAT_DETECTION_CACHE_SIZE:
+                _FORMAT_DETECTION_CACHE.popitem(last=False)
+    return format_ep
+
+
 def _read_from_plugin(plugin_type, filename, format=None, **kwargs):
     """
     Reads a single file from a plug-in's readFormat function.
@@ -376,28 +524,8 @@ def _read_from_plugin(plugin_type, filename, format=None, **kwargs):
     # get format entry point
     format_ep = None
     if not format:
-        # auto detect format - go through all known formats in given sort order
-        for format_ep in eps.values():
-            # search isFormat for given entry point
-            is_format = buffered_load_entry_point(
-                format_ep.dist.key,
-                'obspy.plugin.%s.%s' % (plugin_type, format_ep.name),
-                'isFormat')
-            # If it is a file-like object, store the position and restore it
-            # later to avoid that the isFormat() functions move the file
-            # pointer.
-            if hasattr(filename, "tell") and hasattr(filename, "seek"):
-                position = filename.tell()
-            else:
-                position = None
-            # check format
-            is_format = is_format(filename)
-            if position is not None:
-                filename.seek(0, 0)
-            if is_format:
-                break
-        else:
-            raise TypeError('Unknown format for file %s' % filename)
+        # auto detect format
+        format_ep = _detect_format(plugin_type, filename)
     else:
         # format given via argument
         format = format.upper()
@@ -421,6 +549,58 @@ def _read_from_plugin(plugin_type, filename, format=None, **kwargs):
     return list_obj, format_ep.name
 
 
+def _parallel_map(func, iterable, workers=None, executor=None):
+    """
+    Apply a function to every item of an iterable, optionally in parallel.
+
+    The results are always returned as a list in the order of the input,
+    regardless of the order in which the workers finish.
+
+    :type func: callable
+    :param func: Function taking a single argument. Has to be picklable
+        (e.g. a module level function or a :func:`functools.partial` of one)
+        if a process pool is used.
+    :param iterable: Items to apply ``func`` to.
+    :type workers: int, optional
+    :param workers: Number of parallel workers. ``None`` or ``1`` results in
+        serial execution in the calling thread unless an executor object is
+        passed in.
+    :type executor: str or object, optional
+    :param executor: Either ``"thread"`` (default) or ``"process"`` to select
+        the type of pool that is created for the call, or an already existing
+        pool/executor object with a ``map()`` method (e.g. a
+        :class:`multiprocessing.pool.Pool` or a
+        :class:`concurrent.futures.Executor`) that is used as is and not shut
+        down afterwards.
+    :rtype: list
+    """
+    items = list(iterable)
+    if executor is not None and \
+            not isinstance(executor, (str, native_str)):
+        if not hasattr(executor, "map"):
+            msg = "executor must be 'thread', 'process' or have a map() method"
+            raise TypeError(msg)
+        return list(executor.map(func, items))
+    if workers is not None and int(workers) < 1:
+        raise ValueError("workers must be a positive integer")
+    if not workers or workers == 1 or len(items) < 2:
+        return [func(item) for item in items]
+    executor = (executor or "thread").lower()
+    if executor == "thread":
+        from multiprocessing.pool import ThreadPool as Pool
+    elif executor == "process":
+        from multiprocessing import Pool
+    else:
+        msg = "executor must be 'thread', 'process' or have a map() method"
+        raise ValueError(msg)
+    pool = Pool(min(int(workers), len(items)))
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
 def get_script_dir_name():
     """
     Get the directory of the current script file. This is more robust than
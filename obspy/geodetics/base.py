@@ -47,12 +47,20 @@ def calc_vincenty_inverse(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
     Computes the distance between two geographic points on the WGS84
     ellipsoid and the forward and backward azimuths between these points.
 
+    All coordinates can also be given as arrays, which are broadcast against
+    each other. The distances and azimuths are then computed for all points
+    at once and returned as arrays.
+
+    :type lat1: float or :class:`numpy.ndarray`
     :param lat1: Latitude of point A in degrees (positive for northern,
         negative for southern hemisphere)
+    :type lon1: float or :class:`numpy.ndarray`
     :param lon1: Longitude of point A in degrees (positive for eastern,
         negative for western hemisphere)
+    :type lat2: float or :class:`numpy.ndarray`
     :param lat2: Latitude of point B in degrees (positive for northern,
         negative for southern hemisphere)
+    :type lon2: float or :class:`numpy.ndarray`
     :param lon2: Longitude of point B in degrees (positive for eastern,
         negative for western hemisphere)
     :param a: Radius of Earth in m. Uses the value for WGS84 by default.
@@ -61,7 +69,8 @@ def calc_vincenty_inverse(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
         azimuth B->A in degrees)
     :raises: This method may have no solution between two nearly antipodal
         points; an iteration limit traps this case and a ``StopIteration``
-        exception will be raised.
+        exception will be raised. For array input no exception is raised,
+        distance and azimuths of these points are set to NaN instead.
 
     .. note::
         This code is based on an implementation incorporated in
@@ -93,6 +102,8 @@ matplotlib/files/matplotlib-toolkits/basemap-0.9.5/
             * Direct problem: Latitude and longitude from known position,
               azimuth and distance.
     """
+    if _is_array_input(lat1, lon1, lat2, lon2):
+        return _calc_vincenty_inverse_array(lat1, lon1, lat2, lon2, a, f)[:3]
     # Check inputs
     if lat1 > 90 or lat1 < -90:
         msg = "Latitude of Point 1 out of bounds! (-90 <= lat1 <=90)"
@@ -202,17 +213,202 @@ matplotlib/files/matplotlib-toolkits/basemap-0.9.5/
     return dist, alpha12, alpha21
 
 
+def _is_array_input(*args):
+    return any(np.ndim(arg) > 0 for arg in args)
+
+
+def _wrap_longitudes(lon):
+    """
+    Shifts longitudes by multiples of 360 degrees into [-180, 180].
+    """
+    lon = lon.copy()
+    high = lon > 180
+    lon[high] -= 360 * np.ceil((lon[high] - 180) / 360)
+    low = lon < -180
+    lon[low] += 360 * np.ceil((-180 - lon[low]) / 360)
+    return lon
+
+
+def _calc_vincenty_inverse_array(lat1, lon1, lat2, lon2, a=WGS84_A,
+                                 f=WGS84_F):
+    """
+    Vectorized version of :func:`calc_vincenty_inverse`.
+
+    Every pair of points iterates until it converges on its own, exactly
+    like the scalar version. Points without solution are set to NaN.
+
+    :return: Arrays of the distance in m, azimuth A->B and azimuth B->A in
+        degrees and the angular distance on the auxiliary sphere in degrees.
+    """
+    lat1, lon1, lat2, lon2 = [
+        np.array(x, dtype=np.float64)
+        for x in np.broadcast_arrays(lat1, lon1, lat2, lon2)]
+    shape = lat1.shape
+    lat1, lon1, lat2, lon2 = [x.ravel() for x in (lat1, lon1, lat2, lon2)]
+    if np.any((lat1 > 90) | (lat1 < -90)):
+        msg = "Latitude of Point 1 out of bounds! (-90 <= lat1 <=90)"
+        raise ValueError(msg)
+    if np.any((lat2 > 90) | (lat2 < -90)):
+        msg = "Latitude of Point 2 out of bounds! (-90 <= lat2 <=90)"
+        raise ValueError(msg)
+    lon1 = _wrap_longitudes(lon1)
+    lon2 = _wrap_longitudes(lon2)
+
+    b = a * (1 - f)  # semiminor axis
+
+    dist = np.zeros(lat1.shape)
+    alpha12 = np.zeros(lat1.shape)
+    alpha21 = np.zeros(lat1.shape)
+    sigma_ = np.zeros(lat1.shape)
+    # identical points have zero distance and azimuths
+    idx = np.nonzero((np.abs(lat1 - lat2) >= 1e-8) |
+                     (np.abs(lon1 - lon2) >= 1e-8))[0]
+
+    u_1 = np.arctan((1 - f) * np.tan(np.radians(lat1[idx])))
+    u_2 = np.arctan((1 - f) * np.tan(np.radians(lat2[idx])))
+    sin_u1, cos_u1 = np.sin(u_1), np.cos(u_1)
+    sin_u2, cos_u2 = np.sin(u_2), np.cos(u_2)
+    omega = np.radians(lon2[idx]) - np.radians(lon1[idx])
+    dlon = omega.copy()
+
+    # all points are iterated together, converged points are removed from
+    # the active set (indices into idx)
+    active = np.arange(len(idx))
+    failed = np.zeros(len(idx), dtype=np.bool_)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for iteration in range(101):
+            if not len(active):
+                break
+            i = idx[active]
+            s_u1, c_u1 = sin_u1[active], cos_u1[active]
+            s_u2, c_u2 = sin_u2[active], cos_u2[active]
+            dl = dlon[active]
+            sin_dlon, cos_dlon = np.sin(dl), np.cos(dl)
+            sqr_sin_sigma = (c_u2 * sin_dlon) ** 2 + \
+                (c_u1 * s_u2 - s_u1 * c_u2 * cos_dlon) ** 2
+            sin_sigma = np.sqrt(sqr_sin_sigma)
+            cos_sigma = s_u1 * s_u2 + c_u1 * c_u2 * cos_dlon
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = c_u1 * c_u2 * sin_dlon / np.sin(sigma)
+            alpha = np.arcsin(sin_alpha)
+            sqr_cos_alpha = np.cos(alpha) ** 2
+            cos2sigma_m = np.cos(sigma) - \
+                (2 * s_u1 * s_u2 / sqr_cos_alpha)
+            c = (f / 16) * sqr_cos_alpha * (4 + f * (4 - 3 * sqr_cos_alpha))
+            last_dlon = dl
+            dl = omega[active] + (1 - c) * f * np.sin(alpha) * \
+                (sigma + c * np.sin(sigma) *
+                    (cos2sigma_m + c * np.cos(sigma) *
+                        (-1 + 2 * cos2sigma_m ** 2)))
+            dlon[active] = dl
+
+            u2 = sqr_cos_alpha * (a * a - b * b) / (b * b)
+            _a = 1 + (u2 / 16384) * (4096 + u2 * (-768 + u2 *
+                                                  (320 - 175 * u2)))
+            _b = (u2 / 1024) * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+            delta_sigma = _b * sin_sigma * \
+                (cos2sigma_m + (_b / 4) *
+                    (cos_sigma * (-1 + 2 * cos2sigma_m ** 2) - (_b / 6) *
+                        cos2sigma_m * (-3 + 4 * sqr_sin_sigma) *
+                        (-3 + 4 * cos2sigma_m ** 2)))
+
+            sin_dlon, cos_dlon = np.sin(dl), np.cos(dl)
+            dist[i] = b * _a * (sigma - delta_sigma)
+            sigma_[i] = sigma
+            alpha12[i] = np.arctan2(c_u2 * sin_dlon,
+                                    c_u1 * s_u2 - s_u1 * c_u2 * cos_dlon)
+            alpha21[i] = np.arctan2(c_u1 * sin_dlon,
+                                    -s_u1 * c_u2 + c_u1 * s_u2 * cos_dlon)
+            if iteration == 100:
+                # iteration limit reached
+                failed[active] = True
+                break
+            active = active[(dl != 0) &
+                            (np.abs((last_dlon - dl) / dl) > 1.0e-9)]
+    failed |= np.isnan(dist[idx]) | np.isnan(alpha12[idx]) | \
+        np.isnan(alpha21[idx])
+    for arr in (dist, alpha12, alpha21, sigma_):
+        arr[idx[failed]] = np.nan
+
+    two_pi = 2.0 * np.pi
+    alpha21[idx] += np.pi
+    with np.errstate(invalid='ignore'):
+        for alpha in (alpha12, alpha21):
+            alpha[alpha < 0.0] += two_pi
+            alpha[alpha > two_pi] -= two_pi
+
+    # convert to degrees:
+    alpha12 = alpha12 * 360 / two_pi
+    alpha21 = alpha21 * 360 / two_pi
+    return tuple(arr.reshape(shape) for arr in
+                 (dist, alpha12, alpha21, np.degrees(sigma_)))
+
+
+def _gps2dist_azimuth_array(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
+    """
+    Vectorized version of :func:`gps2dist_azimuth`.
+
+    Uses the vectorized Vincenty's Inverse formulae for all points and
+    geographiclib (if installed) for the nearly antipodal points without
+    solution.
+
+    :return: Arrays of the distance in m, azimuth A->B and azimuth B->A in
+        degrees and the angular distance on the auxiliary sphere in degrees.
+    """
+    dist, azim, bazim, arc = _calc_vincenty_inverse_array(
+        lat1, lon1, lat2, lon2, a, f)
+    failed = np.isnan(dist)
+    if not failed.any():
+        return dist, azim, bazim, arc
+    if HAS_GEOGRAPHICLIB:
+        geodesic = Geodesic(a=a, f=f)
+        lat1, lon1, lat2, lon2 = np.broadcast_arrays(lat1, lon1, lat2, lon2)
+        for i in zip(*np.nonzero(failed)):
+            result = geodesic.Inverse(float(lat1[i]), float(lon1[i]),
+                                      float(lat2[i]), float(lon2[i]))
+            dist[i] = result['s12']
+            azim[i] = result['azi1'] % 360
+            bazim[i] = result['azi2'] + 180
+            arc[i] = result['a12']
+    else:
+        msg = ("Catching unstable calculation on antipodes. "
+               "The currently used Vincenty's Inverse formulae "
+               "has known limitations for two nearly antipodal points. "
+               "Install the Python module 'geographiclib' to solve this "
+               "issue.")
+        warnings.warn(msg)
+        dist[failed] = 20004314.5
+        azim[failed] = 0.0
+        bazim[failed] = 0.0
+        arc[failed] = 180.0
+    return dist, azim, bazim, arc
+
+
 def gps2dist_azimuth(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
     """
     Computes the distance between two geographic points on the WGS84
     ellipsoid and the forward and backward azimuths between these points.
 
+    All coordinates can also be given as arrays, which are broadcast against
+    each other, e.g. to compute the distances between many events and
+    stations at once:
+
+    >>> import numpy as np
+    >>> dist, azim, bazim = gps2dist_azimuth(
+    ...     np.array([[10.0], [20.0]]), 0.0, 0.0, np.array([10.0, 30.0]))
+    >>> dist.shape
+    (2, 2)
+
+    :type lat1: float or :class:`numpy.ndarray`
     :param lat1: Latitude of point A in degrees (positive for northern,
         negative for southern hemisphere)
+    :type lon1: float or :class:`numpy.ndarray`
     :param lon1: Longitude of point A in degrees (positive for eastern,
         negative for western hemisphere)
+    :type lat2: float or :class:`numpy.ndarray`
     :param lat2: Latitude of point B in degrees (positive for northern,
         negative for southern hemisphere)
+    :type lon2: float or :class:`numpy.ndarray`
     :param lon2: Longitude of point B in degrees (positive for eastern,
         negative for western hemisphere)
     :param a: Radius of Earth in m. Uses the value for WGS84 by default.
@@ -220,6 +416,12 @@ def gps2dist_azimuth(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
     :return: (Great circle distance in m, azimuth A->B in degrees,
         azimuth B->A in degrees)
 
+    .. note::
+        Arrays are always handled by a vectorized implementation of
+        Vincenty's Inverse formulae, geographiclib is only used for the
+        nearly antipodal points where it does not converge. The results
+        agree with geographiclib to well below a millimeter.
+
     .. note::
         This function will check if you have installed the Python module
         `geographiclib <http://geographiclib.sf.net>`_ - a very fast module
@@ -230,6 +432,8 @@ def gps2dist_azimuth(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
         has known limitations for two nearly antipodal points and is ca. 4x
         slower.
     """
+    if _is_array_input(lat1, lon1, lat2, lon2):
+        return _gps2dist_azimuth_array(lat1, lon1, lat2, lon2, a, f)[:3]
     if HAS_GEOGRAPHICLIB:
         if lat1 > 90 or lat1 < -90:
             msg = "Latitude of Point 1 out of bounds! (-90 <= lat1 <=90)"
@@ -186,6 +186,59 @@ class UtilGeodeticsTestCase(unittest.TestCase):
             warnings.simplefilter('error', UserWarning)
             self.assertRaises(UserWarning, gps2dist_azimuth, 0, 0, 0, 180)
 
+    def test_calc_vincenty_inverse_array(self):
+        """
+        Array input broadcasts and gives the results of the scalar version,
+        points without solution are NaN.
+        """
+        rs = np.random.RandomState(815)
+        lat1 = np.concatenate([[0.0, 10.0, 0.0], rs.uniform(-90, 90, 200)])
+        lon1 = np.concatenate([[0.0, 20.0, 0.0], rs.uniform(-400, 400, 200)])
+        lat2 = np.concatenate([[0.5, 10.0, 0.0], rs.uniform(-90, 90, 200)])
+        lon2 = np.concatenate([[179.7, 20.0, 180.0],
+                               rs.uniform(-180, 180, 200)])
+        expected = []
+        for args in zip(lat1, lon1, lat2, lon2):
+            try:
+                expected.append(calc_vincenty_inverse(*args))
+            except StopIteration:
+                expected.append((np.nan, np.nan, np.nan))
+        expected = np.array(expected).T
+        got = calc_vincenty_inverse(lat1, lon1, lat2, lon2)
+        for exp, arr in zip(expected, got):
+            self.assertEqual(arr.shape, lat1.shape)
+            np.testing.assert_allclose(arr, exp, rtol=1e-12, atol=1e-9)
+        self.assertTrue(np.isnan(got[0][[0, 2]]).all())
+        self.assertEqual(got[0][1], 0.0)
+        # broadcasting, e.g. all events against all stations
+        dist, azim, bazim = calc_vincenty_inverse(
+            lat1[3:13, None], lon1[3:13, None], lat2[3:8], lon2[3:8])
+        self.assertEqual(dist.shape, (10, 5))
+        self.assertEqual(bazim[4, 2], calc_vincenty_inverse(
+            lat1[7], lon1[7], lat2[5], lon2[5])[2])
+        self.assertRaises(ValueError, calc_vincenty_inverse, [0, 91], 0, 0, 0)
+        self.assertRaises(ValueError, calc_vincenty_inverse, 0, 0, [-91], 0)
+
+    def test_gps2dist_azimuth_array(self):
+        """
+        Array input of gps2dist_azimuth() is handled per element.
+        """
+        lat1 = np.array([10.0, 0.0, 50.0, 50.0])
+        lon1 = np.array([20.0, 0.0, 10.0, 10.0])
+        lat2 = np.array([10.0, 0.0, 51.0, -49.0])
+        lon2 = np.array([20.0, 180.0, 11.0, -160.0])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            dist, azim, bazim = gps2dist_azimuth(lat1, lon1, lat2, lon2)
+            expected = [gps2dist_azimuth(*args)
+                        for args in zip(lat1, lon1, lat2, lon2)]
+        self.assertEqual(len(w), 0 if HAS_GEOGRAPHICLIB else 2)
+        for i, (d, a, b) in enumerate(expected):
+            self.assertAlmostEqual(dist[i], d, 3)
+            self.assertAlmostEqual(azim[i], a, 7)
+            self.assertAlmostEqual(bazim[i], b, 7)
+        self.assertEqual(gps2dist_azimuth([50], 10, 51, 11)[0].shape, (1, ))
+
     def test_kilometer2degrees(self):
         """
         Simple test of the convenience function.
@@ -61,6 +61,9 @@ def _format_header(stats, format, dataquality, dtype, unit):
     return header
 
 
+_SLIST_SIGNATURE = {"magic": br'TIMESERIES[^\n]*SLIST'}
+
+
 def _is_slist(filename):
     """
     Checks whether a file is ASCII SLIST format.
@@ -87,6 +90,9 @@ def _is_slist(filename):
     return True
 
 
+_TSPAIR_SIGNATURE = {"magic": br'TIMESERIES[^\n]*TSPAIR'}
+
+
 def _is_tspair(filename):
     """
     Checks whether a file is ASCII TSPAIR format.
@@ -40,6 +40,9 @@ def merge_gcf_stream(st):
     return Stream(traces=traces)
 
 
+_GCF_SIGNATURE = {"extensions": ['.gcf']}
+
+
 def _is_gcf(filename):
     """
     Checks whether a file is GCF or not.
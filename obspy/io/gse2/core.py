@@ -12,6 +12,9 @@ from obspy import Stream, Trace
 from . import libgse1, libgse2
 
 
+_GSE2_SIGNATURE = {"magic": br'WID2', "extensions": ['.gse2']}
+
+
 def _is_gse2(filename):
     """
     Checks whether a file is GSE2 or not.
@@ -111,6 +114,9 @@ def _write_gse2(stream, filename, inplace=False, **kwargs):  # @UnusedVariable
             libgse2.write(trace.stats, trace.data, f, inplace)
 
 
+_GSE1_SIGNATURE = {"magic": br'WID1|XW01', "extensions": ['.gse1']}
+
+
 def _is_gse1(filename):
     """
     Checks whether a file is GSE1 or not.
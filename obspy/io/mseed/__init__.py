@@ -140,6 +140,8 @@ some purposes. Refer to the documentation of each for details.
 +----------------------------------------------------------+--------------------------------------------------------------------------+
 | :func:`~obspy.io.mseed.util.set_flags_in_fixed_headers`  | Updates a given miniSEED file with some fixed header flags.              |
 +----------------------------------------------------------+--------------------------------------------------------------------------+
+| :func:`~obspy.io.mseed.util.get_record_index`            | Returns a (cached) index of offsets and start times of all records.      |
++----------------------------------------------------------+--------------------------------------------------------------------------+
 """
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
@@ -26,6 +26,22 @@ from .headers import (DATATYPES, ENCODINGS, HPTERROR, HPTMODULUS, SAMPLETYPE,
                       SelectTime, Blkt100S, Blkt1001S, clibmseed)
 
 
+# libmseed addresses buffers with signed 32 bit integers
+MAX_BUFFER_SIZE = 2 ** 31
+_FILESIZE_TOO_LARGE_MSG = (
+    "ObsPy can currently not directly read mini-SEED files that are larger "
+    "than 2^31 bytes (2048 MiB). To still read it, please read the file in "
+    "chunks as documented here: https://github.com/obspy/obspy/pull/1419"
+    "#issuecomment-221582369")
+
+
+# fixed header: six digit sequence number and data header/quality or
+# volume control header indicator
+_MSEED_SIGNATURE = {
+    "magic": br'[0-9 \x00]{6}[DRQMV]',
+    "extensions": ['.mseed', '.miniseed', '.msd']}
+
+
 def _is_mseed(filename):
     """
     Checks whether a file is Mini-SEED/full SEED or not.
@@ -259,6 +275,15 @@ def _read_mseed(mseed_object, starttime=None, endtime=None, headonly=False,
     else:
         bo = None
 
+    for time, name in ((starttime, "starttime"), (endtime, "endtime")):
+        if time is not None and not isinstance(time, UTCDateTime):
+            msg = '%s needs to be a UTCDateTime object' % name
+            raise ValueError(msg)
+    # Files are memory mapped and for time windows only the records
+    # potentially containing data in the time window are read.
+    is_filename = isinstance(mseed_object, (str, native_str))
+    windowed = is_filename and (starttime is not None or endtime is not None)
+
     # Determine total size. Either its a file-like object.
     if hasattr(mseed_object, "tell") and hasattr(mseed_object, "seek"):
         cur_pos = mseed_object.tell()
@@ -273,13 +298,8 @@ def _read_mseed(mseed_object, starttime=None, endtime=None, headonly=False,
         msg = "The smallest possible mini-SEED record is made up of 128 " \
               "bytes. The passed buffer or file contains only %i." % length
         raise ObsPyMSEEDFilesizeTooSmallError(msg)
-    elif length > 2 ** 31:
-        msg = ("ObsPy can currently not directly read mini-SEED files that "
-               "are larger than 2^31 bytes (2048 MiB). To still read it, "
-               "please read the file in chunks as documented here: "
-               "https://github.com/obspy/obspy/pull/1419"
-               "#issuecomment-221582369")
-        raise ObsPyMSEEDFilesizeTooLargeError(msg)
+    elif length > MAX_BUFFER_SIZE and not windowed:
+        raise ObsPyMSEEDFilesizeTooLargeError(_FILESIZE_TOO_LARGE_MSG)
 
     info = util.get_record_information(mseed_object, endian=bo)
 
@@ -301,14 +321,25 @@ def _read_mseed(mseed_object, starttime=None, endtime=None, headonly=False,
         raise ValueError(msg)
 
     record_length = info["record_length"]
+    byteorder = bo or info["byteorder"]
 
     # Only keep information relevant for the whole file.
     info = {'filesize': info['filesize']}
 
-    # If it's a file name just read it.
-    if isinstance(mseed_object, (str, native_str)):
-        # Read to NumPy array which is used as a buffer.
-        bfr_np = np.fromfile(mseed_object, dtype=np.int8)
+    if windowed:
+        bfr_np = _read_records_in_window(mseed_object, record_length,
+                                         byteorder, starttime, endtime)
+    else:
+        bfr_np = None
+    if bfr_np is not None:
+        # No record in the time window.
+        if not len(bfr_np):
+            return Stream()
+    # If it's a file name just map it to memory.
+    elif is_filename:
+        if length > MAX_BUFFER_SIZE:
+            raise ObsPyMSEEDFilesizeTooLargeError(_FILESIZE_TOO_LARGE_MSG)
+        bfr_np = _map_file(mseed_object)
     elif hasattr(mseed_object, 'read'):
         bfr_np = from_buffer(mseed_object.read(), dtype=np.int8)
 
@@ -344,18 +375,12 @@ def _read_mseed(mseed_object, starttime=None, endtime=None, headonly=False,
         selections = Selections()
         selections.timewindows.contents = select_time
         if starttime is not None:
-            if not isinstance(starttime, UTCDateTime):
-                msg = 'starttime needs to be a UTCDateTime object'
-                raise ValueError(msg)
             selections.timewindows.contents.starttime = \
                 util._convert_datetime_to_mstime(starttime)
         else:
             # HPTERROR results in no starttime.
             selections.timewindows.contents.starttime = HPTERROR
         if endtime is not None:
-            if not isinstance(endtime, UTCDateTime):
-                msg = 'endtime needs to be a UTCDateTime object'
-                raise ValueError(msg)
             selections.timewindows.contents.endtime = \
                 util._convert_datetime_to_mstime(endtime)
         else:
@@ -495,6 +520,60 @@ def _read_mseed(mseed_object, starttime=None, endtime=None, headonly=False,
     return Stream(traces=traces)
 
 
+def _map_file(filename):
+    """
+    Maps a file copy-on-write to memory so it can be passed as buffer to
+    libmseed without reading it completely into memory first.
+    """
+    try:
+        return np.memmap(filename, dtype=np.int8, mode="c")
+    except (ValueError, IOError, OSError):
+        # Fallback for files that cannot be mapped.
+        return np.fromfile(filename, dtype=np.int8)
+
+
+def _read_records_in_window(filename, record_length, byteorder, starttime,
+                            endtime):
+    """
+    Returns a buffer with all records of a file that might contain data
+    between starttime and endtime.
+
+    If the selected records are contiguous in the file they are memory
+    mapped, otherwise only they are read into a new buffer. Returns ``None``
+    if the file does not consist of fixed length data records, the caller
+    then has to pass the whole file to libmseed.
+    """
+    table = util.get_record_index(filename, record_length, byteorder,
+                                  cache=None)
+    if table is None:
+        return None
+    indices = util._select_records(table, starttime, endtime)
+    if not len(indices):
+        return np.empty(0, dtype=np.int8)
+    size = len(indices) * record_length
+    if size > MAX_BUFFER_SIZE:
+        raise ObsPyMSEEDFilesizeTooLargeError(_FILESIZE_TOO_LARGE_MSG)
+    offsets = table["offset"][indices]
+    # Contiguous records.
+    if indices[-1] - indices[0] + 1 == len(indices):
+        try:
+            return np.memmap(filename, dtype=np.int8, mode="c",
+                             offset=int(offsets[0]), shape=(size,))
+        except (ValueError, IOError, OSError):
+            pass
+    # Read runs of consecutive records at once.
+    bfr_np = np.empty(size, dtype=np.int8)
+    breaks = np.nonzero(np.diff(indices) != 1)[0] + 1
+    position = 0
+    with io.open(filename, "rb") as fh:
+        for run in np.split(np.arange(len(indices)), breaks):
+            fh.seek(int(offsets[run[0]]), 0)
+            run_size = len(run) * record_length
+            fh.readinto(bfr_np[position:position + run_size])
+            position += run_size
+    return bfr_np
+
+
 def _write_mseed(stream, filename, encoding=None, reclen=None, byteorder=None,
                  sequence_number=None, flush=True, verbose=0, **_kwargs):
     """
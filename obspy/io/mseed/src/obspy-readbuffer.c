@@ -275,6 +275,63 @@ void setupLogging(void (*diag_print) (char*),
 }
 
 
+// Sample type of the unpacked data for a given encoding. Mirrors the
+// decoding in msr_unpack_data().
+char get_sampletype(int8_t encoding) {
+    switch (encoding) {
+        case DE_ASCII:
+            return 'a';
+        case DE_INT16:
+        case DE_INT32:
+        case DE_STEIM1:
+        case DE_STEIM2:
+        case DE_CDSN:
+        case DE_SRO:
+        case DE_DWWSSN:
+            return 'i';
+        case DE_FLOAT32:
+        case DE_GEOSCOPE24:
+        case DE_GEOSCOPE163:
+        case DE_GEOSCOPE164:
+            return 'f';
+        case DE_FLOAT64:
+            return 'd';
+        default:
+            return 0;
+    }
+}
+
+
+// Figure out if the byte-order of the data of a record has to be swapped.
+flag get_swapflag(MSRecord *msr, flag bigendianhost) {
+    flag swapflag = 0;
+    // If blockette 1000 is present, use it.
+    if ( msr->Blkt1000 != 0) {
+        /* If BE host and LE data need swapping */
+        if ( bigendianhost && msr->byteorder == 0 ) {
+            swapflag = 1;
+        }
+        /* If LE host and BE data (or bad byte order value) need swapping */
+        if ( !bigendianhost && msr->byteorder > 0 ) {
+            swapflag = 1;
+        }
+    }
+    // Otherwise assume the data has the same byte order as the header.
+    // This needs to be done on the raw header bytes as libmseed only returns
+    // header fields in the native byte order.
+    else {
+        unsigned char* _t = (unsigned char*)msr->record + 20;
+        unsigned int year = _t[0] | _t[1] << 8;
+        unsigned int day = _t[2] | _t[3] << 8;
+        // Swap data if header needs to be swapped.
+        if (!MS_ISVALIDYEARDAY(year, day)) {
+            swapflag = 1;
+        }
+    }
+    return swapflag;
+}
+
+
 // Function that reads from a MiniSEED binary file from a char buffer and
 // returns a LinkedIDList.
 LinkedIDList *
@@ -284,7 +341,6 @@ readMSEEDBuffer (char *mseed, int buflen, Selections *selections, flag
 {
     int retcode = 0;
     int retval = 0;
-    flag swapflag = 0;
     flag bigendianhost = ms_bigendianhost();
 
     // current offset of mseed char pointer
@@ -313,6 +369,7 @@ readMSEEDBuffer (char *mseed, int buflen, Selections *selections, flag
     LinkedRecordList *recordPrevious = NULL;
     LinkedRecordList *recordCurrent = NULL;
     int datasize;
+    int unpacked_size;
     int record_count = 0;
 
     if (header_byteorder >= 0) {
@@ -458,42 +515,13 @@ readMSEEDBuffer (char *mseed, int buflen, Selections *selections, flag
         recordCurrent->record = msr;
 
 
-        // Figure out if the byte-order of the data has to be swapped.
-        swapflag = 0;
-        // If blockette 1000 is present, use it.
-        if ( msr->Blkt1000 != 0) {
-            /* If BE host and LE data need swapping */
-            if ( bigendianhost && msr->byteorder == 0 ) {
-                swapflag = 1;
-            }
-            /* If LE host and BE data (or bad byte order value) need swapping */
-            if ( !bigendianhost && msr->byteorder > 0 ) {
-                swapflag = 1;
-            }
-        }
-        // Otherwise assume the data has the same byte order as the header.
-        // This needs to be done on the raw header bytes as libmseed only returns
-        // header fields in the native byte order.
-        else {
-            unsigned char* _t = (unsigned char*)mseed + offset + 20;
-            unsigned int year = _t[0] | _t[1] << 8;
-            unsigned int day = _t[2] | _t[3] << 8;
-            // Swap data if header needs to be swapped.
-            if (!MS_ISVALIDYEARDAY(year, day)) {
-                swapflag = 1;
-            }
-        }
-
-        // Actually unpack the data if the flag is not set and if the data
-        // offset is valid.
+        // The data will only be unpacked once the final data array of the
+        // segment has been allocated, but the sample type is already
+        // required to assemble the segments.
         if ((unpack_data != 0) && (msr->fsdh->data_offset >= 48) &&
             (msr->fsdh->data_offset < msr->reclen) &&
             (msr->samplecnt > 0)) {
-            retval = msr_unpack_data (msr, swapflag, verbose);
-        }
-
-        if ( retval > 0 ) {
-            msr->numsamples = retval;
+            msr->sampletype = get_sampletype(msr->encoding);
         }
 
         if ( msr->fsdh->start_time.fract > 9999 ) {
@@ -675,12 +703,33 @@ readMSEEDBuffer (char *mseed, int buflen, Selections *selections, flag
                 segmentCurrent->datasamples = (void *) allocData(segmentCurrent->samplecnt, segmentCurrent->sampletype);
             }
 
-            // Loop over all records, write the data to the buffer and free the msr structures.
+            // Loop over all records, unpack the data of each record directly
+            // before writing it to the buffer and free the msr structures.
+            // This way only the samples of a single record exist twice in
+            // memory at any time.
             recordCurrent = segmentCurrent->firstRecord;
             data_offset = (long long)(segmentCurrent->datasamples);
             while (recordCurrent != NULL) {
-                datasize = recordCurrent->record->samplecnt * ms_samplesize(recordCurrent->record->sampletype);
-                memcpy((void *)data_offset, recordCurrent->record->datasamples, datasize);
+                msr = recordCurrent->record;
+                datasize = msr->samplecnt * ms_samplesize(msr->sampletype);
+                if (datasize > 0) {
+                    retval = msr_unpack_data (msr, get_swapflag(msr, bigendianhost), verbose);
+                    if ((retval > 0) && (msr->datasamples != NULL)) {
+                        msr->numsamples = retval;
+                        unpacked_size = retval * ms_samplesize(msr->sampletype);
+                        if (unpacked_size > datasize) {
+                            unpacked_size = datasize;
+                        }
+                        memcpy((void *)data_offset, msr->datasamples, unpacked_size);
+                    }
+                    else {
+                        unpacked_size = 0;
+                    }
+                    // Never leave uninitialized memory in the output array.
+                    if (unpacked_size < datasize) {
+                        memset((void *)(data_offset + unpacked_size), 0, datasize - unpacked_size);
+                    }
+                }
                 // Free the record.
                 msr_free(&(recordCurrent->record));
                 // Increase the data_offset and the record.
@@ -19,6 +19,7 @@ import numpy as np
 from obspy import Stream, Trace, UTCDateTime, read
 from obspy.core import AttribDict
 from obspy.core.compatibility import from_buffer
+from obspy.core.compatibility import mock
 from obspy.core.util import CatchOutput, NamedTemporaryFile
 from obspy.io.mseed import (util, InternalMSEEDWarning,
                             InternalMSEEDError)
@@ -403,6 +404,56 @@ class MSEEDReadingAndWritingTestCase(unittest.TestCase):
                              endtime=starttime - 1E6 + 1)
         self.assertEqual(len(stream), 0)
 
+    def test_read_time_window_only_reads_selected_records(self):
+        """
+        Reading a time window from a file only passes the records overlapping
+        the window to libmseed but gives the same result as passing the whole
+        file.
+        """
+        np.random.seed(1234)
+        tr1 = Trace(data=np.random.randint(-1000, 1000, 20000).astype(
+            np.int32))
+        tr1.stats.starttime = UTCDateTime(2012, 1, 1)
+        tr1.stats.sampling_rate = 100.0
+        tr1.stats.station = "A"
+        tr2 = tr1.copy()
+        tr2.stats.station = "B"
+        tr2.data = tr2.data[::-1].copy()
+        windows = [(tr1.stats.starttime + 50, tr1.stats.starttime + 60),
+                   (tr1.stats.starttime + 50, None),
+                   (None, tr1.stats.starttime + 10.005),
+                   (tr1.stats.starttime - 100, tr1.stats.starttime - 50)]
+        with NamedTemporaryFile() as tf:
+            # Records of the two stations are stored one after another so
+            # the selected records are not contiguous.
+            Stream([tr1, tr2]).write(tf.name, format="MSEED", reclen=512,
+                                     encoding="STEIM2")
+            with io.open(tf.name, "rb") as fh:
+                data = fh.read()
+            records = util._get_record_table(tf.name, 512, ">")
+            self.assertEqual(len(records), len(data) // 512)
+            for starttime, endtime in windows:
+                with io.BytesIO(data) as buf:
+                    expected = _read_mseed(buf, starttime=starttime,
+                                           endtime=endtime)
+                with mock.patch("obspy.io.mseed.core._map_file") as p:
+                    got = _read_mseed(tf.name, starttime=starttime,
+                                      endtime=endtime)
+                # The whole file is never mapped for time windows.
+                self.assertEqual(p.call_count, 0)
+                self.assertEqual(expected, got)
+            # Single channel file with contiguous records.
+            tr1.write(tf.name, format="MSEED", reclen=512, encoding="STEIM2")
+            with io.open(tf.name, "rb") as fh:
+                data = fh.read()
+            for starttime, endtime in windows:
+                with io.BytesIO(data) as buf:
+                    expected = _read_mseed(buf, starttime=starttime,
+                                           endtime=endtime)
+                got = _read_mseed(tf.name, starttime=starttime,
+                                  endtime=endtime)
+                self.assertEqual(expected, got)
+
     def test_read_partial_with_source_name(self):
         """
         Uses obspy.io.mseed.mseed._read_mseed to read only part of a file that
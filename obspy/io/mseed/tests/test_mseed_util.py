@@ -19,7 +19,9 @@ import numpy as np
 
 from obspy import UTCDateTime
 from obspy.core import Stream, Trace
+from obspy.core.compatibility import mock
 from obspy.core.util import NamedTemporaryFile
+from obspy.core.util.misc import TemporaryWorkingDirectory
 from obspy.io.mseed import util
 from obspy.io.mseed.core import _read_mseed
 from obspy.io.mseed.headers import (FIXED_HEADER_ACTIVITY_FLAGS,
@@ -201,6 +203,111 @@ class MSEEDUtilTestCase(unittest.TestCase):
         self.assertEqual(info['number_of_records'], 2)
         self.assertEqual(info['excess_bytes'], 0)
 
+    def test_get_record_table(self):
+        """
+        Tests scanning the fixed headers of all records of a file.
+        """
+        filename = os.path.join(self.path, 'data',
+                                'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        table = util._get_record_table(filename, 512, ">")
+        self.assertEqual(len(table), 10)
+        for record in table:
+            info = util.get_record_information(filename,
+                                               offset=int(record["offset"]))
+            self.assertEqual(record["network"].decode(), info["network"])
+            self.assertEqual(record["station"].decode(), info["station"])
+            self.assertEqual(record["location"].decode(), info["location"])
+            self.assertEqual(record["channel"].decode(), info["channel"])
+            self.assertEqual(record["starttime"], info["starttime"].ns)
+            self.assertEqual(record["samp_rate"], info["samp_rate"])
+            self.assertEqual(record["npts"], info["npts"])
+        # Small chunks give the same result.
+        np.testing.assert_array_equal(
+            table, util._get_record_table(filename, 512, ">", chunk_size=1))
+        # Time corrections are applied if not yet done.
+        filename = os.path.join(self.path, 'data', 'test.mseed')
+        with NamedTemporaryFile() as tf:
+            with open(filename, 'rb') as fh:
+                data = bytearray(fh.read())
+            data[40:44] = pack(native_str('>i'), 12345)
+            tf.write(bytes(data))
+            tf.flush()
+            table = util._get_record_table(tf.name, 4096, ">")
+            self.assertEqual(table["starttime"][0],
+                             util.get_record_information(tf.name)[
+                                 "starttime"].ns)
+        # Wrong record length or files with non SEED data.
+        self.assertIsNone(util._get_record_table(filename, 1024, ">"))
+        filename = os.path.join(self.path, 'data', 'fullseed.mseed')
+        self.assertIsNone(util._get_record_table(filename, 4096, ">"))
+
+    def test_get_record_index_sidecar(self):
+        """
+        Tests storing, reusing and invalidating record index sidecar files.
+        """
+        source = os.path.join(self.path, 'data',
+                              'BW.BGLD.__.EHE.D.2008.001.first_10_records')
+        with TemporaryWorkingDirectory():
+            filename = os.path.abspath('data.mseed')
+            sidecar = util._get_record_index_sidecar(filename)
+            self.assertEqual(os.path.basename(sidecar),
+                             '.data.mseed.mseedidx.npz')
+            shutil.copy(source, filename)
+            expected = util._get_record_table(filename, 512, ">")
+            # No sidecar when reading time windows unless enabled, and then
+            # only for large files.
+            starttime = UTCDateTime(2008, 1, 1, 0, 0, 5)
+            endtime = UTCDateTime(2008, 1, 1, 0, 0, 8)
+            for auto, min_size in ((False, 0), (True, 10 ** 6)):
+                with mock.patch.multiple(
+                        'obspy.io.mseed.util', RECORD_INDEX_AUTO_SIDECAR=auto,
+                        RECORD_INDEX_MIN_FILESIZE=min_size):
+                    index = util.get_record_index(filename, cache=None)
+                    np.testing.assert_array_equal(index, expected)
+                    _read_mseed(filename, starttime=starttime,
+                                endtime=endtime)
+                self.assertFalse(os.path.exists(sidecar))
+            with mock.patch.multiple(
+                    'obspy.io.mseed.util', RECORD_INDEX_AUTO_SIDECAR=True,
+                    RECORD_INDEX_MIN_FILESIZE=0):
+                _read_mseed(filename, starttime=starttime, endtime=endtime)
+            self.assertTrue(os.path.exists(sidecar))
+            # written atomically, no temporary files are left over
+            self.assertEqual(sorted(os.listdir('.')),
+                             [os.path.basename(sidecar), 'data.mseed'])
+            os.remove(sidecar)
+            index = util.get_record_index(filename)
+            np.testing.assert_array_equal(index, expected)
+            self.assertTrue(os.path.exists(sidecar))
+            # Afterwards the file is not scanned anymore, also for automatic
+            # caching as the sidecar exists.
+            with mock.patch('obspy.io.mseed.util._get_record_table') as p:
+                for cache in (True, None):
+                    index = util.get_record_index(filename, cache=cache)
+                    np.testing.assert_array_equal(index, expected)
+                # Reading time windows uses the index.
+                st = _read_mseed(filename, starttime=starttime,
+                                 endtime=endtime)
+            self.assertEqual(p.call_count, 0)
+            with open(filename, 'rb') as fh:
+                self.assertEqual(st, _read_mseed(
+                    io.BytesIO(fh.read()), starttime=starttime,
+                    endtime=endtime))
+            # Changing the file invalidates the index.
+            with open(source, 'rb') as fh:
+                data = fh.read(5 * 512)
+            with open(filename, 'wb') as fh:
+                fh.write(data)
+            index = util.get_record_index(filename)
+            np.testing.assert_array_equal(index, expected[:5])
+            # Broken sidecar files are rebuilt.
+            with open(sidecar, 'wb') as fh:
+                fh.write(b'abc')
+            index = util.get_record_index(filename)
+            np.testing.assert_array_equal(index, expected[:5])
+            with np.load(sidecar) as npz:
+                np.testing.assert_array_equal(npz['index'], expected[:5])
+
     def test_issue2069(self):
         """
         Tests the util._get_ms_file_info method with sample rate of 0.
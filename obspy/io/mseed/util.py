@@ -11,6 +11,7 @@ import collections
 import ctypes as C
 import os
 import sys
+import tempfile
 import warnings
 from datetime import datetime
 from struct import pack, unpack
@@ -786,6 +787,280 @@ def _get_record_information(file_object, offset=0, endian=None):
     return info
 
 
+def _fixed_header_dtype(byteorder):
+    """
+    NumPy dtype of the fixed section of a data header in given byte order.
+    """
+    fields = [
+        ("sequence_number", "S6", 0), ("dataquality", "S1", 6),
+        ("station", "S5", 8), ("location", "S2", 13), ("channel", "S3", 15),
+        ("network", "S2", 18), ("year", "u2", 20), ("julday", "u2", 22),
+        ("hour", "u1", 24), ("minute", "u1", 25), ("second", "u1", 26),
+        ("fract", "u2", 28), ("npts", "u2", 30),
+        ("samp_rate_factor", "i2", 32), ("samp_rate_mult", "i2", 34),
+        ("activity_flags", "u1", 36),
+        ("time_correction", "i4", 40)]
+    return np.dtype({
+        "names": [native_str(name) for name, _, _ in fields],
+        "formats": [native_str(byteorder + fmt) if fmt[0] in "ui" else
+                    native_str(fmt) for _, fmt, _ in fields],
+        "offsets": [offset for _, _, offset in fields],
+        "itemsize": 48})
+
+
+# Record table as returned by _get_record_table(). Start times are given in
+# integer nanoseconds since the epoch just like UTCDateTime.ns.
+RECORD_TABLE_DTYPE = np.dtype([
+    (native_str("offset"), np.int64),
+    (native_str("network"), native_str("S2")),
+    (native_str("station"), native_str("S5")),
+    (native_str("location"), native_str("S2")),
+    (native_str("channel"), native_str("S3")),
+    (native_str("starttime"), np.int64),
+    (native_str("samp_rate"), np.float64),
+    (native_str("npts"), np.int64)])
+
+
+def _get_record_table(filename, record_length, byteorder, offset=0,
+                      chunk_size=2 ** 20):
+    """
+    Scans the fixed headers of all records in a file of fixed length
+    MiniSEED data records.
+
+    The file is read sequentially in chunks of ``chunk_size`` bytes and the
+    headers of each chunk are parsed at once, so the memory usage does not
+    depend on the size of the file. Blockettes are not parsed, thus
+    sampling rates set via blockette 100 and microseconds of blockettes 500
+    and 1001 are not reflected in the table.
+
+    :type filename: str
+    :param filename: MiniSEED file.
+    :type record_length: int
+    :param record_length: Length of every record in bytes.
+    :type byteorder: str
+    :param byteorder: Byte order of the headers, ``"<"`` or ``">"``.
+    :type offset: int
+    :param offset: Offset of the first data record in the file in bytes.
+    :rtype: :class:`numpy.ndarray` or None
+    :returns: Structured array with ``RECORD_TABLE_DTYPE`` with one entry per
+        record or ``None`` if the file does not only consist of data records
+        of the given length and byte order (e.g. record lengths change
+        within the file or non SEED data is contained).
+    """
+    filesize = os.path.getsize(filename) - offset
+    if filesize <= 0 or filesize % record_length:
+        return None
+    header_dtype = _fixed_header_dtype(byteorder)
+    records_per_chunk = max(1, chunk_size // record_length)
+    buf = np.empty(records_per_chunk * record_length, dtype=np.uint8)
+    table = np.empty(filesize // record_length, dtype=RECORD_TABLE_DTYPE)
+    table["offset"] = offset + \
+        np.arange(len(table), dtype=np.int64) * record_length
+    digits = np.frombuffer(b"0123456789 \x00", dtype=np.uint8)
+    quality = np.frombuffer(b"DRQM", dtype=np.uint8)
+    with open(filename, "rb") as fh:
+        fh.seek(offset, 0)
+        index = 0
+        while index < len(table):
+            n_bytes = fh.readinto(buf)
+            if not n_bytes or n_bytes % record_length:
+                return None
+            records = buf[:n_bytes].reshape(-1, record_length)[:, :48]
+            if not np.in1d(records[:, :6], digits).all() or \
+                    not np.in1d(records[:, 6], quality).all():
+                return None
+            headers = np.ascontiguousarray(records).view(header_dtype)[:, 0]
+            if (headers["year"] < 1900).any() or \
+                    (headers["year"] > 2500).any() or \
+                    (headers["julday"] < 1).any() or \
+                    (headers["julday"] > 366).any():
+                return None
+            chunk = table[index:index + len(headers)]
+            for key in ("network", "station", "location", "channel"):
+                chunk[key] = np.char.strip(headers[key])
+            years = headers["year"].astype(np.int64) - 1970
+            days = years.astype("datetime64[Y]").astype(
+                "datetime64[D]").astype(np.int64) + headers["julday"] - 1
+            seconds = ((days * 24 + headers["hour"]) * 60 +
+                       headers["minute"]) * 60 + headers["second"]
+            starttime = seconds * 10 ** 9 + \
+                headers["fract"].astype(np.int64) * 10 ** 5
+            # Apply time corrections that are not yet applied.
+            correct = (headers["activity_flags"] & 2) == 0
+            starttime[correct] += \
+                headers["time_correction"][correct].astype(np.int64) * 10 ** 5
+            chunk["starttime"] = starttime
+            chunk["samp_rate"] = _get_samp_rate(headers["samp_rate_factor"],
+                                                headers["samp_rate_mult"])
+            chunk["npts"] = headers["npts"]
+            index += len(headers)
+    return table
+
+
+def _get_samp_rate(factor, multiplier):
+    """
+    Vectorized version of the sampling rate calculation from the sample rate
+    factor and multiplier according to the SEED manual.
+    """
+    factor = np.asarray(factor, dtype=np.float64)
+    multiplier = np.asarray(multiplier, dtype=np.float64)
+    samp_rate = np.zeros_like(factor)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        candidates = [
+            ((factor > 0) & (multiplier > 0), factor * multiplier),
+            ((factor > 0) & (multiplier < 0), -factor / multiplier),
+            ((factor < 0) & (multiplier > 0), -multiplier / factor),
+            ((factor < 0) & (multiplier < 0), 1.0 / (factor * multiplier))]
+    for mask, value in candidates:
+        samp_rate[mask] = value[mask]
+    return samp_rate
+
+
+def _select_records(table, starttime=None, endtime=None):
+    """
+    Returns the indices of all records in a record table that might contain
+    data between starttime and endtime.
+
+    The selection is conservative, it errs on the side of including records
+    close to the time window as the exact selection is done by libmseed.
+    """
+    # Accounts for microseconds in blockettes, samples needed by the
+    # nearest_sample logic and slightly inaccurate sampling rates.
+    margin = 10 ** 9
+    rec_start = table["starttime"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        duration = np.where(
+            table["samp_rate"] > 0,
+            table["npts"] / table["samp_rate"] * 1e9, 0).astype(np.int64)
+    mask = np.ones(len(table), dtype=np.bool_)
+    if starttime is not None:
+        mask &= rec_start + duration >= starttime.ns - margin
+    if endtime is not None:
+        mask &= rec_start <= endtime.ns + margin
+    return np.nonzero(mask)[0]
+
+
+# Version of the record index sidecar file layout.
+RECORD_INDEX_VERSION = 1
+# Whether reading time windows automatically stores the record indices of
+# files of at least RECORD_INDEX_MIN_FILESIZE bytes in sidecar files next to
+# the MiniSEED files. Existing sidecar files are always used.
+RECORD_INDEX_AUTO_SIDECAR = False
+RECORD_INDEX_MIN_FILESIZE = 2 ** 24
+
+
+def get_record_index(filename, record_length=None, byteorder=None,
+                     cache=True):
+    """
+    Returns an index of all records in a MiniSEED file.
+
+    The index is a structured array with one entry per record containing
+    its offset in the file, the SEED identifiers, the start time in
+    nanoseconds since the epoch (compare
+    :attr:`~obspy.core.utcdatetime.UTCDateTime.ns`), the sampling rate and
+    the number of samples. Only files consisting of data records of a fixed
+    length can be indexed.
+
+    If ``cache`` is ``True`` the index is stored in a hidden sidecar file
+    ``.<filename>.mseedidx.npz`` next to the file and reused on subsequent
+    calls as long as size and modification time of the file stay the same.
+    The sidecar file is written atomically, so concurrent readers never see
+    partially written files. Failing to write it (e.g. due to missing
+    permissions) is not an error. :func:`~obspy.io.mseed.core._read_mseed`
+    uses the index to only read the records needed for a requested time
+    window.
+
+    :type filename: str
+    :param filename: MiniSEED file name.
+    :type record_length: int, optional
+    :param record_length: Record length in bytes. Determined from the first
+        record if not given.
+    :type byteorder: str, optional
+    :param byteorder: Byte order of the headers, ``"<"`` or ``">"``.
+        Determined from the first record if not given.
+    :type cache: bool or None
+    :param cache: Whether to use a sidecar file. ``None`` (as used when
+        reading time windows) only uses an existing sidecar file and only
+        writes new ones if ``RECORD_INDEX_AUTO_SIDECAR`` is set to ``True``
+        and the file has at least ``RECORD_INDEX_MIN_FILESIZE`` bytes.
+    :rtype: :class:`numpy.ndarray` or None
+    :returns: The record index or ``None`` if the file cannot be indexed.
+
+    .. rubric:: Example
+
+    >>> from obspy.core.util import get_example_file
+    >>> filename = get_example_file(
+    ...     "BW.BGLD.__.EHE.D.2008.001.first_10_records")
+    >>> index = get_record_index(filename, cache=False)
+    >>> print(len(index))
+    10
+    >>> print(index["offset"][:3])
+    [   0  512 1024]
+    >>> print(UTCDateTime(ns=int(index["starttime"][1])))
+    2008-01-01T00:00:01.975000Z
+    """
+    if record_length is None or byteorder is None:
+        info = get_record_information(filename, endian=byteorder)
+        record_length = record_length or info["record_length"]
+        byteorder = byteorder or info["byteorder"]
+    sidecar = _get_record_index_sidecar(filename)
+    stat = os.stat(filename)
+    key = np.array([RECORD_INDEX_VERSION, stat.st_size,
+                    getattr(stat, "st_mtime_ns",
+                            int(round(stat.st_mtime * 1e9))),
+                    record_length, byteorder == ">"], dtype=np.int64)
+    write = cache
+    if cache is None:
+        write = RECORD_INDEX_AUTO_SIDECAR and \
+            stat.st_size >= RECORD_INDEX_MIN_FILESIZE
+        cache = write or os.path.exists(sidecar)
+    if cache and os.path.exists(sidecar):
+        try:
+            with np.load(sidecar, allow_pickle=False) as npz:
+                if np.array_equal(npz["key"], key):
+                    return npz["index"].astype(RECORD_TABLE_DTYPE)
+        except Exception:
+            # Broken or outdated sidecar, it is simply rebuilt.
+            pass
+    index = _get_record_table(filename, record_length, byteorder)
+    if write and index is not None:
+        try:
+            _write_record_index_sidecar(sidecar, key, index)
+        except (IOError, OSError):
+            pass
+    return index
+
+
+def _write_record_index_sidecar(sidecar, key, index):
+    """
+    Atomically writes a record index sidecar file, so that other processes
+    never read partially written files.
+    """
+    path, name = os.path.split(sidecar)
+    fd, tmp_filename = tempfile.mkstemp(prefix=name, suffix=".tmp", dir=path)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            np.savez(fh, key=key, index=index)
+        getattr(os, "replace", os.rename)(tmp_filename, sidecar)
+    except Exception:
+        try:
+            os.remove(tmp_filename)
+        except OSError:
+            pass
+        raise
+
+
+def _get_record_index_sidecar(filename):
+    """
+    Returns the name of the sidecar file storing the record index of a file.
+
+    It is a hidden file so it is not matched by wildcards passed to
+    :func:`~obspy.core.stream.read`.
+    """
+    path, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(path, "." + name + ".mseedidx.npz")
+
+
 def _ctypes_array_2_numpy_array(buffer_, buffer_elements, sampletype):
     """
     Takes a Ctypes array and its length and type and returns it as a
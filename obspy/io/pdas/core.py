@@ -18,6 +18,9 @@ from obspy.core import Stream, Trace, UTCDateTime
 from obspy.core.compatibility import from_buffer
 
 
+_PDAS_SIGNATURE = {"magic": br'DATASET'}
+
+
 def _is_pdas(filename):
     """
     Checks whether a file is a PDAS file or not.
@@ -23,6 +23,7 @@ by a distributed team in a transparent collaborative manner.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import inspect
 import io
@@ -82,6 +83,14 @@ def _xml_doc_from_anything(source):
     return xml_doc
 
 
+# root element of the document, possibly preceded by XML declaration and
+# comments
+_QUAKEML_SIGNATURE = {
+    "magic": (br'(?:\xef\xbb\xbf)?\s*(?:<\?xml[^>]*>\s*)?(?:<!--.*?-->\s*)*'
+              br'<(?:\w+:)?quakeml\b'),
+    "extensions": ['.qml', '.quakeml']}
+
+
 def _is_quakeml(filename):
     """
     Checks whether a file is QuakeML format.
@@ -129,6 +138,8 @@ class Unpickler(object):
     """
     def __init__(self, xml_doc=None):
         self.xml_doc = xml_doc
+        self.catalog = None
+        self._picks = True
 
     @property
     def xml_root(self):
@@ -161,6 +172,82 @@ class Unpickler(object):
         self.xml_doc = etree.parse(io.BytesIO(string))
         return self._deserialize()
 
+    def iter_events(self, file, picks=True):
+        """
+        Reads the events of a QuakeML file one by one.
+
+        The file is parsed incrementally and every event element is
+        discarded once converted, so only one event at a time is kept in
+        memory.
+
+        :type file: str, bytes or file-like object
+        :param file: File name, open file or the QuakeML document itself.
+        :type picks: bool
+        :param picks: If ``False``, picks, amplitudes, station magnitudes
+            and the arrivals of origins are skipped, which is considerably
+            faster for e.g. building event lists from large bulletins.
+        :rtype: generator of :class:`~obspy.core.event.Event`
+
+        When the generator is exhausted, :attr:`catalog` is an (empty)
+        :class:`~obspy.core.event.Catalog` with the catalog level
+        information of the file.
+
+        .. rubric:: Example
+
+        >>> unpickler = Unpickler()
+        >>> for event in unpickler.iter_events(
+        ...         '/path/to/iris_events.xml'):  # doctest: +SKIP
+        ...     print(event.short_str())
+        2011-03-11T05:46:24.120000Z | +38.297, +142.373 | 9.1 MW
+        2006-09-10T04:26:33.610000Z |  +9.614, +121.961 | 9.8 MS
+        """
+        # XML documents given as (byte) strings
+        if isinstance(file, (str, native_str)) and \
+                file.lstrip().startswith("<"):
+            file = file.encode("utf-8")
+        if isinstance(file, bytes) and file.lstrip().startswith(b"<"):
+            file = io.BytesIO(file)
+        self._picks = picks
+        self.xml_doc = None
+        self.catalog = None
+        catalog_el = None
+        event_tag = None
+        context = etree.iterparse(file, events=("start", "end"))
+        try:
+            for action, element in context:
+                if action == "start":
+                    if self.xml_doc is None:
+                        # root element
+                        self.xml_doc = element
+                        self._quakeml_namespaces = [
+                            ns for ns in element.nsmap.values()
+                            if ns.startswith(r"http://quakeml.org/xmlns/")]
+                    elif catalog_el is None and \
+                            element.getparent() is self.xml_doc:
+                        qname = etree.QName(element)
+                        if qname.localname == "eventParameters":
+                            catalog_el = element
+                            event_tag = "{%s}event" % qname.namespace
+                    continue
+                if catalog_el is None or \
+                        element.getparent() is not catalog_el:
+                    continue
+                if element.tag == event_tag:
+                    event = self._event(element)
+                    # discard the converted event
+                    element.clear()
+                    catalog_el.remove(element)
+                    if event is not None:
+                        yield event
+        except etree.XMLSyntaxError as e:
+            if self.xml_doc is None:
+                raise ValueError("Could not parse '%s' to an etree element."
+                                 % file)
+            raise e
+        if catalog_el is None:
+            raise Exception("Not a QuakeML compatible file or string")
+        self.catalog = self._catalog(catalog_el)
+
     def _xpath2obj(self, xpath, element=None, convert_to=str, namespace=None):
         q = self._xpath(xpath, element=element, namespace=namespace)
         if not q:
@@ -182,21 +269,20 @@ class Unpickler(object):
         return None
 
     def _xpath(self, xpath, element=None, namespace=None):
+        # all queries are direct children with a given tag, which findall()
+        # handles a lot faster than a full XPath evaluation
         if element is None:
             element = self.xml_root
 
-        namespaces = None
+        if not namespace:
+            nsmap = getattr(element, "nsmap", {})
+            if None in nsmap:
+                namespace = nsmap[None]
+            elif hasattr(self, "nsmap") and None in self.nsmap:
+                namespace = self.nsmap[None]
         if namespace:
-            xpath = "b:%s" % xpath
-            namespaces = {"b": namespace}
-        elif hasattr(element, "nsmap") and None in element.nsmap:
-            xpath = "b:%s" % xpath
-            namespaces = {"b": element.nsmap[None]}
-        elif hasattr(self, "nsmap") and None in self.nsmap:
-            xpath = "b:%s" % xpath
-            namespaces = {"b": self.nsmap[None]}
-
-        return element.xpath(xpath, namespaces=namespaces)
+            xpath = "{%s}%s" % (namespace, xpath)
+        return element.findall(xpath)
 
     def _comments(self, parent):
         obj = []
@@ -892,7 +978,21 @@ class Unpickler(object):
         self._quakeml_namespaces = [
             ns for ns in self.xml_root.nsmap.values()
             if ns.startswith(r"http://quakeml.org/xmlns/")]
-        # create catalog
+        events = []
+        # loop over all events
+        for event_el in self._xpath('event', catalog_el):
+            event = self._event(event_el)
+            if event is not None:
+                events.append(event)
+        catalog = self._catalog(catalog_el)
+        catalog.extend(events)
+        return catalog
+
+    def _catalog(self, catalog_el):
+        """
+        Converts the catalog level information of an eventParameters
+        etree.Element into a Catalog object without any events.
+        """
         catalog = Catalog(force_resource_id=False)
         # add any custom namespace abbreviations of root element to Catalog
         catalog.nsmap = self.xml_root.nsmap.copy()
@@ -900,87 +1000,95 @@ class Unpickler(object):
         catalog.description = self._xpath2obj('description', catalog_el)
         catalog.comments = self._comments(catalog_el)
         catalog.creation_info = self._creation_info(catalog_el)
-        # loop over all events
-        for event_el in self._xpath('event', catalog_el):
-            # create new Event object
-            event = Event(force_resource_id=False)
-            # optional event attributes
-            event.preferred_origin_id = \
-                self._xpath2obj('preferredOriginID', event_el)
-            event.preferred_magnitude_id = \
-                self._xpath2obj('preferredMagnitudeID', event_el)
-            event.preferred_focal_mechanism_id = \
-                self._xpath2obj('preferredFocalMechanismID', event_el)
-            event_type = self._xpath2obj('type', event_el)
-            # Change for QuakeML 1.2RC4. 'null' is no longer acceptable as an
-            # event type. Will be replaced with 'not reported'.
-            if event_type == "null":
-                event_type = "not reported"
-            # USGS event types contain '_' which is not compliant with
-            # the QuakeML standard
-            if isinstance(event_type, str):
-                event_type = event_type.replace("_", " ")
-            try:
-                event.event_type = event_type
-            except ValueError:
-                msg = "Event type '%s' does not comply " % event_type
-                msg += "with QuakeML standard -- event will be ignored."
-                warnings.warn(msg, UserWarning)
-                continue
-            event.event_type_certainty = self._xpath2obj(
-                'typeCertainty', event_el)
-            event.creation_info = self._creation_info(event_el)
-            event.event_descriptions = self._event_description(event_el)
-            event.comments = self._comments(event_el)
-            # origins
-            event.origins = []
-            for origin_el in self._xpath('origin', event_el):
-                # Have to be created before the origin is created to avoid a
-                # rare issue where a warning is read when the same event is
-                # read twice - the warnings does not occur if two referred
-                # to objects compare equal - for this the arrivals have to
-                # be bound to the event before the resource id is assigned.
-                arrivals = []
+        catalog.resource_id = catalog_el.get('publicID')
+        self._extra(catalog_el, catalog)
+        return catalog
+
+    def _event(self, event_el):
+        """
+        Converts an etree.Element into an Event object, returns None for
+        events with an invalid event type.
+
+        :type element: etree.Element
+        :rtype: :class:`~obspy.core.event.Event`
+        """
+        # create new Event object
+        event = Event(force_resource_id=False)
+        # optional event attributes
+        event.preferred_origin_id = \
+            self._xpath2obj('preferredOriginID', event_el)
+        event.preferred_magnitude_id = \
+            self._xpath2obj('preferredMagnitudeID', event_el)
+        event.preferred_focal_mechanism_id = \
+            self._xpath2obj('preferredFocalMechanismID', event_el)
+        event_type = self._xpath2obj('type', event_el)
+        # Change for QuakeML 1.2RC4. 'null' is no longer acceptable as an
+        # event type. Will be replaced with 'not reported'.
+        if event_type == "null":
+            event_type = "not reported"
+        # USGS event types contain '_' which is not compliant with
+        # the QuakeML standard
+        if isinstance(event_type, str):
+            event_type = event_type.replace("_", " ")
+        try:
+            event.event_type = event_type
+        except ValueError:
+            msg = "Event type '%s' does not comply " % event_type
+            msg += "with QuakeML standard -- event will be ignored."
+            warnings.warn(msg, UserWarning)
+            return None
+        event.event_type_certainty = self._xpath2obj(
+            'typeCertainty', event_el)
+        event.creation_info = self._creation_info(event_el)
+        event.event_descriptions = self._event_description(event_el)
+        event.comments = self._comments(event_el)
+        # origins
+        event.origins = []
+        for origin_el in self._xpath('origin', event_el):
+            # Have to be created before the origin is created to avoid a
+            # rare issue where a warning is read when the same event is
+            # read twice - the warnings does not occur if two referred
+            # to objects compare equal - for this the arrivals have to
+            # be bound to the event before the resource id is assigned.
+            arrivals = []
+            if self._picks:
                 for arrival_el in self._xpath('arrival', origin_el):
                     arrival = self._arrival(arrival_el)
                     arrivals.append(arrival)
 
-                origin = self._origin(origin_el, arrivals=arrivals)
-
-                # append origin with arrivals
-                event.origins.append(origin)
-            # magnitudes
-            event.magnitudes = []
-            for magnitude_el in self._xpath('magnitude', event_el):
-                magnitude = self._magnitude(magnitude_el)
-                event.magnitudes.append(magnitude)
+            origin = self._origin(origin_el, arrivals=arrivals)
+
+            # append origin with arrivals
+            event.origins.append(origin)
+        # magnitudes
+        event.magnitudes = []
+        for magnitude_el in self._xpath('magnitude', event_el):
+            magnitude = self._magnitude(magnitude_el)
+            event.magnitudes.append(magnitude)
+        event.station_magnitudes = []
+        event.picks = []
+        event.amplitudes = []
+        if self._picks:
             # station magnitudes
-            event.station_magnitudes = []
             for magnitude_el in self._xpath('stationMagnitude', event_el):
                 magnitude = self._station_magnitude(magnitude_el)
                 event.station_magnitudes.append(magnitude)
             # picks
-            event.picks = []
             for pick_el in self._xpath('pick', event_el):
                 pick = self._pick(pick_el)
                 event.picks.append(pick)
             # amplitudes
-            event.amplitudes = []
             for el in self._xpath('amplitude', event_el):
                 amp = self._amplitude(el)
                 event.amplitudes.append(amp)
-            # focal mechanisms
-            event.focal_mechanisms = []
-            for fm_el in self._xpath('focalMechanism', event_el):
-                fm = self._focal_mechanism(fm_el)
-                event.focal_mechanisms.append(fm)
-            # finally append newly created event to catalog
-            event.resource_id = event_el.get('publicID')
-            self._extra(event_el, event)
-            catalog.append(event)
-        catalog.resource_id = catalog_el.get('publicID')
-        self._extra(catalog_el, catalog)
-        return catalog
+        # focal mechanisms
+        event.focal_mechanisms = []
+        for fm_el in self._xpath('focalMechanism', event_el):
+            fm = self._focal_mechanism(fm_el)
+            event.focal_mechanisms.append(fm)
+        event.resource_id = event_el.get('publicID')
+        self._extra(event_el, event)
+        return event
 
     def _extra(self, element, obj):
         """
@@ -1705,9 +1813,68 @@ class Pickler(object):
         self._extra(focal_mechanism, element)
         return element
 
-    def _serialize(self, catalog, pretty_print=True):
-        """
-        Converts a Catalog object into XML string.
+    def dump_events(self, events, file, catalog=None, pretty_print=True):
+        """
+        Writes events to a QuakeML file one by one.
+
+        In contrast to :meth:`dump` the XML tree of only one event at a time
+        is kept in memory, so e.g. the generator of
+        :meth:`Unpickler.iter_events` can be converted without ever holding
+        the whole catalog in memory.
+
+        :type events: iterable of :class:`~obspy.core.event.Event`
+        :param events: The events to write.
+        :type file: str or file-like object
+        :param file: File name or open binary file to write to.
+        :type catalog: :class:`~obspy.core.event.Catalog`, optional
+        :param catalog: Catalog providing the catalog level information
+            (resource identifier, description, comments, creation info).
+            Its events are not written.
+        :type pretty_print: bool, optional
+        :param pretty_print: Indent the XML of the events.
+        """
+        if catalog is None:
+            catalog = Catalog()
+        catalog_el = self._catalog(catalog)
+        # custom namespaces of events are declared on the events
+        nsmap = self._get_namespace_map()
+        with etree.xmlfile(file, encoding="utf-8") as xf:
+            xf.write_declaration()
+            with xf.element('{%s}quakeml' % NSMAP_QUAKEML['q'], nsmap=nsmap):
+                xf.write("\n")
+                with xf.element(catalog_el.tag, attrib=catalog_el.attrib):
+                    xf.write("\n")
+                    # catalog level custom tags come last, as in _serialize()
+                    extra = [el for el in catalog_el if el.tag.startswith("{")]
+                    for element in catalog_el:
+                        if element.tag.startswith("{"):
+                            continue
+                        xf.write(element, pretty_print=pretty_print)
+                    for event in events:
+                        xf.write(self._declare_namespaces(self._event(event)),
+                                 pretty_print=pretty_print)
+                    for element in extra:
+                        xf.write(element, pretty_print=pretty_print)
+                xf.write("\n")
+
+    def _declare_namespaces(self, element):
+        """
+        Returns a copy of the element declaring all custom namespaces, so
+        that they are in scope of the element when it is written on its own.
+        """
+        nsmap = dict((key, ns) for key, ns in self._get_namespace_map().items()
+                     if ns not in NSMAP_QUAKEML.values())
+        if not nsmap:
+            return element
+        new = etree.Element(element.tag, attrib=element.attrib, nsmap=nsmap)
+        new.text = element.text
+        new.extend(element)
+        return new
+
+    def _catalog(self, catalog):
+        """
+        Converts the catalog level information of a Catalog into an
+        eventParameters etree.Element without any events.
         """
         catalog_el = etree.Element('eventParameters', attrib={'publicID':
                                    self._id(catalog.resource_id)})
@@ -1716,57 +1883,74 @@ class Pickler(object):
             self._str(catalog.description, catalog_el, 'description')
         self._comments(catalog.comments, catalog_el)
         self._creation_info(catalog.creation_info, catalog_el)
+        self._extra(catalog, catalog_el)
+        return catalog_el
+
+    def _event(self, event):
+        """
+        Converts an Event into etree.Element object.
+        """
+        # create event node
+        event_el = etree.Element(
+            'event', attrib={'publicID': self._id(event.resource_id)})
+        # optional event attributes
+        if hasattr(event, "preferred_origin_id"):
+            self._str(event.preferred_origin_id, event_el,
+                      'preferredOriginID')
+        if hasattr(event, "preferred_magnitude_id"):
+            self._str(event.preferred_magnitude_id, event_el,
+                      'preferredMagnitudeID')
+        if hasattr(event, "preferred_focal_mechanism_id"):
+            self._str(event.preferred_focal_mechanism_id, event_el,
+                      'preferredFocalMechanismID')
+        # event type and event type certainty also are optional attributes.
+        if hasattr(event, "event_type"):
+            self._str(event.event_type, event_el, 'type')
+        if hasattr(event, "event_type_certainty"):
+            self._str(event.event_type_certainty, event_el,
+                      'typeCertainty')
+        # event descriptions
+        for description in event.event_descriptions:
+            el = etree.Element('description')
+            self._str(description.text, el, 'text', True)
+            self._str(description.type, el, 'type')
+            self._extra(description, el)
+            event_el.append(el)
+        self._comments(event.comments, event_el)
+        self._creation_info(event.creation_info, event_el)
+        # origins
+        for origin in event.origins:
+            event_el.append(self._origin(origin))
+        # magnitudes
+        for magnitude in event.magnitudes:
+            event_el.append(self._magnitude(magnitude))
+        # station magnitudes
+        for magnitude in event.station_magnitudes:
+            event_el.append(self._station_magnitude(magnitude))
+        # picks
+        for pick in event.picks:
+            event_el.append(self._pick(pick))
+        # amplitudes
+        for amp in event.amplitudes:
+            event_el.append(self._amplitude(amp))
+        # focal mechanisms
+        for focal_mechanism in event.focal_mechanisms:
+            event_el.append(self._focal_mechanism(focal_mechanism))
+        self._extra(event, event_el)
+        return event_el
+
+    def _serialize(self, catalog, pretty_print=True):
+        """
+        Converts a Catalog object into XML string.
+        """
+        catalog_el = self._catalog(catalog)
+        # catalog level custom tags come last
+        extra = [el for el in catalog_el if el.tag.startswith("{")]
         for event in catalog:
-            # create event node
-            event_el = etree.Element(
-                'event', attrib={'publicID': self._id(event.resource_id)})
-            # optional event attributes
-            if hasattr(event, "preferred_origin_id"):
-                self._str(event.preferred_origin_id, event_el,
-                          'preferredOriginID')
-            if hasattr(event, "preferred_magnitude_id"):
-                self._str(event.preferred_magnitude_id, event_el,
-                          'preferredMagnitudeID')
-            if hasattr(event, "preferred_focal_mechanism_id"):
-                self._str(event.preferred_focal_mechanism_id, event_el,
-                          'preferredFocalMechanismID')
-            # event type and event type certainty also are optional attributes.
-            if hasattr(event, "event_type"):
-                self._str(event.event_type, event_el, 'type')
-            if hasattr(event, "event_type_certainty"):
-                self._str(event.event_type_certainty, event_el,
-                          'typeCertainty')
-            # event descriptions
-            for description in event.event_descriptions:
-                el = etree.Element('description')
-                self._str(description.text, el, 'text', True)
-                self._str(description.type, el, 'type')
-                self._extra(description, el)
-                event_el.append(el)
-            self._comments(event.comments, event_el)
-            self._creation_info(event.creation_info, event_el)
-            # origins
-            for origin in event.origins:
-                event_el.append(self._origin(origin))
-            # magnitudes
-            for magnitude in event.magnitudes:
-                event_el.append(self._magnitude(magnitude))
-            # station magnitudes
-            for magnitude in event.station_magnitudes:
-                event_el.append(self._station_magnitude(magnitude))
-            # picks
-            for pick in event.picks:
-                event_el.append(self._pick(pick))
-            # amplitudes
-            for amp in event.amplitudes:
-                event_el.append(self._amplitude(amp))
-            # focal mechanisms
-            for focal_mechanism in event.focal_mechanisms:
-                event_el.append(self._focal_mechanism(focal_mechanism))
-            self._extra(event, event_el)
             # add event node to catalog
-            catalog_el.append(event_el)
-        self._extra(catalog, catalog_el)
+            catalog_el.append(self._event(event))
+        for el in extra:
+            catalog_el.append(el)
         nsmap = self._get_namespace_map()
         root_el = etree.Element('{%s}quakeml' % NSMAP_QUAKEML['q'],
                                 nsmap=nsmap)
@@ -1775,7 +1959,7 @@ class Pickler(object):
                               encoding="utf-8", xml_declaration=True)
 
 
-def _read_quakeml(filename):
+def _read_quakeml(filename, picks=True):
     """
     Reads a QuakeML file and returns an ObsPy Catalog object.
 
@@ -1786,6 +1970,9 @@ def _read_quakeml(filename):
 
     :type filename: str
     :param filename: QuakeML file to be read.
+    :type picks: bool, optional
+    :param picks: If ``False``, picks, amplitudes, station magnitudes and
+        the arrivals of origins are not read.
     :rtype: :class:`~obspy.core.event.Catalog`
     :return: An ObsPy Catalog object.
 
@@ -1798,7 +1985,11 @@ def _read_quakeml(filename):
     2011-03-11T05:46:24.120000Z | +38.297, +142.373 | 9.1 MW
     2006-09-10T04:26:33.610000Z |  +9.614, +121.961 | 9.8 MS
     """
-    return Unpickler().load(filename)
+    unpickler = Unpickler()
+    events = list(unpickler.iter_events(filename, picks=picks))
+    catalog = unpickler.catalog
+    catalog.extend(events)
+    return catalog
 
 
 def _write_quakeml(catalog, filename, validate=False, nsmap=None,
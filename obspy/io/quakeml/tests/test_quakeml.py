@@ -11,15 +11,16 @@ import warnings
 
 from lxml import etree
 
-from obspy.core.event import (Catalog, Event, FocalMechanism, Magnitude,
-                              MomentTensor, Origin, Pick, ResourceIdentifier,
-                              Tensor, WaveformStreamID, read_events)
+from obspy.core.event import (Arrival, Catalog, Event, FocalMechanism,
+                              Magnitude, MomentTensor, Origin, Pick,
+                              ResourceIdentifier, Tensor, WaveformStreamID,
+                              read_events)
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import AttribDict
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.core.util.testing import compare_xml_strings
-from obspy.io.quakeml.core import Pickler, _read_quakeml, _write_quakeml
-
+from obspy.io.quakeml.core import (Pickler, Unpickler, _read_quakeml,
+                                   _validate, _write_quakeml)
 
 # lxml < 2.3 seems not to ship with RelaxNG schema parser and namespace support
 IS_RECENT_LXML = False
@@ -664,6 +665,11 @@ class QuakeMLTestCase(unittest.TestCase):
 
         catalog = read_events(data)
         self.assertEqual(len(catalog), 3)
+        # documents given as str
+        catalog = _read_quakeml(data.decode('utf-8'))
+        self.assertEqual(len(catalog), 3)
+        events = list(Unpickler().iter_events(data.decode('utf-8')))
+        self.assertEqual(len(events), 3)
 
     def test_preferred_tags(self):
         """
@@ -1062,6 +1068,109 @@ class QuakeMLTestCase(unittest.TestCase):
         self.assertEqual(cat[0].focal_mechanisms[0].nodal_planes, None)
         self.assertEqual(cat[0].focal_mechanisms[0].principal_axes, None)
 
+    def _get_catalog_with_picks(self):
+        cat = _read_quakeml(os.path.join(self.path, 'quakeml_1.2_pick.xml'))
+        event = cat[0]
+        origin = Origin(time=UTCDateTime(2012, 1, 1), latitude=1.0,
+                        longitude=2.0)
+        origin.arrivals = [Arrival(pick_id=pick.resource_id, phase="P")
+                           for pick in event.picks]
+        event.origins.append(origin)
+        event.magnitudes.append(Magnitude(mag=1.5,
+                                          origin_id=origin.resource_id))
+        event.extra = {'custom': {'value': 'abc',
+                                  'namespace': 'http://test.org/xmlns/0.1'}}
+        cat.description = "test catalog"
+        cat.events.append(_read_quakeml(self.neries_filename)[0])
+        return cat
+
+    def test_iter_events(self):
+        """
+        Streaming reading gives the same events and catalog information as
+        reading the whole document.
+        """
+        cat = self._get_catalog_with_picks()
+        memfile = io.BytesIO()
+        cat.write(memfile, format="QUAKEML")
+        memfile.seek(0)
+        expected = Unpickler().load(memfile)
+        memfile.seek(0)
+        unpickler = Unpickler()
+        events = unpickler.iter_events(memfile)
+        self.assertIsNone(unpickler.catalog)
+        event = next(events)
+        self.assertEqual(event, expected[0])
+        self.assertEqual(len(event.picks), 2)
+        self.assertEqual(event.extra.custom.value, 'abc')
+        self.assertEqual(list(events), expected.events[1:])
+        self.assertEqual(len(unpickler.catalog), 0)
+        self.assertEqual(unpickler.catalog.description, "test catalog")
+        self.assertEqual(unpickler.catalog.resource_id, cat.resource_id)
+        # not QuakeML
+        memfile = io.BytesIO(b"<?xml version='1.0'?><a><b/></a>")
+        self.assertRaises(Exception, list, Unpickler().iter_events(memfile))
+
+    def test_read_without_picks(self):
+        """
+        Picks, amplitudes and arrivals are skipped on request.
+        """
+        cat = self._get_catalog_with_picks()
+        with NamedTemporaryFile() as tf:
+            cat.write(tf.name, format="QUAKEML")
+            cat = read_events(tf.name)
+            cat2 = read_events(tf.name, picks=False)
+        self.assertEqual(len(cat2), 2)
+        for event, event2 in zip(cat, cat2):
+            self.assertEqual(event2.picks, [])
+            self.assertEqual(event2.amplitudes, [])
+            self.assertEqual(event2.station_magnitudes, [])
+            self.assertEqual(event2.magnitudes, event.magnitudes)
+            self.assertEqual(len(event2.origins), len(event.origins))
+            for origin, origin2 in zip(event.origins, event2.origins):
+                self.assertEqual(origin2.arrivals, [])
+                origin2.arrivals = origin.arrivals
+                self.assertEqual(origin2, origin)
+
+    def test_dump_events(self):
+        """
+        Events written one by one read back to the same catalog.
+        """
+        cat = self._get_catalog_with_picks()
+        memfile = io.BytesIO()
+        cat.write(memfile, format="QUAKEML")
+        memfile.seek(0)
+        expected = read_events(memfile, format="QUAKEML")
+        memfile = io.BytesIO()
+        Pickler().dump_events(iter(cat), memfile, catalog=cat)
+        memfile.seek(0)
+        self.assertTrue(_validate(memfile))
+        memfile.seek(0)
+        cat2 = read_events(memfile, format="QUAKEML")
+        self.assertEqual(cat2, expected)
+        self.assertEqual(cat2.description, cat.description)
+        self.assertEqual(cat2[0].extra.custom.value, 'abc')
+        # catalog level custom tags are written after the events, just like
+        # by Catalog.write()
+        cat.extra = {'catalog_tag': {
+            'value': 'xyz', 'namespace': 'http://test.org/xmlns/0.1'}}
+        memfile = io.BytesIO()
+        cat.write(memfile, format="QUAKEML")
+        memfile2 = io.BytesIO()
+        Pickler().dump_events(iter(cat), memfile2, catalog=cat)
+        tags = []
+        for buf in (memfile, memfile2):
+            root = etree.fromstring(buf.getvalue())
+            tags.append([etree.QName(el).localname for el in root[0]])
+        self.assertEqual(tags[1], tags[0])
+        self.assertEqual(tags[1][-2:], ['event', 'catalog_tag'])
+        # streaming conversion without a catalog
+        memfile.seek(0)
+        unpickler = Unpickler()
+        memfile2 = io.BytesIO()
+        Pickler().dump_events(unpickler.iter_events(memfile), memfile2)
+        memfile2.seek(0)
+        self.assertEqual(read_events(memfile2).events, expected.events)
+
 
 def suite():
     return unittest.makeSuite(QuakeMLTestCase, 'test')
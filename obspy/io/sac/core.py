@@ -22,6 +22,9 @@ from obspy.core.compatibility import is_bytes_buffer
 from .sactrace import SACTrace
 
 
+_SAC_SIGNATURE = {"extensions": ['.sac']}
+
+
 def _is_sac(filename):
     """
     Checks whether a file is a SAC file or not.
@@ -310,6 +310,12 @@ class SEG2(object):
                 setattr(attrib_dict.NOTE, key, value)
 
 
+# file descriptor block ID in either byte order, followed by revision 1
+_SEG2_SIGNATURE = {
+    "magic": br'\x55\x3a\x01\x00|\x3a\x55\x00\x01',
+    "extensions": ['.seg2', '.sg2']}
+
+
 def _is_seg2(filename):
     if not hasattr(filename, 'write'):
         file_pointer = open(filename, 'rb')
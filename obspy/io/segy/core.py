@@ -52,6 +52,9 @@ class SEGYSampleIntervalError(SEGYError):
     pass
 
 
+_SEGY_SIGNATURE = {"extensions": ['.segy', '.sgy']}
+
+
 def _is_segy(filename):
     """
     Checks whether or not the given file is a SEG Y file.
@@ -394,6 +397,9 @@ def _write_segy(stream, filename, data_encoding=None, byteorder=None,
     segy_file.write(filename, data_encoding=data_encoding, endian=byteorder)
 
 
+_SU_SIGNATURE = {"extensions": ['.su']}
+
+
 def _is_su(filename):
     """
     Checks whether or not the given file is a Seismic Unix (SU) file.
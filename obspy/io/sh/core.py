@@ -68,6 +68,9 @@ SH_KEYS_FLOAT = [k for (k, v) in SH_IDX.items() if v.startswith('R')]
 INVERTED_SH_IDX = {v: k for k, v in SH_IDX.items()}
 
 
+_SH_ASC_SIGNATURE = {"magic": br'DELTA:'}
+
+
 def _is_asc(filename):
     """
     Checks whether a file is a Seismic Handler ASCII file or not.
@@ -298,6 +301,9 @@ def _write_asc(stream, filename, included_headers=None, npl=4,
         fh.write(sio.read().encode('ascii', 'strict'))
 
 
+_Q_SIGNATURE = {"magic": br'43981', "extensions": ['.qhd']}
+
+
 def _is_q(filename):
     """
     Checks whether a file is a Seismic Handler Q file or not.
@@ -44,6 +44,13 @@ SOFTWARE_URI = "https://www.obspy.org"
 SCHEMA_VERSION = "1.0"
 
 
+# root element of the document, possibly preceded by XML declaration and
+# comments
+_STATIONXML_SIGNATURE = {
+    "magic": (br'(?:\xef\xbb\xbf)?\s*(?:<\?xml[^>]*>\s*)?(?:<!--.*?-->\s*)*'
+              br'<(?:\w+:)?FDSNStationXML\b')}
+
+
 def _is_stationxml(path_or_file_object):
     """
     Simple function checking if the passed object contains a valid StationXML
@@ -39,6 +39,9 @@ WIDTH2DTYPE = {
 }
 
 
+_WAV_SIGNATURE = {"magic": br'RIFF....WAVE', "extensions": ['.wav']}
+
+
 def _is_wav(filename):
     """
     Checks whether a file is a audio WAV file or not.
@@ -23,8 +23,9 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
-from obspy.realtime.rtmemory import RtMemory
+from obspy.realtime.rtmemory import RtBuffer, RtMemory
 from obspy.realtime.rttrace import RtTrace
+from obspy.realtime.rtstream import RtStream
 
 
 if __name__ == '__main__':
@@ -15,12 +15,81 @@ from future.builtins import *  # NOQA
 import numpy as np
 
 
+class RtBuffer(object):
+    """
+    Preallocated buffer holding the most recent samples of a data stream.
+
+    The buffer has room for twice the number of samples to keep. Appended
+    samples are copied behind the current window and the window is moved to
+    the front of the buffer only when the end of the buffer is reached, so
+    appending a packet costs (amortized) time proportional to the packet
+    length, independent of the number of samples kept.
+
+    The current window is available as :attr:`data`, a contiguous view into
+    the buffer. Its contents can be overwritten by subsequent appends, use a
+    copy if it has to be kept.
+
+    :type size: int
+    :param size: Maximum number of samples to keep.
+    :type dtype: numpy.dtype
+    :param dtype: Data type of the buffer.
+
+    >>> buf = RtBuffer(4, np.int32)
+    >>> buf.append([1, 2, 3])
+    array([1, 2, 3], dtype=int32)
+    >>> buf.append([4, 5])
+    array([2, 3, 4, 5], dtype=int32)
+    """
+    def __init__(self, size, dtype):
+        if size <= 0:
+            raise ValueError("Buffer size out of bounds: %s" % size)
+        self.size = int(size)
+        self._buffer = np.empty(2 * self.size, dtype=dtype)
+        self._end = 0
+        self.data = self._buffer[:0]
+
+    def __len__(self):
+        return len(self.data)
+
+    def append(self, data):
+        """
+        Append samples, dropping the oldest samples exceeding the size of
+        the buffer.
+
+        :type data: numpy.ndarray
+        :param data: Samples to append.
+        :return: NumPy :class:`~numpy.ndarray` view of the current window.
+        """
+        data = np.asarray(data)
+        if len(data) > self.size:
+            data = data[len(data) - self.size:]
+        npts = len(data)
+        length = min(len(self.data) + npts, self.size)
+        if self._end + npts > len(self._buffer):
+            # move the samples still needed to the front of the buffer
+            keep = length - npts
+            self._buffer[:keep] = self._buffer[self._end - keep:self._end]
+            self._end = keep
+        self._buffer[self._end:self._end + npts] = data
+        self._end += npts
+        self.data = self._buffer[self._end - length:self._end]
+        return self.data
+
+
 class RtMemory:
     """
     Real time memory class.
+
+    :type ring_buffer: bool, optional
+    :param ring_buffer: Keep input and output memory in preallocated
+        :class:`RtBuffer` objects, so that updating them does not copy the
+        whole memory for every packet. The memory arrays are then views into
+        the buffers.
     """
-    def __init__(self):
+    def __init__(self, ring_buffer=False):
         self.initialized = False
+        self.ring_buffer = ring_buffer
+        self._buffers = {}
 
     def initialize(self, data_type, length_input, length_output,
                    input_initial_value=0, output_initial_value=0):
@@ -46,6 +115,16 @@ class RtMemory:
         self.output = np.empty(length_output, data_type)
         self.output.fill(output_initial_value)
 
+        self._buffers = {}
+        if self.ring_buffer:
+            for name in ('input', 'output'):
+                memory_array = getattr(self, name)
+                if not memory_array.size:
+                    continue
+                buf = RtBuffer(memory_array.size, data_type)
+                setattr(self, name, buf.append(memory_array))
+                self._buffers[name] = buf
+
         self.initialized = True
 
     def _update(self, memory_array, data):
@@ -80,7 +159,7 @@ class RtMemory:
         :type data: numpy.ndarray
         :param data:  Data array to use for update.
         """
-        self.output = self._update(self.output, data)
+        self.output = self._update_memory('output', data)
 
     def update_input(self, data):
         """
@@ -90,4 +169,20 @@ class RtMemory:
         :type data: numpy.ndarray
         :param data:  Data array to use for update.
         """
-        self.input = self._update(self.input, data)
+        self.input = self._update_memory('input', data)
+
+    def _update_memory(self, name, data):
+        """
+        Update the input or output memory, in its buffer if possible.
+        """
+        memory_array = getattr(self, name)
+        buf = self._buffers.get(name)
+        # memory arrays replaced from outside are not in the buffer anymore
+        if buf is None or buf.data is not memory_array:
+            return self._update(memory_array, data)
+        return buf.append(data)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+"""
+Module for handling ObsPy RtStream objects.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from collections import defaultdict
+import warnings
+
+import numpy as np
+from scipy.signal import lfilter
+
+from obspy import Stream, Trace
+from obspy.realtime import signal
+from obspy.realtime.rtmemory import RtMemory
+from obspy.realtime.rttrace import REALTIME_PROCESS_FUNCTIONS
+
+
+class RtStream(object):
+    """
+    Real time processing of data packets of many channels with one common
+    processing pipeline.
+
+    Processes are registered like for :class:`~obspy.realtime.RtTrace`, but
+    the state of every process is kept for all channels together in arrays
+    with one row per channel. All packets given to :meth:`append` are
+    processed together as one two-dimensional array per sampling rate and
+    data type (packets of different length are padded), so that the cost of
+    the Python level processing is shared by all channels.
+
+    ``'scale'``, ``'offset'``, ``'integrate'``, ``'differentiate'``,
+    ``'boxcar'``, ``'kurtosis'`` and ``'recstalta'`` (the recursive STA/LTA
+    of :func:`obspy.signal.trigger.recursive_sta_lta`) are vectorized over
+    channels. All other processes (and functions) are applied channel by
+    channel with the usual :class:`~obspy.realtime.rtmemory.RtMemory`
+    objects. The state of vectorized processes is kept in double precision.
+
+    >>> from obspy import read
+    >>> from obspy.realtime import RtStream
+    >>> st = read()
+    >>> rt_stream = RtStream()
+    >>> rt_stream.register_rt_process('boxcar', width=5)
+    1
+    >>> rt_stream.register_rt_process('recstalta', nsta=50, nlta=500)
+    2
+    >>> for i in range(3):
+    ...     packets = st.slice(st[0].stats.starttime + i * 10,
+    ...                        st[0].stats.starttime + i * 10 + 9.99)
+    ...     result = rt_stream.append(packets, gap_overlap_check=True)
+    >>> print(result)  # doctest: +ELLIPSIS
+    3 Trace(s) in Stream:
+    BW.RJOB..EHZ | 2009-08-24T00:20:23.000000Z - ... | 100.0 Hz, 1000 samples
+    BW.RJOB..EHN | 2009-08-24T00:20:23.000000Z - ... | 100.0 Hz, 1000 samples
+    BW.RJOB..EHE | 2009-08-24T00:20:23.000000Z - ... | 100.0 Hz, 1000 samples
+    """
+    def __init__(self):
+        # list of (process name, options) of the registered processes
+        self.processing = []
+        self.ids = []
+        self._steps = []
+        self._rows = {}
+        self._capacity = 0
+        self._sampling_rates = np.empty(0, dtype=np.float64)
+        self._next_ns = np.empty(0, dtype=np.int64)
+        self._dtypes = []
+
+    def __len__(self):
+        """
+        Returns the number of channels seen so far.
+        """
+        return len(self.ids)
+
+    def __str__(self):
+        return "RtStream of %d channel(s) with %d process(es)" % (
+            len(self.ids), len(self.processing))
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    def register_rt_process(self, process, **options):
+        """
+        Adds real-time processing algorithm to the processing list.
+
+        See :meth:`obspy.realtime.RtTrace.register_rt_process` for
+        details, the predefined processes are the same with the addition of
+        ``'recstalta'`` (see :func:`obspy.realtime.signal.recstalta`).
+        Processes registered after data was appended start processing with
+        the next packet of every channel.
+
+        :type process: str or function
+        :param process: Specifies which processing function is added,
+            e.g. ``"boxcar"`` or ``np.abs`` (functions without brackets).
+        :type options: dict, optional
+        :param options: Required keyword arguments to be passed the respective
+            processing function, e.g. ``width=100`` for ``'boxcar'`` process.
+        :rtype: int
+        :return: Length of processing list after registering new processing
+            function.
+        """
+        if hasattr(process, '__call__'):
+            # direct function call
+            process_name = process
+            step = _RtMemoryProcess(process, None, options)
+        else:
+            process_name = ("%s" % process).lower()
+            if process_name not in REALTIME_PROCESS_FUNCTIONS:
+                # check if process name is contained within a predefined
+                # function, e.g. 'int' for 'integrate'
+                for key in REALTIME_PROCESS_FUNCTIONS:
+                    if key.startswith(process_name):
+                        process_name = key
+                        break
+                else:
+                    msg = "Can't register process %s" % (process)
+                    raise NotImplementedError(msg)
+            if process_name in _VECTORIZED_PROCESSES:
+                step = _VECTORIZED_PROCESSES[process_name](**options)
+            else:
+                func, num = REALTIME_PROCESS_FUNCTIONS[process_name]
+                step = _RtMemoryProcess(func, num, options)
+        step.resize(self._capacity)
+        self._steps.append(step)
+        self.processing.append((process_name, options))
+        return len(self.processing)
+
+    def append(self, traces, gap_overlap_check=False, inplace=False):
+        """
+        Processes data packets of any number of channels.
+
+        Packets of the same channel are processed in the given order. On a
+        gap or overlap to the previous packet of a channel the processing
+        memory of the channel is re-initialized (or a TypeError is raised).
+        Sampling rate and data type of a channel have to stay the same.
+
+        :type traces: :class:`~obspy.core.stream.Stream` or list of
+            :class:`~obspy.core.trace.Trace`
+        :param traces: Data packets to process.
+        :type gap_overlap_check: bool, optional
+        :param gap_overlap_check: Raise a TypeError on gaps and overlaps
+            instead of re-initializing the processing memory.
+        :type inplace: bool, optional
+        :param inplace: Replace the data of the given packets with the
+            processed data instead of returning copies. Copying the headers
+            takes most of the time for short packets.
+        :rtype: :class:`~obspy.core.stream.Stream`
+        :return: Processed copies of the packets (or the packets themselves
+            with ``inplace=True``), in the order given.
+        """
+        if isinstance(traces, Trace):
+            traces = [traces]
+        rows = []
+        resets = []
+        for trace in traces:
+            if not isinstance(trace, Trace):
+                msg = "Only obspy.core.trace.Trace objects are allowed"
+                raise TypeError(msg)
+            row, reset = self._check_packet(trace, gap_overlap_check)
+            rows.append(row)
+            resets.append(reset)
+        # group packets for batch processing, the n-th packet of a channel
+        # can only be processed after its (n-1)-th packet
+        count = defaultdict(int)
+        batches = defaultdict(list)
+        for i, (trace, row) in enumerate(zip(traces, rows)):
+            key = (count[row], trace.stats.sampling_rate,
+                   trace.data.dtype.str)
+            batches[key].append(i)
+            count[row] += 1
+        results = [None] * len(traces)
+        for key in sorted(batches, key=lambda key: key[0]):
+            index = batches[key]
+            processed = self._process_batch(
+                [traces[i] for i in index], np.array([rows[i] for i in index]),
+                np.array([resets[i] for i in index], dtype=np.bool_), inplace)
+            for i, trace in zip(index, processed):
+                results[i] = trace
+        return Stream(traces=results)
+
+    def _check_packet(self, trace, gap_overlap_check):
+        """
+        Returns the row of the channel of a packet and whether its processing
+        memory has to be re-initialized.
+        """
+        row = self._rows.get(trace.id)
+        sampling_rate = trace.stats.sampling_rate
+        start_ns = trace.stats.starttime._ns
+        reset = False
+        if row is None:
+            row = len(self.ids)
+            if row >= self._capacity:
+                self._resize(max(2 * self._capacity, 16))
+            self._rows[trace.id] = row
+            self.ids.append(trace.id)
+            self._sampling_rates[row] = sampling_rate
+            self._dtypes.append(trace.data.dtype)
+        else:
+            if self._sampling_rates[row] != sampling_rate:
+                raise TypeError("Sampling rate differs:", trace.id,
+                                self._sampling_rates[row], sampling_rate)
+            if self._dtypes[row] != trace.data.dtype:
+                raise TypeError("Data type differs:", trace.id,
+                                self._dtypes[row], trace.data.dtype)
+            diff = (start_ns - self._next_ns[row]) / 1e9
+            delta = diff * sampling_rate
+            if abs(delta) > 0.1:
+                msg = "%s of (%g) samples in data of %s: diff=%gs" % (
+                    "Gap" if delta > 0 else "Overlap", abs(delta), trace.id,
+                    diff)
+                if gap_overlap_check:
+                    raise TypeError(msg)
+                msg += " - Trace processing memory will be re-initialized."
+                warnings.warn(msg, UserWarning)
+                reset = True
+        if sampling_rate:
+            self._next_ns[row] = start_ns + int(
+                round(len(trace.data) * 1e9 / sampling_rate))
+        else:
+            self._next_ns[row] = start_ns
+        return row, reset
+
+    def _resize(self, capacity):
+        """
+        Grows the per channel arrays to the given number of channels.
+        """
+        for name in ('_sampling_rates', '_next_ns'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        for step in self._steps:
+            step.resize(capacity)
+        self._capacity = capacity
+
+    def _process_batch(self, traces, rows, resets, inplace):
+        """
+        Runs all processes on packets of different channels with the same
+        sampling rate and data type.
+        """
+        npts = np.array([len(tr.data) for tr in traces])
+        dtype = traces[0].data.dtype
+        if resets.any():
+            for step in self._steps:
+                step.reset(rows[resets])
+        valid = npts > 0
+        data = np.zeros((valid.sum(), npts.max()), dtype=dtype)
+        for i, tr in enumerate(tr for tr, v in zip(traces, valid) if v):
+            data[i, :len(tr.data)] = tr.data
+        if len(data):
+            batch = [tr for tr, v in zip(traces, valid) if v]
+            for step in self._steps:
+                data = np.require(
+                    step.process(data, npts[valid], rows[valid], batch),
+                    dtype=dtype)
+        data = iter(data)
+        results = []
+        for tr, n in zip(traces, npts):
+            processed = next(data)[:n].copy() if n else tr.data.copy()
+            if inplace:
+                tr.data = processed
+                results.append(tr)
+            else:
+                results.append(Trace(data=processed, header=tr.stats))
+        return results
+
+
+class _RtProcess(object):
+    """
+    Processing step applied to packets of many channels at once.
+
+    The state of all channels is kept in arrays with one row per channel,
+    named and initialized as given in ``_state``. :meth:`process` gets the
+    packets as rows of a two-dimensional array padded at the end, the
+    number of valid samples and the channel row of every packet.
+    """
+    _state = {}
+
+    def _get_state_shape(self, name):  # @UnusedVariable
+        return ()
+
+    def resize(self, capacity):
+        for name, value in self._state.items():
+            new = np.empty((capacity,) + self._get_state_shape(name),
+                           dtype=np.float64)
+            new.fill(value)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[:len(old)] = old
+            setattr(self, name, new)
+
+    def reset(self, rows):
+        for name, value in self._state.items():
+            getattr(self, name)[rows] = value
+
+    def process(self, data, npts, rows, traces):
+        raise NotImplementedError
+
+
+class _Scale(_RtProcess):
+    def __init__(self, factor=1.0):
+        self.factor = factor
+
+    def process(self, data, npts, rows, traces):
+        return data * np.array(self.factor, dtype=data.dtype)
+
+
+class _Offset(_RtProcess):
+    def __init__(self, offset=0.0):
+        self.offset = offset
+
+    def process(self, data, npts, rows, traces):
+        return data + self.offset
+
+
+class _Integrate(_RtProcess):
+    _state = {'sum_': 0.0}
+
+    def process(self, data, npts, rows, traces):
+        values = np.empty((len(data), data.shape[1] + 1))
+        values[:, 0] = self.sum_[rows]
+        values[:, 1:] = data * traces[0].stats.delta
+        result = np.cumsum(values, axis=1)[:, 1:]
+        self.sum_[rows] = result[np.arange(len(data)), npts - 1]
+        return result
+
+
+class _Differentiate(_RtProcess):
+    # NaN marks channels without previous sample
+    _state = {'previous': np.nan}
+
+    def process(self, data, npts, rows, traces):
+        previous = self.previous[rows]
+        previous = np.where(np.isnan(previous), data[:, 0], previous)
+        result = np.diff(np.hstack([previous[:, np.newaxis], data]),
+                         axis=1) / traces[0].stats.delta
+        self.previous[rows] = data[np.arange(len(data)), npts - 1]
+        return result
+
+
+class _Boxcar(_RtProcess):
+    _state = {'memory': 0.0}
+
+    def __init__(self, width):
+        if not width > 0:
+            msg = "width parameter not specified or < 1."
+            raise ValueError(msg)
+        self.width = width
+
+    def _get_state_shape(self, name):  # @UnusedVariable
+        return (self.width, )
+
+    def process(self, data, npts, rows, traces):
+        width = self.width
+        values = np.hstack([self.memory[rows], data])
+        cumsum = np.zeros((len(data), values.shape[1] + 1))
+        np.cumsum(values, axis=1, out=cumsum[:, 1:])
+        result = (cumsum[:, width + 1:] - cumsum[:, :-width - 1]) / \
+            float(width + 1)
+        # keep the last width samples of every channel
+        index = npts[:, np.newaxis] + np.arange(width)
+        self.memory[rows] = values[np.arange(len(data))[:, np.newaxis],
+                                   index]
+        return result
+
+
+class _Kurtosis(_RtProcess):
+    _state = {'mu1': 0.0, 'mu2': 1.0, 'k4_bar': 0.0}
+
+    def __init__(self, win=3.0):
+        self.win = win
+
+    def process(self, data, npts, rows, traces):
+        # see obspy.realtime.signal.kurtosis, the mean and variance are
+        # linear recursive filters, only the kurtosis itself is iterated
+        c_1 = traces[0].stats.delta / float(self.win)
+        a1 = 1.0 - c_1
+        c_2 = (1.0 - a1 * a1) / 2.0
+        bias = -3 * c_1 - 3.0
+        data = np.asarray(data, dtype=np.float64)
+        last = (np.arange(len(data)), npts - 1)
+        mu1_last = self.mu1[rows]
+        mu1 = lfilter([c_1], [1.0, -a1], data, axis=1,
+                      zi=(a1 * mu1_last)[:, np.newaxis])[0]
+        dx2 = data - np.hstack([mu1_last[:, np.newaxis], mu1[:, :-1]])
+        dx2 = dx2 * dx2
+        mu2_last = self.mu2[rows]
+        mu2 = lfilter([c_2], [1.0, -a1], dx2, axis=1,
+                      zi=(a1 * mu2_last)[:, np.newaxis])[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dx2 = dx2 / np.hstack([mu2_last[:, np.newaxis], mu2[:, :-1]])
+        factor = 1 + c_1 - 2 * c_1 * dx2
+        addend = c_1 * dx2 * dx2
+        result = np.empty_like(data)
+        k4_bar = self.k4_bar[rows]
+        for i in range(data.shape[1]):
+            k4_bar = factor[:, i] * k4_bar + addend[:, i]
+            result[:, i] = k4_bar
+        self.mu1[rows] = mu1[last]
+        self.mu2[rows] = mu2[last]
+        self.k4_bar[rows] = result[last]
+        return result + bias
+
+
+class _RecStaLta(_RtProcess):
+    _state = {'sta': 0.0, 'lta': 0.0, 'count': 0}
+
+    def __init__(self, nsta, nlta):
+        if not nsta > 0 or not nlta > 0:
+            msg = "nsta and nlta parameters not specified or < 1."
+            raise ValueError(msg)
+        self.nsta = nsta
+        self.nlta = nlta
+
+    def process(self, data, npts, rows, traces):
+        charfct, sta, lta, count = signal._recursive_sta_lta(
+            data, npts, self.nsta, self.nlta, self.sta[rows],
+            self.lta[rows], self.count[rows])
+        self.sta[rows] = sta
+        self.lta[rows] = lta
+        self.count[rows] = count
+        return charfct
+
+
+class _RtMemoryProcess(_RtProcess):
+    """
+    Applies a process channel by channel with RtMemory objects (or a
+    function without memory if ``num`` is ``None``).
+    """
+    def __init__(self, func, num, options):
+        self.func = func
+        self.num = num
+        self.options = options
+        self.memory = []
+
+    def resize(self, capacity):
+        self.memory.extend([None] * (capacity - len(self.memory)))
+
+    def reset(self, rows):
+        for row in rows:
+            self.memory[row] = None
+
+    def process(self, data, npts, rows, traces):
+        result = np.zeros_like(data)
+        for i, (row, tr) in enumerate(zip(rows, traces)):
+            sample = data[i, :npts[i]].copy()
+            if self.num is None:
+                result[i, :npts[i]] = self.func(sample, **self.options)
+                continue
+            if self.memory[row] is None:
+                self.memory[row] = [RtMemory() for _i in range(self.num)]
+            trace = Trace(data=sample, header={
+                'starttime': tr.stats.starttime,
+                'sampling_rate': tr.stats.sampling_rate})
+            result[i, :npts[i]] = self.func(
+                trace, rtmemory_list=self.memory[row], **self.options)
+        return result
+
+
+_VECTORIZED_PROCESSES = {
+    'scale': _Scale,
+    'offset': _Offset,
+    'integrate': _Integrate,
+    'differentiate': _Differentiate,
+    'boxcar': _Boxcar,
+    'kurtosis': _Kurtosis,
+    'recstalta': _RecStaLta,
+}
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -20,7 +20,7 @@ import numpy as np
 from obspy import Trace
 from obspy.core import Stats
 from obspy.realtime import signal
-from obspy.realtime.rtmemory import RtMemory
+from obspy.realtime.rtmemory import RtBuffer, RtMemory
 
 
 # dictionary to map given type-strings to processing functions keys must be all
@@ -34,6 +34,7 @@ REALTIME_PROCESS_FUNCTIONS = {
     'tauc': (signal.tauc, 2),
     'mwpintegral': (signal.mwpintegral, 1),
     'kurtosis': (signal.kurtosis, 3),
+    'recstalta': (signal.recstalta, 1),
 }
 
 
@@ -48,6 +49,13 @@ class RtTrace(Trace):
 
     :type max_length: int, optional
     :param max_length: maximum trace length in seconds
+    :type ring_buffer: bool, optional
+    :param ring_buffer: Keep the data in a preallocated
+        :class:`~obspy.realtime.rtmemory.RtBuffer` of ``max_length`` seconds
+        (and the memory of registered processes in ring buffers as well).
+        Appending a packet then only copies the samples of the packet instead
+        of the whole trace and :attr:`data` is a view into the buffer which
+        is overwritten by later appends. Requires ``max_length``.
 
     .. rubric:: Example
 
@@ -129,7 +137,8 @@ class RtTrace(Trace):
             string += str(REALTIME_PROCESS_FUNCTIONS[key][0].__doc__)
         return(string)
 
-    def __init__(self, max_length=None, *args, **kwargs):  # @UnusedVariable
+    def __init__(self, max_length=None, ring_buffer=False, *args,
+                 **kwargs):  # @UnusedVariable
         """
         Initializes an RtTrace.
 
@@ -138,7 +147,11 @@ class RtTrace(Trace):
         # set window length attribute
         if max_length is not None and max_length <= 0:
             raise ValueError("Input max_length out of bounds: %s" % max_length)
+        if ring_buffer and max_length is None:
+            raise ValueError("A ring buffer requires max_length to be set.")
         self.max_length = max_length
+        self.ring_buffer = ring_buffer
+        self._buffer = None
 
         # initialize processing list
         self.processing = []
@@ -267,7 +280,7 @@ class RtTrace(Trace):
             # if gap or overlap, clear memory
             if gap_or_overlap and rtmemory_list is not None:
                 for n in range(len(rtmemory_list)):
-                    rtmemory_list[n] = RtMemory()
+                    rtmemory_list[n] = RtMemory(ring_buffer=self.ring_buffer)
             # apply processing
             trace = trace.copy()
             dtype = trace.data.dtype
@@ -283,10 +296,23 @@ class RtTrace(Trace):
             trace.data = np.require(trace.data, dtype=dtype)
         # if first data, set stats
         if not self.have_appended_data:
-            self.data = np.array(trace.data)
             self.stats = Stats(header=trace.stats)
+            if self.ring_buffer:
+                self._set_buffer_data(trace.data)
+            else:
+                self.data = np.array(trace.data)
             self.have_appended_data = True
             return trace
+        # contiguous data can be copied straight into the ring buffer, unless
+        # the data was replaced since the last append
+        if self.ring_buffer and not gap_or_overlap and \
+                self._buffer is not None and self._buffer.data is self.data:
+            npts = len(self.data) + len(trace.data)
+            self.data = self._buffer.append(trace.data)
+            if npts > len(self.data):
+                self.stats.starttime += \
+                    (npts - len(self.data)) * self.stats.delta
+            return trace
         # handle all following data sets
         # fix Trace.__add__ parameters
         # TODO: IMPORTANT? Should check for gaps and overlaps and handle
@@ -295,6 +321,9 @@ class RtTrace(Trace):
             self, trace, method=0, interpolation_samples=0,
             fill_value='latest', sanity_checks=True)
         # Trace.__add__ returns new Trace, so update to this RtTrace
+        if self.ring_buffer:
+            self._set_buffer_data(sum_trace.data)
+            return trace
         self.data = sum_trace.data
         # left trim if data length exceeds max_length
         if self.max_length is not None:
@@ -307,6 +336,18 @@ class RtTrace(Trace):
                             fill_value=None)
         return trace
 
+    def _set_buffer_data(self, data):
+        """
+        Fills a new ring buffer with the given data (trimmed from the start to
+        max_length) and sets it as data of this RtTrace.
+        """
+        max_samples = int(self.max_length * self.stats.sampling_rate + 0.5)
+        self._buffer = RtBuffer(max(max_samples, 1), data.dtype)
+        self.data = self._buffer.append(data)
+        if len(data) > len(self.data):
+            self.stats.starttime += \
+                (len(data) - len(self.data)) * self.stats.delta
+
     def register_rt_process(self, process, **options):
         """
         Adds real-time processing algorithm to processing list of this RtTrace.
@@ -343,7 +384,8 @@ class RtTrace(Trace):
             num = REALTIME_PROCESS_FUNCTIONS[process_name][1]
             if num:
                 # make sure we have num new RtMemory instances
-                rtmemory_list = [RtMemory() for _i in range(num)]
+                rtmemory_list = [RtMemory(ring_buffer=self.ring_buffer)
+                                 for _i in range(num)]
             entry = (process_name, options, rtmemory_list)
         else:
             # check if process name is contained within a predefined function,
@@ -355,7 +397,8 @@ class RtTrace(Trace):
                 num = REALTIME_PROCESS_FUNCTIONS[process_name][1]
                 if num:
                     # make sure we have num new RtMemory instances
-                    rtmemory_list = [RtMemory() for _i in range(num)]
+                    rtmemory_list = [RtMemory(ring_buffer=self.ring_buffer)
+                                     for _i in range(num)]
                 entry = (process_name, options, rtmemory_list)
                 break
 
@@ -31,6 +31,7 @@ import numpy as np
 
 from obspy.core.trace import Trace, UTCDateTime
 from obspy.realtime.rtmemory import RtMemory
+from obspy.signal.trigger import _recursive_sta_lta
 
 
 _PI = math.pi
@@ -635,3 +636,60 @@ def kurtosis(trace, win=3.0, rtmemory_list=None):
     rtmemory_k4_bar.input[0] = k4_bar_last
 
     return kappa4
+
+
+def recstalta(trace, nsta, nlta, rtmemory_list=None):
+    """
+    Apply recursive STA/LTA on data.
+
+    Streaming version of :func:`obspy.signal.trigger.recursive_sta_lta`:
+    the characteristic function computed packet by packet is the same as
+    the one computed on the whole trace at once. The first ``nlta`` samples
+    are set to zero.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace: :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type nsta: int
+    :param nsta: Length of short time average window in samples
+    :type nlta: int
+    :param nlta: Length of long time average window in samples
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object
+    """
+    if not isinstance(trace, Trace):
+        msg = "Trace parameter must be an obspy.core.trace.Trace object."
+        raise ValueError(msg)
+
+    if not nsta > 0 or not nlta > 0:
+        msg = "nsta and nlta parameters not specified or < 1."
+        raise ValueError(msg)
+
+    if not rtmemory_list:
+        rtmemory_list = [RtMemory()]
+
+    sample = trace.data
+    if np.size(sample) < 1:
+        return sample
+
+    rtmemory = rtmemory_list[0]
+
+    # output memory holds sta, lta and the number of processed samples
+    if not rtmemory.initialized:
+        memory_size_input = 0
+        memory_size_output = 3
+        rtmemory.initialize(np.float64, memory_size_input,
+                            memory_size_output, 0, 0)
+
+    charfct, sta, lta, count = _recursive_sta_lta(
+        sample[np.newaxis, :], np.array([np.size(sample)]), nsta, nlta,
+        rtmemory.output[0:1], rtmemory.output[1:2], rtmemory.output[2:3])
+    rtmemory.output[0] = sta[0]
+    rtmemory.output[1] = lta[0]
+    rtmemory.output[2] = count[0]
+
+    return charfct[0]
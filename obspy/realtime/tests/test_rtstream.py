@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+The obspy.realtime.rtstream test suite.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import unittest
+import warnings
+
+import numpy as np
+
+from obspy import read
+from obspy.realtime import RtStream, RtTrace
+from obspy.signal.trigger import recursive_sta_lta
+
+
+class RtStreamTestCase(unittest.TestCase):
+    """
+    The obspy.realtime.rtstream test suite.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.st = read()
+        sac = read(os.path.join(os.path.dirname(__file__), 'data',
+                                'II.TLY.BHZ.SAC'))[0]
+        sac.data = sac.data.astype(np.float64)
+        cls.st += sac
+        for tr in cls.st:
+            tr.data = tr.data.astype(np.float64)
+
+    def _get_packets(self, lengths):
+        """
+        Splits all test traces into packets of the given lengths, channels
+        interleaved in time.
+        """
+        packets = []
+        for tr in self.st:
+            i = 0
+            for j, npts in enumerate(lengths * 100):
+                if i >= len(tr):
+                    break
+                packet = tr.copy()
+                packet.data = tr.data[i:i + npts].copy()
+                packet.stats.starttime += i * tr.stats.delta
+                packets.append((j, packet))
+                i += npts
+        return [packet for _, packet in sorted(packets, key=lambda x: x[0])]
+
+    def test_same_as_rttrace(self):
+        """
+        All processes have to give the same results as RtTrace channel by
+        channel, with packets of different lengths and several packets of a
+        channel in one append.
+        """
+        processes = [
+            [('scale', {'factor': 2.0}), ('offset', {'offset': 10.0})],
+            [('integrate', {}), ('differentiate', {})],
+            [('boxcar', {'width': 20})],
+            [('kurtosis', {'win': 1.0})],
+            [('recstalta', {'nsta': 20, 'nlta': 200})],
+            [('tauc', {'width': 10}), (np.abs, {})],
+        ]
+        packets = self._get_packets([130, 7, 512, 1, 300])
+        for process_list in processes:
+            rt_stream = RtStream()
+            rt_traces = {}
+            for process, options in process_list:
+                rt_stream.register_rt_process(process, **options)
+            results = []
+            expected = []
+            for i in range(0, len(packets), 7):
+                batch = packets[i:i + 7]
+                results.extend(rt_stream.append(batch,
+                                                gap_overlap_check=True))
+                for packet in batch:
+                    if packet.id not in rt_traces:
+                        rt_traces[packet.id] = RtTrace()
+                        for process, options in process_list:
+                            rt_traces[packet.id].register_rt_process(
+                                process, **options)
+                    expected.append(rt_traces[packet.id].append(
+                        packet, gap_overlap_check=True))
+            self.assertEqual(len(rt_stream), 4)
+            self.assertEqual(len(results), len(expected))
+            for tr, tr2 in zip(results, expected):
+                self.assertEqual(tr.id, tr2.id)
+                self.assertEqual(tr.stats.starttime, tr2.stats.starttime)
+                np.testing.assert_allclose(tr.data, tr2.data, rtol=1e-9,
+                                           atol=1e-9 * np.abs(tr2.data).max())
+
+    def test_recstalta(self):
+        """
+        Streaming recursive STA/LTA gives the same characteristic function
+        as recursive_sta_lta() on the whole trace.
+        """
+        rt_stream = RtStream()
+        rt_stream.register_rt_process('recstalta', nsta=50, nlta=400)
+        results = {}
+        for packet in self._get_packets([333, 1, 1000, 45]):
+            data = packet.data
+            tr = rt_stream.append(packet, inplace=True)[0]
+            self.assertIs(tr, packet)
+            self.assertIsNot(tr.data, data)
+            results.setdefault(tr.id, []).append(tr.data)
+        for tr in self.st:
+            expected = recursive_sta_lta(tr.data, 50, 400)
+            np.testing.assert_array_equal(np.concatenate(results[tr.id]),
+                                          expected)
+
+    def test_gaps_and_sanity_checks(self):
+        """
+        Gaps reset the processing memory of a channel, changed sampling rates
+        and data types are refused.
+        """
+        rt_stream = RtStream()
+        rt_stream.register_rt_process('integrate')
+        tr = self.st[0]
+        packets = tr / 3
+        rt_stream.append(packets[0])
+        self.assertRaises(TypeError, rt_stream.append, packets[2],
+                          gap_overlap_check=True)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            result = rt_stream.append(packets[2])[0]
+        self.assertEqual(len(w), 1)
+        self.assertIn('Gap', str(w[0].message))
+        # integration starts again at zero
+        np.testing.assert_allclose(
+            result.data, np.cumsum(packets[2].data) * tr.stats.delta)
+        packet = packets[0].copy()
+        packet.stats.sampling_rate = 50.0
+        self.assertRaises(TypeError, rt_stream.append, packet)
+        packet = packets[0].copy()
+        packet.data = packet.data.astype(np.float32)
+        self.assertRaises(TypeError, rt_stream.append, packet)
+        self.assertRaises(TypeError, rt_stream.append, [1])
+        self.assertRaises(NotImplementedError,
+                          rt_stream.register_rt_process, 'xyz')
+        self.assertRaises(TypeError, rt_stream.register_rt_process,
+                          'boxcar', muh='maeh')
+
+
+def suite():
+    return unittest.makeSuite(RtStreamTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
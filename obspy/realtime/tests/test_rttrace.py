@@ -15,7 +15,7 @@ import numpy as np
 from obspy import Trace
 from obspy.core.stream import read
 from obspy.realtime import RtTrace
-from obspy.realtime.rtmemory import RtMemory
+from obspy.realtime.rtmemory import RtBuffer, RtMemory
 import obspy.signal.filter
 
 
@@ -204,6 +204,68 @@ class RtTraceTestCase(unittest.TestCase):
         rt_trace.register_rt_process('tauc', width=20, notexistingoption=True)
         self.assertRaises(TypeError, rt_trace.append, trace)
 
+    def test_rt_buffer(self):
+        """
+        Tests appending to RtBuffer objects.
+        """
+        buf = RtBuffer(10, np.float64)
+        self.assertEqual(len(buf), 0)
+        expected = np.array([])
+        data = np.arange(100, dtype=np.float64)
+        for npts in (3, 4, 0, 7, 1, 9, 10, 2, 15, 5, 5, 5, 5):
+            chunk, data = data[:npts], data[npts:]
+            expected = np.concatenate([expected, chunk])[-10:]
+            view = buf.append(chunk)
+            self.assertIs(view, buf.data)
+            np.testing.assert_array_equal(view, expected)
+        self.assertRaises(ValueError, RtBuffer, 0, np.float64)
+
+    def test_ring_buffer(self):
+        """
+        RtTrace with a ring buffer and registered processes has to give the
+        same results as without.
+        """
+        tr = read()[0]
+        tr.data = tr.data.astype(np.float64)
+        traces = tr / 25
+        self.assertRaises(ValueError, RtTrace, ring_buffer=True)
+        results = []
+        for ring_buffer in (False, True):
+            rtr = RtTrace(max_length=6, ring_buffer=ring_buffer)
+            rtr.register_rt_process('boxcar', width=50)
+            rtr.register_rt_process('integrate')
+            for trace in traces:
+                rtr.append(trace, gap_overlap_check=True)
+                if ring_buffer:
+                    self.assertIs(rtr.data, rtr._buffer.data)
+                results.append((rtr.data.copy(), rtr.stats.copy()))
+            self.assertEqual(len(rtr), 600)
+            self.assertEqual(rtr.stats.endtime, tr.stats.endtime)
+        for (data, stats), (data2, stats2) in zip(
+                results[:len(traces)], results[len(traces):]):
+            np.testing.assert_array_equal(data, data2)
+            self.assertEqual(stats, stats2)
+        # memory of registered processes is kept in ring buffers, too
+        self.assertTrue(rtr.processing[0][2][0]._buffers)
+        # a gap re-initializes the buffer, data replaced from outside is
+        # copied into a new buffer as well
+        rtr = RtTrace(max_length=6, ring_buffer=True)
+        rtr.append(traces[0])
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter('ignore', UserWarning)
+            rtr.append(traces[2])
+        self.assertIs(rtr.data, rtr._buffer.data)
+        self.assertEqual(rtr.stats.starttime, traces[0].stats.starttime)
+        self.assertEqual(rtr.stats.endtime, traces[2].stats.endtime)
+        rtr.data = rtr.data[:-20].copy()
+        rtr.append(traces[3])
+        self.assertIs(rtr.data, rtr._buffer.data)
+        self.assertEqual(rtr.stats.endtime, traces[3].stats.endtime)
+        new = rtr.copy()
+        new.append(traces[4])
+        np.testing.assert_array_equal(new.data[-len(traces[4]):],
+                                      traces[4].data)
+
 
 def suite():
     return unittest.makeSuite(RtTraceTestCase, 'test')
@@ -21,6 +21,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+from itertools import islice
 import math
 import warnings
 
@@ -849,10 +850,49 @@ def dump(pow_map, apow_map, i):
     np.savez('apow_map_%d.npz' % i, apow_map)
 
 
+# number of windows processed by the pool at once, bounds the number of
+# power maps kept in memory before they are passed to the store function
+_ARRAY_PROCESSING_BLOCK_SIZE = 64
+
+
+def _array_processing_window(args):
+    """
+    Relative and absolute power maps of one window for
+    :func:`array_processing`.
+    """
+    (data, tap, nfft, nlow, nf, steer, prewhiten, method) = args
+    nstat, grdpts_x, grdpts_y = steer.shape[3], steer.shape[1], steer.shape[2]
+    dat = (data - data.mean(axis=1)[:, np.newaxis]) * tap
+    ft = np.fft.rfft(dat, nfft, axis=1)[:, nlow:nlow + nf]
+    # computing the covariances of the signal at different receivers for all
+    # frequencies at once
+    ft = ft.T
+    _r = ft[:, :, np.newaxis] * ft[:, np.newaxis, :].conj()
+    if method == 1:
+        _r /= np.abs(_r.sum(axis=0))
+    dpow = np.abs(np.diagonal(_r.sum(axis=0))).sum() * nstat
+    if method == 1:
+        # P(f) = 1/(e.H R(f)^-1 e)
+        for n in range(nf):
+            _r[n, :, :] = np.linalg.pinv(_r[n, :, :], rcond=1e-6)
+    _r = np.ascontiguousarray(_r, np.complex128)
+    relpow_map = np.zeros((grdpts_x, grdpts_y), dtype=np.float64)
+    abspow_map = np.zeros((grdpts_x, grdpts_y), dtype=np.float64)
+    # the C function is called without holding the GIL, so windows can be
+    # processed by threads in parallel
+    errcode = clibsignal.generalizedBeamformer(
+        relpow_map, abspow_map, steer, _r, nstat, prewhiten,
+        grdpts_x, grdpts_y, nf, dpow, method)
+    if errcode != 0:
+        msg = 'generalizedBeamforming exited with error %d'
+        raise Exception(msg % errcode)
+    return relpow_map, abspow_map
+
+
 def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
                      sl_s, semb_thres, vel_thres, frqlow, frqhigh, stime,
                      etime, prewhiten, verbose=False, coordsys='lonlat',
-                     timestamp='mlabday', method=0, store=None):
+                     timestamp='mlabday', method=0, store=None, pool=None):
     """
     Method for Seismic-Array-Beamforming/FK-Analysis/Capon
 
@@ -903,12 +943,19 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
         called with the relative power map and the time offset as first and
         second arguments and the iteration number as third argument. Useful for
         storing or plotting the map for each iteration. For this purpose the
-        dump function of this module can be used.
+        dump function of this module can be used. It is called for the
+        windows in chronological order, also when processing in parallel.
+    :param pool: Pool of workers to process the windows in parallel, i.e.
+        anything with an ``imap`` method like
+        :class:`multiprocessing.pool.ThreadPool`. Thread pools are
+        recommended, the beamforming runs in C without holding the GIL and
+        the steering vectors are shared by all threads. Only a limited
+        number of windows is processed ahead, so long time spans need no
+        more memory than with serial processing.
     :return: :class:`numpy.ndarray` of timestamp, relative relpow, absolute
         relpow, backazimuth, slowness
     """
     res = []
-    eotr = True
 
     # check that sampling rates do not vary
     fs = stream[0].stats.sampling_rate
@@ -952,72 +999,54 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
     steer = np.empty((nf, grdpts_x, grdpts_y, nstat), dtype=np.complex128)
     clibsignal.calcSteer(nstat, grdpts_x, grdpts_y, nf, nlow,
                          deltaf, time_shift_table, steer)
-    _r = np.empty((nf, nstat, nstat), dtype=np.complex128)
-    ft = np.empty((nstat, nf), dtype=np.complex128)
-    newstart = stime
     # 0.22 matches 0.2 of historical C bbfk.c
     tap = cosine_taper(nsamp, p=0.22)
-    offset = 0
-    relpow_map = np.empty((grdpts_x, grdpts_y), dtype=np.float64)
-    abspow_map = np.empty((grdpts_x, grdpts_y), dtype=np.float64)
-    while eotr:
-        try:
-            for i, tr in enumerate(stream):
-                dat = tr.data[spoint[i] + offset:
-                              spoint[i] + offset + nsamp]
-                dat = (dat - dat.mean()) * tap
-                ft[i, :] = np.fft.rfft(dat, nfft)[nlow:nlow + nf]
-        except IndexError:
+
+    def _get_windows():
+        offset = 0
+        newstart = stime
+        while True:
+            yield offset, newstart
+            if (newstart + (nsamp + nstep) / fs) > etime:
+                break
+            offset += nstep
+            newstart += nstep / fs
+
+    def _get_results(windows):
+        tasks = [(np.array([tr.data[spoint[i] + offset:
+                                    spoint[i] + offset + nsamp]
+                            for i, tr in enumerate(stream)]),
+                  tap, nfft, nlow, nf, steer, prewhiten, method)
+                 for offset, _ in windows]
+        if pool is None:
+            return map(_array_processing_window, tasks)
+        return pool.imap(_array_processing_window, tasks)
+
+    windows = _get_windows()
+    while True:
+        block = list(islice(windows, _ARRAY_PROCESSING_BLOCK_SIZE))
+        if not block:
             break
-        ft = np.ascontiguousarray(ft, np.complex128)
-        relpow_map.fill(0.)
-        abspow_map.fill(0.)
-        # computing the covariances of the signal at different receivers
-        dpow = 0.
-        for i in range(nstat):
-            for j in range(i, nstat):
-                _r[:, i, j] = ft[i, :] * ft[j, :].conj()
-                if method == 1:
-                    _r[:, i, j] /= np.abs(_r[:, i, j].sum())
-                if i != j:
-                    _r[:, j, i] = _r[:, i, j].conjugate()
-                else:
-                    dpow += np.abs(_r[:, i, j].sum())
-        dpow *= nstat
-        if method == 1:
-            # P(f) = 1/(e.H R(f)^-1 e)
-            for n in range(nf):
-                _r[n, :, :] = np.linalg.pinv(_r[n, :, :], rcond=1e-6)
-
-        errcode = clibsignal.generalizedBeamformer(
-            relpow_map, abspow_map, steer, _r, nstat, prewhiten,
-            grdpts_x, grdpts_y, nf, dpow, method)
-        if errcode != 0:
-            msg = 'generalizedBeamforming exited with error %d'
-            raise Exception(msg % errcode)
-        ix, iy = np.unravel_index(relpow_map.argmax(), relpow_map.shape)
-        relpow, abspow = relpow_map[ix, iy], abspow_map[ix, iy]
-        if store is not None:
-            store(relpow_map, abspow_map, offset)
-        # here we compute baz, slow
-        slow_x = sll_x + ix * sl_s
-        slow_y = sll_y + iy * sl_s
-
-        slow = np.sqrt(slow_x ** 2 + slow_y ** 2)
-        if slow < 1e-8:
-            slow = 1e-8
-        azimut = 180 * math.atan2(slow_x, slow_y) / math.pi
-        baz = azimut % -360 + 180
-        if relpow > semb_thres and 1. / slow > vel_thres:
-            res.append(np.array([newstart.timestamp, relpow, abspow, baz,
-                                 slow]))
-            if verbose:
-                print(newstart, (newstart + (nsamp / fs)), res[-1][1:])
-        if (newstart + (nsamp + nstep) / fs) > etime:
-            eotr = False
-        offset += nstep
-
-        newstart += nstep / fs
+        for (offset, newstart), (relpow_map, abspow_map) in zip(
+                block, _get_results(block)):
+            ix, iy = np.unravel_index(relpow_map.argmax(), relpow_map.shape)
+            relpow, abspow = relpow_map[ix, iy], abspow_map[ix, iy]
+            if store is not None:
+                store(relpow_map, abspow_map, offset)
+            # here we compute baz, slow
+            slow_x = sll_x + ix * sl_s
+            slow_y = sll_y + iy * sl_s
+
+            slow = np.sqrt(slow_x ** 2 + slow_y ** 2)
+            if slow < 1e-8:
+                slow = 1e-8
+            azimut = 180 * math.atan2(slow_x, slow_y) / math.pi
+            baz = azimut % -360 + 180
+            if relpow > semb_thres and 1. / slow > vel_thres:
+                res.append(np.array([newstart.timestamp, relpow, abspow, baz,
+                                     slow]))
+                if verbose:
+                    print(newstart, (newstart + (nsamp / fs)), res[-1][1:])
     res = np.array(res)
     if timestamp == 'julsec':
         pass
@@ -21,17 +21,28 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 from future.utils import native_str
 
+import bisect
+from collections import deque
 import ctypes as C
 from distutils.version import LooseVersion
+import io
+from itertools import islice
+import os
+import tempfile
+import threading
+import uuid
 import warnings
+import weakref
 
 import numpy as np
 import scipy
+from scipy import fftpack
 
 from obspy import Stream, Trace
 from obspy.core.util.misc import MatplotlibBackend
 from obspy.signal.headers import clibsignal
 from obspy.signal.invsim import cosine_taper
+from obspy.signal.util import next_pow_2
 
 
 def _pad_zeros(a, num, num2=None):
@@ -337,6 +348,474 @@ def correlate_template(data, template, mode='valid', normalize='full',
     return cc
 
 
+# templates per batch are chosen so that the correlations of one batch with
+# one channel need about this many bytes
+_MATCHED_FILTER_BATCH_BYTES = 2 ** 27
+# the spectra of the templates are kept in memory up to this size
+_MATCHED_FILTER_CACHE_BYTES = 2 ** 28
+# number of chunks handed to the pool at once
+_MATCHED_FILTER_POOL_BLOCK_SIZE = 16
+
+
+def _imap_blocks(pool, func, tasks, block_size):
+    """
+    Like ``pool.imap(func, tasks)`` but hands over at most ``block_size``
+    tasks at a time.
+
+    :meth:`multiprocessing.pool.Pool.imap` consumes its whole iterable
+    immediately, so all tasks would be held in memory at once.
+    """
+    tasks = iter(tasks)
+    while True:
+        block = list(islice(tasks, block_size))
+        if not block:
+            return
+        for result in pool.imap(func, block):
+            yield result
+
+
+def _get_template_groups(templates, stream):
+    """
+    Prepare the channels of a template bank for
+    :func:`matched_filter_detector`.
+
+    Returns the data arrays on a common time axis, its start time, the
+    template channels grouped by SEED id and template length, the number of
+    channels and the span in samples of each template.
+    """
+    ids = [tr.id for tr in stream]
+    if len(set(ids)) != len(ids):
+        msg = ("Stream must contain at most one trace per SEED id, merge the "
+               "stream first, e.g. with stream.merge(fill_value=0).")
+        raise ValueError(msg)
+    sampling_rates = set(tr.stats.sampling_rate for tr in stream)
+    for template in templates:
+        sampling_rates.update(tr.stats.sampling_rate for tr in template)
+    if len(sampling_rates) != 1:
+        msg = "All traces of stream and templates need the same sampling rate"
+        raise ValueError(msg)
+    sampling_rate = sampling_rates.pop()
+    starttime = min(tr.stats.starttime for tr in stream)
+    offsets = {tr.id: int(round((tr.stats.starttime - starttime) *
+                                sampling_rate)) for tr in stream}
+    npts = max(offsets[tr.id] + len(tr) for tr in stream)
+    data = {}
+    for tr in stream:
+        # traces starting later or ending earlier are padded with zeros,
+        # i.e. correlations of zero there
+        arr = np.zeros(npts)
+        arr[offsets[tr.id]:offsets[tr.id] + len(tr)] = tr.data
+        data[tr.id] = arr
+
+    groups = {}
+    num_channels = np.zeros(len(templates), dtype=np.int_)
+    spans = np.zeros(len(templates), dtype=np.int_)
+    for i, template in enumerate(templates):
+        traces = [tr for tr in template if tr.id in data]
+        if not traces:
+            msg = ("Skipping template %d: No common SEED ids of template "
+                   "and data stream.")
+            warnings.warn(msg % i)
+            continue
+        reftime = min(tr.stats.starttime for tr in traces)
+        for tr in traces:
+            moveout = int(round((tr.stats.starttime - reftime) *
+                                sampling_rate))
+            group = groups.setdefault((tr.id, len(tr)), ([], [], []))
+            group[0].append(i)
+            group[1].append(moveout)
+            group[2].append(tr.data - np.mean(tr.data))
+            spans[i] = max(spans[i], moveout + len(tr))
+        num_channels[i] = len(traces)
+    for key, (template_ids, moveouts, arrays) in groups.items():
+        # template ids are sorted, so every batch of templates is a slice
+        groups[key] = (np.array(template_ids), np.array(moveouts),
+                       np.array(arrays, dtype=np.float64))
+    return data, starttime, sampling_rate, groups, num_channels, spans
+
+
+def _get_template_spectra(groups, nfft):
+    """
+    Add the conjugated spectra of the templates to the template groups if
+    they fit into the memory budget, otherwise they are calculated for every
+    chunk of data.
+    """
+    nbytes = sum(16 * len(template_ids) * (nfft // 2 + 1)
+                 for template_ids, _, _ in groups.values())
+    for key, (template_ids, moveouts, templates) in groups.items():
+        spectra = None
+        if nbytes <= _MATCHED_FILTER_CACHE_BYTES:
+            spectra = np.conjugate(np.fft.rfft(templates, nfft, axis=-1))
+        groups[key] = (template_ids, moveouts, templates, spectra)
+    return groups
+
+
+# template banks alive in this process by token, and the banks most recently
+# loaded by worker processes
+_TEMPLATE_BANKS = weakref.WeakValueDictionary()
+_LOADED_TEMPLATE_BANKS = deque(maxlen=2)
+
+
+class _TemplateBank(object):
+    """
+    Template groups, channel counts and spans of one
+    :func:`matched_filter_detector` call shared by the tasks of all chunks.
+
+    Tasks only carry a reference to the bank. Within one process (no pool
+    or a thread pool) it is used directly. The first time it is pickled for
+    a process pool, the arrays are written to a temporary file once, which
+    every worker process loads once.
+    """
+    def __init__(self, groups, num_channels, spans, token=None,
+                 filename=None):
+        self.groups = groups
+        self.num_channels = num_channels
+        self.spans = spans
+        self._owner = token is None
+        self.token = token or uuid.uuid4().hex
+        self._filename = filename
+        self._lock = threading.Lock()
+        _TEMPLATE_BANKS[self.token] = self
+
+    def __reduce__(self):
+        with self._lock:
+            if self._filename is None:
+                self._filename = self._dump()
+        return (_load_template_bank, (self.token, self._filename))
+
+    def _dump(self):
+        arrays = {native_str('num_channels'): self.num_channels,
+                  native_str('spans'): self.spans}
+        for k, key in enumerate(sorted(self.groups)):
+            template_ids, moveouts, templates, spectra = self.groups[key]
+            group = {'seed_id': np.array(key[0]),
+                     'length': np.array(key[1]),
+                     'template_ids': template_ids, 'moveouts': moveouts,
+                     'templates': templates}
+            if spectra is not None:
+                group['spectra'] = spectra
+            for name, arr in group.items():
+                arrays[native_str('%s_%d' % (name, k))] = arr
+        fd, filename = tempfile.mkstemp(prefix='obspy_templates_',
+                                        suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                np.savez(fh, **arrays)
+        except Exception:
+            os.remove(filename)
+            raise
+        return filename
+
+    def close(self):
+        """
+        Removes the temporary file of the bank.
+        """
+        if self._owner and self._filename is not None:
+            try:
+                os.remove(self._filename)
+            except OSError:
+                pass
+            self._filename = None
+
+
+def _load_template_bank(token, filename):
+    """
+    Returns the template bank of a token, loads it from its file if it is
+    not present in this process.
+    """
+    bank = _TEMPLATE_BANKS.get(token)
+    if bank is not None:
+        return bank
+    npz = np.load(filename, allow_pickle=False)
+    try:
+        groups = {}
+        k = 0
+        while 'seed_id_%d' % k in npz.files:
+            key = (npz['seed_id_%d' % k].item(),
+                   int(npz['length_%d' % k]))
+            spectra = None
+            if 'spectra_%d' % k in npz.files:
+                spectra = npz['spectra_%d' % k]
+            groups[key] = (npz['template_ids_%d' % k],
+                           npz['moveouts_%d' % k],
+                           npz['templates_%d' % k], spectra)
+            k += 1
+        bank = _TemplateBank(groups, npz['num_channels'], npz['spans'],
+                             token=token, filename=filename)
+    finally:
+        npz.close()
+    # keep it for the following chunks handled by this process
+    _LOADED_TEMPLATE_BANKS.append(bank)
+    return bank
+
+
+def _irfft_product(a, b, nfft):
+    """
+    Inverse real FFT of the product of two half spectra as returned by
+    :func:`numpy.fft.rfft` for an even ``nfft``.
+
+    Uses the faster real transform of :mod:`scipy.fftpack`. The product is
+    written to a buffer whose float view is the packed input format of
+    :func:`scipy.fftpack.irfft` when shifted by one sample (which drops the
+    zero imaginary parts of the first and last frequency).
+    """
+    shape = np.broadcast(a, b).shape
+    buf = np.empty(shape[:-1] + (nfft + 2,))
+    np.multiply(a, b, out=buf.view(np.complex128))
+    buf[..., 1] = buf[..., 0]
+    return fftpack.irfft(buf[..., 1:nfft + 1], axis=-1)
+
+
+def _matched_filter_chunk(args):
+    """
+    Calculate the stacked correlations of a chunk of data and all templates
+    and return the local maxima above the threshold.
+
+    The correlations are calculated by the overlap-save method in blocks of
+    ``nfft`` samples, the chunk consists of ``nblocks`` blocks and one
+    additional block for the moveouts. The chunk data starts one sample
+    before ``start`` (zero padded for the first chunk), so that the
+    correlations of the neighbouring samples of both chunk edges are known
+    and maxima are found across chunk boundaries.
+    """
+    chunk, start, npts, nfft, nblocks, bank, threshold, batch_size = args
+    groups, num_channels, spans = bank.groups, bank.num_channels, bank.spans
+    max_span = spans.max()
+    step = nfft - max_span + 1
+    length = min(nblocks * step, npts - start)
+    ncc = (nblocks + 1) * step
+    eps = np.finfo(float).eps
+    spectra = {}
+    norms = {}
+    for (seed_id, lent) in groups:
+        if seed_id not in spectra:
+            # the mean of the data does not change the correlation with
+            # demeaned templates but improves the precision of the norms
+            data = np.zeros(ncc + max_span - 1)
+            data[:len(chunk[seed_id])] = chunk[seed_id] - \
+                np.mean(chunk[seed_id])
+            # the data of each channel is transformed once for all templates
+            blocks = np.lib.stride_tricks.as_strided(
+                data, shape=(nblocks + 1, nfft),
+                strides=(step * data.itemsize, data.itemsize))
+            spectra[seed_id] = np.fft.rfft(blocks, axis=-1)
+            cumsum = np.concatenate([[0.0], np.cumsum(data)])
+            cumsum2 = np.concatenate([[0.0], np.cumsum(data ** 2)])
+            spectra[seed_id, 'cumsum'] = (cumsum, cumsum2)
+        # the windowed norm of the data is shared by all templates with the
+        # same length
+        cumsum, cumsum2 = spectra[seed_id, 'cumsum']
+        window_sum = cumsum[lent:lent + ncc] - cumsum[:ncc]
+        norm = cumsum2[lent:lent + ncc] - cumsum2[:ncc] - \
+            window_sum ** 2 / lent
+        norm = np.sqrt(np.clip(norm, 0, None))
+        inverse = np.zeros_like(norm)
+        np.divide(1.0, norm, out=inverse, where=norm > 0)
+        norms[seed_id, lent] = (norm, inverse)
+
+    candidates = []
+    for first in range(0, len(spans), batch_size):
+        last = min(first + batch_size, len(spans))
+        # correlations of the samples start - 1 to start + length
+        stack = np.zeros((last - first, length + 2))
+        for (seed_id, lent), (template_ids, moveouts, templates,
+                              template_spectra) in groups.items():
+            i, j = np.searchsorted(template_ids, [first, last])
+            if i == j:
+                continue
+            if template_spectra is None:
+                spec = np.conjugate(np.fft.rfft(templates[i:j], nfft,
+                                                axis=-1))
+            else:
+                spec = template_spectra[i:j]
+            ccs = _irfft_product(spec[:, None, :], spectra[seed_id], nfft)
+            # only the first step samples of each block are free of
+            # wrap around effects, together they form a continuous
+            # correlation function
+            ccs = ccs[:, :, :step].reshape(j - i, ncc)
+            # normalize like correlate_template(), correlations with a norm
+            # of data window times template below eps are zero
+            norm, inverse = norms[seed_id, lent]
+            template_norm = np.sum(templates[i:j] ** 2, axis=-1) ** 0.5
+            ccs *= inverse
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ccs *= (1.0 / template_norm)[:, None]
+                small = np.nonzero(norm <= eps / template_norm.min())[0]
+            if len(small):
+                mask = np.outer(template_norm, norm[small]) <= eps
+                ccs[:, small] = np.where(mask, 0.0, ccs[:, small])
+            for template_id, moveout, cc in zip(template_ids[i:j],
+                                                moveouts[i:j], ccs):
+                stack[template_id - first] += \
+                    cc[moveout:moveout + length + 2]
+        for k, stacked in enumerate(stack):
+            template_id = first + k
+            if not num_channels[template_id]:
+                continue
+            # correlations are only defined as long as the whole template
+            # fits into the data
+            valid = npts - start - spans[template_id] + 1
+            end = min(length, valid)
+            if end <= 0:
+                continue
+            stacked /= num_channels[template_id]
+            stacked[valid + 1:] = -np.inf
+            if start == 0:
+                stacked[0] = -np.inf
+            # local maxima above threshold of the samples of this chunk
+            above = np.nonzero(stacked[1:end + 1] >= threshold)[0] + 1
+            peaks = above[(stacked[above] >= stacked[above - 1]) &
+                          (stacked[above] > stacked[above + 1])]
+            candidates.extend((template_id, start - 1 + index,
+                               stacked[index]) for index in peaks)
+    return candidates
+
+
+def matched_filter_detector(stream, templates, threshold, distance=None,
+                            template_names=None, chunk_length=600,
+                            pool=None):
+    """
+    Detect events by matched filtering with a bank of templates.
+
+    Every template is a stream with any number of channels. The offsets of
+    the start times of the template traces are kept (moveouts), i.e. the
+    templates are usually cut around the picks of an event on several
+    stations. The normalized cross-correlations (see
+    :func:`correlate_template`) of all template traces with the
+    corresponding data traces are shifted by the moveouts and averaged over
+    all channels of the template. Local maxima of this similarity of at
+    least ``threshold`` are detections.
+
+    The data is processed in chunks of ``chunk_length`` seconds. The data of
+    each channel is transformed into the frequency domain once per chunk and
+    correlated with all templates at once, the windowed normalization of the
+    data is shared by all templates. Templates are processed in batches to
+    bound the memory usage.
+
+    :type stream: :class:`~obspy.core.stream.Stream`
+    :param stream: Continuous data with at most one trace per SEED id. Gaps
+        have to be filled first, e.g. with ``stream.merge(fill_value=0)``.
+    :type templates: list of :class:`~obspy.core.stream.Stream`
+    :param templates: Template bank. Template channels not present in the
+        data are ignored. All traces need the sampling rate of the data.
+    :type threshold: float
+    :param threshold: Minimal similarity (mean normalized correlation) of a
+        detection.
+    :type distance: float
+    :param distance: Minimal time in seconds between two detections of the
+        same template, of close detections only the one with the higher
+        similarity is kept. Defaults to the duration of each template.
+    :type template_names: list
+    :param template_names: Optional names of the templates, added to the
+        detections.
+    :type chunk_length: float
+    :param chunk_length: Length of the processed chunks of data in seconds.
+    :param pool: Pool of workers to process the chunks in parallel, i.e.
+        anything with an ``imap`` method like
+        :class:`multiprocessing.pool.ThreadPool` or
+        :class:`multiprocessing.Pool`. Chunks are processed one after the
+        other by default. Each task gets the data of one chunk. Process
+        pools get the template bank once through a temporary file. Chunks
+        are handed to the pool in blocks of 16, so at most the data of 16
+        chunks is held in memory at once.
+    :return: List of detections sorted by time. Each detection is a dict
+        with the ``'time'`` (:class:`~obspy.core.utcdatetime.UTCDateTime`)
+        of the template start (earliest trace) in the data, the
+        ``'similarity'`` and the ``'template_id'`` (index of the template)
+        and the ``'template_name'`` if names were given.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> stream = read()
+    >>> template = stream.slice(stream[0].stats.starttime + 4.5,
+    ...                         stream[0].stats.starttime + 5.5)
+    >>> detections = matched_filter_detector(stream, [template], 0.9)
+    >>> len(detections)
+    1
+    >>> print(detections[0]['time'])
+    2009-08-24T00:20:07.500000Z
+    >>> round(detections[0]['similarity'], 6)
+    1.0
+    """
+    if template_names is not None and \
+            len(template_names) != len(templates):
+        msg = "template_names must have the same length as templates"
+        raise ValueError(msg)
+    data, starttime, sampling_rate, groups, num_channels, spans = \
+        _get_template_groups(templates, stream)
+    if not groups:
+        return []
+    npts = len(next(iter(data.values())))
+    max_span = spans.max()
+    if npts < max_span:
+        msg = 'Data must not be shorter than templates.'
+        raise ValueError(msg)
+    # block length of the overlap-save correlation, a good compromise
+    # between the cost of the transforms and the overlap of the blocks
+    nfft = next_pow_2(4 * max_span)
+    step = nfft - max_span + 1
+    nblocks = max(1, int(np.ceil(chunk_length * sampling_rate / step)))
+    batch_size = max(1, _MATCHED_FILTER_BATCH_BYTES //
+                     (16 * (nblocks + 1) * nfft))
+    bank = _TemplateBank(_get_template_spectra(groups, nfft), num_channels,
+                         spans)
+
+    def _get_tasks():
+        for start in range(0, npts - spans[spans > 0].min() + 1,
+                           nblocks * step):
+            # one more sample on the left for the maxima at chunk edges
+            end = start - 1 + (nblocks + 1) * step + max_span - 1
+            if start:
+                chunk = {seed_id: arr[start - 1:end]
+                         for seed_id, arr in data.items()}
+            else:
+                chunk = {seed_id: np.concatenate([[0.0], arr[:end]])
+                         for seed_id, arr in data.items()}
+            yield (chunk, start, npts, nfft, nblocks, bank, threshold,
+                   batch_size)
+
+    if pool is None:
+        results = map(_matched_filter_chunk, _get_tasks())
+    else:
+        results = _imap_blocks(pool, _matched_filter_chunk, _get_tasks(),
+                               _MATCHED_FILTER_POOL_BLOCK_SIZE)
+    try:
+        candidates = [candidate for result in results
+                      for candidate in result]
+    finally:
+        bank.close()
+
+    # of close detections of each template keep the one with the highest
+    # similarity
+    if distance is None:
+        distances = spans
+    else:
+        distances = np.full(len(spans), distance * sampling_rate)
+    candidates.sort(key=lambda x: (x[0], -x[2], x[1]))
+    detections = []
+    current_id = None
+    for template_id, index, similarity in candidates:
+        if template_id != current_id:
+            current_id = template_id
+            # sorted indices of the detections of the current template
+            accepted = []
+        pos = bisect.bisect(accepted, index)
+        if (pos and index - accepted[pos - 1] < distances[template_id]) or \
+                (pos < len(accepted) and
+                 accepted[pos] - index < distances[template_id]):
+            continue
+        accepted.insert(pos, index)
+        detection = {'time': starttime + index / sampling_rate,
+                     'similarity': float(similarity),
+                     'template_id': int(template_id)}
+        if template_names is not None:
+            detection['template_name'] = template_names[template_id]
+        detections.append(detection)
+    detections.sort(key=lambda x: (x['time'], x['template_id']))
+    return detections
+
+
 def xcorr(tr1, tr2, shift_len, full_xcorr=False):
     """
     Cross correlation of tr1 and tr2 in the time domain using window_len.
@@ -733,6 +1212,238 @@ def xcorr_pick_correction(pick1, trace1, pick2, trace2, t_before, t_after,
     return (pick2_corr, coeff)
 
 
+# correlations of one group of pairs are calculated in slices needing about
+# this many bytes
+_CORRELATE_PAIRS_BATCH_BYTES = 2 ** 26
+# number of batches handed to the pool at once, Pool.imap() consumes its
+# whole iterable immediately, so this bounds the snippets held in memory
+_CORRELATE_PAIRS_POOL_BLOCK_SIZE = 16
+_CORRELATE_PAIRS_DTYPE = np.dtype([
+    (native_str('shift'), np.float64), (native_str('value'), np.float64),
+    (native_str('subsample_shift'), np.float64),
+    (native_str('subsample_value'), np.float64)])
+
+
+def _correlate_pairs_batch(args):
+    """
+    Correlate a batch of pairs of snippets for :func:`correlate_pairs`.
+
+    Every snippet is transformed once, correlations of pairs with the same
+    snippet lengths are calculated and evaluated at once.
+    """
+    snippets, index1, index2, shift, demean, normalize, abs_max = args
+    result = np.full(len(index1), np.nan, dtype=_CORRELATE_PAIRS_DTYPE)
+    lengths = np.array([len(data) for data in snippets], dtype=np.int_)
+    energies = np.zeros(len(snippets))
+    spectra = {}
+    pair_lengths = np.column_stack([lengths[index1], lengths[index2]])
+    for len1, len2 in sorted(set(map(tuple, pair_lengths.tolist()))):
+        # the same slice of the full correlation as in correlate(), lags
+        # outside of the full correlation are zero
+        mid = (len1 + len2 - 1) // 2
+        lags = np.arange(mid - shift, mid + shift + (len1 + len2 - 1) % 2) - \
+            (len2 - 1)
+        valid = (lags > -len2) & (lags < len1)
+        if not np.any(valid):
+            continue
+        # the circular correlation is free of wrap around effects for the
+        # required lags only, usually much shorter than the full correlation
+        nfft = next_pow_2(max(len1, len2, lags[valid].max() + len2,
+                              len1 - lags[valid].min()))
+        for length in (len1, len2):
+            if (length, nfft) in spectra:
+                continue
+            ids = np.nonzero(lengths == length)[0]
+            data = np.array([snippets[i] for i in ids], dtype=np.float64)
+            if len(data) and demean:
+                data -= np.mean(data, axis=-1)[:, None]
+            energies[ids] = np.sum(data ** 2, axis=-1)
+            # rows of the spectra by snippet index
+            rows = np.zeros(len(snippets), dtype=np.int_)
+            rows[ids] = np.arange(len(ids))
+            spectra[length, nfft] = (np.fft.rfft(data, nfft, axis=-1), rows)
+        spec1, rows1 = spectra[len1, nfft]
+        spec2, rows2 = spectra[len2, nfft]
+        cc_mid = (len(lags) - 1) / 2
+        pairs = np.nonzero((pair_lengths[:, 0] == len1) &
+                           (pair_lengths[:, 1] == len2))[0]
+        num = max(1, _CORRELATE_PAIRS_BATCH_BYTES // (32 * nfft))
+        for first in range(0, len(pairs), num):
+            sub = pairs[first:first + num]
+            cc = np.zeros((len(sub), len(lags)))
+            cc[:, valid] = _irfft_product(
+                spec1[rows1[index1[sub]]],
+                np.conjugate(spec2[rows2[index2[sub]]]),
+                nfft)[:, lags[valid] % nfft]
+            if normalize == 'naive':
+                norm = (energies[index1[sub]] * energies[index2[sub]]) ** 0.5
+                zero = norm <= np.finfo(float).eps
+                norm[zero] = 1.0
+                cc /= norm[:, None]
+                cc[zero] = 0.0
+            rows = np.arange(len(sub))
+            index = np.argmax(np.abs(cc) if abs_max else cc, axis=-1)
+            value = cc[rows, index]
+            # vertex of the parabola through the maximum and its neighbours
+            left = cc[rows, np.maximum(index - 1, 0)]
+            right = cc[rows, np.minimum(index + 1, len(lags) - 1)]
+            curvature = left - 2 * value + right
+            fit = (index > 0) & (index < len(lags) - 1) & (curvature != 0)
+            offset = np.zeros(len(sub))
+            offset[fit] = 0.5 * (left[fit] - right[fit]) / curvature[fit]
+            result['shift'][sub] = index - cc_mid
+            result['value'][sub] = value
+            result['subsample_shift'][sub] = index - cc_mid + offset
+            result['subsample_value'][sub] = \
+                value - 0.25 * (left - right) * offset
+    return result
+
+
+def correlate_pairs(snippets, pairs, shift, demean=True, normalize='naive',
+                    abs_max=True, filename=None, batch_size=10000, pool=None):
+    """
+    Cross-correlation of many pairs of waveform snippets.
+
+    For every pair ``(event1, event2, channel)`` the snippets
+    ``snippets[event1, channel]`` and ``snippets[event2, channel]`` are
+    correlated as by :func:`correlate` and the shift and value of the
+    maximum are determined as by :func:`xcorr_max`. Additionally the vertex
+    of a parabola through the maximum and its two neighbouring samples gives
+    the shift and value with subsample precision, e.g. to calculate
+    differential travel times for double-difference relocation.
+
+    The pairs are processed in batches. Every snippet used in a batch is
+    transformed into the frequency domain once and all correlations of
+    pairs with the same snippet lengths are calculated at once, so sorting
+    the pairs by event helps to transform every snippet only a few times.
+
+    :type snippets: dict
+    :param snippets: Waveform snippets (:class:`~numpy.ndarray` or
+        :class:`~obspy.core.trace.Trace`) indexed by ``(event, channel)``.
+        Any mapping supporting item access works, e.g. one loading the
+        snippets from disk on access. Snippets of one channel should have the
+        same sampling rate.
+    :type pairs: iterable
+    :param pairs: Tuples ``(event1, event2, channel)`` of the pairs to
+        correlate. Results of pairs with missing snippets are ``NaN``.
+    :param int shift: Number of samples to shift for cross correlation, see
+        :func:`correlate`.
+    :param bool demean: Demean snippets beforehand.
+    :param normalize: Method for normalization of cross-correlation, one of
+        ``'naive'`` or ``None``, see :func:`correlate`.
+    :param bool abs_max: Determines if the absolute maximum should be used.
+    :type filename: str or file-like object
+    :param filename: If given, the results are written to this file batch by
+        batch instead of being returned, one line per pair with the two
+        events, the channel, shift, value, subsample shift and subsample
+        value separated by whitespace.
+    :param int batch_size: Number of pairs processed in one batch.
+    :param pool: Pool of workers to process the batches in parallel, i.e.
+        anything with an ``imap`` method like
+        :class:`multiprocessing.pool.ThreadPool` or
+        :class:`multiprocessing.Pool`. Each task gets the snippets used by
+        one batch. Batches are handed to the pool in blocks of 16, so at
+        most the snippets of 16 batches are held in memory at once.
+    :return: Structured :class:`~numpy.ndarray` with the fields ``'shift'``,
+        ``'value'``, ``'subsample_shift'`` and ``'subsample_value'`` and one
+        row for each pair, shifts are in samples. ``None`` if the results are
+        written to a file.
+
+    .. rubric:: Example
+
+    >>> from obspy import read
+    >>> st = read()
+    >>> snippets = {('ev1', 'Z'): st[0][450:550],
+    ...             ('ev2', 'Z'): st[0][451:551],
+    ...             ('ev1', 'N'): st[1][450:550],
+    ...             ('ev2', 'N'): st[1][449:549]}
+    >>> pairs = [('ev1', 'ev2', 'Z'), ('ev1', 'ev2', 'N')]
+    >>> result = correlate_pairs(snippets, pairs, 5)
+    >>> result['shift']
+    array([ 1., -1.])
+    >>> shift, value = xcorr_max(correlate(snippets['ev1', 'N'],
+    ...                                    snippets['ev2', 'N'], 5))
+    >>> shift, round(value, 6) == round(result['value'][1], 6)
+    (-1, True)
+    """
+    if normalize is False:
+        normalize = None
+    if normalize is True:
+        normalize = 'naive'
+    if normalize not in ('naive', None):
+        raise ValueError("normalize has to be one of (None, 'naive'))")
+    # pairs of the tasks handed to the workers and which of them have both
+    # snippets, results arrive in the same order
+    pending = deque()
+    num_missing = [0]
+
+    def _get_tasks():
+        iterator = iter(pairs)
+        while True:
+            batch = [tuple(pair) for pair in islice(iterator, batch_size)]
+            if not batch:
+                return
+            data = []
+            keys = {}
+            indices = np.zeros((len(batch), 2), dtype=np.int_)
+            for i, (event1, event2, channel) in enumerate(batch):
+                for j, event in enumerate((event1, event2)):
+                    key = (event, channel)
+                    if key not in keys:
+                        try:
+                            snippet = snippets[key]
+                        except KeyError:
+                            keys[key] = -1
+                        else:
+                            if isinstance(snippet, Trace):
+                                snippet = snippet.data
+                            keys[key] = len(data)
+                            data.append(np.asarray(snippet))
+                    indices[i, j] = keys[key]
+            found = np.all(indices >= 0, axis=-1)
+            num_missing[0] += len(batch) - np.count_nonzero(found)
+            pending.append((batch, found))
+            yield (data, indices[found, 0], indices[found, 1], shift,
+                   demean, normalize, abs_max)
+
+    if pool is None:
+        results = map(_correlate_pairs_batch, _get_tasks())
+    else:
+        results = _imap_blocks(pool, _correlate_pairs_batch, _get_tasks(),
+                               _CORRELATE_PAIRS_POOL_BLOCK_SIZE)
+    if filename is None:
+        output = []
+    elif hasattr(filename, 'write'):
+        fh = filename
+    else:
+        fh = io.open(filename, 'wt', encoding='utf-8')
+    try:
+        if filename is not None:
+            fh.write('# event1 event2 channel shift value subsample_shift '
+                     'subsample_value\n')
+        for result in results:
+            batch, found = pending.popleft()
+            out = np.full(len(batch), np.nan, dtype=_CORRELATE_PAIRS_DTYPE)
+            out[found] = result
+            if filename is None:
+                output.append(out)
+                continue
+            fh.write(''.join(
+                '%s %s %s %r %r %r %r\n' % (pair + tuple(row.tolist()))
+                for pair, row in zip(batch, out)))
+    finally:
+        if filename is not None and fh is not filename:
+            fh.close()
+    if num_missing[0]:
+        msg = ('Missing snippets for %d pairs, their results are NaN.' %
+               num_missing[0])
+        warnings.warn(msg)
+    if filename is None:
+        if not output:
+            return np.zeros(0, dtype=_CORRELATE_PAIRS_DTYPE)
+        return np.concatenate(output)
+
+
 def templates_max_similarity(st, time, streams_templates):
     """
     Compares all event templates in the streams_templates list of streams
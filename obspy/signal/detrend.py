@@ -30,8 +30,10 @@ def simple(data):
     # Convert data if it's not a floating point type.
     if not np.issubdtype(data.dtype, np.floating):
         data = np.require(data, dtype=np.float64)
-    ndat = len(data)
-    x1, x2 = data[0], data[-1]
+    # (works along the last axis so that also all rows of a 2-D array can
+    # be detrended at once)
+    ndat = data.shape[-1]
+    x1, x2 = data[..., :1], data[..., -1:]
     data -= x1 + np.arange(ndat) * (x2 - x1) / float(ndat - 1)
     return data
 
@@ -75,7 +75,7 @@ def bandpass(data, freqmin, freqmax, df, corners=4, zerophase=False):
     sos = zpk2sos(z, p, k)
     if zerophase:
         firstpass = sosfilt(sos, data)
-        return sosfilt(sos, firstpass[::-1])[::-1]
+        return sosfilt(sos, firstpass[..., ::-1])[..., ::-1]
     else:
         return sosfilt(sos, data)
 
@@ -117,7 +117,7 @@ def bandstop(data, freqmin, freqmax, df, corners=4, zerophase=False):
     sos = zpk2sos(z, p, k)
     if zerophase:
         firstpass = sosfilt(sos, data)
-        return sosfilt(sos, firstpass[::-1])[::-1]
+        return sosfilt(sos, firstpass[..., ::-1])[..., ::-1]
     else:
         return sosfilt(sos, data)
 
@@ -154,7 +154,7 @@ def lowpass(data, freq, df, corners=4, zerophase=False):
     sos = zpk2sos(z, p, k)
     if zerophase:
         firstpass = sosfilt(sos, data)
-        return sosfilt(sos, firstpass[::-1])[::-1]
+        return sosfilt(sos, firstpass[..., ::-1])[..., ::-1]
     else:
         return sosfilt(sos, data)
 
@@ -189,7 +189,7 @@ def highpass(data, freq, df, corners=4, zerophase=False):
     sos = zpk2sos(z, p, k)
     if zerophase:
         firstpass = sosfilt(sos, data)
-        return sosfilt(sos, firstpass[::-1])[::-1]
+        return sosfilt(sos, firstpass[..., ::-1])[..., ::-1]
     else:
         return sosfilt(sos, data)
 
@@ -346,7 +346,7 @@ def integer_decimation(data, decimation_factor):
         raise TypeError(msg)
 
     # reshape and only use every decimation_factor-th sample
-    data = np.array(data[::decimation_factor])
+    data = np.array(data[..., ::decimation_factor])
     return data
 
 
@@ -23,12 +23,15 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 import bisect
+import copy
+import functools
 import glob
 import math
 import os
 import warnings
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 from matplotlib import mlab
 from matplotlib.colors import LinearSegmentedColormap
 from matplotlib.ticker import FormatStrFormatter
@@ -38,7 +41,7 @@ from obspy.core import Stats
 from obspy.imaging.scripts.scan import compress_start_end
 from obspy.core.inventory import Inventory
 from obspy.core.util import AttribDict, NUMPY_VERSION
-from obspy.core.util.base import MATPLOTLIB_VERSION
+from obspy.core.util.base import MATPLOTLIB_VERSION, _parallel_map
 from obspy.core.util.obspy_types import ObsPyException
 from obspy.imaging.cm import obspy_sequential
 from obspy.imaging.util import _set_xaxis_obspy_dates
@@ -52,6 +55,9 @@ dtiny = np.finfo(0.0).tiny
 
 NOISE_MODEL_FILE = os.path.join(os.path.dirname(__file__),
                                 "data", "noise_models.npz")
+# maximum number of samples in the array of overlapping FFT windows that is
+# set up at once when computing the spectra of multiple PPSD segments
+_PSD_BATCH_MAX_SAMPLES = 2 ** 23
 
 
 def fft_taper(data):
@@ -119,6 +125,57 @@ def welch_window(n):
     return taper
 
 
+def _welch_psd(data, nfft, noverlap, sampling_rate, window=fft_taper):
+    """
+    Computes the power spectral densities of all rows of a 2-D array at once.
+
+    Mirrors :func:`matplotlib.mlab.psd` with ``detrend=mlab.detrend_linear``,
+    ``sides='onesided'`` and ``scale_by_freq=True`` as used for single PPSD
+    segments, but sets up the overlapping windows of all rows as one strided
+    array and computes all FFTs in a single call.
+
+    :type data: :class:`numpy.ndarray`
+    :param data: 2-D array with one segment of data per row.
+    :rtype: tuple of two :class:`numpy.ndarray`
+    :returns: Power spectral densities (one row per input row) and
+        frequencies.
+    """
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    nrows, npts = data.shape
+    step = nfft - noverlap
+    nwin = (npts - nfft) // step + 1
+    windows = as_strided(
+        data, shape=(nrows, nwin, nfft),
+        strides=(data.strides[0], step * data.strides[1], data.strides[1]))
+    # linear detrend of each window, same as mlab.detrend_linear
+    x = np.arange(nfft, dtype=np.float64)
+    x -= x.mean()
+    demeaned = windows - windows.mean(axis=-1)[..., np.newaxis]
+    slope = np.dot(demeaned, x) / np.dot(x, x)
+    demeaned -= slope[..., np.newaxis] * x
+    window_vals = window(np.ones(nfft))
+    demeaned *= window_vals
+    spec = np.fft.rfft(demeaned, axis=-1)
+    spec = (spec.real ** 2 + spec.imag ** 2).mean(axis=1)
+    # scaling of one-sided densities as done by mlab
+    if nfft % 2:
+        spec[:, 1:] *= 2.0
+    else:
+        spec[:, 1:-1] *= 2.0
+    spec /= sampling_rate
+    spec /= (np.abs(window_vals) ** 2).sum()
+    freq = np.fft.rfftfreq(nfft, 1.0 / sampling_rate)
+    return spec, freq
+
+
+def _process_ppsd_segments(ppsd, traces):
+    """
+    Helper for parallel processing in :meth:`PPSD.add`, has to be on module
+    level to be picklable.
+    """
+    return ppsd._process_segments(traces)
+
+
 class PPSD(object):
     """
     Class to compile probabilistic power spectral densities for one combination
@@ -603,7 +660,7 @@ class PPSD(object):
 
         Replaces old :meth:`PPSD.__insert_used_time()` private method and the
         addition ot the histogram stack that was performed directly in
-        :meth:`PPSD.__process()`.
+        :meth:`PPSD.__process()` (nowadays :meth:`PPSD._process_segments()`).
 
         :type utcdatetime: :class:`~obspy.core.utcdatetime.UTCDateTime`
         :type spectrum: :class:`numpy.ndarray`
@@ -645,8 +702,10 @@ class PPSD(object):
         """
         index1 = bisect.bisect_left(self._times_processed,
                                     utcdatetime._ns)
-        index2 = bisect.bisect_right(self._times_processed,
-                                     utcdatetime._ns + self.ppsd_length * 1e9)
+        # a segment starting exactly at the end of this one does not overlap,
+        # so independently processed adjacent PPSDs merge in any order
+        index2 = bisect.bisect_left(self._times_processed,
+                                    utcdatetime._ns + self.ppsd_length * 1e9)
         if index1 != index2:
             return True
         else:
@@ -667,16 +726,30 @@ class PPSD(object):
         self._current_times_used = []
         self._current_times_all_details = []
 
-    def add(self, stream, verbose=False):
+    def add(self, stream, verbose=False, workers=None, executor="process"):
         """
         Process all traces with compatible information and add their spectral
         estimates to the histogram containing the probabilistic psd.
         Also ensures that no piece of data is inserted twice.
 
+        The spectra of all segments of a trace are computed together in
+        batches. Segments can additionally be distributed over multiple
+        ``workers``, the results are identical to serial processing.
+
         :type stream: :class:`~obspy.core.stream.Stream` or
                 :class:`~obspy.core.trace.Trace`
         :param stream: Stream or trace with data that should be added to the
                 probabilistic psd histogram.
+        :type workers: int, optional
+        :param workers: Number of workers the psd segments are distributed
+            over. Defaults to processing all segments in the calling process.
+        :type executor: str or object, optional
+        :param executor: Either ``"process"`` (default) or ``"thread"`` to
+            select the kind of pool created for ``workers``, or an existing
+            pool/executor with a ``map()`` method (e.g.
+            :class:`concurrent.futures.ProcessPoolExecutor`) which is used
+            instead. With processes, the PPSD (including its metadata) has to
+            be picklable.
         :returns: True if appropriate data were found and the ppsd statistics
                 were changed, False otherwise.
         """
@@ -712,6 +785,8 @@ class PPSD(object):
         # merge depending on skip_on_gaps set during __init__
         stream.merge(self.merge_method, fill_value=0)
 
+        # collect all psd segments not yet covered by processed data
+        slices = []
         for tr in stream:
             # the following check should not be necessary due to the select()..
             if not self.__sanity_check(tr):
@@ -729,53 +804,108 @@ class PPSD(object):
                 else:
                     # throw warnings if trace length is different
                     # than ppsd_length..!?!
-                    slice = tr.slice(t1, t1 + self.ppsd_length
-                                     - tr.stats.delta)
-                    # XXX not good, should be working in place somehow
-                    # XXX how to do it with the padding, though?
-                    success = self.__process(slice)
-                    if success:
-                        if verbose:
-                            print(t1)
-                        changed = True
+                    slices.append(tr.slice(t1, t1 + self.ppsd_length -
+                                           tr.stats.delta))
                 t1 += (1 - self.overlap) * self.ppsd_length  # advance
+        if not slices:
+            return changed
+
+        # compute the spectra, optionally distributed over multiple workers
+        # using a lightweight copy without any processed data
+        if workers and workers > 1 or \
+                not isinstance(executor, (str, native_str)):
+            ppsd = copy.copy(self)
+            for key in self.NPZ_STORE_KEYS_LIST_TYPES:
+                setattr(ppsd, key, [])
+            ppsd.__invalidate_histogram()
+            nchunks = min(len(slices), int(workers or 1) * 4)
+            chunks = [slices[i::nchunks] for i in range(nchunks)]
+            results = _parallel_map(
+                functools.partial(_process_ppsd_segments, ppsd), chunks,
+                workers=workers, executor=executor)
+            results = [results[i % nchunks][i // nchunks]
+                       for i in range(len(slices))]
+        else:
+            results = self._process_segments(slices)
+
+        # insert in order of the segments as in serial processing
+        for slice, (smoothed_psd, msg) in zip(slices, results):
+            t1 = slice.stats.starttime
+            if self.__check_time_present(t1):
+                msg = "Already covered time spans detected (e.g. %s), " + \
+                      "skipping these slices."
+                msg = msg % t1
+                warnings.warn(msg)
+                continue
+            if smoothed_psd is None:
+                warnings.warn(msg)
+                continue
+            self.__insert_processed_data(t1, smoothed_psd)
+            if verbose:
+                print(t1)
+            changed = True
 
-            # enforce time limits, pad zeros if gaps
-            # tr.trim(t, t+PPSD_LENGTH, pad=True)
         if changed:
             self.__invalidate_histogram()
         return changed
 
-    def __process(self, tr):
+    def _process_segments(self, traces):
         """
-        Processes a segment of data and save the psd information.
-        Whether `Trace` is compatible (station, channel, ...) has to
-        checked beforehand.
+        Computes the smoothed psds of multiple segments of data without
+        inserting them into the PPSD.
 
-        :type tr: :class:`~obspy.core.trace.Trace`
-        :param tr: Compatible Trace with data of one PPSD segment
-        :returns: `True` if segment was successfully processed,
-            `False` otherwise.
-        """
-        # XXX DIRTY HACK!!
-        if len(tr) == self.len + 1:
-            tr.data = tr.data[:-1]
-        # one last check..
-        if len(tr) != self.len:
-            msg = "Got a piece of data with wrong length. Skipping"
-            warnings.warn(msg)
-            print(len(tr), self.len)
-            return False
-        # being paranoid, only necessary if in-place operations would follow
-        tr.data = tr.data.astype(np.float64)
-        # if trace has a masked array we fill in zeros
-        try:
-            tr.data[tr.data.mask] = 0.0
-        # if it is no masked array, we get an AttributeError
-        # and have nothing to do
-        except AttributeError:
-            pass
+        The spectra of all segments are computed in batches with
+        :func:`_welch_psd`, response removal and binning are done per segment.
+        Whether the traces are compatible (station, channel, ...) has to be
+        checked beforehand.
 
+        :type traces: list of :class:`~obspy.core.trace.Trace`
+        :param traces: Compatible Traces with data of one PPSD segment each.
+        :rtype: list of tuple
+        :returns: One tuple per trace with the smoothed psd (or ``None`` if
+            the segment could not be processed) and the reason for skipping
+            the segment (or ``None``).
+        """
+        results = [None] * len(traces)
+        valid = []
+        for i, tr in enumerate(traces):
+            data = tr.data
+            # XXX DIRTY HACK!!
+            if len(data) == self.len + 1:
+                data = data[:-1]
+            # one last check..
+            if len(data) != self.len:
+                msg = "Got a piece of data with wrong length. Skipping"
+                results[i] = (None, msg)
+                continue
+            valid.append((i, data))
+
+        nwin = (self.len - self.nfft) // (self.nfft - self.nlap) + 1
+        batch_size = max(1, _PSD_BATCH_MAX_SAMPLES // (nwin * self.nfft))
+        for j in range(0, len(valid), batch_size):
+            batch = valid[j:j + batch_size]
+            # if a trace has a masked array we fill in zeros
+            data = np.empty((len(batch), self.len), dtype=np.float64)
+            for row, (_, data_) in zip(data, batch):
+                row[:] = np.ma.filled(data_, 0.0)
+            specs, _freq = _welch_psd(data, self.nfft, self.nlap,
+                                      self.sampling_rate)
+            # leave out first entry (offset) and
+            # work with the periods not frequencies later so reverse spectrum
+            specs = specs[:, :0:-1]
+            for (i, _), spec in zip(batch, specs):
+                results[i] = self.__process_spectrum(traces[i], spec, _freq)
+        return results
+
+    def __process_spectrum(self, tr, spec, _freq):
+        """
+        Removes the instrument response from the spectrum of one segment of
+        data and bins it in period.
+
+        :rtype: tuple
+        :returns: Smoothed psd or ``None`` and the reason for skipping the
+            segment or ``None``.
+        """
         # restitution:
         # mcnamara apply the correction at the end in freq-domain,
         # does it make a difference?
@@ -783,23 +913,12 @@ class PPSD(object):
         # Yes, you should avoid removing the response until after you
         # have estimated the spectra to avoid elevated lp noise
 
-        spec, _freq = mlab.psd(tr.data, self.nfft, self.sampling_rate,
-                               detrend=mlab.detrend_linear, window=fft_taper,
-                               noverlap=self.nlap, sides='onesided',
-                               scale_by_freq=True)
-
-        # leave out first entry (offset)
-        spec = spec[1:]
-
-        # working with the periods not frequencies later so reverse spectrum
-        spec = spec[::-1]
-
         # Here we remove the response using the same conventions
         # since the power is squared we want to square the sensitivity
         # we can also convert to acceleration if we have non-rotational data
         if self.special_handling == "ringlaser":
             # in case of rotational data just remove sensitivity
-            spec /= self.metadata['sensitivity'] ** 2
+            spec = spec / self.metadata['sensitivity'] ** 2
         # special_handling "hydrophone" does instrument correction same as
         # "normal" data
         else:
@@ -811,8 +930,7 @@ class PPSD(object):
                        "%s: %s\n"
                        "Skipping time segment(s).")
                 msg = msg % (e.__class__.__name__, str(e))
-                warnings.warn(msg)
-                return False
+                return None, msg
 
             resp = resp[1:]
             resp = resp[::-1]
@@ -843,8 +961,7 @@ class PPSD(object):
                          (self.psd_periods <= per_right)]
             smoothed_psd.append(specs.mean())
         smoothed_psd = np.array(smoothed_psd, dtype=np.float32)
-        self.__insert_processed_data(tr.stats.starttime, smoothed_psd)
-        return True
+        return smoothed_psd, None
 
     def _get_times_all_details(self):
         # check if we can reuse a previously cached array of all times as
@@ -1287,83 +1404,139 @@ class PPSD(object):
         same settings, then any time periods that are not yet covered are added
         to the current PPSD (a warning is emitted if any segments are omitted).
 
+        This is the reduce step for PPSDs computed independently from each
+        other (e.g. one per day file in separate processes) and stored with
+        :meth:`~PPSD.save_npz`. Partial PPSDs of adjacent time spans can be
+        added in any order and result in the same PPSD as processing all data
+        at once (see also :meth:`~PPSD.add_ppsd`).
+
         :type filename: str
         :param filename: Name of numpy .npz file(s) with stored PPSD data.
             Wildcards are possible and will be expanded using
             :py:func:`glob.glob`.
         """
-        for filename in glob.glob(filename):
+        for filename in sorted(glob.glob(filename)):
             self._add_npz(filename)
 
+    def add_ppsd(self, ppsd):
+        """
+        Add the results of other PPSD instance(s) to current PPSD instance.
+
+        Same as :meth:`~PPSD.add_npz` for PPSDs in memory, e.g. partial PPSDs
+        computed in worker processes and returned to the calling process.
+        The PPSDs have to be set up with the same settings, time periods that
+        are already covered are omitted (with a warning).
+
+        >>> from obspy import read
+        >>> st = read()
+        >>> paz = {'gain': 60077000.0,
+        ...        'poles': [-0.037004+0.037016j, -0.037004-0.037016j,
+        ...                  -251.33+0j, -131.04-467.29j, -131.04+467.29j],
+        ...        'sensitivity': 2516778400.0,
+        ...        'zeros': [0j, 0j]}
+        >>> ppsd = PPSD(st[0].stats, paz, ppsd_length=10.0)
+        >>> partial = PPSD(st[0].stats, paz, ppsd_length=10.0)
+        >>> ppsd.add(st.slice(endtime=st[0].stats.starttime + 20))
+        True
+        >>> partial.add(st.slice(starttime=st[0].stats.starttime + 20))
+        True
+        >>> ppsd.add_ppsd(partial)
+        >>> print(len(ppsd.times_processed))
+        4
+
+        :type ppsd: :class:`PPSD` or list of :class:`PPSD`
+        :param ppsd: PPSD(s) to add.
+        """
+        if isinstance(ppsd, PPSD):
+            ppsd = [ppsd]
+        for ppsd_ in ppsd:
+            data = dict([(key, np.asarray(getattr(ppsd_, key)))
+                         for key in self.NPZ_STORE_KEYS])
+            self._add_data(data, "PPSD '%s'" % ppsd_.id)
+
     def _add_npz(self, filename):
         """
         See :meth:`PPSD.add_npz()`.
         """
-        def _add(data):
-            # check ppsd_version version and raise if higher than current
-            _check_npz_ppsd_version(self, data)
-            # check if all metadata agree
-            for key in self.NPZ_STORE_KEYS_SIMPLE_TYPES:
-                if getattr(self, key) != data[key].item():
-                    msg = ("Mismatch in '%s' attribute.\n\tCurrent:\n\t%s\n\t"
-                           "Loaded:\n\t%s")
-                    msg = msg % (key, getattr(self, key), data[key].item())
-                    raise AssertionError(msg)
-            for key in self.NPZ_STORE_KEYS_ARRAY_TYPES:
-                try:
-                    np.testing.assert_array_equal(getattr(self, key),
-                                                  data[key])
-                except AssertionError as e:
-                    msg = ("Mismatch in '%s' attribute.\n") % key
-                    raise AssertionError(msg + str(e))
-            # load new psd data
-            for key in self.NPZ_STORE_KEYS_VERSION_NUMBERS:
-                if getattr(self, key) != data[key].item():
-                    msg = ("Mismatch in version numbers (%s) between current "
-                           "data (%s) and loaded data (%s).") % (
-                               key, getattr(self, key), data[key].item())
-                    warnings.warn(msg)
-            _times_data = data["_times_data"].tolist()
-            _times_gaps = data["_times_gaps"].tolist()
-            _times_processed = [d_ for d_ in data["_times_processed"]]
-            _binned_psds = [d_ for d_ in data["_binned_psds"]]
-            # convert floating point POSIX second timestamps from older npz
-            # files
-            if data['ppsd_version'].item() == 1:
-                _times_data = [[UTCDateTime(start)._ns, UTCDateTime(end)._ns]
-                               for start, end in _times_data]
-                _times_gaps = [[UTCDateTime(start)._ns, UTCDateTime(end)._ns]
-                               for start, end in _times_gaps]
-                _times_processed = [
-                    UTCDateTime(t)._ns for t in _times_processed]
-            # add new data
-            self._times_data.extend(_times_data)
-            self._times_gaps.extend(_times_gaps)
-            duplicates = 0
-            for t, psd in zip(_times_processed, _binned_psds):
-                t = UTCDateTime(ns=t)
-                if self.__check_time_present(t):
-                    duplicates += 1
-                    continue
-                self.__insert_processed_data(t, psd)
-            # warn if some segments were omitted
-            if duplicates:
-                msg = ("%d/%d segments omitted in file '%s' "
-                       "(time ranges already covered).")
-                msg = msg % (duplicates, len(_times_processed), filename)
-                warnings.warn(msg)
-
         # XXX get rid of if/else again when bumping minimal numpy to 1.7
         if NUMPY_VERSION >= [1, 7]:
             with np.load(filename) as data:
-                _add(data)
+                self._add_data(data, "file '%s'" % filename)
         else:
             data = np.load(filename)
             try:
-                _add(data)
+                self._add_data(data, "file '%s'" % filename)
             finally:
                 data.close()
 
+    def _add_data(self, data, source):
+        """
+        Adds stored PPSD results to current PPSD instance.
+
+        See :meth:`PPSD.add_npz()` and :meth:`PPSD.add_ppsd()`.
+
+        :type data: dict-like
+        :param data: Arrays for all keys in :attr:`PPSD.NPZ_STORE_KEYS`, e.g.
+            an opened npz file.
+        :type source: str
+        :param source: Description of the origin of the data used in warning
+            messages.
+        """
+        # check ppsd_version version and raise if higher than current
+        _check_npz_ppsd_version(self, data)
+        # check if all metadata agree
+        for key in self.NPZ_STORE_KEYS_SIMPLE_TYPES:
+            if getattr(self, key) != data[key].item():
+                msg = ("Mismatch in '%s' attribute.\n\tCurrent:\n\t%s\n\t"
+                       "Loaded:\n\t%s")
+                msg = msg % (key, getattr(self, key), data[key].item())
+                raise AssertionError(msg)
+        for key in self.NPZ_STORE_KEYS_ARRAY_TYPES:
+            try:
+                np.testing.assert_array_equal(getattr(self, key),
+                                              data[key])
+            except AssertionError as e:
+                msg = ("Mismatch in '%s' attribute.\n") % key
+                raise AssertionError(msg + str(e))
+        # load new psd data
+        for key in self.NPZ_STORE_KEYS_VERSION_NUMBERS:
+            if getattr(self, key) != data[key].item():
+                msg = ("Mismatch in version numbers (%s) between current "
+                       "data (%s) and loaded data (%s).") % (
+                           key, getattr(self, key), data[key].item())
+                warnings.warn(msg)
+        _times_data = data["_times_data"].tolist()
+        _times_gaps = data["_times_gaps"].tolist()
+        _times_processed = [d_ for d_ in data["_times_processed"]]
+        _binned_psds = [d_ for d_ in data["_binned_psds"]]
+        # convert floating point POSIX second timestamps from older npz
+        # files
+        if data['ppsd_version'].item() == 1:
+            _times_data = [[UTCDateTime(start)._ns, UTCDateTime(end)._ns]
+                           for start, end in _times_data]
+            _times_gaps = [[UTCDateTime(start)._ns, UTCDateTime(end)._ns]
+                           for start, end in _times_gaps]
+            _times_processed = [
+                UTCDateTime(t)._ns for t in _times_processed]
+        # add new data
+        self._times_data.extend(_times_data)
+        self._times_gaps.extend(_times_gaps)
+        duplicates = 0
+        for t, psd in zip(_times_processed, _binned_psds):
+            t = UTCDateTime(ns=t)
+            if self.__check_time_present(t):
+                duplicates += 1
+                continue
+            self.__insert_processed_data(t, psd)
+        if duplicates < len(_times_processed):
+            self.__invalidate_histogram()
+        # warn if some segments were omitted
+        if duplicates:
+            msg = ("%d/%d segments omitted in %s "
+                   "(time ranges already covered).")
+            msg = msg % (duplicates, len(_times_processed), source)
+            warnings.warn(msg)
+
     def _split_lists(self, times, psds):
         """
         """
@@ -7,19 +7,39 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import ctypes as C
+from multiprocessing.pool import ThreadPool
 import numpy as np
 import os
+import pickle
 import unittest
 import warnings
 
-from obspy import UTCDateTime, read
+from obspy import Stream, Trace, UTCDateTime, read
+from obspy.core.compatibility import mock
 from obspy.core.util.deprecation_helpers import ObsPyDeprecationWarning
 from obspy.core.util.libnames import _load_cdll
+from obspy.core.util.base import NamedTemporaryFile
 from obspy.core.util.testing import ImageComparison
-from obspy.signal.cross_correlation import (correlate, correlate_template,
+from obspy.signal.cross_correlation import (correlate, correlate_pairs,
+                                            correlate_template,
+                                            matched_filter_detector,
                                             xcorr_pick_correction,
                                             xcorr_3c, xcorr_max, xcorr,
-                                            _xcorr_padzeros, _xcorr_slice)
+                                            _TemplateBank, _xcorr_padzeros,
+                                            _xcorr_slice)
+
+
+class _EagerPool(object):
+    """
+    Pool consuming all tasks at once just like multiprocessing.Pool.
+    """
+    def __init__(self):
+        self.sizes = []
+
+    def imap(self, func, iterable):
+        tasks = list(iterable)
+        self.sizes.append(len(tasks))
+        return map(func, tasks)
 
 
 class CrossCorrelationTestCase(unittest.TestCase):
@@ -494,6 +514,230 @@ class CrossCorrelationTestCase(unittest.TestCase):
                                          normalize=normalize)
                 np.testing.assert_allclose(cc3, cc4)
 
+    def test_matched_filter_detector_single_channel(self):
+        """
+        The similarity of single channel templates is the correlation of
+        correlate_template().
+        """
+        st = read()
+        st.filter('highpass', freq=1.0)
+        t0 = st[0].stats.starttime
+        template = st.select(component='Z').slice(t0 + 4.5, t0 + 5.5)
+        detections = matched_filter_detector(st, [template], -1.0,
+                                             distance=0.001)
+        cc = correlate_template(st.select(component='Z')[0], template[0])
+        # all local maxima are detections
+        peaks = np.nonzero((cc[1:-1] >= cc[:-2]) & (cc[1:-1] > cc[2:]))[0]
+        got = {int(round((d['time'] - t0) * 100)): d['similarity']
+               for d in detections}
+        for index in peaks + 1:
+            self.assertAlmostEqual(got[index], cc[index], 10)
+        self.assertEqual(max(got, key=got.get), 450)
+        # detections of one template are at least a template length apart
+        times = [d['time'] for d in matched_filter_detector(
+            st, [template], 0.2)]
+        self.assertTrue(np.all(np.diff(times) >= 1.0))
+
+    def test_matched_filter_detector(self):
+        """
+        Multi-channel templates with moveouts in synthetic data.
+        """
+        rs = np.random.RandomState(42)
+        t0 = UTCDateTime(2018, 1, 1)
+        header = {'network': 'XX', 'channel': 'HHZ', 'sampling_rate': 50.0}
+        st = Stream([Trace(rs.randn(20000), header=dict(
+            header, station='S%d' % i, starttime=t0)) for i in range(4)])
+        templates = []
+        for _ in range(5):
+            templates.append(Stream([Trace(rs.randn(100), header=dict(
+                header, station='S%d' % i,
+                starttime=t0 + rs.randint(0, 150) / 50.0))
+                for i in range(3)]))
+        # a channel without data is ignored
+        templates[2][0].stats.station = 'S9'
+        for k, index in ((1, 5000), (1, 12000), (3, 9000), (2, 15000)):
+            reftime = min(tr.stats.starttime for tr in templates[k])
+            for tr in templates[k].select(station='S[0-3]'):
+                i = index + int(round((tr.stats.starttime - reftime) * 50))
+                data = st.select(station=tr.stats.station)[0].data
+                data[i:i + 100] += 2 * tr.data
+        names = ['a', 'b', 'c', 'd', 'e']
+        detections = matched_filter_detector(st, templates, 0.7,
+                                             template_names=names)
+        self.assertEqual(
+            [(d['template_id'], d['template_name'], d['time'])
+             for d in detections],
+            [(1, 'b', t0 + 100.0), (3, 'd', t0 + 180.0),
+             (1, 'b', t0 + 240.0), (2, 'c', t0 + 300.0)])
+        for d in detections:
+            self.assertGreater(d['similarity'], 0.85)
+            self.assertLess(d['similarity'], 1.0)
+        # results do not depend on the chunks and the pool
+        for chunk_length in (1, 7.3, 1000):
+            got = matched_filter_detector(
+                st, templates, 0.7, template_names=names,
+                chunk_length=chunk_length, pool=ThreadPool(2))
+            self.assertEqual([d['time'] for d in got],
+                             [d['time'] for d in detections])
+            np.testing.assert_allclose(
+                [d['similarity'] for d in got],
+                [d['similarity'] for d in detections], rtol=1e-10)
+        # pools get the chunks in bounded blocks
+        pool = _EagerPool()
+        with mock.patch('obspy.signal.cross_correlation.'
+                        '_MATCHED_FILTER_POOL_BLOCK_SIZE', 3):
+            got = matched_filter_detector(st, templates, 0.7,
+                                          chunk_length=30, pool=pool)
+        self.assertGreater(len(pool.sizes), 1)
+        self.assertEqual(max(pool.sizes), 3)
+        self.assertEqual([d['time'] for d in got],
+                         [d['time'] for d in detections])
+        # errors
+        self.assertRaises(ValueError, matched_filter_detector, st + st,
+                          templates, 0.7)
+        st[0].stats.sampling_rate = 100.0
+        self.assertRaises(ValueError, matched_filter_detector, st,
+                          templates, 0.7)
+
+    def test_matched_filter_detector_chunk_edges(self):
+        """
+        Maxima next to chunk edges are detected once, just like without
+        chunks.
+        """
+        rs = np.random.RandomState(42)
+        data = np.convolve(rs.randn(1000), np.hanning(15), mode='same')
+        t0 = UTCDateTime(2018, 1, 1)
+        header = {'network': 'XX', 'station': 'S0', 'channel': 'HHZ',
+                  'sampling_rate': 1.0, 'starttime': t0}
+        st = Stream([Trace(data, header=header)])
+        # 25 samples long templates give chunks of 104 samples for a chunk
+        # length of 104 s, the maxima are at the first and last sample of
+        # the second chunk
+        templates = []
+        for index in (104, 207):
+            templates.append(Stream([Trace(data[index:index + 25],
+                                           header=dict(header))]))
+        expected = matched_filter_detector(st, templates, 0.5, distance=0,
+                                           chunk_length=10000)
+        got = matched_filter_detector(st, templates, 0.5, distance=0,
+                                      chunk_length=104)
+        self.assertEqual([(d['template_id'], d['time']) for d in got],
+                         [(d['template_id'], d['time']) for d in expected])
+        for template_id, index in enumerate((104, 207)):
+            times = [d['time'] - t0 for d in got
+                     if d['template_id'] == template_id]
+            self.assertIn(index, times)
+            self.assertNotIn(index - 1, times)
+            self.assertNotIn(index + 1, times)
+
+    def test_matched_filter_template_bank(self):
+        """
+        Tasks only carry a reference to the template bank, process pools
+        get it once through a temporary file.
+        """
+        groups = {('XX.S0..HHZ', 100): (
+            np.arange(3), np.zeros(3, dtype=np.int_), np.ones((3, 100)),
+            np.ones((3, 129), dtype=np.complex128))}
+        bank = _TemplateBank(groups, np.ones(3, dtype=np.int_),
+                             np.full(3, 100))
+        data = pickle.dumps(bank)
+        self.assertLess(len(data), 1000)
+        # pickled several times, written once
+        self.assertEqual(pickle.dumps(bank), data)
+        # within the same process the bank itself is used
+        self.assertIs(pickle.loads(data), bank)
+        # other processes load the file
+        with mock.patch('obspy.signal.cross_correlation._TEMPLATE_BANKS',
+                        {}):
+            loaded = pickle.loads(data)
+        self.assertIsNot(loaded, bank)
+        self.assertEqual(list(loaded.groups), list(groups))
+        for got, expected in zip(loaded.groups['XX.S0..HHZ', 100],
+                                 groups['XX.S0..HHZ', 100]):
+            np.testing.assert_array_equal(got, expected)
+        np.testing.assert_array_equal(loaded.spans, bank.spans)
+        filename = bank._filename
+        self.assertTrue(os.path.exists(filename))
+        loaded.close()
+        self.assertTrue(os.path.exists(filename))
+        bank.close()
+        self.assertFalse(os.path.exists(filename))
+
+    def test_correlate_pairs(self):
+        """
+        Bulk correlation of pairs gives the results of correlate() and
+        xcorr_max() for snippets of different lengths.
+        """
+        rs = np.random.RandomState(42)
+        snippets = {}
+        for event in range(5):
+            for channel in ('Z', 'N'):
+                snippets[event, channel] = rs.randn(rs.choice([50, 51, 64]))
+        snippets[4, 'N'] = Trace(np.zeros(50))
+        pairs = [(i, j, channel) for i in range(5) for j in range(5)
+                 for channel in ('Z', 'N')]
+        for shift in (3, 10, 60):
+            for normalize in ('naive', None):
+                for abs_max in (True, False):
+                    result = correlate_pairs(
+                        snippets, pairs, shift, normalize=normalize,
+                        abs_max=abs_max, batch_size=7, pool=ThreadPool(2))
+                    self.assertEqual(len(result), len(pairs))
+                    for (i, j, channel), row in zip(pairs, result):
+                        cc = correlate(snippets[i, channel],
+                                       snippets[j, channel], shift,
+                                       normalize=normalize, method='fft')
+                        shift_, value = xcorr_max(cc, abs_max=abs_max)
+                        self.assertEqual(row['shift'], shift_)
+                        self.assertAlmostEqual(row['value'], value, 10)
+        # pairs with missing snippets
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            result = correlate_pairs(snippets, [(0, 1, 'Z'), (0, 9, 'Z')], 3)
+        self.assertEqual(len(w), 1)
+        self.assertFalse(np.isnan(result['value'][0]))
+        self.assertTrue(np.all(np.isnan(result[1].tolist())))
+        self.assertEqual(len(correlate_pairs(snippets, [], 3)), 0)
+
+    def test_correlate_pairs_pool_memory_bounded(self):
+        """
+        Pools get the batches in bounded blocks, not all at once.
+        """
+        rs = np.random.RandomState(42)
+        snippets = {(event, 'Z'): rs.randn(50) for event in range(10)}
+        pairs = [(i, j, 'Z') for i in range(10) for j in range(10)]
+        pool = _EagerPool()
+        with mock.patch('obspy.signal.cross_correlation.'
+                        '_CORRELATE_PAIRS_POOL_BLOCK_SIZE', 3):
+            result = correlate_pairs(snippets, pairs, 5, batch_size=7,
+                                     pool=pool)
+        # 15 batches
+        self.assertEqual(pool.sizes, [3, 3, 3, 3, 3])
+        expected = correlate_pairs(snippets, pairs, 5, batch_size=7)
+        np.testing.assert_array_equal(result, expected)
+
+    def test_correlate_pairs_subsample_shift(self):
+        """
+        Subsample shifts of smooth signals and output to a file.
+        """
+        t = np.linspace(-5, 5, 201)
+        snippets = {(k, 'Z'): np.exp(-(t - 0.015 * k) ** 2)
+                    for k in range(3)}
+        pairs = [(0, 1, 'Z'), (0, 2, 'Z'), (2, 0, 'Z')]
+        # demeaning would introduce tails with a kink at zero lag
+        result = correlate_pairs(snippets, pairs, 10, demean=False)
+        np.testing.assert_array_equal(result['shift'], [0, -1, 1])
+        np.testing.assert_allclose(result['subsample_shift'],
+                                   [-0.3, -0.6, 0.6], atol=0.01)
+        self.assertTrue(np.all(result['subsample_value'] >=
+                               result['value']))
+        with NamedTemporaryFile() as tf:
+            self.assertIsNone(correlate_pairs(snippets, pairs, 10,
+                                              demean=False,
+                                              filename=tf.name))
+            got = np.genfromtxt(tf.name, usecols=(3, 4, 5, 6))
+        np.testing.assert_allclose(got, result.tolist(), rtol=1e-12)
+
 
 def suite():
     return unittest.makeSuite(CrossCorrelationTestCase, 'test')
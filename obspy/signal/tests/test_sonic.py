@@ -6,11 +6,14 @@ from future.builtins import *  # NOQA
 
 import io
 import unittest
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 
 from obspy import Stream, Trace, UTCDateTime
+from obspy.core.compatibility import mock
 from obspy.core.util import AttribDict
+from obspy.signal import array_analysis
 from obspy.signal.array_analysis import (array_processing,
                                          array_transff_freqslowness,
                                          array_transff_wavenumber, get_spoint)
@@ -22,7 +25,7 @@ class SonicTestCase(unittest.TestCase):
     Test fk analysis, main function is sonic() in array_analysis.py
     """
 
-    def array_processing(self, prewhiten, method):
+    def array_processing(self, prewhiten, method, **kwargs):
         np.random.seed(2348)
 
         geometry = np.array([[0.0, 0.0, 0.0],
@@ -88,7 +91,7 @@ class SonicTestCase(unittest.TestCase):
 
         args = (st, win_len, step_frac, sll_x, slm_x, sll_y, slm_y, sl_s,
                 semb_thres, vel_thres, frqlow, frqhigh, stime, etime)
-        kwargs = dict(prewhiten=prewhiten, coordsys='xy', verbose=False,
+        kwargs.update(prewhiten=prewhiten, coordsys='xy', verbose=False,
                       method=method)
         out = array_processing(*args, **kwargs)
         if False:  # 1 for debugging
@@ -149,6 +152,37 @@ class SonicTestCase(unittest.TestCase):
         # XXX relative tolerance should be lower!
         self.assertTrue(np.allclose(ref, out[:, 1:], rtol=4e-5))
 
+    def test_sonic_pool(self):
+        """
+        Processing the windows in parallel gives identical results and
+        passes the power maps to the store function in order.
+        """
+        for prewhiten, method in ((0, 0), (1, 1)):
+            maps = []
+            out = self.array_processing(
+                prewhiten=prewhiten, method=method,
+                store=lambda rel, abs_, offset: maps.append(
+                    (rel.copy(), abs_.copy(), offset)))
+            maps_pool = []
+            pool = ThreadPool(3)
+            try:
+                # process the windows in several blocks
+                with mock.patch.object(array_analysis,
+                                       '_ARRAY_PROCESSING_BLOCK_SIZE', 4):
+                    out_pool = self.array_processing(
+                        prewhiten=prewhiten, method=method, pool=pool,
+                        store=lambda rel, abs_, offset: maps_pool.append(
+                            (rel.copy(), abs_.copy(), offset)))
+            finally:
+                pool.close()
+                pool.join()
+            np.testing.assert_array_equal(out, out_pool)
+            self.assertEqual(len(maps), len(out))
+            self.assertEqual([m[2] for m in maps_pool], [m[2] for m in maps])
+            for (rel, abs_, _), (rel2, abs2, _) in zip(maps, maps_pool):
+                np.testing.assert_array_equal(rel, rel2)
+                np.testing.assert_array_equal(abs_, abs2)
+
     def test_get_spoint(self):
         stime = UTCDateTime(1970, 1, 1, 0, 0)
         etime = UTCDateTime(1970, 1, 1, 0, 0) + 10
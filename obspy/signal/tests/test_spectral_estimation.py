@@ -23,7 +23,8 @@ from obspy.core.util.obspy_types import ObsPyException
 from obspy.core.util.testing import (
     ImageComparison, ImageComparisonException, MATPLOTLIB_VERSION)
 from obspy.io.xseed import Parser
-from obspy.signal.spectral_estimation import (PPSD, welch_taper, welch_window)
+from obspy.signal.spectral_estimation import (
+    PPSD, _welch_psd, fft_taper, welch_taper, welch_window)
 
 
 PATH = os.path.join(os.path.dirname(__file__), 'data')
@@ -585,6 +586,60 @@ class PsdTestCase(unittest.TestCase):
             np.testing.assert_array_equal(_times_processed,
                                           ppsd._times_processed)
 
+    def test_ppsd_parallel_and_partials(self):
+        """
+        Test batched and parallel processing in PPSD.add() and merging of
+        independently computed partial PPSDs with PPSD.add_ppsd().
+        """
+        from matplotlib import mlab
+        tr, paz = _get_sample_data()
+        # batched spectra agree with computing them segment by segment
+        data = tr.data[:3 * 8192].reshape(3, -1)
+        specs, freq = _welch_psd(data, 2048, 1536, 100.0)
+        for spec, data_ in zip(specs, data):
+            expected, expected_freq = mlab.psd(
+                data_, 2048, 100.0, detrend=mlab.detrend_linear,
+                window=fft_taper, noverlap=1536, sides='onesided',
+                scale_by_freq=True)
+            np.testing.assert_allclose(spec, expected, rtol=1e-10)
+            np.testing.assert_allclose(freq, expected_freq)
+
+        kwargs = dict(db_bins=(-200, -50, 0.5), ppsd_length=1800.0,
+                      overlap=0)
+        ppsd = PPSD(tr.stats, paz, **kwargs)
+        ppsd.add(tr.copy())
+        self.assertEqual(len(ppsd.times_processed), 5)
+        for executor in ("thread", "process"):
+            ppsd_ = PPSD(tr.stats, paz, **kwargs)
+            ppsd_.add(tr.copy(), workers=2, executor=executor)
+            self.assertEqual(ppsd_._times_processed, ppsd._times_processed)
+            np.testing.assert_array_equal(ppsd_._binned_psds,
+                                          ppsd._binned_psds)
+        # partials of adjacent time spans merge in any order
+        split = tr.stats.starttime + 3600
+        partials = []
+        for tr_ in (tr.slice(endtime=split - tr.stats.delta),
+                    tr.slice(starttime=split)):
+            partial = PPSD(tr.stats, paz, **kwargs)
+            partial.add(tr_.copy())
+            partials.append(partial)
+        for order in (partials, partials[::-1]):
+            merged = PPSD(tr.stats, paz, **kwargs)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter('always')
+                merged.add_ppsd(order)
+            self.assertEqual(len(w), 0)
+            self.assertEqual(merged._times_processed, ppsd._times_processed)
+            np.testing.assert_array_equal(merged._binned_psds,
+                                          ppsd._binned_psds)
+        # adding them again omits all segments
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            merged.add_ppsd(partials[0])
+        self.assertEqual(len(w), 1)
+        self.assertIn("2/2 segments omitted", str(w[0].message))
+        self.assertEqual(len(merged.times_processed), 5)
+
     def test_issue1216(self):
         tr, paz = _get_sample_data()
         st = Stream([tr])
@@ -7,7 +7,10 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import gzip
+from multiprocessing.pool import ThreadPool
 import os
+import shutil
+import tempfile
 import unittest
 import warnings
 from ctypes import ArgumentError
@@ -15,9 +18,11 @@ from ctypes import ArgumentError
 import numpy as np
 
 from obspy import Stream, UTCDateTime, read
+from obspy.clients.filesystem.sds import SDS_FMTSTR, Client
 from obspy.signal.trigger import (
-    ar_pick, classic_sta_lta, classic_sta_lta_py, coincidence_trigger, pk_baer,
-    recursive_sta_lta, recursive_sta_lta_py, trigger_onset)
+    ar_pick, classic_sta_lta, classic_sta_lta_py, coincidence_trigger,
+    coincidence_trigger_chunked, pk_baer, recursive_sta_lta,
+    recursive_sta_lta_py, trigger_onset, _chunked_trigger_onset)
 from obspy.signal.util import clibsignal
 
 
@@ -370,6 +375,107 @@ class TriggerTestCase(unittest.TestCase):
         self.assertAlmostEqual(ev['cft_stds'][3], 4.2723814539487703,
                                places=5)
 
+    def test_coincidence_trigger_chunked(self):
+        """
+        Chunk by chunk processing of data in an SDS archive gives the
+        results of coincidence_trigger() for all data at once.
+        """
+        st = Stream()
+        files = ["BW.UH1._.SHZ.D.2010.147.cut.slist.gz",
+                 "BW.UH2._.SHZ.D.2010.147.cut.slist.gz",
+                 "BW.UH3._.SHZ.D.2010.147.cut.slist.gz",
+                 "BW.UH4._.EHZ.D.2010.147.cut.slist.gz"]
+        for filename in files:
+            st += read(os.path.join(self.path, filename))
+        st.filter('bandpass', freqmin=10, freqmax=20)
+        # a gap during the second event is processed like separate traces
+        t = UTCDateTime("2010-05-27T16:27:00")
+        tr = st.select(station='UH2')[0]
+        st.remove(tr)
+        st += Stream([tr.slice(endtime=t), tr.slice(starttime=t + 20)])
+        st.sort()
+        sds_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, sds_root)
+        for tr in st:
+            filename = os.path.join(sds_root, SDS_FMTSTR.format(
+                year=t.year, doy=t.julday, sds_type='D', **tr.stats))
+            if not os.path.isdir(os.path.dirname(filename)):
+                os.makedirs(os.path.dirname(filename))
+            with open(filename, 'ab') as fh:
+                tr.write(fh, format='MSEED')
+        client = Client(sds_root)
+        trace_ids = {'BW.UH1..SHZ': 1, 'BW.UH2..SHZ': 1, 'BW.UH3..SHZ': 1,
+                     'BW.UH4..EHZ': 2}
+        starttime = min(tr.stats.starttime for tr in st)
+        endtime = max(tr.stats.endtime for tr in st)
+        for trigger_type, kwargs in (
+                ('recstalta', {}), ('classicstalta', {}),
+                ('recstalta', {'max_trigger_length': 3.0,
+                               'delete_long_trigger': True}),
+                ('recstalta', {'max_trigger_length': 2.0,
+                               'trigger_off_extension': 5.0})):
+            expected = coincidence_trigger(
+                trigger_type, 3.5, 1, st.copy(), 3, trace_ids=trace_ids,
+                details=True, sta=0.5, lta=10, **kwargs)
+            self.assertGreater(len(expected), 1)
+            for chunk_length, pool in ((13.37, None), (60, ThreadPool(2)),
+                                       (1e4, None)):
+                got = coincidence_trigger_chunked(
+                    trigger_type, 3.5, 1, client, trace_ids, starttime,
+                    endtime, 3, chunk_length=chunk_length, details=True,
+                    pool=pool, sta=0.5, lta=10, **kwargs)
+                got = list(got)
+                # characteristic functions are equal within precision
+                keys = ['cft_peaks', 'cft_stds', 'cft_peak_wmean',
+                        'cft_std_wmean']
+                for event, expected_event in zip(got, expected):
+                    for key in keys:
+                        np.testing.assert_allclose(
+                            event.pop(key), expected_event[key], rtol=1e-8)
+                self.assertEqual(
+                    got, [{key: value for key, value in event.items()
+                           if key not in keys} for event in expected])
+        self.assertRaises(ValueError, coincidence_trigger_chunked,
+                          'zdetect', 3.5, 1, client, trace_ids, starttime,
+                          endtime, 3, nsta=10)
+
+    def test_chunked_trigger_onset(self):
+        """
+        Single station triggers of a characteristic function processed chunk
+        by chunk are those of trigger_onset() for all of it, the state
+        does not grow with the length of a trigger.
+        """
+        for max_len, delete in ((1e6, False), (30, False), (30, True)):
+            for cft in (np.repeat(np.random.rand(200) * 4, 5),
+                        np.full(1000, 3.0)):
+                expected = []
+                for on, off in trigger_onset(cft, 2.5, 1.5, max_len=max_len,
+                                             max_len_delete=delete):
+                    try:
+                        expected.append((on, off, cft[on:off].max(),
+                                         cft[on:off].std()))
+                    except ValueError:
+                        expected.append((on, off, cft[on], 0))
+                state = dict(reference=UTCDateTime(0), sampling_rate=1.0,
+                             next=0, previous=np.nan, trigger=None,
+                             last_off=-1)
+                got = []
+                for i in range(0, len(cft), 7):
+                    got += _chunked_trigger_onset(
+                        state, 'X', cft[i:i + 7], 2.5, 1.5, max_len, delete,
+                        final=False)
+                    for value in state.values():
+                        self.assertNotIsInstance(value, np.ndarray)
+                got += _chunked_trigger_onset(
+                    state, 'X', np.zeros(0), 2.5, 1.5, max_len, delete,
+                    final=True)
+                self.assertEqual([(on, off) for on, off, _, _, _ in got],
+                                 [(on, off) for on, off, _, _ in expected])
+                np.testing.assert_allclose(
+                    np.reshape([trigger[3:] for trigger in got], (-1, 2)),
+                    np.reshape([trigger[2:] for trigger in expected],
+                               (-1, 2)), rtol=1e-10, atol=1e-12)
+
     def test_coincidence_trigger_with_similarity_checking(self):
         """
         Test network coincidence trigger with cross correlation similarity
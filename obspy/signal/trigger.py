@@ -29,13 +29,16 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import bisect
 from collections import deque
 import ctypes as C
+from itertools import islice
 import warnings
 
 import numpy as np
+from scipy.signal import lfilter
 
-from obspy import UTCDateTime
+from obspy import Stream, UTCDateTime
 from obspy.signal.cross_correlation import templates_max_similarity
 from obspy.signal.headers import clibsignal, head_stalta_t
 
@@ -111,6 +114,47 @@ def recursive_sta_lta_py(a, nsta, nlta):
     return np.array(charfct)
 
 
+def _recursive_sta_lta(data, npts, nsta, nlta, sta, lta, count):
+    """
+    Recursive STA/LTA of packets of multiple channels.
+
+    :type data: :class:`numpy.ndarray`
+    :param data: Packets of all channels, shape ``(channels, samples)``. Rows
+        shorter than ``samples`` are padded at the end.
+    :type npts: :class:`numpy.ndarray`
+    :param npts: Number of valid samples of each row.
+    :type sta: :class:`numpy.ndarray`
+    :param sta: Short time average of each channel before the packet.
+    :type lta: :class:`numpy.ndarray`
+    :param lta: Long time average of each channel before the packet.
+    :type count: :class:`numpy.ndarray`
+    :param count: Number of samples of each channel before the packet.
+    :return: Characteristic function and the new ``sta``, ``lta`` and
+        ``count`` of each channel.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if not data.shape[1]:
+        return data.copy(), sta, lta, count
+    squared = data * data
+    # like recursive_sta_lta(), the first sample of a channel is skipped
+    squared[count == 0, 0] = 0.0
+    csta = 1.0 / nsta
+    clta = 1.0 / nlta
+    sta_ = lfilter([csta], [1.0, -(1.0 - csta)], squared, axis=1,
+                   zi=((1.0 - csta) * np.asarray(sta))[:, np.newaxis])[0]
+    lta_ = lfilter([clta], [1.0, -(1.0 - clta)], squared, axis=1,
+                   zi=((1.0 - clta) * np.asarray(lta))[:, np.newaxis])[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        charfct = sta_ / lta_
+    index = np.asarray(count)[:, np.newaxis] + np.arange(data.shape[1])
+    charfct[index < nlta] = 0.0
+    last = np.asarray(npts) - 1
+    rows = np.arange(data.shape[0])
+    sta = np.where(last >= 0, sta_[rows, last], sta)
+    lta = np.where(last >= 0, lta_[rows, last], lta)
+    return charfct, sta, lta, np.asarray(count) + npts
+
+
 def carl_sta_trig(a, nsta, nlta, ratio, quiet):
     """
     Computes the carlSTAtrig characteristic function.
@@ -532,6 +576,64 @@ def plot_trigger(trace, cft, thr_on, thr_off, show=True):
         plt.show()
 
 
+def _get_coincidence_event(triggers, trace_ids, trigger_off_extension,
+                           details):
+    """
+    Compile the coincidence trigger starting with the first of the
+    chronologically sorted single station triggers and all triggers
+    overlapping with it.
+
+    :returns: The event, its on time and its off time as timestamps.
+    """
+    on, off, tr_id, cft_peak, cft_std = triggers[0]
+    event = {}
+    event['time'] = UTCDateTime(on)
+    event['stations'] = [tr_id.split(".")[1]]
+    event['trace_ids'] = [tr_id]
+    event['coincidence_sum'] = float(trace_ids[tr_id])
+    event['similarity'] = {}
+    if details:
+        event['cft_peaks'] = [cft_peak]
+        event['cft_stds'] = [cft_std]
+    # compile the list of stations that overlap with the current trigger
+    for trigger in islice(triggers, 1, None):
+        tmp_on, tmp_off, tmp_tr_id, tmp_cft_peak, tmp_cft_std = trigger
+        tmp_sta = tmp_tr_id.split(".")[1]
+        # skip retriggering of already present station in current
+        # coincidence trigger
+        if tmp_tr_id in event['trace_ids']:
+            continue
+        # check for overlapping trigger,
+        # break if there is a gap in between the two triggers
+        if tmp_on > off + trigger_off_extension:
+            break
+        event['stations'].append(tmp_sta)
+        event['trace_ids'].append(tmp_tr_id)
+        event['coincidence_sum'] += trace_ids[tmp_tr_id]
+        if details:
+            event['cft_peaks'].append(tmp_cft_peak)
+            event['cft_stds'].append(tmp_cft_std)
+        # allow sets of triggers that overlap only on subsets of all
+        # stations (e.g. A overlaps with B and B overlaps w/ C => ABC)
+        off = max(off, tmp_off)
+    return event, on, off
+
+
+def _finish_coincidence_event(event, on, off, trace_ids, details):
+    """
+    Add duration and weighted means of the details to an accepted
+    coincidence trigger.
+    """
+    event['duration'] = off - on
+    if details:
+        weights = np.array([trace_ids[i] for i in event['trace_ids']])
+        weighted_values = np.array(event['cft_peaks']) * weights
+        event['cft_peak_wmean'] = weighted_values.sum() / weights.sum()
+        weighted_values = np.array(event['cft_stds']) * weights
+        event['cft_std_wmean'] = \
+            (np.array(event['cft_stds']) * weights).sum() / weights.sum()
+
+
 def coincidence_trigger(trigger_type, thr_on, thr_off, stream,
                         thr_coincidence_sum, trace_ids=None,
                         max_trigger_length=1e6, delete_long_trigger=False,
@@ -680,50 +782,16 @@ def coincidence_trigger(trigger_type, thr_on, thr_off, stream,
     coincidence_triggers = []
     last_off_time = 0.0
     while triggers != []:
-        # remove first trigger from list and look for overlaps
-        on, off, tr_id, cft_peak, cft_std = triggers.pop(0)
-        sta = tr_id.split(".")[1]
-        event = {}
-        event['time'] = UTCDateTime(on)
-        event['stations'] = [tr_id.split(".")[1]]
-        event['trace_ids'] = [tr_id]
-        event['coincidence_sum'] = float(trace_ids[tr_id])
-        event['similarity'] = {}
-        if details:
-            event['cft_peaks'] = [cft_peak]
-            event['cft_stds'] = [cft_std]
-        # evaluate maximum similarity for station if event templates were
+        # look for overlaps with the first trigger and remove it from list
+        event, on, off = _get_coincidence_event(
+            triggers, trace_ids, trigger_off_extension, details)
+        triggers.pop(0)
+        # evaluate maximum similarity for stations if event templates were
         # provided
-        templates = event_templates.get(sta)
-        if templates:
-            event['similarity'][sta] = \
-                templates_max_similarity(stream, event['time'], templates)
-        # compile the list of stations that overlap with the current trigger
-        for trigger in triggers:
-            tmp_on, tmp_off, tmp_tr_id, tmp_cft_peak, tmp_cft_std = trigger
-            tmp_sta = tmp_tr_id.split(".")[1]
-            # skip retriggering of already present station in current
-            # coincidence trigger
-            if tmp_tr_id in event['trace_ids']:
-                continue
-            # check for overlapping trigger,
-            # break if there is a gap in between the two triggers
-            if tmp_on > off + trigger_off_extension:
-                break
-            event['stations'].append(tmp_sta)
-            event['trace_ids'].append(tmp_tr_id)
-            event['coincidence_sum'] += trace_ids[tmp_tr_id]
-            if details:
-                event['cft_peaks'].append(tmp_cft_peak)
-                event['cft_stds'].append(tmp_cft_std)
-            # allow sets of triggers that overlap only on subsets of all
-            # stations (e.g. A overlaps with B and B overlaps w/ C => ABC)
-            off = max(off, tmp_off)
-            # evaluate maximum similarity for station if event templates were
-            # provided
-            templates = event_templates.get(tmp_sta)
+        for sta in event['stations']:
+            templates = event_templates.get(sta)
             if templates:
-                event['similarity'][tmp_sta] = \
+                event['similarity'][sta] = \
                     templates_max_similarity(stream, event['time'], templates)
         # skip if both coincidence sum and similarity thresholds are not met
         if event['coincidence_sum'] < thr_coincidence_sum:
@@ -736,19 +804,378 @@ def coincidence_trigger(trigger_type, thr_on, thr_off, stream,
         # (determined by a shared off-time, this is a bit sloppy)
         if off <= last_off_time:
             continue
-        event['duration'] = off - on
-        if details:
-            weights = np.array([trace_ids[i] for i in event['trace_ids']])
-            weighted_values = np.array(event['cft_peaks']) * weights
-            event['cft_peak_wmean'] = weighted_values.sum() / weights.sum()
-            weighted_values = np.array(event['cft_stds']) * weights
-            event['cft_std_wmean'] = \
-                (np.array(event['cft_stds']) * weights).sum() / weights.sum()
+        _finish_coincidence_event(event, on, off, trace_ids, details)
         coincidence_triggers.append(event)
         last_off_time = off
     return coincidence_triggers
 
 
+def _chunked_characteristic_function(data, state, trigger_type, options):
+    """
+    Characteristic function of the next samples of a continuous segment of
+    data, continuing the calculation with the state of the previous
+    samples.
+    """
+    if trigger_type is None:
+        return data
+    nsta, nlta = options['nsta'], options['nlta']
+    if trigger_type == 'recstalta':
+        charfct, sta, lta, count = _recursive_sta_lta(
+            data[np.newaxis, :], np.array([len(data)]), nsta, nlta,
+            state['sta'], state['lta'], np.array([state['next']]))
+        state['sta'], state['lta'] = sta, lta
+        return charfct[0]
+    # classic STA/LTA of the last nlta samples of the previous data and the
+    # new data, exactly the values of the complete segment
+    history = state['history']
+    data = np.concatenate([history, data])
+    state['history'] = data[-nlta:]
+    if len(data) < nlta:
+        return np.zeros(len(data) - len(history))
+    return classic_sta_lta(data, nsta, nlta)[len(history):]
+
+
+def _add_trigger_values(trigger, values):
+    """
+    Add values of the characteristic function to the running peak, mean
+    and sum of squared deviations of an open single station trigger.
+    """
+    if not len(values):
+        return
+    count = trigger['count'] + len(values)
+    mean = values.mean()
+    delta = mean - trigger['mean']
+    trigger['m2'] += ((values - mean) ** 2).sum() + \
+        delta ** 2 * trigger['count'] * len(values) / count
+    trigger['mean'] += delta * len(values) / count
+    trigger['count'] = count
+    trigger['peak'] = max(trigger['peak'], values.max())
+
+
+def _chunked_trigger_onset(state, trace_id, charfct, thr_on, thr_off,
+                           max_trigger_length, delete_long_trigger, final):
+    """
+    Single station triggers of the next samples of the characteristic
+    function of a segment, like :func:`trigger_onset` for the whole
+    segment at once.
+
+    Only the last value of the characteristic function, the end of the
+    last trigger and, for an open trigger, the start and the running peak,
+    mean and sum of squared deviations (over all samples but the last one)
+    are kept in the state. The open trigger is completed at the end of the
+    segment (``final``).
+    """
+    sampling_rate = state['sampling_rate']
+    max_len = int(max_trigger_length * sampling_rate + 0.5)
+    # index of the previous value of the characteristic function
+    base = state['next'] - 1
+    charfct = np.concatenate([[state['previous']], charfct])
+    # the previous value is NaN at the start of a segment
+    with np.errstate(invalid='ignore'):
+        above_on = charfct > thr_on
+        above_off = np.nonzero(charfct > thr_off)[0]
+        below_off = np.nonzero(charfct <= thr_off)[0]
+    # starts of periods above thr_on
+    starts = np.nonzero(above_on[1:] & ~above_on[:-1])[0] + 1
+    trigger = state['trigger']
+    triggers = []
+
+    def _emit(on, off):
+        if trigger['count']:
+            cft_peak = trigger['peak']
+            cft_std = np.sqrt(trigger['m2'] / trigger['count'])
+        else:
+            cft_peak = trigger['on_value']
+            cft_std = 0
+        on = state['reference'] + float(on) / sampling_rate
+        off = state['reference'] + float(off) / sampling_rate
+        triggers.append((on.timestamp, off.timestamp, trace_id, cft_peak,
+                         cft_std))
+
+    pos = 1
+    while True:
+        if trigger is None:
+            # a new trigger starts after the end of the last one
+            i = np.searchsorted(starts, max(pos, state['last_off'] - base + 1))
+            if i == len(starts):
+                break
+            pos = starts[i]
+            trigger = dict(on=base + pos, on_value=charfct[pos], count=0,
+                           mean=0.0, m2=0.0, peak=-np.inf, armed=False,
+                           too_long=False)
+        on = trigger['on'] - base
+        if not trigger['armed']:
+            i = np.searchsorted(above_off, pos)
+            if i == len(above_off):
+                pos = len(charfct)
+            else:
+                trigger['armed'] = True
+                pos = above_off[i] + 1
+        # first value below thr_off after the trigger is armed, i.e. the
+        # trigger ends at the value before
+        end = None
+        if trigger['armed']:
+            i = np.searchsorted(below_off, pos)
+            if i < len(below_off):
+                end = below_off[i]
+        limit = on + max_len + 1
+        if not trigger['too_long']:
+            trigger['too_long'] = limit < (
+                len(charfct) if end is None else end)
+        if trigger['too_long'] and not delete_long_trigger:
+            # cut at the maximum length
+            _add_trigger_values(trigger, charfct[max(on, 0):limit - 1])
+            _emit(base + on, base + on + max_len)
+            state['last_off'] = base + on + max_len
+            trigger = None
+            pos = limit
+        elif end is not None:
+            if not trigger['too_long']:
+                _add_trigger_values(trigger, charfct[max(on, 0):end - 1])
+                _emit(base + on, base + end - 1)
+            state['last_off'] = base + end - 1
+            trigger = None
+            pos = end
+        else:
+            if not trigger['too_long']:
+                _add_trigger_values(trigger, charfct[max(on, 0):-1])
+            break
+    if final and trigger is not None and trigger['armed'] and \
+            not trigger['too_long']:
+        # the trigger ends with the segment
+        _emit(trigger['on'], base + len(charfct) - 1)
+        trigger = None
+    state['trigger'] = trigger
+    state['previous'] = charfct[-1]
+    state['next'] += len(charfct) - 1
+    return triggers
+
+
+def _coincidence_trigger_chunk(args):
+    """
+    Single station triggers of one channel in one chunk of time for
+    :func:`coincidence_trigger_chunked`.
+
+    :returns: The new state of the channel and the completed triggers.
+    """
+    (client, trace_id, starttime, endtime, state, trigger_type, options,
+     thr_on, thr_off, max_trigger_length, delete_long_trigger, final) = args
+    state = dict(state)
+    triggers = []
+
+    def _end_segment():
+        if state.get('reference') is not None:
+            triggers.extend(_chunked_trigger_onset(
+                state, trace_id, np.zeros(0), thr_on, thr_off,
+                max_trigger_length, delete_long_trigger, final=True))
+        state['reference'] = None
+
+    try:
+        st = client.get_waveforms(*(trace_id.split('.') +
+                                    [starttime, endtime]))
+    except Exception as e:
+        # FDSN clients raise if there is no data
+        from obspy.clients.fdsn.header import FDSNNoDataException
+        if not isinstance(e, FDSNNoDataException):
+            raise
+        st = Stream()
+    st = st.select(id=trace_id)
+    if len(st) > 1:
+        # continuous pieces of data without overlaps
+        st.sort(['starttime'])
+        st.merge(method=1)
+        st = st.split()
+    for tr in st:
+        sampling_rate = tr.stats.sampling_rate
+        data = tr.data
+        if state.get('reference') is not None and \
+                sampling_rate == state['sampling_rate']:
+            index = int(round((tr.stats.starttime - state['reference']) *
+                              sampling_rate))
+            # samples of the previous chunk are skipped
+            if index <= state['next']:
+                data = data[state['next'] - index:]
+            else:
+                _end_segment()
+        else:
+            _end_segment()
+        if state['reference'] is None:
+            # start of a new continuous segment, processed like a separate
+            # trace
+            state.update(reference=tr.stats.starttime,
+                         sampling_rate=sampling_rate, next=0,
+                         previous=np.nan, trigger=None, last_off=-1,
+                         sta=np.zeros(1), lta=np.zeros(1),
+                         history=np.zeros(0))
+        if not len(data):
+            continue
+        opts = dict(options)
+        for key in ['sta', 'lta']:
+            if key in opts:
+                opts['n%s' % (key)] = int(opts.pop(key) * sampling_rate)
+        charfct = _chunked_characteristic_function(
+            np.require(data, dtype=np.float64), state, trigger_type, opts)
+        triggers.extend(_chunked_trigger_onset(
+            state, trace_id, charfct, thr_on, thr_off, max_trigger_length,
+            delete_long_trigger, final=False))
+    # segments are complete at the end and if data ends within the chunk
+    if state.get('reference') is not None and (final or (
+            state['reference'] + (state['next'] + 0.5) /
+            state['sampling_rate'] < endtime)):
+        _end_segment()
+    return state, triggers
+
+
+def coincidence_trigger_chunked(trigger_type, thr_on, thr_off, client,
+                                trace_ids, starttime, endtime,
+                                thr_coincidence_sum, chunk_length=3600,
+                                max_trigger_length=1e6,
+                                delete_long_trigger=False,
+                                trigger_off_extension=0, details=False,
+                                pool=None, **options):
+    """
+    Perform a network coincidence trigger on long time spans of data from a
+    client, chunk by chunk.
+
+    Works like :func:`coincidence_trigger` but requests the data chunk by
+    chunk from a client, e.g. an SDS archive
+    (:class:`obspy.clients.filesystem.sds.Client`) or an FDSN web service
+    (:class:`obspy.clients.fdsn.client.Client`). The state of the
+    characteristic functions and of the single station triggers is carried
+    over to the next chunk, so the results do not depend on the chunk
+    length and are the same as those of :func:`coincidence_trigger` for the
+    whole time span at once (with gaps, continuous pieces of data are
+    processed like separate traces). Coincidence triggers are returned as
+    soon as they are complete, the memory usage does not depend on the
+    length of the time span.
+
+    Only the characteristic functions that can be continued exactly are
+    supported. The data is used as returned by the client, i.e. unfiltered.
+
+    :param trigger_type: ``'recstalta'``, ``'classicstalta'`` or ``None``
+        if the client returns precomputed characteristic functions, see
+        :func:`coincidence_trigger`.
+    :type trigger_type: str or None
+    :type thr_on: float
+    :param thr_on: threshold for switching single station trigger on
+    :type thr_off: float
+    :param thr_off: threshold for switching single station trigger off
+    :param client: Client with a ``get_waveforms(network, station,
+        location, channel, starttime, endtime)`` method.
+    :type trace_ids: list or dict
+    :param trace_ids: Trace IDs to request and use in the network
+        coincidence sum, optionally with weights, see
+        :func:`coincidence_trigger`.
+    :type starttime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+    :param starttime: Start of the time span.
+    :type endtime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+    :param endtime: End of the time span.
+    :type thr_coincidence_sum: int or float
+    :param thr_coincidence_sum: Threshold for coincidence sum, see
+        :func:`coincidence_trigger`.
+    :type chunk_length: float
+    :param chunk_length: Length of the requested chunks of data in seconds.
+    :type max_trigger_length: int or float
+    :param max_trigger_length: See :func:`coincidence_trigger`.
+    :type delete_long_trigger: bool
+    :param delete_long_trigger: See :func:`coincidence_trigger`.
+    :type trigger_off_extension: int or float
+    :param trigger_off_extension: See :func:`coincidence_trigger`.
+    :type details: bool
+    :param details: See :func:`coincidence_trigger`.
+    :param pool: Pool of workers to request the data and run the single
+        station triggers of all channels of a chunk in parallel, i.e.
+        anything with a ``map`` method like
+        :class:`multiprocessing.pool.ThreadPool` or
+        :class:`multiprocessing.Pool` (the client has to be picklable).
+    :param options: Keyword arguments of the trigger, e.g. ``sta`` and
+        ``lta`` in seconds, see :func:`coincidence_trigger`.
+    :returns: Generator yielding the coincidence triggers chronologically.
+
+    .. rubric:: Example
+
+    >>> from obspy import UTCDateTime
+    >>> from obspy.clients.filesystem.sds import Client
+    >>> client = Client("/path/to/SDS")  # doctest: +SKIP
+    >>> t = UTCDateTime(2018, 1, 1)
+    >>> for event in coincidence_trigger_chunked(
+    ...         "recstalta", 3.5, 1, client,
+    ...         ["BW.UH1..SHZ", "BW.UH2..SHZ", "BW.UH3..SHZ"],
+    ...         t, t + 30 * 86400, 2, sta=0.5, lta=10):  # doctest: +SKIP
+    ...     print(event['time'], event['stations'])
+    """
+    if trigger_type is not None:
+        trigger_type = trigger_type.lower()
+    if trigger_type not in (None, 'recstalta', 'classicstalta'):
+        msg = ("Chunked coincidence trigger only supports trigger types "
+               "'recstalta', 'classicstalta' and None.")
+        raise ValueError(msg)
+    # we always work with a dictionary with trace ids and their weights
+    if isinstance(trace_ids, list) or isinstance(trace_ids, tuple):
+        trace_ids = dict.fromkeys(trace_ids, 1)
+    if chunk_length <= 0:
+        raise ValueError("chunk_length must be positive.")
+    return _coincidence_trigger_chunked(
+        trigger_type, thr_on, thr_off, client, trace_ids, starttime,
+        endtime, thr_coincidence_sum, chunk_length, max_trigger_length,
+        delete_long_trigger, trigger_off_extension, details, pool, options)
+
+
+def _coincidence_trigger_chunked(trigger_type, thr_on, thr_off, client,
+                                 trace_ids, starttime, endtime,
+                                 thr_coincidence_sum, chunk_length,
+                                 max_trigger_length, delete_long_trigger,
+                                 trigger_off_extension, details, pool,
+                                 options):
+    """
+    Generator doing the work of :func:`coincidence_trigger_chunked`.
+    """
+    ids = sorted(trace_ids)
+    states = [{} for _ in ids]
+    # chronologically sorted single station triggers not yet evaluated
+    triggers = []
+    last_off_time = 0.0
+    t1 = starttime
+    while t1 < endtime:
+        t2 = min(t1 + chunk_length, endtime)
+        final = t2 >= endtime
+        tasks = [(client, trace_id, t1, t2, state, trigger_type, options,
+                  thr_on, thr_off, max_trigger_length, delete_long_trigger,
+                  final) for trace_id, state in zip(ids, states)]
+        if pool is None:
+            results = list(map(_coincidence_trigger_chunk, tasks))
+        else:
+            results = pool.map(_coincidence_trigger_chunk, tasks)
+        # single station triggers starting before this time are all known
+        known = t2.timestamp
+        for i, (state, new_triggers) in enumerate(results):
+            states[i] = state
+            for trigger in new_triggers:
+                bisect.insort(triggers, trigger)
+            if state.get('reference') is not None and \
+                    state['trigger'] is not None:
+                known = min(known, (state['reference'] + float(
+                    state['trigger']['on']) / state['sampling_rate']
+                ).timestamp)
+        while triggers:
+            event, on, off = _get_coincidence_event(
+                triggers, trace_ids, trigger_off_extension, details)
+            # later triggers could still overlap
+            if not final and off + trigger_off_extension >= known:
+                break
+            triggers.pop(0)
+            if event['coincidence_sum'] < thr_coincidence_sum:
+                continue
+            # skip coincidence trigger if it is just a subset of the previous
+            # (determined by a shared off-time, this is a bit sloppy)
+            if off <= last_off_time:
+                continue
+            _finish_coincidence_event(event, on, off, trace_ids, details)
+            last_off_time = off
+            yield event
+        t1 = t2
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
@@ -25,10 +25,12 @@ Models can be initialized by specifying the name of a model provided by ObsPy.
 >>> from obspy.taup import TauPyModel
 >>> model = TauPyModel(model="iasp91")
 
-Model initialization is a fairly expensive operation so make sure to do it only
-if necessary. Custom built models can be initialized by specifying an absolute
-path to a model in ObsPy's ``.npz`` model format instead of just a model name.
-See below for information on how to build a ``.npz`` model file.
+Model initialization is cheap after a model has been used once: a flat copy of
+the model is memory mapped (see :mod:`obspy.taup.flat_model`), so processes
+using the same model share its memory. Custom built models can be initialized
+by specifying an absolute path to a model in ObsPy's ``.npz`` model format or
+a flat model file instead of just a model name. See below for information on
+how to build a ``.npz`` model file.
 
 ObsPy currently ships with the following 1D velocity models:
 
@@ -420,6 +422,28 @@ depth to an interface involved in an interaction.
     So ``ttp`` gives you the phase list corresponding to ``P`` in ``ttimes``.
     Similarly there are ``tts``, ``ttp+``, ``tts+``, ``ttbasic`` and ``ttall``.
 
+Travel Time Grids
+^^^^^^^^^^^^^^^^^
+
+For large numbers of travel time queries (e.g. when locating events) a table
+of first arrival travel times can be precomputed once with
+:meth:`~obspy.taup.tau.TauPyModel.create_travel_time_grid`. The resulting
+:class:`~obspy.taup.travel_time_grid.TravelTimeGrid` can be saved to disk,
+is memory mapped when loading it again and interpolates travel times for whole
+arrays of source depths and distances at once.
+
+>>> grid = model.create_travel_time_grid(
+...     source_depths_in_km=[0, 50, 100], distances_in_degree=range(20, 31),
+...     phase_list=["P"])
+>>> grid.save("iasp91_P.npz")  # doctest: +SKIP
+>>> from obspy.taup import TravelTimeGrid
+>>> grid = TravelTimeGrid.load("iasp91_P.npz")  # doctest: +SKIP
+>>> times = grid.get_travel_times(source_depth_in_km=[10, 75],
+...                              distance_in_degree=[20.5, 27.25],
+...                              phase="P")
+>>> print("%.1f s, %.1f s" % tuple(times))
+278.4 s, 337.0 s
+
 Building custom models
 ----------------------
 
@@ -451,6 +475,7 @@ _DEFAULT_VALUES = {
 from .tau import TauPyModel  # NOQA
 from .tau import plot_travel_times  # NOQA
 from .tau import plot_ray_paths  # NOQA
+from .travel_time_grid import TravelTimeGrid  # NOQA
 
 if __name__ == '__main__':
     import doctest
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Pluggable caches for depth corrected tau models.
+
+Splitting a :class:`~obspy.taup.tau_model.TauModel` at the source depth is
+the most expensive part of setting up a travel time calculation for a new
+source depth. By default every model keeps the last 128 depth corrected
+models in memory. A :class:`DiskDepthCache` additionally stores them in a
+directory so that they survive the process and are shared by all processes
+(e.g. the workers of a process pool) using the same directory.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from collections import OrderedDict
+import hashlib
+import os
+import tempfile
+
+from .flat_model import FLAT_MODEL_EXTENSION, read_flat_arrays
+from .utils import get_cache_directory, make_private_directory
+
+
+# bump if the stored depth corrected models change
+DEPTH_CACHE_VERSION = 2
+
+
+def _get_model_hash(tau_model):
+    """
+    Returns a hash of the content of a (surface source) tau model.
+    """
+    try:
+        return tau_model.__dict__['_model_hash']
+    except KeyError:
+        pass
+    sha1 = hashlib.sha1()
+    v_mod = tau_model.s_mod.v_mod
+    sha1.update(("%d %s %r" % (DEPTH_CACHE_VERSION, v_mod.model_name,
+                               float(tau_model.radius_of_planet))).encode())
+    for arr in (tau_model.ray_params, tau_model.s_mod.p_layers,
+                tau_model.s_mod.s_layers, v_mod.layers):
+        sha1.update(arr.tobytes())
+    model_hash = sha1.hexdigest()
+    tau_model.__dict__['_model_hash'] = model_hash
+    return model_hash
+
+
+class DepthCache(object):
+    """
+    Base class for caches of depth corrected tau models.
+
+    Pass an instance of a subclass as ``cache`` to
+    :class:`~obspy.taup.tau.TauPyModel` to use it. Subclasses have to
+    implement :meth:`get` and :meth:`put`.
+    """
+    def get(self, tau_model, depth):
+        """
+        Returns the cached model of ``tau_model`` corrected for a source at
+        ``depth`` or ``None`` if it is not cached.
+
+        :type tau_model: :class:`~obspy.taup.tau_model.TauModel`
+        :param tau_model: Model for a surface source.
+        :type depth: float
+        :param depth: Source depth in km.
+        """
+        raise NotImplementedError
+
+    def put(self, tau_model, depth, depth_corrected_model):
+        """
+        Stores the model of ``tau_model`` corrected for a source at
+        ``depth``.
+
+        :type tau_model: :class:`~obspy.taup.tau_model.TauModel`
+        :param tau_model: Model for a surface source.
+        :type depth: float
+        :param depth: Source depth in km.
+        :type depth_corrected_model: :class:`~obspy.taup.tau_model.TauModel`
+        :param depth_corrected_model: The depth corrected model.
+        """
+        raise NotImplementedError
+
+    def __deepcopy__(self, memo):
+        # models are deep copied when split, caches are shared
+        return self
+
+
+class DiskDepthCache(DepthCache):
+    """
+    Persistent cache of depth corrected tau models in a directory.
+
+    Models are stored as flat model files (see :mod:`obspy.taup.flat_model`)
+    named after a hash of the model content and the source depth, loading
+    them is much faster than splitting the model again. Files are written
+    atomically, so any number of processes can share a directory. The least
+    recently used files are deleted when the total size exceeds
+    ``max_size``. Recently used models are also kept in memory.
+
+    The directory must only be writable by the current user, see
+    :func:`~obspy.taup.utils.make_private_directory`.
+
+    :type path: str
+    :param path: Directory of the cache, created with permissions for the
+        current user only if it does not exist. Defaults to a per-user cache
+        directory (``~/.cache/obspy/taup/depth_cache``, see
+        :func:`~obspy.taup.utils.get_cache_directory`).
+    :type max_size: int
+    :param max_size: Maximum total size of all files in the directory in
+        bytes.
+    :type max_entries_in_memory: int
+    :param max_entries_in_memory: Number of models additionally kept in
+        memory by each process.
+
+    >>> from obspy.taup import TauPyModel
+    >>> from obspy.taup.depth_cache import DiskDepthCache
+    >>> model = TauPyModel("iasp91", cache=DiskDepthCache())
+    >>> arrivals = model.get_travel_times(33.3, 50.0, ["P"])
+    """
+    def __init__(self, path=None, max_size=500 * 1024 ** 2,
+                 max_entries_in_memory=128):
+        if path is None:
+            path = get_cache_directory("depth_cache")
+        self.path = path
+        self.max_size = max_size
+        self.max_entries_in_memory = max_entries_in_memory
+        self._memory = OrderedDict()
+        # refuses directories other users can write to
+        make_private_directory(self.path)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the in-memory part is local to each process
+        state['_memory'] = OrderedDict()
+        return state
+
+    def _get_filename(self, tau_model, depth):
+        return os.path.join(self.path, "%s_%s%s" % (
+            _get_model_hash(tau_model), float(depth).hex(),
+            FLAT_MODEL_EXTENSION))
+
+    def get(self, tau_model, depth):
+        from .tau_model import TauModel
+        filename = self._get_filename(tau_model, depth)
+        try:
+            value = self._memory.pop(filename)
+        except KeyError:
+            try:
+                # only ever read the flat format, it contains no code
+                value = TauModel._from_arrays(read_flat_arrays(filename),
+                                              cache=False)
+            except (IOError, OSError):
+                return None
+            except Exception:
+                # incomplete or corrupt file, will be replaced
+                self._remove(filename)
+                return None
+            try:
+                # mark as recently used for the eviction
+                os.utime(filename, None)
+            except OSError:
+                pass
+        self._remember(filename, value)
+        return value
+
+    def put(self, tau_model, depth, depth_corrected_model):
+        filename = self._get_filename(tau_model, depth)
+        fd, tmp_filename = tempfile.mkstemp(suffix=".tmp", dir=self.path)
+        os.close(fd)
+        try:
+            depth_corrected_model.serialize(tmp_filename, flat=True)
+            # atomic, so other processes never read partially written files
+            getattr(os, "replace", os.rename)(tmp_filename, filename)
+        except Exception:
+            self._remove(tmp_filename)
+            raise
+        self._remember(filename, depth_corrected_model)
+        self._evict()
+
+    def _remember(self, filename, value):
+        self._memory[filename] = value
+        while len(self._memory) > self.max_entries_in_memory:
+            self._memory.popitem(last=False)
+
+    def _remove(self, filename):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """
+        Deletes the least recently used files until the total size of the
+        cache directory is below ``max_size``.
+        """
+        files = []
+        for name in os.listdir(self.path):
+            if not name.endswith(FLAT_MODEL_EXTENSION):
+                continue
+            filename = os.path.join(self.path, name)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                # removed by another process in the meantime
+                continue
+            files.append((stat.st_mtime, stat.st_size, filename))
+        total = sum(size for _, size, _ in files)
+        for _, size, filename in sorted(files):
+            if total <= self.max_size:
+                break
+            self._remove(filename)
+            self._memory.pop(filename, None)
+            total -= size
+
+    def clear(self):
+        """
+        Removes all models from the cache.
+        """
+        self._memory.clear()
+        for name in os.listdir(self.path):
+            if name.endswith(FLAT_MODEL_EXTENSION):
+                self._remove(os.path.join(self.path, name))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Flat, memory mappable tau model files.
+
+Loading a :class:`~obspy.taup.tau_model.TauModel` from the compressed
+``.npz`` model files requires decompressing and parsing dozens of arrays,
+which dominates the start up time of short running scripts and of every new
+worker process. Flat model files contain the same arrays uncompressed in a
+single file with one small header. The arrays are memory mapped read-only,
+so reading a model is almost instant and all processes using the same file
+share its memory.
+
+The files start with the magic bytes ``OBSPYTAU``, followed by the format
+version and the length of the UTF-8 encoded JSON header as little endian
+unsigned 32 bit integers. The header lists name, dtype, shape and offset of
+all arrays. The array data follows, every array aligned to 64 bytes.
+
+Flat copies of the ``.npz`` models are created automatically when they are
+first used by :meth:`~obspy.taup.tau_model.TauModel.from_file`. They are
+stored in a per-user cache directory (``~/.cache/obspy/taup/models`` or
+``$XDG_CACHE_HOME/obspy/taup/models``, see
+:func:`~obspy.taup.utils.get_cache_directory`) that is only accessible by
+the user. Copies are only used if directory and file are owned by the user
+and not writable by others. The directory can be deleted at any time.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+from collections import OrderedDict
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from .utils import get_cache_directory, make_private_directory
+
+
+FLAT_MODEL_MAGIC = b"OBSPYTAU"
+# bump if the layout of the files or the arrays of the models change
+FLAT_MODEL_VERSION = 1
+FLAT_MODEL_EXTENSION = ".taumodel"
+_PREAMBLE = struct.Struct(native_str("<8sII"))
+_ALIGNMENT = 64
+
+
+def _align(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _dtype_from_descr(descr):
+    """
+    Inverse of :func:`numpy.lib.format.dtype_to_descr` for descriptions
+    that went through JSON (tuples turned into lists).
+    """
+    if not isinstance(descr, list):
+        return np.dtype(native_str(descr))
+    fields = []
+    for field in descr:
+        name, typestr = native_str(field[0]), field[1]
+        if isinstance(typestr, list):
+            typestr = _dtype_from_descr(typestr)
+        else:
+            typestr = native_str(typestr)
+        if len(field) > 2:
+            fields.append((name, typestr, tuple(field[2])))
+        else:
+            fields.append((name, typestr))
+    return np.dtype(fields)
+
+
+def write_flat_arrays(filename, arrays):
+    """
+    Writes a dictionary of arrays to a flat model file.
+
+    :type filename: str
+    :param filename: Name of the output file.
+    :type arrays: dict
+    :param arrays: Arrays or objects convertible to arrays keyed by name.
+        Arrays of Python objects are not supported.
+    """
+    items = []
+    offset = 0
+    for name in sorted(arrays):
+        arr = np.asanyarray(arrays[name])
+        if arr.dtype.hasobject:
+            raise TypeError("Arrays of Python objects can not be stored in "
+                            "flat model files (array '%s')." % name)
+        offset = _align(offset)
+        items.append((name, arr, offset))
+        offset += arr.nbytes
+    header = json.dumps({
+        "arrays": [[name, np.lib.format.dtype_to_descr(arr.dtype),
+                    arr.shape, offset] for name, arr, offset in items]},
+        sort_keys=True).encode("utf-8")
+    start = _align(_PREAMBLE.size + len(header))
+    with open(filename, "wb") as fh:
+        fh.write(_PREAMBLE.pack(FLAT_MODEL_MAGIC, FLAT_MODEL_VERSION,
+                                len(header)))
+        fh.write(header)
+        for name, arr, offset in items:
+            fh.write(b"\0" * (start + offset - fh.tell()))
+            fh.write(arr.tobytes())
+
+
+def read_flat_arrays(filename):
+    """
+    Reads the arrays of a flat model file.
+
+    The returned arrays are read-only views of a memory map of the file.
+
+    :type filename: str
+    :param filename: Name of the flat model file.
+    :rtype: :class:`collections.OrderedDict`
+    """
+    with open(filename, "rb") as fh:
+        magic, version, header_length = _PREAMBLE.unpack(
+            fh.read(_PREAMBLE.size))
+        if magic != FLAT_MODEL_MAGIC:
+            raise ValueError("Not a flat model file: %s" % filename)
+        if version != FLAT_MODEL_VERSION:
+            raise ValueError("Unsupported flat model file version %d: %s" %
+                             (version, filename))
+        header = json.loads(fh.read(header_length).decode("utf-8"))
+        # the mapping stays valid after closing the file
+        buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    start = _align(_PREAMBLE.size + header_length)
+    arrays = OrderedDict()
+    for name, descr, shape, offset in header["arrays"]:
+        dtype = _dtype_from_descr(descr)
+        if dtype.hasobject:
+            # never create Python objects from raw bytes of a file
+            raise ValueError("Invalid dtype of array '%s': %s" %
+                             (name, filename))
+        shape = tuple(shape)
+        count = int(np.prod(shape))
+        if count == 0:
+            arr = np.empty(shape, dtype=dtype)
+            arr.flags.writeable = False
+        else:
+            arr = np.frombuffer(buf, dtype=dtype, count=count,
+                                offset=start + offset).reshape(shape)
+        arrays[name] = arr
+    return arrays
+
+
+def is_flat_model_file(filename):
+    """
+    Checks whether a file is a flat model file.
+
+    :type filename: str
+    :param filename: Name of the file to check.
+    :rtype: bool
+    """
+    try:
+        with open(filename, "rb") as fh:
+            return fh.read(len(FLAT_MODEL_MAGIC)) == FLAT_MODEL_MAGIC
+    except (IOError, OSError):
+        return False
+
+
+def get_flat_copy_filename(filename, path=None):
+    """
+    Returns the name of the flat copy of an ``.npz`` model file.
+
+    The name contains a hash of location, size and modification time of the
+    original file, so changed models get new copies.
+
+    :type filename: str
+    :param filename: Name of the ``.npz`` model file.
+    :type path: str
+    :param path: Directory of the flat copies. Defaults to the per-user
+        cache directory, see :func:`~obspy.taup.utils.get_cache_directory`.
+    """
+    if path is None:
+        path = get_cache_directory("models")
+    stat = os.stat(filename)
+    sha1 = hashlib.sha1(("%d %s %d %r" % (
+        FLAT_MODEL_VERSION, os.path.abspath(filename), stat.st_size,
+        stat.st_mtime)).encode("utf-8"))
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(path, "%s_%s%s" % (name, sha1.hexdigest()[:16],
+                                           FLAT_MODEL_EXTENSION))
+
+
+def write_flat_copy(filename, arrays):
+    """
+    Atomically writes a flat copy of a model, so that other processes never
+    read partially written files.
+
+    The directory is created if necessary and has to be private to the
+    current user, see :func:`~obspy.taup.utils.make_private_directory`. The
+    file is only readable by the current user.
+
+    :type filename: str
+    :param filename: Name of the flat copy, see
+        :func:`get_flat_copy_filename`.
+    :type arrays: dict
+    :param arrays: Arrays of the model.
+    """
+    path = os.path.dirname(filename)
+    make_private_directory(path)
+    fd, tmp_filename = tempfile.mkstemp(suffix=".tmp", dir=path)
+    os.close(fd)
+    try:
+        write_flat_arrays(tmp_filename, arrays)
+        getattr(os, "replace", os.rename)(tmp_filename, filename)
+    except Exception:
+        try:
+            os.remove(tmp_filename)
+        except OSError:
+            pass
+        raise
@@ -1034,6 +1034,173 @@ class SeismicPhase(object):
                 self._settings["max_recursion"]))
         return arrivals
 
+    def calc_time_many(self, degrees):
+        """
+        Calculate arrival times for this phase at many distances.
+
+        Gives the same arrivals as :meth:`calc_time` for every distance, but
+        the rays of all distances are shot together in each refinement step.
+
+        :returns: Lists of arrivals, one for every distance.
+        """
+        r_dist = np.empty(100, dtype=np.float64)
+        r_ray_num = np.empty(100, dtype=np.int32)
+        index = []
+        search_dists = []
+        ray_nums = []
+        for i, degree in enumerate(degrees):
+            phase_count = clibtau.seismic_phase_calc_time_inner_loop(
+                float(degree),
+                self.max_distance,
+                self.dist,
+                self.ray_param,
+                r_dist,
+                r_ray_num,
+                len(self.dist)
+            )
+            index.extend([i] * phase_count)
+            search_dists.extend(r_dist[:phase_count])
+            ray_nums.extend(r_ray_num[:phase_count])
+        arrivals = [[] for _ in degrees]
+        if not index:
+            return arrivals
+        search_dist = np.array(search_dists, dtype=np.float64)
+        ray_num = np.array(ray_nums, dtype=np.int_)
+        # estimates are arrays of time, distance, ray parameter and ray
+        # parameter index
+        left = [self.time[ray_num], self.dist[ray_num],
+                self.ray_param[ray_num], ray_num]
+        right = [self.time[ray_num + 1], self.dist[ray_num + 1],
+                 self.ray_param[ray_num + 1], ray_num]
+        result = [np.empty_like(values) for values in left]
+        degenerate = np.zeros(len(ray_num), dtype=np.bool_)
+
+        def _store(rows, left, right):
+            values = self._linear_interp_many(search_dist[rows], left, right)
+            for res, value in zip(result, values[:4]):
+                res[rows] = value
+            degenerate[rows] = values[4]
+
+        rows = np.arange(len(ray_num))
+        recursion_limit = self._settings["max_recursion"]
+        no_shoot = (self.name.endswith('kmps') or
+                    any(phase in self.name
+                        for phase in ['Pdiff', 'Sdiff', 'Pn', 'Sn']))
+        while len(rows):
+            new_estimate = self._linear_interp_many(search_dist[rows], left,
+                                                    right)
+            if recursion_limit <= 0 or no_shoot:
+                _store(rows, left, right)
+                break
+            try:
+                shoot = self._shoot_rays(new_estimate[2])
+            except (IndexError, LookupError, SlownessModelError) as e:
+                raise_from(RuntimeError('Please contact the developers. This '
+                                        'error should not occur.'), e)
+            search = search_dist[rows]
+            between_left = (left[1] - search) * (search - shoot[1]) > 0
+            close = np.abs(shoot[1] - new_estimate[1]) < \
+                REFINE_DIST_RADIAN_TOL
+            done = between_left & close
+            _store(rows[done], [v[done] for v in left],
+                   [v[done] for v in shoot])
+            done = ~between_left & close
+            _store(rows[done], [v[done] for v in shoot],
+                   [v[done] for v in right])
+            # continue searching between left and shoot or shoot and right
+            right = [np.where(between_left, s, r)[~close]
+                     for s, r in zip(shoot, right)]
+            left = [np.where(between_left, lft, s)[~close]
+                    for s, lft in zip(shoot, left)]
+            rows = rows[~close]
+            recursion_limit -= 1
+
+        for i, row in enumerate(index):
+            angle = 0 if degenerate[i] else None
+            arrivals[row].append(Arrival(
+                self, degrees[row], result[0][i], result[1][i],
+                result[2][i], result[3][i], self.name, self.purist_name,
+                self.source_depth, self.receiver_depth, angle, angle))
+        return arrivals
+
+    def _linear_interp_many(self, search_dist, left, right):
+        """
+        Vectorized version of :meth:`linear_interp_arrival`.
+
+        :returns: Arrays of time, distance, ray parameter and ray parameter
+            index of the interpolated estimates and a mask of the degenerate
+            case (whose takeoff and incident angles are zero).
+        """
+        left_time, left_dist, left_ray_param, left_index = left
+        right_time, right_dist, right_ray_param, _ = right
+        degenerate = (left_index == 0) & (search_dist == self.dist[0])
+        same = ~degenerate & (left_dist == search_dist)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            arrival_time = ((search_dist - left_dist) /
+                            (right_dist - left_dist) *
+                            (right_time - left_time)) + left_time
+            ray_param = ((search_dist - right_dist) /
+                         (left_dist - right_dist) *
+                         (left_ray_param - right_ray_param)) + right_ray_param
+        invalid = np.isnan(arrival_time) & ~degenerate & ~same
+        if np.any(invalid):
+            i = np.flatnonzero(invalid)[0]
+            msg = ('Time is NaN, search=%f leftDist=%f leftTime=%f '
+                   'rightDist=%f rightTime=%f')
+            raise RuntimeError(msg % (search_dist[i], left_dist[i],
+                                      left_time[i], right_dist[i],
+                                      right_time[i]))
+        arrival_time = np.where(degenerate, self.time[0],
+                                np.where(same, left_time, arrival_time))
+        ray_param = np.where(degenerate, self.ray_param[0],
+                             np.where(same, left_ray_param, ray_param))
+        dist = np.where(same, left_dist, search_dist)
+        index = np.where(degenerate, 0, left_index)
+        return arrival_time, dist, ray_param, index, degenerate
+
+    def _shoot_rays(self, ray_param):
+        """
+        Vectorized version of :meth:`shoot_ray` for body waves.
+
+        :returns: Arrays of time, distance, ray parameter and ray parameter
+            index of the rays.
+        """
+        outside = (ray_param < self.min_ray_param) | \
+            (self.max_ray_param < ray_param)
+        if np.any(outside):
+            msg = 'Ray param %f is outside range for this phase: min=%f max=%f'
+            raise SlownessModelError(msg % (ray_param[outside][0],
+                                            self.min_ray_param,
+                                            self.max_ray_param))
+        if np.any(np.isnan(ray_param)):
+            raise ValueError('Time cannot be NaN')
+        # first index with a smaller ray parameter at the next index
+        smaller = self.ray_param[1:][np.newaxis, :] < ray_param[:, np.newaxis]
+        ray_param_index = np.where(smaller.any(axis=1),
+                                   smaller.argmax(axis=1),
+                                   len(self.ray_param) - 2)
+
+        tau_model = self.tau_model
+        s_mod = tau_model.s_mod
+        times_branches = self.calc_branch_mult(tau_model)
+        time = np.zeros(len(ray_param))
+        dist = np.zeros(len(ray_param))
+        ray_param = np.array(ray_param, dtype=np.float64)
+        for j in range(tau_model.tau_branches.shape[1]):
+            for k, is_p_wave in ((0, s_mod.p_wave), (1, s_mod.s_wave)):
+                if times_branches[k, j] == 0:
+                    continue
+                br = tau_model.get_tau_branch(j, is_p_wave)
+                top_layer = s_mod.layer_number_below(br.top_depth, is_p_wave)
+                bot_layer = s_mod.layer_number_above(br.bot_depth, is_p_wave)
+                td = br.calc_time_dist(s_mod, top_layer, bot_layer, ray_param,
+                                       allow_turn_in_layer=True)
+                time += times_branches[k, j] * td['time']
+                dist += times_branches[k, j] * td['dist']
+        if np.any(np.isnan(time)):
+            raise ValueError('Time cannot be NaN')
+        return [time, dist, ray_param, ray_param_index]
+
     def calc_pierce(self, degrees):
         """
         Calculate pierce points for this phase.
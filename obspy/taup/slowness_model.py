@@ -1767,7 +1767,7 @@ class SlownessModel(object):
             out_layers[layer_num] = bot_layer
             out_layers = np.insert(out_layers, layer_num, top_layer)
             # Fix critical layers since we added a slowness layer.
-            out_critical_depths = self.critical_depths
+            out_critical_depths = out.critical_depths
             _fix_critical_depths(out_critical_depths, layer_num, is_p_wave)
             if is_p_wave:
                 out_p_layers = out_layers
@@ -6,6 +6,7 @@ High-level interface to travel-time calculation routines.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import copy
 import warnings
@@ -16,6 +17,7 @@ from matplotlib.cm import get_cmap
 import matplotlib.text
 import numpy as np
 
+from .depth_cache import DiskDepthCache
 from .helper_classes import Arrival
 from .tau_model import TauModel
 from .taup_create import TauPCreate
@@ -23,6 +25,7 @@ from .taup_path import TauPPath
 from .taup_pierce import TauPPierce
 from .taup_time import TauPTime
 from .taup_geo import calc_dist, add_geo_to_arrivals
+from .travel_time_grid import TravelTimeGrid
 from .utils import parse_phase_list
 import obspy.geodetics.base as geodetics
 
@@ -578,7 +581,10 @@ class TauPyModel(object):
         Loads an already created TauPy model.
 
         :param model: The model name. Either an internal TauPy model or a
-            filename in the case of custom models.
+            filename in the case of custom models. Flat copies of ``.npz``
+            models are written to a per-user cache directory when a model
+            is used for the first time, see
+            :meth:`~obspy.taup.tau_model.TauModel.from_file`.
         :param planet_flattening: Flattening parameter for the planet's
             ellipsoid (i.e. (a-b)/a, where a is the semimajor equatorial radius
             and b is the semiminor polar radius). A value of 0 (the default)
@@ -593,8 +599,13 @@ class TauPyModel(object):
             multiple results are requested for the same source depth. The
             dictionary must be ordered, otherwise the LRU cache will not
             behave correctly. If ``False`` is specified, then no cache will be
-            used.
-        :type cache: :class:`collections.OrderedDict` or bool
+            used. A :class:`~obspy.taup.depth_cache.DepthCache` (or the name
+            of a directory for a
+            :class:`~obspy.taup.depth_cache.DiskDepthCache`) can be given to
+            store the split models persistently and share them between
+            processes.
+        :type cache: :class:`collections.OrderedDict`, bool, str or
+            :class:`~obspy.taup.depth_cache.DepthCache`
 
         Usage:
 
@@ -608,6 +619,8 @@ class TauPyModel(object):
         2
         """
         self.verbose = verbose
+        if isinstance(cache, (str, native_str)):
+            cache = DiskDepthCache(cache)
         self.model = TauModel.from_file(model, cache=cache)
         self.planet_flattening = planet_flattening
 
@@ -641,6 +654,74 @@ class TauPyModel(object):
         return Arrivals(sorted(tt.arrivals, key=lambda x: x.time),
                         model=self.model)
 
+    def get_travel_times_many(self, source_depth_in_km, distances_in_degree,
+                              phase_list=("ttall",),
+                              receiver_depth_in_km=0.0):
+        """
+        Return travel times of every given phase at many distances.
+
+        The model is depth corrected and the phases are set up only once for
+        all distances, which is a lot faster than calling
+        :meth:`get_travel_times` for every distance, e.g. for all stations
+        of a network. Distances to stations can be computed with
+        :func:`~obspy.geodetics.base.locations2degrees` for whole arrays of
+        coordinates.
+
+        :param source_depth_in_km: Source depth in km
+        :type source_depth_in_km: float
+        :param distances_in_degree: Epicentral distances in degrees.
+        :type distances_in_degree: array_like
+        :param phase_list: List of phases for which travel times should be
+            calculated.
+        :type phase_list: list of str
+        :param receiver_depth_in_km: Receiver depth in km
+        :type receiver_depth_in_km: float
+
+        :return: Structured array with one row per arrival and the fields
+            ``distance_index`` (index into ``distances_in_degree``),
+            ``distance`` (in degrees), ``name``, ``time`` (in s),
+            ``ray_param`` (in s/radian), ``takeoff_angle``,
+            ``incident_angle`` and ``purist_distance`` (in degrees). Rows are
+            sorted by distance index and, for each distance, by time, just
+            like :meth:`get_travel_times` returns them.
+        :rtype: :class:`numpy.ndarray`
+
+        .. rubric:: Example
+
+        >>> from obspy.taup import TauPyModel
+        >>> model = TauPyModel()
+        >>> arrivals = model.get_travel_times_many(
+        ...     10, [30, 50, 70], phase_list=["P", "S"])
+        >>> for arr in arrivals:
+        ...     print(arr["distance_index"], arr["name"],
+        ...           "%.2f" % arr["time"])
+        0 P 368.73
+        0 S 667.64
+        1 P 534.30
+        1 S 965.83
+        2 P 671.78
+        2 S 1222.96
+        """
+        distances = np.atleast_1d(
+            np.asarray(distances_in_degree, dtype=np.float64))
+        if distances.ndim != 1:
+            msg = "Distances have to be a one-dimensional array."
+            raise ValueError(msg)
+        tt = TauPTime(self.model, phase_list, source_depth_in_km, None,
+                      receiver_depth_in_km)
+        arrivals = tt.calc_time_many(distances.tolist())
+        count = sum(len(arrs) for arrs in arrivals)
+        width = max([len(phase.name) for phase in tt.phases] or [1])
+        result = np.empty(count, dtype=_get_arrivals_dtype(width))
+        j = 0
+        for i, arrs in enumerate(arrivals):
+            for arr in arrs:
+                result[j] = (i, distances[i], arr.name, arr.time,
+                             arr.ray_param, arr.takeoff_angle,
+                             arr.incident_angle, arr.purist_distance)
+                j += 1
+        return result
+
     def get_pierce_points(self, source_depth_in_km, distance_in_degree,
                           phase_list=("ttall",), receiver_depth_in_km=0.0):
         """
@@ -695,6 +776,40 @@ class TauPyModel(object):
         return Arrivals(sorted(rp.arrivals, key=lambda x: x.time),
                         model=self.model)
 
+    def create_travel_time_grid(self, source_depths_in_km,
+                                distances_in_degree, phase_list=("P", "S"),
+                                receiver_depth_in_km=0.0, workers=None,
+                                executor=None):
+        """
+        Precompute a table of first arrival travel times for fast lookups.
+
+        See :class:`~obspy.taup.travel_time_grid.TravelTimeGrid` for details
+        and the accuracy of the interpolated travel times.
+
+        :param source_depths_in_km: Source depths of the grid nodes in km
+        :type source_depths_in_km: array_like
+        :param distances_in_degree: Epicentral distances of the grid nodes in
+            degrees.
+        :type distances_in_degree: array_like
+        :param phase_list: List of phases for which travel times should be
+            calculated.
+        :type phase_list: list of str
+        :param receiver_depth_in_km: Receiver depth in km
+        :type receiver_depth_in_km: float
+        :param workers: Number of source depths computed in parallel.
+        :type workers: int
+        :param executor: Either ``"thread"`` (default) or ``"process"`` to
+            select the kind of pool created for ``workers``, or an existing
+            pool/executor with a ``map()`` method which is used instead.
+        :type executor: str or object
+
+        :rtype: :class:`~obspy.taup.travel_time_grid.TravelTimeGrid`
+        """
+        return TravelTimeGrid.from_model(
+            self, source_depths_in_km, distances_in_degree,
+            phase_list=phase_list, receiver_depth_in_km=receiver_depth_in_km,
+            workers=workers, executor=executor)
+
     def get_travel_times_geo(self, source_depth_in_km, source_latitude_in_deg,
                              source_longitude_in_deg, receiver_latitude_in_deg,
                              receiver_longitude_in_deg, phase_list=("ttall",)):
@@ -871,6 +986,23 @@ class TauPyModel(object):
         return arrivals
 
 
+def _get_arrivals_dtype(name_width):
+    """
+    Returns the dtype of the arrays returned by
+    :meth:`TauPyModel.get_travel_times_many`.
+    """
+    return np.dtype([
+        (native_str('distance_index'), np.int_),
+        (native_str('distance'), np.float_),
+        (native_str('name'), native_str('U%d' % name_width)),
+        (native_str('time'), np.float_),
+        (native_str('ray_param'), np.float_),
+        (native_str('takeoff_angle'), np.float_),
+        (native_str('incident_angle'), np.float_),
+        (native_str('purist_distance'), np.float_),
+    ])
+
+
 def create_taup_model(model_name, output_dir, input_dir):
     """
     Create a .taup model from a .tvel file.
@@ -9,16 +9,22 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 from collections import OrderedDict
+import errno
 import os
 from copy import deepcopy
 from itertools import count
 from math import pi
+import warnings
 
 import numpy as np
 
+from .depth_cache import DepthCache
+from .flat_model import (get_flat_copy_filename, is_flat_model_file,
+                         read_flat_arrays, write_flat_arrays, write_flat_copy)
 from .helper_classes import DepthRange, SlownessModelError, TauModelError
 from .slowness_model import SlownessModel
 from .tau_branch import TauBranch
+from .utils import check_private_path
 from .velocity_model import VelocityModel
 
 
@@ -221,6 +227,12 @@ class TauModel(object):
         return self.load_from_depth_cache(depth)
 
     def load_from_depth_cache(self, depth):
+        if isinstance(self._depth_cache, DepthCache):
+            value = self._depth_cache.get(self, depth)
+            if value is None:
+                value = self._load_from_depth_cache(depth)
+                self._depth_cache.put(self, depth, value)
+            return value
         # Very simple and straightforward LRU cache implementation.
         if self._depth_cache is not None:
             # Retrieve and later insert again to get LRU cache behaviour.
@@ -403,10 +415,17 @@ class TauModel(object):
             for i in range(1, len(self.tau_branches[0]))]
         return branch_depths
 
-    def serialize(self, filename):
+    def serialize(self, filename, flat=False):
         """
         Serialize model to numpy npz binary file.
 
+        :type filename: str
+        :param filename: Name of the output file.
+        :type flat: bool
+        :param flat: If ``True``, write an uncompressed flat model file
+            instead (see :mod:`obspy.taup.flat_model`) that is memory mapped
+            when read.
+
         Summary of contents that have to be handled during serialization::
 
             TauModel
@@ -473,6 +492,16 @@ class TauModel(object):
             moho_depth <type 'float'>
             radius_of_planet <type 'float'>
         """
+        arrays = self._to_arrays()
+        if flat:
+            write_flat_arrays(filename, arrays)
+        else:
+            np.savez_compressed(filename, **arrays)
+
+    def _to_arrays(self):
+        """
+        Returns a dictionary of the (structured) arrays describing the model.
+        """
         # a) handle simple contents
         keys = ['cmb_branch', 'cmb_depth', 'debug', 'iocb_branch',
                 'iocb_depth', 'moho_branch', 'moho_depth', 'no_discon_depths',
@@ -536,93 +565,24 @@ class TauModel(object):
             velocity_model[key] = getattr(self.s_mod.v_mod, key)
         arrays['v_mod'] = velocity_model
         arrays['v_mod.layers'] = self.s_mod.v_mod.layers
-
-        # finally save the collection of (structured) arrays to a binary file
-        np.savez_compressed(filename, **arrays)
+        return arrays
 
     @staticmethod
     def deserialize(filename, cache=None):
         """
-        Deserialize model from numpy npz binary file.
+        Deserialize model from numpy npz binary file or flat model file.
+
+        The arrays of flat model files are memory mapped read-only, so
+        loading them is almost instant and all processes using the same file
+        share its memory.
         """
+        if is_flat_model_file(filename):
+            return TauModel._from_arrays(read_flat_arrays(filename),
+                                         cache=cache)
         # XXX: Make this a with statement when old NumPy support is dropped.
         npz = np.load(filename)
         try:
-            model = TauModel(s_mod=None,
-                             radius_of_planet=float(npz["radius_of_planet"]),
-                             cache=cache, skip_calc=True)
-            complex_contents = [
-                'tau_branches', 's_mod', 'v_mod',
-                's_mod.p_layers', 's_mod.s_layers', 's_mod.critical_depths',
-                's_mod.fluid_layer_depths',
-                's_mod.high_slowness_layer_depths_p',
-                's_mod.high_slowness_layer_depths_s', 'v_mod.layers']
-
-            # a) handle simple contents
-            for key in npz.keys():
-                # we have multiple, dynamic key names for individual tau
-                # branches now, skip them all
-                if key in complex_contents or key.startswith('tau_branches'):
-                    continue
-                arr = npz[key]
-                if arr.ndim == 0:
-                    arr = arr[()]
-                setattr(model, key, arr)
-
-            # b) handle .tau_branches
-            tau_branch_keys = [key for key in npz.keys()
-                               if key.startswith('tau_branches_')]
-            j, i = tau_branch_keys[0].split("__")[1:]
-            i = int(i.split("/")[1])
-            j = int(j.split("/")[1])
-            branches = np.empty(shape=(i, j), dtype=np.object_)
-            for key in tau_branch_keys:
-                j_, i_ = key.split("__")[1:]
-                i_ = int(i_.split("/")[0])
-                j_ = int(j_.split("/")[0])
-                branches[i_][j_] = TauBranch._from_array(npz[key])
-            # no idea how numpy lays out empty arrays of object type,
-            # make a copy just in case..
-            branches = np.copy(branches)
-            setattr(model, "tau_branches", branches)
-
-            # c) handle simple contents of .s_mod
-            slowness_model = SlownessModel(v_mod=None,
-                                           skip_model_creation=True)
-            setattr(model, "s_mod", slowness_model)
-            for key in npz['s_mod'].dtype.names:
-                # restore scalar types from 0d array
-                arr = npz['s_mod'][key]
-                if arr.ndim == 0:
-                    arr = arr.flatten()[0]
-                setattr(slowness_model, key, arr)
-
-            # d) handle complex contents of .s_mod
-            for key in ['p_layers', 's_layers', 'critical_depths']:
-                setattr(slowness_model, key, npz['s_mod.' + key])
-            for key in ['fluid_layer_depths', 'high_slowness_layer_depths_p',
-                        'high_slowness_layer_depths_s']:
-                arr_ = npz['s_mod.' + key]
-                if len(arr_) == 0:
-                    data = []
-                else:
-                    data = [DepthRange._from_array(x) for x in arr_]
-                setattr(slowness_model, key, data)
-
-            # e) handle .s_mod.v_mod
-            velocity_model = VelocityModel(
-                model_name=native_str(npz["v_mod"]["model_name"]),
-                radius_of_planet=float(npz["v_mod"]["radius_of_planet"]),
-                min_radius=float(npz["v_mod"]["min_radius"]),
-                max_radius=float(npz["v_mod"]["max_radius"]),
-                moho_depth=float(npz["v_mod"]["moho_depth"]),
-                cmb_depth=float(npz["v_mod"]["cmb_depth"]),
-                iocb_depth=float(npz["v_mod"]["iocb_depth"]),
-                is_spherical=bool(npz["v_mod"]["is_spherical"]),
-                layers=None
-            )
-            setattr(slowness_model, "v_mod", velocity_model)
-            setattr(velocity_model, 'layers', npz['v_mod.layers'])
+            model = TauModel._from_arrays(npz, cache=cache)
         finally:
             if hasattr(npz, 'close'):
                 npz.close()
@@ -631,10 +591,140 @@ class TauModel(object):
         return model
 
     @staticmethod
-    def from_file(model_name, cache=None):
+    def _from_arrays(npz, cache=None):
+        """
+        Create a model from a mapping of the arrays created by
+        :meth:`_to_arrays`.
+        """
+        model = TauModel(s_mod=None,
+                         radius_of_planet=float(npz["radius_of_planet"]),
+                         cache=cache, skip_calc=True)
+        complex_contents = [
+            'tau_branches', 's_mod', 'v_mod',
+            's_mod.p_layers', 's_mod.s_layers', 's_mod.critical_depths',
+            's_mod.fluid_layer_depths',
+            's_mod.high_slowness_layer_depths_p',
+            's_mod.high_slowness_layer_depths_s', 'v_mod.layers']
+
+        # a) handle simple contents
+        for key in npz.keys():
+            # we have multiple, dynamic key names for individual tau
+            # branches now, skip them all
+            if key in complex_contents or key.startswith('tau_branches'):
+                continue
+            arr = npz[key]
+            if arr.ndim == 0:
+                arr = arr[()]
+            setattr(model, key, arr)
+
+        # b) handle .tau_branches
+        tau_branch_keys = [key for key in npz.keys()
+                           if key.startswith('tau_branches_')]
+        j, i = tau_branch_keys[0].split("__")[1:]
+        i = int(i.split("/")[1])
+        j = int(j.split("/")[1])
+        branches = np.empty(shape=(i, j), dtype=np.object_)
+        for key in tau_branch_keys:
+            j_, i_ = key.split("__")[1:]
+            i_ = int(i_.split("/")[0])
+            j_ = int(j_.split("/")[0])
+            branches[i_][j_] = TauBranch._from_array(npz[key])
+        # no idea how numpy lays out empty arrays of object type,
+        # make a copy just in case..
+        branches = np.copy(branches)
+        setattr(model, "tau_branches", branches)
+
+        # c) handle simple contents of .s_mod
+        slowness_model = SlownessModel(v_mod=None,
+                                       skip_model_creation=True)
+        setattr(model, "s_mod", slowness_model)
+        for key in npz['s_mod'].dtype.names:
+            # restore scalar types from 0d array
+            arr = npz['s_mod'][key]
+            if arr.ndim == 0:
+                arr = arr.flatten()[0]
+            setattr(slowness_model, key, arr)
+
+        # d) handle complex contents of .s_mod
+        for key in ['p_layers', 's_layers', 'critical_depths']:
+            setattr(slowness_model, key, npz['s_mod.' + key])
+        for key in ['fluid_layer_depths', 'high_slowness_layer_depths_p',
+                    'high_slowness_layer_depths_s']:
+            arr_ = npz['s_mod.' + key]
+            if len(arr_) == 0:
+                data = []
+            else:
+                data = [DepthRange._from_array(x) for x in arr_]
+            setattr(slowness_model, key, data)
+
+        # e) handle .s_mod.v_mod
+        model_name = npz["v_mod"]["model_name"].item()
+        if isinstance(model_name, bytes):
+            model_name = model_name.decode()
+        velocity_model = VelocityModel(
+            model_name=native_str(model_name),
+            radius_of_planet=float(npz["v_mod"]["radius_of_planet"]),
+            min_radius=float(npz["v_mod"]["min_radius"]),
+            max_radius=float(npz["v_mod"]["max_radius"]),
+            moho_depth=float(npz["v_mod"]["moho_depth"]),
+            cmb_depth=float(npz["v_mod"]["cmb_depth"]),
+            iocb_depth=float(npz["v_mod"]["iocb_depth"]),
+            is_spherical=bool(npz["v_mod"]["is_spherical"]),
+            layers=None
+        )
+        setattr(slowness_model, "v_mod", velocity_model)
+        setattr(velocity_model, 'layers', npz['v_mod.layers'])
+        return model
+
+    @staticmethod
+    def from_file(model_name, cache=None, flat_copy=True):
+        """
+        Load a model by name or from a model file.
+
+        :type model_name: str
+        :param model_name: Name of a model shipped with ObsPy or the filename
+            of an ``.npz`` or flat model file.
+        :param cache: Cache of depth corrected models, see
+            :class:`~obspy.taup.tau.TauPyModel`.
+        :type flat_copy: bool
+        :param flat_copy: Memory map an automatically created flat copy (see
+            :mod:`obspy.taup.flat_model`) of ``.npz`` model files. This makes
+            loading a model almost instant after the first time and lets all
+            processes of the user share the memory of the model. Note that
+            this writes the copy to a per-user cache directory (by default
+            ``~/.cache/obspy/taup/models``) when a model is loaded for the
+            first time. Copies are only used if the directory and the copy
+            can not be modified by other users.
+        """
         if os.path.exists(model_name):
             filename = model_name
         else:
             filename = os.path.join(os.path.dirname(__file__), "data",
                                     model_name.lower() + ".npz")
-        return TauModel.deserialize(filename, cache=cache)
+        if not flat_copy or is_flat_model_file(filename):
+            return TauModel.deserialize(filename, cache=cache)
+        flat_filename = get_flat_copy_filename(filename)
+        try:
+            check_private_path(os.path.dirname(flat_filename))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                msg = "Not using flat copies of tau models: %s" % e
+                warnings.warn(msg)
+                return TauModel.deserialize(filename, cache=cache)
+        else:
+            try:
+                # copies written by us are private, others are replaced
+                check_private_path(flat_filename)
+                # only ever read the flat format, np.load() may unpickle
+                return TauModel._from_arrays(read_flat_arrays(flat_filename),
+                                             cache=cache)
+            except Exception:
+                # no (usable) copy yet
+                pass
+        model = TauModel.deserialize(filename, cache=cache)
+        try:
+            write_flat_copy(flat_filename, model._to_arrays())
+        except Exception:
+            # e.g. no writable cache directory, just use the npz model
+            pass
+        return model
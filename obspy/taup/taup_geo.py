@@ -79,7 +79,33 @@ def calc_dist_azi(source_latitude_in_deg, source_longitude_in_deg,
     :returns: distance_in_deg (in degrees), source_receiver_azimuth (in
               degrees) and receiver_to_source_backazimuth (in degrees).
     :rtype: tuple of three floats
+
+    All locations can also be given as arrays, which are broadcast against
+    each other. Distances and azimuths are then computed for all locations at
+    once (see :func:`~obspy.geodetics.base.gps2dist_azimuth`) and returned
+    as arrays.
     """
+    if geodetics._is_array_input(
+            source_latitude_in_deg, source_longitude_in_deg,
+            receiver_latitude_in_deg, receiver_longitude_in_deg):
+        distance_in_m, source_receiver_azimuth, \
+            receiver_to_source_backazimuth, distance_in_deg = \
+            geodetics._gps2dist_azimuth_array(
+                source_latitude_in_deg, source_longitude_in_deg,
+                receiver_latitude_in_deg, receiver_longitude_in_deg,
+                a=radius_of_planet_in_km * 1000.0, f=flattening_of_planet)
+        if not geodetics.HAS_GEOGRAPHICLIB:
+            # same as for single locations below
+            if flattening_of_planet != 0.0:
+                msg = "Assuming spherical planet when calculating " + \
+                      "epicentral distance. Install the Python module " + \
+                      "'geographiclib' to solve this."
+                warnings.warn(msg)
+            distance_in_deg = kilometer2degrees(distance_in_m / 1000.0,
+                                                radius=radius_of_planet_in_km)
+        return (distance_in_deg, source_receiver_azimuth % 360,
+                receiver_to_source_backazimuth % 360)
+
     if geodetics.HAS_GEOGRAPHICLIB:
         ellipsoid = Geodesic(a=radius_of_planet_in_km * 1000.0,
                              f=flattening_of_planet)
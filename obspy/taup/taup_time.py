@@ -108,3 +108,22 @@ class TauPTime(object):
         # Sort them.
         self.arrivals = sorted(self.arrivals,
                                key=lambda arrivals: arrivals.time)
+
+    def calc_time_many(self, degrees):
+        """
+        Calculate the arrival times at many distances, reusing the depth
+        corrected model and the phases for all of them and shooting the rays
+        of all distances at once.
+
+        :returns: Lists of arrivals, sorted by time, one for every distance.
+        """
+        self.depth_correct(self.source_depth, self.receiver_depth)
+        self.recalc_phases()
+        self.degrees = degrees
+        arrivals = [[] for _ in degrees]
+        for phase in self.phases:
+            for i, arrs in enumerate(phase.calc_time_many(degrees)):
+                arrivals[i] += arrs
+        self.arrivals = []
+        return [sorted(arrs, key=lambda arrival: arrival.time)
+                for arrs in arrivals]
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests the caches of depth corrected tau models.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import pickle
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+
+from obspy.core.compatibility import mock
+from obspy.taup.depth_cache import DiskDepthCache
+from obspy.taup.flat_model import is_flat_model_file, read_flat_arrays
+from obspy.taup.tau import TauPyModel
+from obspy.taup.tau_model import TauModel
+
+
+class DiskDepthCacheTestCase(unittest.TestCase):
+    """
+    Test suite for the DiskDepthCache class.
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _get_files(self):
+        return sorted(name for name in os.listdir(self.path)
+                      if name.endswith(".taumodel"))
+
+    def _get_times(self, model, depth, receiver_depth=0.0):
+        arrivals = model.get_travel_times(depth, 40.0, ["ttbasic"],
+                                          receiver_depth_in_km=receiver_depth)
+        return [(arr.name, arr.time, arr.ray_param) for arr in arrivals]
+
+    def test_shared_between_models(self):
+        """
+        Split models are stored on disk and used by other model instances
+        (e.g. in other processes) with identical results.
+        """
+        reference = TauPyModel("iasp91", cache=False)
+        model = TauPyModel("iasp91", cache=DiskDepthCache(self.path))
+        depths = [0.0, 10.0, 35.5, 410.0]
+        expected = [self._get_times(reference, depth, 1.0)
+                    for depth in depths]
+        self.assertEqual([self._get_times(model, depth, 1.0)
+                          for depth in depths], expected)
+        # surface sources need no depth correction
+        self.assertEqual(len(self._get_files()), len(depths) - 1)
+        # a new model with a copy of the cache as in a new process has to
+        # load the models from disk
+        cache = pickle.loads(pickle.dumps(model.model._depth_cache))
+        self.assertEqual(len(cache._memory), 0)
+        model = TauPyModel("iasp91", cache=cache)
+        with mock.patch.object(TauModel, "_load_from_depth_cache") as p:
+            got = [self._get_times(model, depth, 1.0) for depth in depths]
+        self.assertEqual(p.call_count, 0)
+        self.assertEqual(got, expected)
+        # passing a directory name works as well, other models do not use
+        # the models of iasp91
+        model = TauPyModel("ak135", cache=self.path)
+        self.assertIsInstance(model.model._depth_cache, DiskDepthCache)
+        self.assertEqual(self._get_times(model, 10.0),
+                         self._get_times(TauPyModel("ak135"), 10.0))
+        self.assertEqual(len(self._get_files()), len(depths))
+
+    def test_eviction_and_corrupt_files(self):
+        """
+        The least recently used files are removed, corrupt files replaced.
+        """
+        cache = DiskDepthCache(self.path, max_entries_in_memory=0)
+        model = TauPyModel("iasp91", cache=cache)
+        model.model.depth_correct(10.0)
+        size = os.path.getsize(os.path.join(self.path, self._get_files()[0]))
+        cache.max_size = int(2.5 * size)
+        model.model.depth_correct(20.0)
+        first, second = self._get_files()
+        # make sure the modification times differ
+        os.utime(os.path.join(self.path, first), (1, 1))
+        os.utime(os.path.join(self.path, second), (2, 2))
+        # using the first model marks it as recently used
+        model.model.depth_correct(10.0)
+        self.assertGreater(
+            os.path.getmtime(os.path.join(self.path, first)),
+            time.time() - 100)
+        model.model.depth_correct(30.0)
+        files = self._get_files()
+        self.assertEqual(len(files), 2)
+        self.assertIn(first, files)
+        self.assertNotIn(second, files)
+        # corrupt files are replaced
+        with open(os.path.join(self.path, first), "wb") as fh:
+            fh.write(b"garbage")
+        self.assertEqual(self._get_times(model, 10.0),
+                         self._get_times(TauPyModel("iasp91"), 10.0))
+        self.assertTrue(read_flat_arrays(os.path.join(self.path, first)))
+        # other files, e.g. pickles, are never loaded
+        with open(os.path.join(self.path, first), "wb") as fh:
+            pickle.dump(model.model.depth_correct(10.0), fh)
+        with mock.patch("pickle.load") as p:
+            self.assertEqual(self._get_times(model, 10.0),
+                             self._get_times(TauPyModel("iasp91"), 10.0))
+        self.assertEqual(p.call_count, 0)
+        self.assertTrue(is_flat_model_file(os.path.join(self.path, first)))
+        cache.clear()
+        self.assertEqual(self._get_files(), [])
+
+    @unittest.skipIf(not hasattr(os, "getuid"), "no POSIX file ownership")
+    def test_private_directory(self):
+        """
+        The default directory is private to the user, directories other
+        users can modify are refused.
+        """
+        with mock.patch.dict(os.environ, {
+                "XDG_CACHE_HOME": os.path.join(self.path, "cache")}):
+            cache = DiskDepthCache()
+        self.assertEqual(cache.path, os.path.join(
+            self.path, "cache", "obspy", "taup", "depth_cache"))
+        self.assertEqual(stat.S_IMODE(os.stat(cache.path).st_mode), 0o700)
+        path = os.path.join(self.path, "shared")
+        os.mkdir(path)
+        os.chmod(path, 0o777)
+        self.assertRaises(OSError, DiskDepthCache, path)
+        self.assertRaises(OSError, TauPyModel, "iasp91", cache=path)
+        os.chmod(path, 0o755)
+        DiskDepthCache(path)
+        with mock.patch("os.getuid", return_value=os.getuid() + 1):
+            self.assertRaises(OSError, DiskDepthCache, path)
+
+
+def suite():
+    return unittest.makeSuite(DiskDepthCacheTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
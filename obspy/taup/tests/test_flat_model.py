@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests the flat, memory mapped model files.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+import warnings
+
+import numpy as np
+
+from obspy.core.compatibility import mock
+from obspy.taup.flat_model import (get_flat_copy_filename,
+                                   is_flat_model_file, read_flat_arrays,
+                                   write_flat_arrays)
+from obspy.taup.tau import TauPyModel
+from obspy.taup.tau_model import TauModel
+from obspy.taup.utils import get_cache_directory
+
+
+class FlatModelTestCase(unittest.TestCase):
+    """
+    Test suite for the flat model files.
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.npz_filename = os.path.join(os.path.dirname(
+            os.path.dirname(__file__)), "data", "iasp91.npz")
+        # keep the flat copies of the tests out of the user's cache
+        patcher = mock.patch.dict(os.environ, {
+            "XDG_CACHE_HOME": os.path.join(self.path, "cache"),
+            "LOCALAPPDATA": os.path.join(self.path, "cache")})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _get_times(self, model):
+        times = []
+        for depth in (0.0, 10.0, 120.3, 600.0):
+            arrivals = model.get_travel_times(depth, 40.0, ["ttbasic"],
+                                              receiver_depth_in_km=2.0)
+            times.append([(arr.name, arr.time, arr.ray_param)
+                          for arr in arrivals])
+        return times
+
+    def test_serialize_flat(self):
+        """
+        Flat model files contain the same arrays as the npz files and give
+        identical results.
+        """
+        model = TauModel.from_file(self.npz_filename, flat_copy=False)
+        filename = os.path.join(self.path, "iasp91.taumodel")
+        model.serialize(filename, flat=True)
+        self.assertTrue(is_flat_model_file(filename))
+        self.assertFalse(is_flat_model_file(self.npz_filename))
+        expected = model._to_arrays()
+        got = read_flat_arrays(filename)
+        self.assertEqual(sorted(got), sorted(expected))
+        for key, arr in got.items():
+            self.assertEqual(arr.dtype, np.asarray(expected[key]).dtype)
+            np.testing.assert_array_equal(arr, expected[key])
+            self.assertFalse(arr.flags.writeable)
+        reference = TauPyModel("iasp91")
+        reference.model = model
+        flat = TauPyModel(filename)
+        self.assertEqual(self._get_times(flat), self._get_times(reference))
+        # depth correction must not modify the memory mapped arrays
+        critical_depths = np.array(flat.model.s_mod.critical_depths)
+        flat.model.depth_correct(123.4)
+        np.testing.assert_array_equal(flat.model.s_mod.critical_depths,
+                                      critical_depths)
+
+    def test_flat_copy(self):
+        """
+        A flat copy of npz models is created on first use and replaced if
+        the npz file changes or the copy is corrupt.
+        """
+        npz_filename = os.path.join(self.path, "iasp91.npz")
+        shutil.copy(self.npz_filename, npz_filename)
+        flat_filename = get_flat_copy_filename(npz_filename)
+        self.assertEqual(os.path.dirname(flat_filename),
+                         get_cache_directory("models"))
+        self.assertFalse(os.path.exists(flat_filename))
+        expected = self._get_times(TauPyModel(npz_filename))
+        self.assertTrue(is_flat_model_file(flat_filename))
+        if hasattr(os, "getuid"):
+            # only accessible by the user
+            self.assertEqual(stat.S_IMODE(os.stat(flat_filename).st_mode) &
+                             0o077, 0)
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(
+                flat_filename)).st_mode), 0o700)
+        model = TauPyModel(npz_filename)
+        self.assertFalse(model.model.ray_params.flags.writeable)
+        self.assertEqual(self._get_times(model), expected)
+        with open(flat_filename, "wb") as fh:
+            fh.write(b"OBSPYTAU garbage")
+        model = TauPyModel(npz_filename)
+        self.assertEqual(self._get_times(model), expected)
+        self.assertTrue(read_flat_arrays(flat_filename))
+        # copies in other formats are never loaded
+        shutil.copy(npz_filename, flat_filename)
+        os.chmod(flat_filename, 0o600)
+        with mock.patch("numpy.load", side_effect=np.load) as p:
+            model = TauPyModel(npz_filename)
+        self.assertEqual([c[0][0] for c in p.call_args_list], [npz_filename])
+        self.assertEqual(self._get_times(model), expected)
+        self.assertTrue(is_flat_model_file(flat_filename))
+        # a modified model gets a new copy
+        os.utime(npz_filename, (1, 1))
+        self.assertNotEqual(get_flat_copy_filename(npz_filename),
+                            flat_filename)
+
+    @unittest.skipIf(not hasattr(os, "getuid"), "no POSIX file ownership")
+    def test_flat_copy_not_private(self):
+        """
+        Copies that can be modified by other users are replaced, directories
+        that can be modified by other users are not used at all.
+        """
+        npz_filename = os.path.join(self.path, "iasp91.npz")
+        shutil.copy(self.npz_filename, npz_filename)
+        flat_filename = get_flat_copy_filename(npz_filename)
+        path = os.path.dirname(flat_filename)
+        expected = self._get_times(TauPyModel(npz_filename))
+        # files writable by others or owned by others are replaced
+        os.chmod(flat_filename, 0o666)
+        model = TauPyModel(npz_filename)
+        self.assertTrue(model.model.ray_params.flags.writeable)
+        self.assertEqual(stat.S_IMODE(os.stat(flat_filename).st_mode) &
+                         0o077, 0)
+        model = TauPyModel(npz_filename)
+        self.assertFalse(model.model.ray_params.flags.writeable)
+        with mock.patch("os.getuid", return_value=os.getuid() + 1):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                model = TauPyModel(npz_filename)
+        self.assertEqual(len(w), 1)
+        self.assertIn("Not owned by the current user", str(w[0].message))
+        self.assertTrue(model.model.ray_params.flags.writeable)
+        # no copies in directories writable by others
+        os.remove(flat_filename)
+        os.chmod(path, 0o777)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            model = TauPyModel(npz_filename)
+        self.assertEqual(len(w), 1)
+        self.assertIn("Writable by group or others", str(w[0].message))
+        self.assertFalse(os.path.exists(flat_filename))
+        self.assertEqual(self._get_times(model), expected)
+
+    def test_no_object_arrays(self):
+        """
+        Flat model files can not contain arrays of Python objects.
+        """
+        filename = os.path.join(self.path, "test.taumodel")
+        self.assertRaises(TypeError, write_flat_arrays, filename,
+                          {"a": np.array([None])})
+        write_flat_arrays(filename, {"a": np.arange(3, dtype=np.int64)})
+        with open(filename, "rb") as fh:
+            data = fh.read()
+        with open(filename, "wb") as fh:
+            fh.write(data.replace(b'"<i8"', b'"|O8"'))
+        self.assertRaises(ValueError, read_flat_arrays, filename)
+
+
+def suite():
+    return unittest.makeSuite(FlatModelTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
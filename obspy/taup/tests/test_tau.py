@@ -1023,6 +1023,44 @@ class TauPyModelTestCase(unittest.TestCase):
             self.assertEqual(a.name, d[0])
             self.assertAlmostEqual(a.time, d[1], 3)
 
+    def test_travel_times_many(self):
+        """
+        get_travel_times_many() returns the same arrivals as
+        get_travel_times() called for every distance.
+        """
+        m = TauPyModel(model="iasp91")
+        distances = [0.0, 1.5, 19.5, 35.0, 99.0, 101.5, 145.0, 180.0]
+        for depth, receiver_depth, phases in (
+                (10.0, 0.0, ["ttbasic"]), (300.0, 0.0, ["P", "pP", "PKiKP"]),
+                (50.0, 5.0, ["P", "S"])):
+            result = m.get_travel_times_many(
+                depth, distances, phase_list=phases,
+                receiver_depth_in_km=receiver_depth)
+            for i, distance in enumerate(distances):
+                expected = m.get_travel_times(
+                    depth, distance, phase_list=phases,
+                    receiver_depth_in_km=receiver_depth)
+                got = result[result["distance_index"] == i]
+                self.assertEqual(len(got), len(expected))
+                for row, arr in zip(got, expected):
+                    self.assertEqual(row["distance"], distance)
+                    self.assertEqual(row["name"], arr.name)
+                    self.assertEqual(row["time"], arr.time)
+                    self.assertEqual(row["ray_param"], arr.ray_param)
+                    self.assertEqual(row["takeoff_angle"], arr.takeoff_angle)
+                    self.assertEqual(row["incident_angle"],
+                                     arr.incident_angle)
+                    self.assertEqual(row["purist_distance"],
+                                     arr.purist_distance)
+        self.assertTrue(np.all(np.diff(result["distance_index"]) >= 0))
+        # scalars and empty distances
+        result = m.get_travel_times_many(10.0, 35.0, phase_list=["P"])
+        self.assertEqual(len(result), 1)
+        self.assertAlmostEqual(result[0]["time"], 412.43, 2)
+        self.assertEqual(len(m.get_travel_times_many(10.0, [])), 0)
+        self.assertRaises(ValueError, m.get_travel_times_many, 10.0,
+                          [[10.0]])
+
 
 def suite():
     return unittest.makeSuite(TauPyModelTestCase, 'test')
@@ -8,6 +8,7 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import unittest
+import warnings
 
 import numpy as np
 
@@ -171,6 +172,25 @@ class TaupGeoDistTestCase(unittest.TestCase):
                                          radius_of_planet_in_km=6.371,
                                          flattening_of_planet=0.0), 35.0, 5)
 
+    def test_taup_geo_calc_dist_azi_array(self):
+        """
+        Test for calc_dist_azi with arrays of receivers.
+        """
+        latitudes = np.array([55.0, -20.0, 10.0, 33.0])
+        longitudes = np.array([33.0, 40.0, -170.0, 33.0])
+        for flattening in (0.0, 1 / 298.257223563):
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter('ignore')
+                got = calc_dist_azi(20.0, 33.0, latitudes, longitudes,
+                                    6371.0, flattening)
+                for i in range(len(latitudes)):
+                    expected = calc_dist_azi(20.0, 33.0, latitudes[i],
+                                             longitudes[i], 6371.0,
+                                             flattening)
+                    self.assertAlmostEqual(got[0][i], expected[0], 7)
+                    self.assert_angle_almost_equal(got[1][i], expected[1])
+                    self.assert_angle_almost_equal(got[2][i], expected[2])
+
     def test_taup_geo_calc_dist_azi(self):
         """Test for calc_dist"""
         dist, azi, backazi = calc_dist_azi(source_latitude_in_deg=20.0,
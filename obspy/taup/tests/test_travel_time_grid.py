@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests the TravelTimeGrid class.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import unittest
+
+import numpy as np
+
+from obspy.core.util.base import NamedTemporaryFile
+from obspy.taup.tau import TauPyModel
+from obspy.taup.travel_time_grid import TravelTimeGrid
+
+
+class TravelTimeGridTestCase(unittest.TestCase):
+    """
+    Test suite for the TravelTimeGrid class.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.model = TauPyModel('iasp91')
+        cls.grid = cls.model.create_travel_time_grid(
+            source_depths_in_km=[0, 20, 40, 60],
+            distances_in_degree=np.arange(30, 51, 2.0),
+            phase_list=["P", "S", "PKIKP"])
+
+    def _get_exact(self, depth, distance, phase):
+        arrivals = self.model.get_travel_times(depth, distance, [phase])
+        return min(arr.time for arr in arrivals)
+
+    def test_grid_nodes_and_interpolation(self):
+        grid = self.grid
+        self.assertEqual(grid.phases, ["P", "S", "PKIKP"])
+        self.assertEqual(grid.times.shape, (3, 4, 11))
+        self.assertEqual(grid.model_name, "iasp91")
+        # values at the nodes are exact
+        for phase in ("P", "S"):
+            self.assertAlmostEqual(grid.get_travel_times(20, 34, phase),
+                                   self._get_exact(20, 34, phase), 6)
+        # no PKIKP at these distances
+        self.assertTrue(np.isnan(grid.times[2]).all())
+        # interpolation between the nodes
+        for depth, distance in ((10, 31), (33.3, 47.7), (55, 42.5)):
+            for phase in ("P", "S"):
+                self.assertAlmostEqual(
+                    grid.get_travel_times(depth, distance, phase),
+                    self._get_exact(depth, distance, phase), delta=0.2)
+        # broadcasting of depths and distances
+        times = grid.get_travel_times([[10], [50]], [31, 35, 49], "P")
+        self.assertEqual(times.shape, (2, 3))
+        np.testing.assert_allclose(
+            times[1], [grid.get_travel_times(50, d, "P")
+                       for d in (31, 35, 49)])
+        # outside of the grid
+        times = grid.get_travel_times([-1, 10, 61, 10], [40, 29, 40, 51], "P")
+        self.assertTrue(np.isnan(times).all())
+        self.assertRaises(ValueError, grid.get_travel_times, 10, 40, "SKS")
+
+    def test_save_and_load(self):
+        with NamedTemporaryFile(suffix=".npz") as tf:
+            self.grid.save(tf.name)
+            for mmap in (True, False):
+                grid = TravelTimeGrid.load(tf.name, mmap=mmap)
+                self.assertEqual(isinstance(grid.times, np.memmap), mmap)
+                self.assertEqual(grid.phases, self.grid.phases)
+                self.assertEqual(grid.model_name, "iasp91")
+                np.testing.assert_array_equal(grid.times, self.grid.times)
+                np.testing.assert_array_equal(grid.source_depths,
+                                              self.grid.source_depths)
+                np.testing.assert_array_equal(grid.distances,
+                                              self.grid.distances)
+                np.testing.assert_array_equal(
+                    grid.get_travel_times([5, 45], [33, 41], "S"),
+                    self.grid.get_travel_times([5, 45], [33, 41], "S"))
+                del grid
+
+    def test_parallel_build(self):
+        grid = TravelTimeGrid.from_model(
+            self.model, [0, 40], [30, 40, 50], phase_list=["P"], workers=2)
+        np.testing.assert_array_equal(
+            grid.times[0], self.grid.times[0][::2][:, ::5])
+
+
+def suite():
+    return unittest.makeSuite(TravelTimeGridTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,329 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Precomputed travel time lookup tables.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import functools
+import struct
+import zipfile
+
+import numpy as np
+
+from obspy.core.util.base import _parallel_map
+
+from .taup_time import TauPTime
+from .utils import parse_phase_list
+
+
+# version of the npz representation of travel time grids
+TRAVEL_TIME_GRID_VERSION = 1
+
+
+class TravelTimeGrid(object):
+    """
+    Table of first arrival travel times per phase, interpolated bilinearly in
+    source depth and epicentral distance.
+
+    A grid is built once from a :class:`~obspy.taup.tau.TauPyModel` with
+    :meth:`from_model` (or
+    :meth:`~obspy.taup.tau.TauPyModel.create_travel_time_grid`), can be
+    stored with :meth:`save` and loaded (memory mapped) with :meth:`load`.
+    Queries with :meth:`get_travel_times` work on whole numpy arrays of
+    source depths and distances at once and do not touch the model anymore.
+
+    >>> from obspy.taup import TauPyModel
+    >>> model = TauPyModel("iasp91")
+    >>> grid = model.create_travel_time_grid(
+    ...     source_depths_in_km=[0, 50, 100], distances_in_degree=range(
+    ...         20, 31), phase_list=["P", "S"])
+    >>> times = grid.get_travel_times([10, 75], [20.5, 27.25], "P")
+    >>> print("%.1f s, %.1f s" % tuple(times))
+    278.4 s, 337.0 s
+
+    .. rubric:: Accuracy
+
+    For every phase only the first arrival is stored. Travel times between
+    the grid nodes are linearly interpolated, so the error is governed by the
+    curvature of the travel time curves and by kinks where the first arrival
+    switches between branches of a triplication. For ``iasp91`` on a grid of
+    10 km in depth (0 to 700 km) and 1 degree in distance (0 to 100 degrees)
+    the absolute error for random source depths and distances compared to
+    :meth:`~obspy.taup.tau.TauPyModel.get_travel_times` is:
+
+    ======= ======== ================ =========
+    Phase   Median   99th percentile  Maximum
+    ======= ======== ================ =========
+    ``P``   0.005 s  0.16 s           1.1 s
+    ``S``   0.008 s  0.22 s           3.2 s
+    ======= ======== ================ =========
+
+    The largest errors occur at the upper mantle triplications (about 10 to
+    25 degrees distance) and at very short distances. Away from these, the
+    error decreases with the square of the grid spacing. ``NaN`` is returned
+    outside of the grid and where the phase does not exist at any of the four
+    surrounding grid nodes, so the usable range of a phase ends up to one
+    grid spacing before e.g. a shadow zone. Note that the direct waves of
+    deep sources at short distances are called ``p`` and ``s``, not ``P``
+    and ``S``. Use the exact
+    :meth:`~obspy.taup.tau.TauPyModel.get_travel_times` to check the
+    accuracy of a particular grid in the region of interest.
+
+    :type source_depths: array_like
+    :param source_depths: Strictly increasing source depths of the grid
+        nodes in km.
+    :type distances: array_like
+    :param distances: Strictly increasing epicentral distances of the grid
+        nodes in degrees.
+    :type phases: list of str
+    :param phases: Names of the phases in the grid.
+    :type times: :class:`numpy.ndarray`
+    :param times: Travel times in seconds of shape ``(len(phases),
+        len(source_depths), len(distances))``, ``NaN`` where a phase does not
+        exist.
+    :type model_name: str
+    :param model_name: Name of the model the grid was computed from.
+    :type receiver_depth_in_km: float
+    :param receiver_depth_in_km: Receiver depth the grid was computed for.
+    """
+    def __init__(self, source_depths, distances, phases, times,
+                 model_name=None, receiver_depth_in_km=0.0):
+        self.source_depths = np.asarray(source_depths, dtype=np.float64)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        self.phases = [str(phase) for phase in phases]
+        self.times = times
+        self.model_name = model_name
+        self.receiver_depth_in_km = float(receiver_depth_in_km)
+        shape = (len(self.phases), len(self.source_depths),
+                 len(self.distances))
+        if self.times.shape != shape:
+            msg = "Shape of travel times %s does not match grid axes %s." % (
+                self.times.shape, shape)
+            raise ValueError(msg)
+        for axis in (self.source_depths, self.distances):
+            if np.any(np.diff(axis) <= 0):
+                msg = "Grid axes have to be strictly increasing."
+                raise ValueError(msg)
+
+    def __str__(self):
+        return ("Travel time grid (%s) of %d phase(s) for %d source depths "
+                "(%g - %g km) and %d distances (%g - %g deg)") % (
+            self.model_name, len(self.phases), len(self.source_depths),
+            self.source_depths[0], self.source_depths[-1],
+            len(self.distances), self.distances[0], self.distances[-1])
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    @classmethod
+    def from_model(cls, model, source_depths_in_km, distances_in_degree,
+                   phase_list=("P", "S"), receiver_depth_in_km=0.0,
+                   workers=None, executor=None):
+        """
+        Compute a travel time grid with the exact tau-p calculation.
+
+        :type model: :class:`~obspy.taup.tau.TauPyModel` or str
+        :param model: Model (or name of a model) to compute the grid with.
+        :type source_depths_in_km: array_like
+        :param source_depths_in_km: Source depths of the grid nodes in km.
+        :type distances_in_degree: array_like
+        :param distances_in_degree: Epicentral distances of the grid nodes in
+            degrees.
+        :type phase_list: list of str
+        :param phase_list: Phases to compute, see
+            :meth:`~obspy.taup.tau.TauPyModel.get_travel_times`.
+        :type receiver_depth_in_km: float
+        :param receiver_depth_in_km: Receiver depth in km.
+        :type workers: int, optional
+        :param workers: Number of source depths computed in parallel.
+        :type executor: str or object, optional
+        :param executor: Either ``"thread"`` (default) or ``"process"`` to
+            select the kind of pool created for ``workers``, or an existing
+            pool/executor with a ``map()`` method which is used instead.
+        :rtype: :class:`TravelTimeGrid`
+        """
+        if isinstance(model, (str, native_str)):
+            from .tau import TauPyModel
+            model = TauPyModel(model)
+        source_depths = np.asarray(source_depths_in_km, dtype=np.float64)
+        distances = np.asarray(distances_in_degree, dtype=np.float64)
+        # keep the order of the given phases (parse_phase_list() does not)
+        phases = []
+        for phase_ in phase_list:
+            for phase in sorted(parse_phase_list([phase_])):
+                if phase not in phases:
+                    phases.append(phase)
+        func = functools.partial(_get_first_arrivals, model.model, phases,
+                                 distances, float(receiver_depth_in_km))
+        times = _parallel_map(func, source_depths.tolist(), workers=workers,
+                              executor=executor)
+        times = np.array(times, dtype=np.float64).reshape(
+            len(source_depths), len(phases), len(distances))
+        return cls(source_depths, distances, phases,
+                   np.ascontiguousarray(times.transpose(1, 0, 2)),
+                   model_name=model.model.s_mod.v_mod.model_name,
+                   receiver_depth_in_km=receiver_depth_in_km)
+
+    def save(self, filename):
+        """
+        Save the grid in an (uncompressed) numpy npz file.
+
+        :type filename: str
+        :param filename: Name of the output file.
+        """
+        np.savez(filename, version=TRAVEL_TIME_GRID_VERSION,
+                 source_depths=self.source_depths, distances=self.distances,
+                 phases=np.array(self.phases, dtype=np.unicode_),
+                 times=np.asarray(self.times, dtype=np.float64),
+                 model_name=np.array(self.model_name or "",
+                                     dtype=np.unicode_),
+                 receiver_depth_in_km=self.receiver_depth_in_km)
+
+    @classmethod
+    def load(cls, filename, mmap=True):
+        """
+        Load a grid written with :meth:`save`.
+
+        :type filename: str
+        :param filename: Name of the npz file.
+        :type mmap: bool
+        :param mmap: Memory map the travel times instead of reading them into
+            memory, so that only the parts of the grid touched by queries are
+            read from disk.
+        :rtype: :class:`TravelTimeGrid`
+        """
+        with np.load(filename, allow_pickle=False) as data:
+            version = data["version"].item()
+            if version > TRAVEL_TIME_GRID_VERSION:
+                msg = ("Travel time grid version %d is newer than supported "
+                       "(%d).") % (version, TRAVEL_TIME_GRID_VERSION)
+                raise ValueError(msg)
+            times = None
+            if mmap:
+                times = _memmap_npz_member(filename, "times")
+            if times is None:
+                times = data["times"]
+            return cls(data["source_depths"], data["distances"],
+                       data["phases"].tolist(), times,
+                       model_name=data["model_name"].item() or None,
+                       receiver_depth_in_km=data[
+                           "receiver_depth_in_km"].item())
+
+    def get_travel_times(self, source_depth_in_km, distance_in_degree,
+                         phase):
+        """
+        Interpolate first arrival travel times of a phase.
+
+        Source depths and distances are broadcast against each other.
+
+        :type source_depth_in_km: float or array_like
+        :param source_depth_in_km: Source depth(s) in km.
+        :type distance_in_degree: float or array_like
+        :param distance_in_degree: Epicentral distance(s) in degrees.
+        :type phase: str
+        :param phase: Name of one of the phases in the grid.
+        :rtype: :class:`numpy.ndarray` or float
+        :returns: Travel times in seconds, ``NaN`` outside of the grid or
+            where the phase does not exist.
+        """
+        try:
+            index = self.phases.index(phase)
+        except ValueError:
+            msg = "Phase '%s' not in travel time grid (available: %s)." % (
+                phase, ", ".join(self.phases))
+            raise ValueError(msg)
+        depths, distances = np.broadcast_arrays(
+            np.asarray(source_depth_in_km, dtype=np.float64),
+            np.asarray(distance_in_degree, dtype=np.float64))
+        i, wi, valid_i = _get_interpolation_weights(self.source_depths,
+                                                    depths)
+        j, wj, valid_j = _get_interpolation_weights(self.distances,
+                                                    distances)
+        times = self.times[index]
+        i1 = np.minimum(i + 1, len(self.source_depths) - 1)
+        j1 = np.minimum(j + 1, len(self.distances) - 1)
+        result = ((1.0 - wi) * ((1.0 - wj) * times[i, j] + wj * times[i, j1]) +
+                  wi * ((1.0 - wj) * times[i1, j] + wj * times[i1, j1]))
+        result = np.where(valid_i & valid_j, result, np.nan)
+        if result.ndim == 0:
+            return float(result)
+        return result
+
+
+def _get_first_arrivals(tau_model, phases, distances, receiver_depth, depth):
+    """
+    Computes the first arrival times of all phases for one source depth.
+
+    Module level function so it can be used with process pools.
+
+    :rtype: :class:`numpy.ndarray`
+    :returns: Times of shape ``(len(phases), len(distances))``.
+    """
+    times = np.empty((len(phases), len(distances)), dtype=np.float64)
+    times.fill(np.nan)
+    tt = TauPTime(tau_model, phases, depth, None, receiver_depth)
+    tt.depth_correct(depth, receiver_depth)
+    tt.recalc_phases()
+    for phase in tt.phases:
+        i = phases.index(phase.name)
+        for j, arrivals in enumerate(phase.calc_time_many(distances)):
+            if arrivals:
+                times[i, j] = min(arr.time for arr in arrivals)
+    return times
+
+
+def _get_interpolation_weights(axis, values):
+    """
+    Returns indices of the lower grid nodes, linear interpolation weights
+    and a mask of values inside of the grid axis.
+    """
+    valid = (values >= axis[0]) & (values <= axis[-1])
+    if len(axis) == 1:
+        return (np.zeros(values.shape, dtype=np.intp),
+                np.zeros(values.shape), valid)
+    index = np.searchsorted(axis, values, side="right") - 1
+    index = np.clip(index, 0, len(axis) - 2)
+    weights = (values - axis[index]) / (axis[index + 1] - axis[index])
+    return index, weights, valid
+
+
+def _memmap_npz_member(filename, name):
+    """
+    Memory maps an array stored uncompressed in an npz file.
+
+    Returns ``None`` if the member is compressed.
+    """
+    with zipfile.ZipFile(filename) as zf:
+        info = zf.getinfo(name + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(filename, "rb") as fh:
+        # skip the local file header of the zip member
+        fh.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack(native_str("<HH"),
+                                                  fh.read(4))
+        fh.seek(name_length + extra_length, 1)
+        version = np.lib.format.read_magic(fh)
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(fh)
+        else:
+            header = np.lib.format.read_array_header_2_0(fh)
+        shape, fortran_order, dtype = header
+        offset = fh.tell()
+    return np.memmap(filename, dtype=dtype, mode="r", offset=offset,
+                     shape=shape, order="F" if fortran_order else "C")
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
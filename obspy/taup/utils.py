@@ -7,8 +7,11 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
+import errno
 import inspect
 import os
+import stat
+import sys
 
 
 ROOT = os.path.dirname(os.path.abspath(inspect.getfile(
@@ -61,3 +64,63 @@ def get_phase_names(phase_name):
         names.append(phase_name)
 
     return names
+
+
+def get_cache_directory(name):
+    """
+    Returns the name of a per-user cache directory of :mod:`obspy.taup`.
+
+    The directory is ``obspy/taup/<name>`` in ``$XDG_CACHE_HOME`` (defaults
+    to ``~/.cache``) or in ``%LOCALAPPDATA%`` on Windows. It is not created.
+
+    :type name: str
+    :param name: Name of the cache.
+    """
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or \
+            os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "obspy", "taup", name)
+
+
+def check_private_path(path):
+    """
+    Checks that a file or directory can only be modified by the current
+    user, i.e. that it is owned by the current user and not writable by
+    group or others.
+
+    Files in cache directories are loaded without further checks, so caches
+    must not be used if other users can write to them. Always passes on
+    systems without POSIX ownership (e.g. Windows).
+
+    :type path: str
+    :param path: Name of the file or directory.
+    :raises OSError: If the path does not exist or does not pass the check.
+    """
+    if not hasattr(os, "getuid"):
+        return
+    st = os.stat(path)
+    if st.st_uid != os.getuid():
+        raise OSError(errno.EACCES, "Not owned by the current user", path)
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise OSError(errno.EACCES, "Writable by group or others", path)
+
+
+def make_private_directory(path):
+    """
+    Creates a directory only accessible by the current user (including
+    missing parent directories) or checks an existing one with
+    :func:`check_private_path`.
+
+    :type path: str
+    :param path: Name of the directory.
+    :raises OSError: If the directory can not be created or an existing one
+        can be modified by other users.
+    """
+    try:
+        os.makedirs(path, 0o700)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+    check_private_path(path)
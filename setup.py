@@ -169,16 +169,19 @@ ENTRY_POINTS = {
         ],
     'obspy.plugin.waveform.TSPAIR': [
         'isFormat = obspy.io.ascii.core:_is_tspair',
+        'signature = obspy.io.ascii.core:_TSPAIR_SIGNATURE',
         'readFormat = obspy.io.ascii.core:_read_tspair',
         'writeFormat = obspy.io.ascii.core:_write_tspair',
         ],
     'obspy.plugin.waveform.SLIST': [
         'isFormat = obspy.io.ascii.core:_is_slist',
+        'signature = obspy.io.ascii.core:_SLIST_SIGNATURE',
         'readFormat = obspy.io.ascii.core:_read_slist',
         'writeFormat = obspy.io.ascii.core:_write_slist',
         ],
     'obspy.plugin.waveform.PICKLE': [
         'isFormat = obspy.core.stream:_is_pickle',
+        'signature = obspy.core.stream:_PICKLE_SIGNATURE',
         'readFormat = obspy.core.stream:_read_pickle',
         'writeFormat = obspy.core.stream:_write_pickle',
         ],
@@ -200,24 +203,29 @@ ENTRY_POINTS = {
         ],
     'obspy.plugin.waveform.GSE1': [
         'isFormat = obspy.io.gse2.core:_is_gse1',
+        'signature = obspy.io.gse2.core:_GSE1_SIGNATURE',
         'readFormat = obspy.io.gse2.core:_read_gse1',
         ],
     'obspy.plugin.waveform.GSE2': [
         'isFormat = obspy.io.gse2.core:_is_gse2',
+        'signature = obspy.io.gse2.core:_GSE2_SIGNATURE',
         'readFormat = obspy.io.gse2.core:_read_gse2',
         'writeFormat = obspy.io.gse2.core:_write_gse2',
         ],
     'obspy.plugin.waveform.MSEED': [
         'isFormat = obspy.io.mseed.core:_is_mseed',
+        'signature = obspy.io.mseed.core:_MSEED_SIGNATURE',
         'readFormat = obspy.io.mseed.core:_read_mseed',
         'writeFormat = obspy.io.mseed.core:_write_mseed',
         ],
     'obspy.plugin.waveform.PDAS': [
         'isFormat = obspy.io.pdas.core:_is_pdas',
+        'signature = obspy.io.pdas.core:_PDAS_SIGNATURE',
         'readFormat = obspy.io.pdas.core:_read_pdas',
         ],
     'obspy.plugin.waveform.SAC': [
         'isFormat = obspy.io.sac.core:_is_sac',
+        'signature = obspy.io.sac.core:_SAC_SIGNATURE',
         'readFormat = obspy.io.sac.core:_read_sac',
         'writeFormat = obspy.io.sac.core:_write_sac',
         ],
@@ -228,15 +236,18 @@ ENTRY_POINTS = {
         ],
     'obspy.plugin.waveform.SEG2': [
         'isFormat = obspy.io.seg2.seg2:_is_seg2',
+        'signature = obspy.io.seg2.seg2:_SEG2_SIGNATURE',
         'readFormat = obspy.io.seg2.seg2:_read_seg2',
         ],
     'obspy.plugin.waveform.SEGY': [
         'isFormat = obspy.io.segy.core:_is_segy',
+        'signature = obspy.io.segy.core:_SEGY_SIGNATURE',
         'readFormat = obspy.io.segy.core:_read_segy',
         'writeFormat = obspy.io.segy.core:_write_segy',
         ],
     'obspy.plugin.waveform.SU': [
         'isFormat = obspy.io.segy.core:_is_su',
+        'signature = obspy.io.segy.core:_SU_SIGNATURE',
         'readFormat = obspy.io.segy.core:_read_su',
         'writeFormat = obspy.io.segy.core:_write_su',
         ],
@@ -246,16 +257,19 @@ ENTRY_POINTS = {
         ],
     'obspy.plugin.waveform.Q': [
         'isFormat = obspy.io.sh.core:_is_q',
+        'signature = obspy.io.sh.core:_Q_SIGNATURE',
         'readFormat = obspy.io.sh.core:_read_q',
         'writeFormat = obspy.io.sh.core:_write_q',
         ],
     'obspy.plugin.waveform.SH_ASC': [
         'isFormat = obspy.io.sh.core:_is_asc',
+        'signature = obspy.io.sh.core:_SH_ASC_SIGNATURE',
         'readFormat = obspy.io.sh.core:_read_asc',
         'writeFormat = obspy.io.sh.core:_write_asc',
         ],
     'obspy.plugin.waveform.WAV': [
         'isFormat = obspy.io.wav.core:_is_wav',
+        'signature = obspy.io.wav.core:_WAV_SIGNATURE',
         'readFormat = obspy.io.wav.core:_read_wav',
         'writeFormat = obspy.io.wav.core:_write_wav',
         ],
@@ -274,6 +288,7 @@ ENTRY_POINTS = {
         ],
     'obspy.plugin.waveform.GCF': [
         'isFormat = obspy.io.gcf.core:_is_gcf',
+        'signature = obspy.io.gcf.core:_GCF_SIGNATURE',
         'readFormat = obspy.io.gcf.core:_read_gcf',
         ],
     'obspy.plugin.waveform.REFTEK130': [
@@ -301,6 +316,7 @@ ENTRY_POINTS = {
         ],
     'obspy.plugin.event.QUAKEML': [
         'isFormat = obspy.io.quakeml.core:_is_quakeml',
+        'signature = obspy.io.quakeml.core:_QUAKEML_SIGNATURE',
         'readFormat = obspy.io.quakeml.core:_read_quakeml',
         'writeFormat = obspy.io.quakeml.core:_write_quakeml',
         ],
@@ -383,6 +399,7 @@ ENTRY_POINTS = {
         ],
     'obspy.plugin.inventory.STATIONXML': [
         'isFormat = obspy.io.stationxml.core:_is_stationxml',
+        'signature = obspy.io.stationxml.core:_STATIONXML_SIGNATURE',
         'readFormat = obspy.io.stationxml.core:_read_stationxml',
         'writeFormat = obspy.io.stationxml.core:_write_stationxml',
         ],